@@ -5,6 +5,18 @@ import QuizAttempt from "../../models/QuizAttempt.js";
 
 const router = express.Router();
 
+// Grading for no-auth-submit-attempt: the comparison submit-answer and
+// no-auth-submit-answer make inline.
+const isAnswerCorrect = (question, answer) => {
+  if (typeof answer !== typeof question.correctAnswer) return false;
+  if (typeof answer === String) return answer === question.correctAnswer;
+  return (
+    answer.length === question.correctAnswer.length &&
+    JSON.stringify([...answer].sort()) ===
+      JSON.stringify([...question.correctAnswer].sort())
+  );
+};
+
 // GET /api/quizzes?lessonId=...
 // Gets all quizzes for a specific LESSON
 router.get("/", async (req, res) => {
@@ -409,4 +421,79 @@ router.post("/no-auth-submit-answer", async (req, res) => {
   }
 });
 
+// POST /api/quizzes/no-auth-submit-attempt
+// Bulk variant of no-auth-submit-answer used by the seeding scripts: stores
+// several consecutive answers of one (user, quiz) pair with a single save.
+// Body: { quizId, userId, startIndex?, answers: [...] }
+router.post("/no-auth-submit-attempt", async (req, res) => {
+  try {
+    const { quizId, userId, answers } = req.body;
+    const startIndex = req.body.startIndex ?? 0;
+
+    if (!quizId || !userId || !Array.isArray(answers) || answers.length === 0) {
+      return res.status(400).json({
+        message:
+          "Missing required fields: quizId, userId and a non-empty answers array are required.",
+      });
+    }
+
+    if (answers.some((answer) => answer == null)) {
+      return res.status(400).json({ message: "Answers cannot be null." });
+    }
+
+    const quiz = await Quiz.findById(quizId);
+    if (!quiz) {
+      return res.status(404).json({ message: "Quiz not found" });
+    }
+
+    let quizAttempt = await QuizAttempt.findOne({ userId, quizId });
+    if (!quizAttempt) {
+      quizAttempt = new QuizAttempt({
+        userId,
+        quizId,
+        lessonId: quiz.lessonId,
+        completed: false,
+        questionsAnswered: 0,
+        currentScore: 0,
+        answers: [],
+      });
+    }
+
+    if (startIndex !== quizAttempt.questionsAnswered) {
+      return res.status(400).json({ message: "Question not allowed" });
+    }
+
+    if (startIndex + answers.length > quiz.questions.length) {
+      return res.status(404).json({ message: "Question not found" });
+    }
+
+    const results = answers.map((answer, offset) => {
+      const question = quiz.questions[startIndex + offset];
+      const isCorrect = isAnswerCorrect(question, answer);
+
+      quizAttempt.answers.push({
+        correct: isCorrect,
+        score: isCorrect ? question.value : 0,
+        answer,
+      });
+      quizAttempt.questionsAnswered++;
+
+      return { correct: isCorrect, answer: question.correctAnswer };
+    });
+
+    if (quizAttempt.questionsAnswered === quiz.questions.length) {
+      quizAttempt.completed = true;
+    }
+
+    await quizAttempt.save();
+
+    return res.json({ results });
+  } catch (err) {
+    console.error(err);
+    return res
+      .status(500)
+      .json({ message: "Server error while submitting attempt." });
+  }
+});
+
 export default router;
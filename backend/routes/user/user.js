@@ -78,12 +78,41 @@ router.get("/:userId", async (req, res) => {
 
 // GET /api/users
 // Get all users (useful for admin to see all users and their roles)
+// Optional cursor paging: ?limit=N&after=<lastUserId> returns the next N users
+// in _id order. Without limit the whole list is returned as before.
+const MAX_PAGE_SIZE = 5000;
+
 router.get("/", async (req, res) => {
   try {
-    const users = await User.find().select("name email role createdAt");
+    const { limit, after } = req.query;
+
+    if (limit === undefined) {
+      const users = await User.find().select("name email role createdAt");
+      return res.json(users);
+    }
+
+    const pageSize = Number(limit);
+    if (!Number.isInteger(pageSize) || pageSize < 1 || pageSize > MAX_PAGE_SIZE) {
+      return res.status(400).json({
+        message: `limit must be an integer between 1 and ${MAX_PAGE_SIZE}.`,
+      });
+    }
+
+    const filter = after ? { _id: { $gt: after } } : {};
+    const users = await User.find(filter)
+      .sort({ _id: 1 })
+      .limit(pageSize)
+      .select("name email role createdAt")
+      .lean();
+
     return res.json(users);
   } catch (err) {
     console.error(err);
+
+    if (err.name === "CastError") {
+      return res.status(400).json({ message: "Invalid cursor." });
+    }
+
     return res.status(500).json({
       message: "Server error while fetching users.",
     });
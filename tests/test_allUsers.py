@@ -0,0 +1,157 @@
+import csv
+import json
+import os
+
+import pytest
+import requests
+
+from utils import allUsers
+
+USERS = [{"_id": f"{i:024x}", "name": f"User {i}", "email": f"u{i}@x.com",
+          "role": "admin" if i % 4 == 0 else "student", "createdAt": "2026-01-01T00:00:00.000Z"}
+         for i in range(1, 24)]
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+class FakeSession:
+    """Pages USERS by ?limit=&after=; fails the request after `fail_after` pages."""
+
+    def __init__(self, users=USERS, paged=True, fail_after=None):
+        self.users = users
+        self.paged = paged
+        self.fail_after = fail_after
+        self.calls = []
+
+    def get(self, url, params=None):
+        self.calls.append(dict(params or {}))
+        if self.fail_after is not None and len(self.calls) > self.fail_after:
+            raise requests.exceptions.ConnectionError("server went away")
+        if not self.paged:
+            return FakeResponse(self.users)
+        after = params.get("after")
+        rest = [u for u in self.users if after is None or u["_id"] > after]
+        return FakeResponse(rest[:params["limit"]])
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    def install(**kwargs):
+        session = FakeSession(**kwargs)
+        monkeypatch.setattr(allUsers, "session", session)
+        return session
+    return install
+
+
+def read_ndjson(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def expected_roles(users=USERS):
+    roles = {}
+    for user in users:
+        allUsers.add_to_role_count(roles, user)
+    return roles
+
+
+def test_ndjson_export(fake, tmp_path):
+    session = fake()
+    path = str(tmp_path / "users.ndjson")
+    roles = allUsers.export_users(path, page_size=5)
+    assert read_ndjson(path) == USERS
+    assert roles == expected_roles()
+    assert not os.path.exists(allUsers.export_state_path(path))
+    # 5 pages of 5, the last one short ends the walk
+    assert [c.get("after") for c in session.calls] == [None] + [USERS[i]["_id"] for i in (4, 9, 14, 19)]
+
+
+def test_csv_export(fake, tmp_path):
+    fake()
+    path = str(tmp_path / "users.csv")
+    allUsers.export_users(path, page_size=10)
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["email"] for r in rows] == [u["email"] for u in USERS]
+    assert list(rows[0]) == allUsers.EXPORT_FIELDS
+
+
+def test_unpaged_backend_is_one_page(fake, tmp_path):
+    session = fake(paged=False)
+    path = str(tmp_path / "users.ndjson")
+    allUsers.export_users(path, page_size=5)
+    assert read_ndjson(path) == USERS
+    assert len(session.calls) == 1
+
+
+def test_unpaged_backend_with_a_full_page_ends(fake, tmp_path):
+    session = fake(paged=False)
+    path = str(tmp_path / "users.ndjson")
+    allUsers.export_users(path, page_size=len(USERS))
+    assert read_ndjson(path) == USERS
+    assert len(session.calls) == 2
+
+
+@pytest.mark.parametrize("name", ["users.ndjson", "users.csv"])
+def test_resume_after_interruption(fake, tmp_path, name):
+    path = str(tmp_path / name)
+    fake(fail_after=2)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        allUsers.export_users(path, page_size=5)
+    state = allUsers.load_export_state(path)
+    assert state["exported"] == 10 and state["after"] == USERS[9]["_id"]
+
+    # Half a page written after the checkpoint is dropped on resume
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("partial line")
+
+    session = fake()
+    roles = allUsers.export_users(path, page_size=5, resume=True)
+    assert session.calls[0]["after"] == USERS[9]["_id"]
+    assert roles == expected_roles()
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    reference = str(tmp_path / f"reference-{name}")
+    fake()
+    allUsers.export_users(reference, page_size=5)
+    with open(reference, encoding="utf-8") as f:
+        assert content == f.read()
+
+
+def test_resume_rejects_another_format(fake, tmp_path):
+    path = str(tmp_path / "users.out")
+    fake(fail_after=1)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        allUsers.export_users(path, fmt="csv", page_size=5)
+    fake()
+    with pytest.raises(ValueError):
+        allUsers.export_users(path, fmt="ndjson", page_size=5, resume=True)
+
+
+def test_without_resume_starts_over(fake, tmp_path):
+    path = str(tmp_path / "users.ndjson")
+    fake(fail_after=1)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        allUsers.export_users(path, page_size=5)
+    fake()
+    allUsers.export_users(path, page_size=5)
+    assert read_ndjson(path) == USERS
+
+
+def test_main_reports_a_failed_export(fake, tmp_path, capsys):
+    path = str(tmp_path / "users.ndjson")
+    fake(fail_after=1)
+    assert allUsers.main(["--export", path, "--page-size", "5"]) == 1
+    assert "Cannot connect" in capsys.readouterr().out
+    fake()
+    assert allUsers.main(["--export", path, "--page-size", "5", "--resume"]) == 0
+    assert read_ndjson(path) == USERS
@@ -0,0 +1,96 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from utils import asyncSeeder
+from utils.httpClient import create_session
+from utils.loadtest.standin import running_standin
+from utils.quizGrading import grade_attempts
+from utils.tokenPool import TokenPool
+
+QUESTIONS = [
+    {"title": "p1", "type": "multiple-choice", "options": ["si", "no"], "correctAnswer": "si", "value": 1},
+    {"title": "p2", "type": "multiple-choice", "options": ["si", "no"], "correctAnswer": "no", "value": 2},
+    {"title": "p3", "type": "number", "correctAnswer": 7, "value": 3},  # a number answer makes the route throw
+    {"title": "p4", "type": "multiple-choice", "options": ["si", "no"], "correctAnswer": "si", "value": 4},
+]
+
+
+class Draws:
+    """rng stand-in: random() returns the given values in turn (< 0.2 picks a wrong answer)."""
+
+    def __init__(self, *values):
+        self.values = list(values)
+
+    def random(self):
+        return self.values.pop(0)
+
+
+@pytest.fixture(scope="module")
+def backend():
+    with running_standin() as host:
+        admin = create_session(persist_cookies=True)
+        admin.post(f"{host}/api/auth/login", json={"email": "admin1@email.com", "password": "password1"})
+        students = {}
+        for i in range(1, 6):
+            student = create_session(persist_cookies=True)
+            data = student.post(f"{host}/api/auth/login",
+                                json={"email": f"student{i}@email.com", "password": f"password{i}"}).json()
+            students[data["user"]["id"]] = student
+        yield host, admin, students
+
+
+def new_quiz(backend, questions):
+    host, admin, _ = backend
+    quiz_id = admin.post(f"{host}/api/quizzes", json={"title": "t", "description": "", "questions": []}).json()["_id"]
+    admin.put(f"{host}/api/quizzes/{quiz_id}", json={"title": "t", "questions": questions, "deleteAttempts": False})
+    return quiz_id
+
+
+def take_quiz(backend, monkeypatch, quiz_id, questions, user_id, mode, rng):
+    monkeypatch.setattr(asyncSeeder, "TokenPool", lambda **kwargs: TokenPool(cache_file=None, **kwargs))
+
+    async def run():
+        async with aiohttp.ClientSession() as session:
+            seeder = asyncSeeder.Seeder(session, base_url=f"{backend[0]}/api", rng=rng, attempt_mode=mode)
+            await seeder.take_quiz(quiz_id, questions, user_id)
+            return seeder.stats["attempts"]
+
+    return asyncio.run(run())
+
+
+def stored_score(backend, quiz_id, user_id):
+    host, _, students = backend
+    return students[user_id].get(f"{host}/api/quizzes/quiz-score", params={"quizId": quiz_id}).json()["score"]
+
+
+@pytest.mark.parametrize("mode, grading, user", [("pipelined", "sequential", 0), ("batch", "batch", 1)])
+def test_seeded_attempts_match_the_grader(backend, monkeypatch, mode, grading, user):
+    questions = [QUESTIONS[0], QUESTIONS[1], QUESTIONS[3]]
+    quiz_id = new_quiz(backend, questions)
+    user_id = list(backend[2])[user]
+    stats = take_quiz(backend, monkeypatch, quiz_id, questions, user_id, mode, Draws(0.5, 0.1, 0.5))
+    answers = ["si", "Wrong Answer Value", "si"]
+    expected = grade_attempts([{"_id": quiz_id, "questions": questions}], [(quiz_id, user_id, answers)], mode=grading)
+    assert stored_score(backend, quiz_id, user_id) == expected.score_pct[0] == 71.43
+    assert stats.failed == 0
+
+
+def test_pipelined_keeps_sending_after_a_rejected_answer(backend, monkeypatch):
+    quiz_id = new_quiz(backend, QUESTIONS)
+    user_id = list(backend[2])[2]
+    stats = take_quiz(backend, monkeypatch, quiz_id, QUESTIONS, user_id, "pipelined", Draws(0.5, 0.5, 0.5, 0.5))
+    # The 500 on question 3 is followed by question 4, which is refused as out of step
+    assert (stats.ok, stats.failed) == (2, 2)
+    answers = [q["correctAnswer"] for q in QUESTIONS]
+    expected = grade_attempts([{"_id": quiz_id, "questions": QUESTIONS}], [(quiz_id, user_id, answers)])
+    assert stored_score(backend, quiz_id, user_id) == expected.score_pct[0] == 30.0
+
+
+def test_batch_stores_nothing_after_a_rejected_answer(backend, monkeypatch):
+    quiz_id = new_quiz(backend, QUESTIONS)
+    user_id = list(backend[2])[3]
+    stats = take_quiz(backend, monkeypatch, quiz_id, QUESTIONS, user_id, "batch", Draws(0.5, 0.5, 0.5, 0.5))
+    assert (stats.ok, stats.failed) == (0, 1)
+    assert stored_score(backend, quiz_id, user_id) == 0
@@ -0,0 +1,78 @@
+import pytest
+
+from utils import attemptPipeline
+from utils.httpClient import create_session
+from utils.loadtest.standin import running_standin
+from utils.quizGrading import CORRECT, MISSING, NOT_SENT, grade_attempts
+
+QUESTIONS = [
+    {"title": "p1", "type": "multiple-choice", "options": ["si", "no"], "correctAnswer": "si", "value": 1},
+    {"title": "p2", "type": "multiple-choice", "options": ["si", "no"], "correctAnswer": "no", "value": 2},
+    {"title": "p3", "type": "multiple-choice", "options": ["si", "no"], "correctAnswer": "si", "value": 3},
+]
+
+
+def test_build_queues_keeps_one_attempt_per_pair(capsys):
+    queues = attemptPipeline.build_queues([("q1", "u1", ["a", "b"]), ("q1", "u2", ["c"]), ("q1", "u1", ["d"])])
+    assert {pair: list(queue) for pair, queue in queues.items()} == {("q1", "u1"): ["a", "b"], ("q1", "u2"): ["c"]}
+    assert "Skipped 1 attempt(s)" in capsys.readouterr().out
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        attemptPipeline.run_attempts([], mode="parallel")
+
+
+@pytest.fixture(scope="module")
+def backend():
+    """A stand-in with one quiz, and a logged-in session per parametros/ student by user id."""
+    with running_standin() as host:
+        admin = create_session(persist_cookies=True)
+        admin.post(f"{host}/api/auth/login", json={"email": "admin1@email.com", "password": "password1"})
+        quiz_id = admin.post(f"{host}/api/quizzes", json={"title": "t", "description": "", "questions": []}).json()["_id"]
+        admin.put(f"{host}/api/quizzes/{quiz_id}", json={"title": "t", "questions": QUESTIONS, "deleteAttempts": False})
+        students = {}
+        for i in range(1, 6):
+            student = create_session(persist_cookies=True)
+            data = student.post(f"{host}/api/auth/login",
+                                json={"email": f"student{i}@email.com", "password": f"password{i}"}).json()
+            students[data["user"]["id"]] = student
+        yield host, quiz_id, students
+
+
+@pytest.fixture
+def pipeline(backend, monkeypatch):
+    host = backend[0]
+    monkeypatch.setattr(attemptPipeline, "QUIZ_ATTEMPT_URL", f"{host}/api/quizzes/no-auth-submit-answer")
+    monkeypatch.setattr(attemptPipeline, "QUIZ_ATTEMPT_BATCH_URL", f"{host}/api/quizzes/no-auth-submit-attempt")
+    return backend
+
+
+def stored_score(pipeline, user_id):
+    host, quiz_id, students = pipeline
+    return students[user_id].get(f"{host}/api/quizzes/quiz-score", params={"quizId": quiz_id}).json()["score"]
+
+
+@pytest.mark.parametrize("mode, user", [("serial", 0), ("pipelined", 1), ("batch", 2)])
+def test_modes_store_the_same_attempts(pipeline, mode, user):
+    host, quiz_id, students = pipeline
+    user_id = list(students)[user]
+    attempts = [(quiz_id, user_id, ["si", "si", "si"])]
+    completed, accepted = attemptPipeline.run_attempts(attempts, mode=mode, workers=2)
+    assert (completed, accepted) == (1, 3)
+    expected = grade_attempts([{"_id": quiz_id, "questions": QUESTIONS}], attempts)
+    assert stored_score(pipeline, user_id) == expected.score_pct[0] == 66.67
+    # A second submission of the pair is refused: questionIndex 0 was already answered
+    assert attemptPipeline.run_attempts(attempts, mode=mode) == (0, 0)
+
+
+def test_nothing_after_a_rejected_answer_is_stored(pipeline):
+    host, quiz_id, students = pipeline
+    user_id = list(students)[3]
+    attempts = [(quiz_id, user_id, ["si", None, "si"])]
+    # The null answer is refused (400); questionIndex 2 is then out of step and refused too
+    assert attemptPipeline.run_attempts(attempts, mode="pipelined") == (0, 1)
+    result = grade_attempts([{"_id": quiz_id, "questions": QUESTIONS}], attempts)
+    assert list(result.outcome) == [CORRECT, MISSING, NOT_SENT]
+    assert list(result.questions_answered) == [1]
+    assert stored_score(pipeline, user_id) == result.score_pct[0] == 16.67
@@ -0,0 +1,100 @@
+import json
+import math
+from functools import partial
+
+import pytest
+
+from utils.loadtest import benchmarks
+from utils.loadtest.standin import running_standin
+from utils.tokenPool import TokenPool
+
+
+def entry(*p95s, throughput=100.0):
+    """A stored workload entry whose rounds have the given p95s (seconds); 20 latencies per round."""
+    rounds = [{"wall_time": 20 / throughput, "failed": 0, "latencies": [p95 / 2] * 18 + [p95] * 2} for p95 in p95s]
+    return {"description": "", "requests": 20, "concurrency": 1, "rounds": rounds}
+
+
+def test_mann_whitney_exact_small_samples():
+    # x above y in every pair: 1 ordering in C(6, 3) = 20
+    assert benchmarks.mann_whitney_greater([4, 5, 6], [1, 2, 3]) == pytest.approx(1 / 20)
+    assert benchmarks.mann_whitney_greater([1, 2, 3], [4, 5, 6]) == 1.0
+    assert benchmarks.mann_whitney_greater([1, 2], []) == 1.0
+    for n1, n2 in ((1, 1), (3, 4), (5, 5)):
+        assert sum(benchmarks._u_distribution(n1, n2)) == math.comb(n1 + n2, n1)
+
+
+def test_mann_whitney_ties_and_large_samples(monkeypatch):
+    assert benchmarks.mann_whitney_greater([1.0] * 5, [1.0] * 5) == 1.0
+    assert benchmarks.mann_whitney_greater([1, 2, 2, 3], [2, 2, 2, 2]) == pytest.approx(0.5, abs=0.2)
+    x, y = list(range(10, 30)), list(range(0, 20))
+    exact = benchmarks.mann_whitney_greater(x, y)
+    monkeypatch.setattr(benchmarks, "EXACT_LIMIT", 0)
+    assert benchmarks.mann_whitney_greater(x, y) == pytest.approx(exact, abs=0.005)
+
+
+def verdicts(baseline, candidate):
+    return {row[0]: row[5] for row in benchmarks.compare_workload(baseline, candidate, threshold=10, alpha=0.05)}
+
+
+def test_compare_workload_verdicts():
+    base = entry(0.100, 0.101, 0.102, 0.103, 0.104)
+    assert verdicts(base, entry(0.130, 0.131, 0.132, 0.133, 0.134))["p95"] == "regression"
+    assert verdicts(base, entry(0.070, 0.071, 0.072, 0.073, 0.074))["p95"] == "improvement"
+    assert verdicts(base, entry(0.101, 0.102, 0.103, 0.104, 0.105))["p95"] == "ok"
+    # Two rounds a side can never reach p < 0.05 (the smallest is 1/6)
+    assert verdicts(entry(0.100, 0.101), entry(0.130, 0.131))["p95"] == "not significant"
+    assert verdicts(base, entry(0.100, 0.101, 0.102, 0.103, 0.104, throughput=50))["throughput"] == "regression"
+
+
+def test_compare_results_counts_regressions(capsys):
+    base = {"commit": "a" * 40, "dirty": False, "workloads": {"w": entry(0.10, 0.10, 0.10, 0.10, 0.10)}}
+    cand = {"commit": "b" * 40, "dirty": True, "workloads": {"w": entry(0.20, 0.21, 0.22, 0.23, 0.24),
+                                                            "new": entry(0.1)}}
+    assert benchmarks.compare_results(base, cand) == 1
+    out = capsys.readouterr().out
+    assert "bbbbbbbbbbbb-dirty vs baseline aaaaaaaaaaaa" in out and "new                (no baseline)" in out
+
+
+def test_result_store(tmp_path):
+    directory = str(tmp_path)
+    head = benchmarks.git("rev-parse", "HEAD")
+    parent = benchmarks.git("rev-parse", "HEAD~1")
+    benchmarks.save_result({"commit": parent, "dirty": False, "created": "1", "workloads": {"a": 1}}, directory)
+    benchmarks.save_result({"commit": head, "dirty": False, "created": "2", "workloads": {"a": 1, "b": 1}}, directory)
+    path = benchmarks.save_result({"commit": head, "dirty": False, "created": "3", "workloads": {"b": 2}}, directory)
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["workloads"] == {"a": 1, "b": 2}
+    assert path.endswith(f"{head[:12]}.json")
+
+    dirty = {"commit": head, "dirty": True, "created": "4", "workloads": {}}
+    benchmarks.save_result(dirty, directory)
+    assert [r["created"] for r in benchmarks.load_results(directory)] == ["1", "3", "4"]
+    assert benchmarks.find_result("HEAD", directory)["created"] == "3"
+    assert benchmarks.find_result(f"{head[:7]}-dirty", directory)["created"] == "4"
+    assert benchmarks.find_result(path, directory)["created"] == "3"
+    assert benchmarks.find_result("0" * 12, directory) is None
+    assert benchmarks.default_baseline(dirty, directory)["created"] == "3"
+    assert benchmarks.default_baseline({"commit": head, "dirty": False}, directory)["created"] == "1"
+
+
+def test_select_workloads():
+    assert [w.name for w in benchmarks.select_workloads("login_burst, upload_large")] == \
+        ["login_burst", "upload_large"]
+    assert all(w.default for w in benchmarks.select_workloads(None))
+    with pytest.raises(ValueError):
+        benchmarks.select_workloads("login_burst,nope")
+
+
+def test_workloads_pass_against_the_standin(monkeypatch):
+    monkeypatch.setattr(benchmarks, "TokenPool", partial(TokenPool, cache_file=None))
+    names = ["login_burst", "my_students_10", "submit_answer", "download_small"]
+    with running_standin() as host:
+        bench = benchmarks.Bench(host, max_workers=20)
+        try:
+            results = {name: benchmarks.run_workload(bench, benchmarks.WORKLOADS[name], repeat=2, scale=0.1)
+                       for name in names}
+        finally:
+            bench.close()
+    for name, result in results.items():
+        assert [(r["failed"], len(r["latencies"])) for r in result["rounds"]] == [(0, result["requests"])] * 2, name
@@ -0,0 +1,79 @@
+import pytest
+
+pytest.importorskip("pymongo")
+
+from bson import ObjectId  # noqa: E402
+
+from utils.bulkLoad import BulkLoader, js_round_2  # noqa: E402
+
+COURSE = "a" * 24
+LESSONS = ["b" * 24, "c" * 24]
+QUIZ = "d" * 24
+USER = "e" * 24
+
+
+def loader():
+    return BulkLoader(db=None)
+
+
+def quiz(values):
+    return {"_id": QUIZ, "lessonId": LESSONS[0], "title": "q", "createdAt": "2026-01-01T00:00:00Z",
+            "questions": [{"title": f"p{i}", "correctAnswer": "si", **({"value": v} if v else {})}
+                          for i, v in enumerate(values)]}
+
+
+def attempt(*correct, quiz_id=QUIZ):
+    return {"_id": "f" * 24, "quizId": quiz_id, "userId": USER,
+            "answers": [{"answer": "si", "correct": c} for c in correct]}
+
+
+def test_quiz_max_score_and_subdocuments():
+    doc = loader().prepare("quizzes", quiz([2, None, 3]))
+    assert doc["maxScore"] == 6
+    assert [q["value"] for q in doc["questions"]] == [2, 1, 3]
+    assert all(isinstance(q["_id"], ObjectId) for q in doc["questions"])
+    assert isinstance(doc["_id"], ObjectId) and isinstance(doc["lessonId"], ObjectId)
+    assert doc["__v"] == 0 and doc["createdAt"] == doc["updatedAt"]
+
+
+def test_attempt_scores_follow_question_values():
+    bulk = loader()
+    bulk.prepare("quizzes", quiz([2, 1, 3]))
+    doc = bulk.prepare("quizattempts", attempt(True, False, True))
+    assert [a["score"] for a in doc["answers"]] == [2, 0, 3]
+    assert doc["currentScore"] == 5
+    assert doc["questionsAnswered"] == 3
+    assert doc["completed"] is True
+    assert "updatedAt" not in doc  # quizattempts has no timestamps
+
+
+def test_attempt_with_extra_answers_or_unknown_quiz_scores_zero():
+    bulk = loader()
+    bulk.prepare("quizzes", quiz([2]))
+    doc = bulk.prepare("quizattempts", attempt(True, True, True))
+    assert [a["score"] for a in doc["answers"]] == [2, 0, 0]
+    assert all(isinstance(a["_id"], ObjectId) for a in doc["answers"])
+    assert doc["currentScore"] == 2
+
+    doc = bulk.prepare("quizattempts", attempt(True, quiz_id="0" * 24))
+    assert doc["currentScore"] == 0
+
+    doc = bulk.prepare("quizattempts", attempt())
+    assert doc["completed"] is False and doc["questionsAnswered"] == 0
+
+
+def test_enrollment_progress_feeds_the_course_average():
+    bulk = loader()
+    for lesson in LESSONS:
+        bulk.prepare("lessons", {"_id": lesson, "courseId": COURSE, "contents": []})
+    first = bulk.prepare("enrollments", {"student": USER, "course": COURSE, "completedLessons": LESSONS[:1]})
+    second = bulk.prepare("enrollments", {"student": USER, "course": COURSE, "completedLessons": LESSONS * 2})
+    assert first["studentProgress"] == 50
+    assert second["studentProgress"] == 100
+    assert bulk._progress[ObjectId(COURSE)] == [150, 2]
+
+
+def test_js_round_2_rounds_halves_up():
+    assert js_round_2(200 / 3) == 66.67
+    assert js_round_2(0.125) == 0.13
+    assert js_round_2(-0.125) == -0.12
@@ -0,0 +1,80 @@
+import io
+import types
+
+import pytest
+
+from utils.loadtest import dashboard
+from utils.loadtest.dashboard import Dashboard, format_bytes, live, sparkline
+from utils.loadtest.stats import StatsCollector
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = types.SimpleNamespace(value=100.0)
+    monkeypatch.setattr(dashboard, "time", types.SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def test_rates_per_refresh_and_rolling_window(clock):
+    collector = StatsCollector()
+    board = Dashboard(collector, interval=1, window=5, stream=io.StringIO())
+    board.started_at = 100.0
+
+    clock.value = 101.0
+    for _ in range(10):
+        collector.record("T01", 0.010)
+    frame = board.read()
+    assert frame.total["rps"] == 10 and frame.total["p95"] == pytest.approx(0.010, rel=0.01)
+
+    clock.value = 102.0
+    for _ in range(10):
+        collector.record("T01", 1.0)
+    collector.record("T02", 0.5, ok=False)
+    collector.record("T02", 0.5, ok=False)
+    frame = board.read()
+    rows = {row["transaction"]: row for row in frame.rows}
+    assert rows["T01"]["rps"] == 10 and rows["T02"]["rps"] == 2 and frame.total["rps"] == 12
+    assert frame.total["p95"] == pytest.approx(1.0, rel=0.01) and frame.total["window_fail"] == 2
+
+    # Six seconds later the window (5 s) starts after the second reading: nothing is left in it
+    clock.value = 108.0
+    frame = board.read()
+    assert frame.total["rps"] == 0 and frame.total["p95"] == 0 and frame.total["window_fail"] == 0
+    assert (frame.total["pass"], frame.total["fail"], frame.elapsed) == (20, 2, 8.0)
+    assert list(board.rates) == [10, 12, 0]
+
+
+def test_draw_depends_on_the_stream(clock):
+    collector = StatsCollector()
+    collector.record("T04_GetMyStudents", 0.2)
+    collector.count_bytes(2048, 3 * 1024 * 1024)
+    plain = io.StringIO()
+    board = Dashboard(collector, interval=1, stream=plain)
+    board.draw()
+    assert plain.getvalue().startswith("   ⏱️ ") and "↓ 3.0 MB/s" in plain.getvalue()
+
+    class Terminal(io.StringIO):
+        def isatty(self):
+            return True
+
+    screen = Terminal()
+    board = Dashboard(collector, interval=1, stream=screen, title="Seed")
+    frame = board.draw()
+    assert screen.getvalue().startswith("\x1b[H📡 Seed") and screen.getvalue().endswith("\x1b[J")
+    assert any(line.startswith("T04_GetMyStudents") for line in board.render(frame))
+
+
+def test_live_keeps_the_dashboard_and_hides_prints(capsys):
+    collector = StatsCollector()
+    with live(collector, interval=0.05, title="Quiet") as board:
+        print("per-object progress")
+        collector.record("T01", 0.01)
+    out = capsys.readouterr().out
+    assert "per-object progress" not in out and "VUsers 0" in out
+    assert board.stopping.is_set()
+
+
+def test_formatting():
+    assert [format_bytes(n) for n in (512, 1536, 5 * 1024 ** 3)] == ["512 B", "1.5 KB", "5.0 GB"]
+    assert sparkline([0, 1, 2, 4]) == "▁▃▅█"
+    assert sparkline([0, 0]) == "▁▁"
@@ -0,0 +1,66 @@
+import itertools
+
+import pytest
+
+from utils.loadtest.distributed import partition_config
+from utils.loadtest.engine import LoadTestConfig, vuser_plan
+from utils.loadtest.params import ListFile, ParameterPool, PoolExhausted
+from utils.loadtest.scheduler import ArrivalProfile
+
+MIX = {"1": 40, "2": 30, "3a": 20, "3b": 10}
+
+
+def make_config(vusers=23, arrivals=None):
+    pools = {
+        "student": ParameterPool(ListFile(["email"], [[f"s{i}"] for i in range(31)]), mode="unique"),
+        "admin": ParameterPool(ListFile(["email"], [["a0"], ["a1"]]), mode="round-robin"),
+    }
+    return LoadTestConfig(vusers=vusers, mix=MIX, pools=pools, seed=42, arrivals=arrivals)
+
+
+def drain(pool, vuser_id):
+    rows = []
+    while True:
+        try:
+            rows.append(pool.next(vuser_id)["email"])
+        except PoolExhausted:
+            return rows
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 5])
+def test_workers_share_the_plan_without_overlap(count):
+    full = vuser_plan(make_config())
+    plans = [partition_config(make_config(), index, count)[0] for index in range(count)]
+    combined = [entry for plan in plans for entry in plan]
+    assert sorted(combined) == sorted(full)
+    assert len(set(combined)) == len(combined)
+
+
+@pytest.mark.parametrize("count", [2, 3, 4])
+def test_unique_rows_are_disjoint(count):
+    configs = [make_config() for _ in range(count)]
+    rows = []
+    for index, config in enumerate(configs):
+        partition_config(config, index, count)
+        rows.append(drain(config.pools["student"], index))
+    combined = [row for part in rows for row in part]
+    assert sorted(combined) == sorted(f"s{i}" for i in range(31))
+    # Shared pools keep every row on every worker
+    assert all(len(config.pools["admin"].file) == 2 for config in configs)
+
+
+def test_open_model_ids_seeds_and_rates():
+    count = 3
+    profile = ArrivalProfile.constant(30, 10)
+    results = []
+    for index in range(count):
+        config = make_config(vusers=10, arrivals=profile)
+        _, vuser_ids = partition_config(config, index, count)
+        results.append((config, list(itertools.islice(vuser_ids, 50))))
+
+    ids = [i for _, worker_ids in results for i in worker_ids]
+    assert len(set(ids)) == len(ids)
+    assert {i for i in ids if i <= 30} == set(range(1, 31))
+    assert len({config.seed for config, _ in results}) == count
+    assert sum(config.arrivals.expected for config, _ in results) == pytest.approx(profile.expected)
+    assert all(config.vusers == 4 for config, _ in results)
@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+
+from utils.httpClient import create_session
+from utils.loadtest import upload
+from utils.loadtest.download import Downloader
+from utils.loadtest.standin import running_standin
+
+SIZE = 300_000
+
+
+@pytest.fixture(scope="module")
+def pdf_url(tmp_path_factory):
+    path = upload.generate_pdf(str(tmp_path_factory.mktemp("pdf") / "doc.pdf"), SIZE)
+    with running_standin() as host:
+        res, _ = upload.upload_file(create_session(), f"{host}/api/upload", path)
+        yield host, f"{host}/uploads/{res.json()['url'].rsplit('/', 1)[1]}"
+
+
+@pytest.mark.parametrize("options", [{}, {"range_size": 64 * 1024}, {"resume_at": 0.4}, {"chunk_size": 1000}])
+def test_every_mode_reads_the_whole_file(pdf_url, options):
+    host, url = pdf_url
+    downloader = Downloader(host, readers=3, iterations=2, url=url, **options)
+    results = asyncio.run(downloader.run(seed=1))
+    assert [(r.downloads, r.failures, r.bytes) for r in results] == [(2, 0, 2 * SIZE)] * 3
+    assert downloader.ttfb.total == 6
+    assert [(row["transaction"], row["pass"]) for row in downloader.stats.report()] == [("T06_DownloadPDF", 6)]
+
+
+def test_missing_file_fails_each_iteration(pdf_url):
+    host, _ = pdf_url
+    downloader = Downloader(host, readers=1, iterations=2, url=f"{host}/uploads/none.pdf")
+    [result] = asyncio.run(downloader.run())
+    assert (result.downloads, result.failures) == (0, 2) and "-> 404" in result.last_error
@@ -0,0 +1,51 @@
+import pytest
+
+from utils.loadtest.__main__ import build_config, build_parser
+from utils.loadtest.engine import allocate_vusers, run
+from utils.loadtest.scenarios import SCENARIOS
+from utils.loadtest.standin import running_standin
+from utils.loadtest.stats import StatsCollector, TransactionStats, percentile
+
+
+@pytest.mark.parametrize("total, mix, expected", [
+    (10, {"1": 50, "2": 20, "3a": 10, "3b": 20}, ["1"] * 5 + ["2"] * 2 + ["3a"] + ["3b"] * 2),
+    (3, {"a": 1, "b": 1, "c": 1, "d": 1}, ["a", "b", "c"]),
+    (5, {"a": 2, "b": 1}, ["a"] * 3 + ["b"] * 2),
+    (0, {"a": 1}, []),
+])
+def test_allocate_vusers(total, mix, expected):
+    assert allocate_vusers(total, mix) == expected
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert [percentile(values, p) for p in (50, 90, 99, 100)] == [50, 90, 99, 100]
+    assert percentile([], 50) == 0.0
+    assert percentile([7], 99) == 7
+
+
+def test_stats_merge_across_threads_and_snapshots():
+    stats = TransactionStats("T01")
+    for ms in (10, 20, 30):
+        stats.add(ms / 1000)
+    stats.add(1.0, ok=False)
+    row = stats.summary(wall_time=2)
+    assert (row["pass"], row["fail"], row["error_rate"], row["tps"]) == (3, 1, 0.25, 1.5)
+    assert row["p50"] == pytest.approx(0.02, rel=0.01) and row["max"] == pytest.approx(0.03, rel=0.01)
+
+    collector = StatsCollector()
+    collector.record("T01", 0.01)
+    collector.record("T02", 0.02, ok=False)
+    merged = StatsCollector.from_snapshots([collector.snapshot(), collector.snapshot()])
+    assert [(r["transaction"], r["pass"], r["fail"]) for r in merged.report()] == [("T01", 2, 0), ("T02", 0, 2)]
+
+
+def test_default_mix_passes_against_the_standin():
+    with running_standin(demo=True) as host:
+        args = build_parser().parse_args(["--host", host, "--iterations", "1", "--duration", "0",
+                                          "--think-scale", "0", "--seed", "1"])
+        stats = run(build_config(args), SCENARIOS)
+    assert {key: (s.iterations_passed, s.iterations_failed) for key, s in SCENARIOS.items()} == \
+        {"1": (5, 0), "2": (2, 0), "3a": (1, 0), "3b": (2, 0)}
+    rows = stats.report()
+    assert rows and all(row["fail"] == 0 for row in rows)
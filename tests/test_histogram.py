@@ -0,0 +1,116 @@
+import json
+import math
+import random
+
+import pytest
+
+from utils.loadtest.histogram import HIGHEST, Histogram
+
+
+def exact_percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+def latencies(n, seed=0):
+    rng = random.Random(seed)
+    return [rng.lognormvariate(-3, 1.2) for _ in range(n)]
+
+
+def filled(values):
+    histogram = Histogram()
+    for value in values:
+        histogram.record(value)
+    return histogram
+
+
+def test_empty():
+    histogram = Histogram()
+    assert len(histogram) == 0
+    assert histogram.mean == 0.0
+    assert histogram.percentile(99) == 0.0
+    assert histogram.percentiles([50, 99]) == {50: 0.0, 99: 0.0}
+
+
+def test_record_tracks_totals():
+    histogram = filled([0.001, 0.002, 0.5])
+    assert len(histogram) == 3
+    assert (histogram.min, histogram.max) == (1000, 500000)
+    assert histogram.mean == pytest.approx(0.503 / 3)
+
+
+def test_small_values_are_exact():
+    histogram = Histogram()
+    for micros in range(1, 101):
+        histogram.record_value(micros)
+    assert histogram.percentile(50) == 50 / 1_000_000
+    assert histogram.percentile(100) == 100 / 1_000_000
+
+
+@pytest.mark.parametrize("pct", [1, 25, 50, 90, 99, 99.9, 100])
+def test_percentiles_within_precision(pct):
+    values = latencies(5000)
+    histogram = filled(values)
+    expected = exact_percentile(values, pct)
+    assert histogram.percentile(pct) == pytest.approx(expected, rel=0.01)
+    assert histogram.percentile(pct) <= max(values) + 1e-6
+
+
+def test_percentiles_match_percentile():
+    histogram = filled(latencies(2000, seed=1))
+    pcts = [99, 50, 0, 90, 100, 75]
+    assert histogram.percentiles(pcts) == {pct: histogram.percentile(pct) for pct in pcts}
+
+
+def test_values_are_clamped():
+    histogram = Histogram()
+    histogram.record_value(-5)
+    histogram.record_value(HIGHEST * 10)
+    assert (histogram.min, histogram.max) == (0, HIGHEST)
+    assert histogram.percentile(100) == HIGHEST / 1_000_000
+
+
+def test_merge_equals_recording_everything():
+    first, second = latencies(1000, seed=2), latencies(700, seed=3)
+    merged = filled(first).merge(filled(second))
+    whole = filled(first + second)
+    assert merged.counts == whole.counts
+    assert (merged.total, merged.sum, merged.min, merged.max) == (whole.total, whole.sum, whole.min, whole.max)
+    assert filled(first).merge(Histogram()).counts == filled(first).counts
+    assert Histogram().merge(filled(second)).min == filled(second).min
+
+
+def test_subtract_leaves_the_interval():
+    first, second = latencies(500, seed=4), latencies(300, seed=5)
+    histogram = filled(first)
+    earlier = histogram.copy()
+    for value in second:
+        histogram.record(value)
+    interval = histogram.copy().subtract(earlier)
+    alone = filled(second)
+    assert interval.counts == alone.counts
+    assert (interval.total, interval.sum) == (alone.total, alone.sum)
+    assert interval.max == histogram.max
+
+
+def test_layout_mismatch():
+    with pytest.raises(ValueError):
+        Histogram().merge(Histogram(significant_figures=3))
+    with pytest.raises(ValueError):
+        Histogram().subtract(Histogram(highest=1000))
+    with pytest.raises(ValueError):
+        Histogram(significant_figures=6)
+
+
+def test_to_dict_round_trip():
+    histogram = filled(latencies(1500, seed=6))
+    data = json.loads(json.dumps(histogram.to_dict()))
+    restored = Histogram.from_dict(data)
+    assert restored.counts == histogram.counts
+    assert restored.to_dict() == histogram.to_dict()
+    assert restored.percentiles([50, 99]) == histogram.percentiles([50, 99])
+    assert len(data["counts"]) == 2 * sum(1 for c in histogram.counts if c)
+
+    empty = Histogram.from_dict(Histogram(significant_figures=3).to_dict())
+    assert empty.significant_figures == 3
+    assert empty.counts == Histogram(significant_figures=3).counts
@@ -0,0 +1,90 @@
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils import httpClient
+
+
+class Handler(BaseHTTPRequestHandler):
+    """/flaky answers 503 twice per method, then 200; /login sets a cookie; everything else echoes it."""
+    protocol_version = "HTTP/1.1"
+    hits = Counter()
+    peers = set()
+
+    def answer(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        Handler.peers.add(self.client_address[1])
+        Handler.hits[(self.command, self.path)] += 1
+        status, headers = 200, []
+        if self.path == "/flaky" and Handler.hits[(self.command, self.path)] <= 2:
+            status = 503
+        elif self.path == "/login":
+            headers.append(("Set-Cookie", "token=abc; Path=/"))
+        body = (self.headers.get("Cookie") or "").encode()
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = answer
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def httpd():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def server(httpd):
+    Handler.hits.clear()
+    Handler.peers.clear()
+    return httpd
+
+
+def test_requests_share_one_kept_alive_connection(server):
+    session = httpClient.create_session(backoff_factor=0)
+    for _ in range(20):
+        assert session.get(f"{server}/ping").status_code == 200
+    assert len(Handler.peers) == 1
+
+
+def test_only_idempotent_methods_retry_on_503(server):
+    session = httpClient.create_session(backoff_factor=0)
+    assert session.get(f"{server}/flaky").status_code == 200
+    assert session.post(f"{server}/flaky").status_code == 503
+    assert Handler.hits == {("GET", "/flaky"): 3, ("POST", "/flaky"): 1}
+
+
+def test_cookies_are_kept_only_when_asked(server):
+    shared = httpClient.create_session()
+    shared.post(f"{server}/login")
+    assert shared.get(f"{server}/echo").text == ""
+    user = httpClient.create_session(persist_cookies=True)
+    user.post(f"{server}/login")
+    assert user.get(f"{server}/echo").text == "token=abc"
+
+
+def test_shared_session_until_closed(monkeypatch):
+    monkeypatch.setattr(httpClient, "_session", None)
+    session = httpClient.get_session()
+    assert httpClient.get_session() is session
+    httpClient.close_session()
+    assert httpClient.get_session() is not session
+    httpClient.close_session()
+
+
+def test_auth_headers():
+    assert httpClient.auth_headers(None) == {}
+    assert httpClient.auth_headers("t") == {"Authorization": "Bearer t", "Cookie": "token=t"}
@@ -0,0 +1,58 @@
+import pytest
+
+from utils.httpClient import create_session
+from utils.loadtest import instrument
+from utils.loadtest.standin import running_standin
+from utils.loadtest.stats import StatsCollector
+
+
+@pytest.fixture
+def collector(monkeypatch):
+    collector = StatsCollector()
+    monkeypatch.setattr(instrument, "_collector", collector)
+    return collector
+
+
+def results(collector):
+    return {name: (stats.passed, stats.failures) for name, stats in collector.merged().items()}
+
+
+def test_error_responses_fail_the_transaction(collector):
+    with running_standin() as host:
+        session = instrument.instrument_session(instrument.instrument_session(create_session()))
+        assert len(session.hooks["response"]) == 2
+        with instrument.transaction("T01_Login"):
+            session.post(f"{host}/api/auth/login", json={"email": "student1@email.com", "password": "password1"})
+        with instrument.transaction("T01_Login"):
+            session.post(f"{host}/api/auth/login", json={"email": "student1@email.com", "password": "wrong"})
+        # Only the innermost open transaction is failed by a response
+        with instrument.transaction("T00_Outer"):
+            with instrument.transaction("T02_Missing"):
+                session.get(f"{host}/api/courses/{'0' * 24}")
+    assert results(collector) == {"T01_Login": (1, 1), "T00_Outer": (1, 0), "T02_Missing": (0, 1)}
+    gauges = collector.gauges()
+    assert gauges["sent"] > 0 and gauges["received"] > 0 and gauges["active"] == 0
+
+
+def test_exceptions_fail_and_threads_count_as_active(collector):
+    @instrument.timed("T03_Work")
+    def work(fail):
+        assert collector.gauges()["active"] == 1
+        if fail:
+            raise RuntimeError("boom")
+        return "done"
+
+    assert work(False) == "done"
+    with pytest.raises(RuntimeError):
+        work(True)
+    assert results(collector) == {"T03_Work": (1, 1)}
+    assert collector.gauges()["active"] == 0 and collector.started_at is not None
+
+
+def test_report_exports(collector, tmp_path, capsys):
+    with instrument.transaction("T01"):
+        pass
+    rows = instrument.report(json_path=str(tmp_path / "t.json"), csv_path=str(tmp_path / "t.csv"))
+    assert [row["transaction"] for row in rows] == ["T01"]
+    assert (tmp_path / "t.json").exists() and (tmp_path / "t.csv").read_text().count("\n") == 2
+    assert "Transactions saved to" in capsys.readouterr().out
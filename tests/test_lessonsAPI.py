@@ -0,0 +1,80 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils import lessonsAPI
+
+CONTENT = bytes(range(256)) * 1000
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Serves CONTENT; the path picks how Range is handled: /ranges, /ignore or /shifted."""
+
+    def do_GET(self):
+        ranged = self.headers.get("Range", "")
+        start = int(ranged[len("bytes="):-1]) if ranged.startswith("bytes=") else 0
+        if start and self.path != "/ignore":
+            sent = start + 10 if self.path == "/shifted" else start
+            body = CONTENT[sent:]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {sent}-{len(CONTENT) - 1}/{len(CONTENT)}")
+        else:
+            body = CONTENT
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def partial(tmp_path, size, extra=b""):
+    dest = tmp_path / "file.pdf"
+    dest.write_bytes(CONTENT[:size] + extra)
+    return dest
+
+
+def test_full_download(server, tmp_path):
+    dest = tmp_path / "file.pdf"
+    assert lessonsAPI.download_content(f"{server}/ranges", str(dest)) == len(CONTENT)
+    assert dest.read_bytes() == CONTENT
+    assert lessonsAPI.download_content(f"{server}/ranges") == len(CONTENT)
+
+
+def test_resume_with_range(server, tmp_path):
+    dest = partial(tmp_path, 100_000, extra=b"half a chunk")
+    received = lessonsAPI.download_content(f"{server}/ranges", str(dest), start=100_000)
+    assert received == len(CONTENT) - 100_000
+    assert dest.read_bytes() == CONTENT
+
+
+def test_range_ignored_restarts_from_the_top(server, tmp_path, capsys):
+    dest = partial(tmp_path, 100_000)
+    assert lessonsAPI.download_content(f"{server}/ignore", str(dest), start=100_000) == len(CONTENT)
+    assert dest.read_bytes() == CONTENT
+    assert "Range ignored" in capsys.readouterr().out
+
+
+def test_wrong_content_range_writes_nothing(server, tmp_path, capsys):
+    dest = partial(tmp_path, 100_000)
+    assert lessonsAPI.download_content(f"{server}/shifted", str(dest), start=100_000) == 0
+    assert dest.read_bytes() == CONTENT[:100_000]
+    assert "Content-Range 'bytes 100010-" in capsys.readouterr().out
+
+
+def test_resume_needs_the_earlier_bytes(server, tmp_path, capsys):
+    dest = partial(tmp_path, 50)
+    assert lessonsAPI.download_content(f"{server}/ranges", str(dest), start=100) == 0
+    assert dest.read_bytes() == CONTENT[:50]
+    assert "fewer than the 100 bytes" in capsys.readouterr().out
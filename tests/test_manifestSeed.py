@@ -0,0 +1,97 @@
+import copy
+import json
+
+import pytest
+
+from utils import allUsers, manifestSeed
+from utils.httpClient import auth_headers, create_session
+from utils.loadtest.standin import running_standin
+from utils.manifestSeed import ManifestSeeder, SeedIndex, load_manifest
+from utils.tokenPool import TokenPool
+
+QUESTION = {"title": "p1", "type": "multiple-choice", "options": ["si", "no"], "correctAnswer": "si", "value": 1}
+MANIFEST = {
+    "owner": {"email": "admin1@email.com", "password": "password1"},
+    "students": [{"email": "student1@email.com", "password": "password1"},
+                 {"email": "nuevo@test.com", "password": "password123", "name": "Nuevo"}],
+    "courses": [{
+        "key": "robotica", "title": "Robótica", "description": "d", "category": "Secundaria",
+        "students": ["student1@email.com", "nuevo@test.com"],
+        "lessons": [
+            {"key": "l1", "title": "Lección 1", "contents": [{"title": "v", "type": "video", "url": "https://x"}],
+             "quiz": {"title": "Quiz 1", "questions": [QUESTION]}},
+            {"key": "l2", "title": "Lección 2"},
+        ],
+    }],
+}
+
+
+@pytest.fixture
+def backend(monkeypatch, tmp_path):
+    with running_standin() as host:
+        api = f"{host}/api"
+        monkeypatch.setattr(allUsers, "API_URL", f"{api}/user")
+        monkeypatch.setattr(manifestSeed, "get_token_pool", lambda: TokenPool(cache_file=None, base_url=api))
+        path = tmp_path / "manifest.json"
+        path.write_text(json.dumps(MANIFEST))
+        yield api, str(path), str(tmp_path / "index.json")
+
+
+def seed(backend, manifest=None, index=None, dry_run=False):
+    api, path, index_path = backend
+    manifest = manifest or load_manifest(path)
+    seeder = ManifestSeeder(manifest, SeedIndex(index_path if index is None else index, server=api),
+                            workers=2, dry_run=dry_run, base_url=api)
+    seeder.run()
+    assert seeder.errors == []
+    return {kind: {k: v for k, v in row.items() if v} for kind, row in seeder.counts.items()}
+
+
+def lessons(api, course_title):
+    session = create_session()
+    token = TokenPool(cache_file=None, base_url=api).get("admin1@email.com", "password1")["token"]
+    headers = auth_headers(token)
+    course = next(c for c in session.get(f"{api}/courses", headers=headers).json() if c["name"] == course_title)
+    return session.get(f"{api}/lessons/{course['id']}/lessons", headers=headers).json()
+
+
+def test_second_run_writes_nothing(backend):
+    plan = seed(backend, dry_run=True)
+    assert seed(backend) == plan == {"student": {"created": 1, "unchanged": 1}, "course": {"created": 1},
+                                     "lesson": {"created": 2}, "quiz": {"created": 1}}
+    assert seed(backend) == {"student": {"unchanged": 2}, "course": {"unchanged": 1},
+                             "lesson": {"unchanged": 2}, "quiz": {"unchanged": 1}}
+
+
+def test_only_what_changed_is_updated(backend):
+    seed(backend)
+    manifest = load_manifest(backend[1])
+    lesson, other = manifest["courses"][0]["lessons"]
+    other["title"] = "Lección 2: renombrada"
+    lesson["quiz"]["questions"] = [dict(QUESTION, value=5)]
+    assert seed(backend, manifest) == {"student": {"unchanged": 2}, "course": {"unchanged": 1},
+                                       "lesson": {"updated": 1, "unchanged": 1}, "quiz": {"updated": 1}}
+    stored = lessons(backend[0], "Robótica")
+    assert sorted(row["title"] for row in stored) == ["Lección 1", "Lección 2: renombrada"]
+
+
+def test_without_an_index_objects_are_matched_by_title(backend):
+    seed(backend)
+    counts = seed(backend, index="")
+    assert all("created" not in row for row in counts.values())
+    assert len(lessons(backend[0], "Robótica")) == 2
+
+
+@pytest.mark.parametrize("change, message", [
+    (lambda m: m.pop("owner"), "owner"),
+    (lambda m: m["courses"].append(copy.deepcopy(m["courses"][0])), "duplicate course key"),
+    (lambda m: m["courses"][0]["lessons"][1].update(key="l1"), "duplicate lesson key"),
+    (lambda m: m["courses"][0]["lessons"][1].update(contents=[{"type": "quiz", "quizId": "x"}]), "under \"quiz\""),
+])
+def test_malformed_manifests(tmp_path, change, message):
+    manifest = copy.deepcopy(MANIFEST)
+    change(manifest)
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps(manifest))
+    with pytest.raises(ValueError, match=message):
+        load_manifest(str(path))
@@ -0,0 +1,146 @@
+import pytest
+
+from utils.loadtest.__main__ import build_config, build_parser
+from utils.loadtest.engine import LoadTestConfig, check_pools, vuser_plan
+from utils.loadtest.params import ListFile, ParameterFile, ParameterPool, PoolExhausted
+from utils.loadtest.scenarios import SCENARIOS as QA_SCENARIOS
+from utils.loadtest.scenarios import Scenario
+
+
+def names(n):
+    return ListFile(["name"], [[f"row{i}"] for i in range(n)])
+
+
+def take(pool, count, vuser_id=0):
+    return [pool.next(vuser_id)["name"] for _ in range(count)]
+
+
+def test_sequential_gives_each_vuser_its_own_cursor():
+    pool = ParameterPool(names(3), mode="sequential")
+    assert take(pool, 4, vuser_id=1) == ["row0", "row1", "row2", "row0"]
+    assert take(pool, 2, vuser_id=2) == ["row0", "row1"]
+
+
+def test_round_robin_shares_one_cursor():
+    pool = ParameterPool(names(3), mode="round-robin")
+    assert [pool.next(v)["name"] for v in (1, 2, 1, 2)] == ["row0", "row1", "row2", "row0"]
+
+
+def test_random_is_seeded_and_stays_in_range():
+    first = take(ParameterPool(names(50), mode="random", seed=7), 20)
+    assert first == take(ParameterPool(names(50), mode="random", seed=7), 20)
+    assert set(first) <= {f"row{i}" for i in range(50)}
+
+
+def test_random_empty_pool():
+    with pytest.raises(PoolExhausted):
+        ParameterPool(names(0), mode="random").next()
+
+
+def test_unique_hands_out_each_row_once_in_blocks():
+    pool = ParameterPool(names(5), mode="unique", block_size=2)
+    assert take(pool, 2, vuser_id=1) == ["row0", "row1"]
+    assert take(pool, 1, vuser_id=2) == ["row2"]
+    assert take(pool, 1, vuser_id=1) == ["row4"]  # row3 is in vuser 2's block
+    assert take(pool, 1, vuser_id=2) == ["row3"]
+    with pytest.raises(PoolExhausted):
+        pool.next(3)
+
+
+def test_unique_cycle_starts_over():
+    pool = ParameterPool(names(2), mode="unique", on_exhausted="cycle")
+    assert take(pool, 3) == ["row0", "row1", "row0"]
+    with pytest.raises(PoolExhausted):
+        ParameterPool(names(0), mode="unique", on_exhausted="cycle").next()
+
+
+def test_bad_mode_and_update():
+    with pytest.raises(ValueError):
+        ParameterPool(names(1), mode="shuffle")
+    with pytest.raises(ValueError):
+        ParameterPool(names(1), update="always")
+
+
+def test_parameter_file(tmp_path):
+    path = tmp_path / "users.dat"
+    path.write_text("email,password\r\na@x.com,1\r\n\r\nb@x.com,\"2,3\"\n")
+    source = ParameterFile(str(path))
+    try:
+        assert source.columns == ["email", "password"]
+        assert len(source) == 2
+        assert source.row(1) == {"email": "b@x.com", "password": "2,3"}
+        pool = ParameterPool(source, mode="round-robin")
+        assert [pool.next()["email"] for _ in range(3)] == ["a@x.com", "b@x.com", "a@x.com"]
+    finally:
+        source.close()
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 4, 7])
+def test_unique_partitions_are_disjoint_and_complete(count):
+    pool = ParameterPool(names(10), mode="unique")
+    seen = []
+    for index in range(count):
+        part = pool.partition(index, count)
+        while True:
+            try:
+                seen.append(part.next(index)["name"])
+            except PoolExhausted:
+                break
+    assert sorted(seen) == sorted(f"row{i}" for i in range(10))
+
+
+def test_shared_modes_keep_every_row_when_partitioned():
+    pool = ParameterPool(names(3), mode="round-robin")
+    assert take(pool.partition(1, 2), 3) == ["row0", "row1", "row2"]
+
+
+def make_config(rows, vusers, mix, **pool_options):
+    pool = ParameterPool(names(rows), mode="unique", **pool_options)
+    return LoadTestConfig(vusers=vusers, mix=mix, pools={"student": pool})
+
+
+SCENARIOS = {
+    "uses": Scenario("uses", "Uses students", None, params=("student",)),
+    "other": Scenario("other", "No students", None),
+}
+
+
+def plan_of(*keys):
+    return list(enumerate(keys, 1))
+
+
+def test_check_pools_counts_only_consumers():
+    config = make_config(2, 4, {"uses": 50, "other": 50})
+    check_pools(config, SCENARIOS, plan_of("uses", "other", "uses", "other"))
+    with pytest.raises(PoolExhausted, match="3 VUsers of scenario\\(s\\) uses need at least 3"):
+        check_pools(config, SCENARIOS, plan_of("uses", "uses", "uses", "other"))
+
+
+def test_check_pools_blocks_and_iterations():
+    config = make_config(5, 3, {"uses": 100}, block_size=2)
+    check_pools(config, SCENARIOS, plan_of("uses", "uses", "uses"))  # 2 + 2 + 1
+    config = make_config(4, 3, {"uses": 100}, block_size=2)
+    with pytest.raises(PoolExhausted):
+        check_pools(config, SCENARIOS, plan_of("uses", "uses", "uses"))
+
+    config = make_config(5, 2, {"uses": 100})
+    config.iterations = 3
+    with pytest.raises(PoolExhausted, match="need at least 6"):
+        check_pools(config, SCENARIOS, plan_of("uses", "uses"))
+    config.pools["student"].update = "once"
+    check_pools(config, SCENARIOS, plan_of("uses", "uses"))
+
+
+def test_check_pools_skips_cycling_pools():
+    config = make_config(1, 3, {"uses": 100}, on_exhausted="cycle")
+    check_pools(config, SCENARIOS, plan_of("uses", "uses", "uses"))
+
+
+def test_default_run_fits_the_shipped_pools():
+    config = build_config(build_parser().parse_args([]))
+    check_pools(config, QA_SCENARIOS, vuser_plan(config))
+    assert config.pools["reader"].mode == "round-robin"
+
+    with pytest.raises(ValueError, match="scenario\\(s\\) 1 need"):
+        build_config(build_parser().parse_args(["--vusers", "20"]))
+    build_config(build_parser().parse_args(["--vusers", "20", "--student-mode", "round-robin"]))
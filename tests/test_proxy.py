@@ -0,0 +1,113 @@
+import json
+import random
+import time
+
+import pytest
+import requests
+
+from utils.httpClient import create_session
+from utils.loadtest import upload
+from utils.loadtest.proxy import ConfigError, Rule, load_config, parse_delay, parse_size, running_proxy
+from utils.loadtest.standin import StandInApp, StandInThread
+
+LOGIN = {"email": "admin1@email.com", "password": "password1"}
+
+
+@pytest.fixture
+def standin():
+    app = StandInApp()
+    app.load_accounts()
+    server = StandInThread(app).start()
+    try:
+        yield app, server.url
+    finally:
+        server.stop()
+
+
+def test_parse_delay_and_size():
+    rng = random.Random(0)
+    assert parse_delay("40")(rng) == 0.04
+    assert parse_delay("5 + spike:1:100")(rng) == pytest.approx(0.105)
+    assert parse_delay("exp:0")(rng) == 0.0
+    assert parse_delay("") is None
+    draws = [parse_delay("10-50")(rng) for _ in range(50)]
+    assert all(0.01 <= d <= 0.05 for d in draws)
+    for bad in ("exp:a", "gamma:1:2", "normal:1"):
+        with pytest.raises(ConfigError):
+            parse_delay(bad)
+    assert [parse_size(s) for s in ("512KB", "2mb", "100", "", None)] == [524288, 2 * 1024 ** 2, 100, None, None]
+    with pytest.raises(ConfigError):
+        parse_size("fast")
+
+
+def test_draws_depend_only_on_seed_rule_and_count():
+    def draws(seed):
+        rule = Rule("submit", latency="lognormal:40:0.5", error_rate=0.2, reset_rate=0.1)
+        return [rule.draw(seed) for _ in range(200)]
+
+    assert draws(7) == draws(7) and draws(7) != draws(8)
+    assert {fault for _, fault in draws(7)} == {None, "error", "reset"}
+    assert Rule("r", reset_after_rate=1).draw(0) == (0.0, "reset_after")
+
+
+def test_load_config(tmp_path):
+    path = tmp_path / "faults.json"
+    path.write_text(json.dumps({"upstream": "http://h:1", "seed": 3,
+                                "rules": [{"match": "^/api/", "method": ["get", "post"]}]}))
+    config = load_config(str(path))
+    rule, = config["rules"]
+    assert (config["upstream"], config["seed"], rule.name, rule.methods) == ("http://h:1", 3, "rule1", {"GET", "POST"})
+    assert rule.matches("GET", "/api/courses") and not rule.matches("PUT", "/api/courses")
+    path.write_text(json.dumps({"rules": [{"name": "x", "latncy": "5"}]}))
+    with pytest.raises(ConfigError, match="latncy"):
+        load_config(str(path))
+
+
+def test_latency_and_bandwidth(standin, tmp_path):
+    _, host = standin
+    pdf = upload.generate_pdf(str(tmp_path / "f.pdf"), 200_000)
+    rules = [Rule("login", "^/api/auth/login$", latency="100"), Rule("files", "^/(uploads/|api/upload)",
+                                                                    bandwidth="1MB")]
+    with running_proxy(host, rules, log_path=str(tmp_path / "log.ndjson")) as (url, proxy):
+        session = create_session(persist_cookies=True)
+        started = time.perf_counter()
+        res = session.post(f"{url}/api/auth/login", json=LOGIN)
+        assert res.status_code == 200 and time.perf_counter() - started >= 0.1
+        assert res.headers["X-Fault"] == "login 100ms"
+        res, _ = upload.upload_file(session, f"{url}/api/upload", pdf, chunked=True)
+        started = time.perf_counter()
+        stored = session.get(f"{url}/uploads/{res.json()['url'].rsplit('/', 1)[1]}")
+        assert stored.content == open(pdf, "rb").read() and time.perf_counter() - started >= 0.15
+        assert session.get(f"{url}/api/courses").status_code == 200
+    assert {name: c["requests"] for name, c in proxy.counts.items()} == {"login": 1, "files": 2, "pass": 1}
+    assert proxy.counts["files"]["bytes"] >= 200_000
+    log = [json.loads(line) for line in (tmp_path / "log.ndjson").read_text().splitlines()]
+    assert [(e["path"], e["status"]) for e in log][-1] == ("/api/courses", 200)
+
+
+def test_errors_keep_the_connection_and_resets_drop_it(standin):
+    app, host = standin
+    rules = [Rule("submit", "submit-answer$", method="POST", error_rate=1, error_status=503),
+             Rule("reset", "^/api/lessons", reset_rate=1),
+             Rule("lost", "^/api/courses$", method="POST", reset_after_rate=1)]
+    with running_proxy(host, rules) as (url, proxy):
+        session = create_session(persist_cookies=True, retries=0)
+        session.post(f"{url}/api/auth/login", json=LOGIN)
+        res = session.post(f"{url}/api/quizzes/no-auth-submit-answer", json={"quizId": "x", "answer": "a" * 10_000})
+        assert res.status_code == 503 and res.headers["X-Fault"] == "submit error"
+        assert session.get(f"{url}/api/courses").status_code == 200
+        with pytest.raises(requests.exceptions.ConnectionError):
+            session.get(f"{url}/api/lessons/{'0' * 24}")
+        with pytest.raises(requests.exceptions.ConnectionError):
+            session.post(f"{url}/api/courses", json={"title": "Perdido", "category": "Secundaria"})
+        assert session.get(f"{url}/api/courses").status_code == 200
+    # The backend did the work the client never heard about
+    assert [c["title"] for c in app.store.courses.values()] == ["Perdido"]
+    assert [(c["error"], c["reset"], c["reset_after"]) for c in proxy.counts.values()] == \
+        [(1, 0, 0), (0, 1, 0), (0, 0, 1), (0, 0, 0)]
+
+
+def test_unreachable_upstream_is_a_502():
+    with running_proxy("http://127.0.0.1:9") as (url, proxy):
+        res = create_session(retries=0).get(f"{url}/api/courses")
+    assert res.status_code == 502 and proxy.counts["pass"]["upstream_errors"] == 1
@@ -0,0 +1,94 @@
+import itertools
+
+import pytest
+
+from utils.loadtest.standin import JSTypeError, is_answer_correct
+from utils.quizGrading import CORRECT, MISSING, NOT_FOUND, NOT_SENT, REJECTED, WRONG, grade_attempts
+
+# Answers and correct answers covering every kind the comparison can see
+VALUES = [
+    "abc", "cab", "abcd", "aab", "", "ñé", "éñ", "😀a", "a😀",
+    ["a", "b"], ["b", "a"], ["a", "b", "b"], ["a"], [], [1, 2], [2, 1], [1, "1"], ["1", 1], [10, 9],
+    [True, None], [None, True], [{"x": 1}], [[1, 2], 3], [3, [1, 2]],
+    0, 1, 1.5, True, False, {"a": 1}, {},
+]
+
+
+def standin_outcome(correct, answer):
+    try:
+        return CORRECT if is_answer_correct({"correctAnswer": correct}, answer) else WRONG
+    except JSTypeError:
+        return REJECTED
+
+
+def grade_one(correct, answer, mode="sequential"):
+    quizzes = [{"_id": "q1", "questions": [{"correctAnswer": correct, "value": 2}]}]
+    return grade_attempts(quizzes, [("q1", [answer])], mode=mode)
+
+
+def test_matches_standin_comparison():
+    pairs = list(itertools.product(VALUES + [None], VALUES))
+    quizzes = [{"_id": f"q{i}", "questions": [{"correctAnswer": correct, "value": 2}]}
+               for i, (correct, _) in enumerate(pairs)]
+    result = grade_attempts(quizzes, [(f"q{i}", [answer]) for i, (_, answer) in enumerate(pairs)])
+    mismatches = [(correct, answer, outcome) for (correct, answer), outcome in zip(pairs, result.outcome)
+                  if outcome != standin_outcome(correct, answer)]
+    assert mismatches == []
+
+
+@pytest.mark.parametrize("correct, answer, expected", [
+    ("abc", "bca", CORRECT),              # strings compare as sorted characters
+    ("abc", "abcc", WRONG),               # length mismatch
+    (["a", "b", "b"], ["b", "a", "b"], CORRECT),
+    (["a", "b", "b"], ["a", "a", "b"], WRONG),  # arrays are multisets
+    ("ab", ["a", "b"], WRONG),            # typeof mismatch
+    (["a"], {"a": 1}, WRONG),             # same typeof, different length
+    (1, 1, REJECTED),                     # numbers reach the spread and throw
+    (True, True, REJECTED),
+    (None, ["a"], REJECTED),              # null.length throws
+])
+def test_outcomes(correct, answer, expected):
+    assert grade_one(correct, answer).outcome[0] == expected
+
+
+def test_missing_answer_and_unknown_question():
+    quizzes = [{"_id": "q1", "questions": [{"correctAnswer": "ab"}]}]
+    result = grade_attempts(quizzes, [("q1", [None]), ("q1", ["ab", "ab"]), ("nope", ["ab"])])
+    assert list(result.outcome) == [MISSING, CORRECT, NOT_FOUND, NOT_FOUND]
+
+
+def test_sequential_stops_at_first_failure():
+    quizzes = [{"_id": "q1", "questions": [
+        {"correctAnswer": "ab", "value": 1},
+        {"correctAnswer": 3, "value": 1},
+        {"correctAnswer": "cd", "value": 4},
+    ]}]
+    result = grade_attempts(quizzes, [("q1", ["ba", 3, "dc"])])
+    assert list(result.outcome) == [CORRECT, REJECTED, NOT_SENT]
+    assert list(result.accepted) == [True, False, False]
+    assert result.current_score[0] == 1
+    assert result.questions_answered[0] == 1
+    assert result.rejected[0]
+    assert result.max_score[0] == 6
+
+
+def test_batch_stores_nothing_after_a_failure():
+    quizzes = [{"_id": "q1", "questions": [{"correctAnswer": "ab"}, {"correctAnswer": 3}, {"correctAnswer": "cd"}]}]
+    result = grade_attempts(quizzes, [("q1", ["ba", 3, "dc"]), ("q1", ["ba", "x", "dc"])], mode="batch")
+    assert list(result.outcome) == [CORRECT, REJECTED, CORRECT, CORRECT, WRONG, CORRECT]
+    assert list(result.questions_answered) == [0, 3]
+    assert list(result.current_score) == [0, 2]
+    assert list(result.completed) == [False, True]
+
+
+def test_score_pct_and_documents():
+    quizzes = [{"_id": "q1", "questions": [{"correctAnswer": "a", "value": 1}, {"correctAnswer": "b", "value": 2}]}]
+    attempts = [{"_id": "t1", "quizId": "q1", "answers": [{"answer": "a"}, {"answer": "x"}]}]
+    result = grade_attempts(quizzes, attempts)
+    assert result.score_pct[0] == 33.33
+    assert result.outcome_counts()["correct"] == 1
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        grade_one("a", "a", mode="parallel")
@@ -0,0 +1,80 @@
+import json
+
+from utils.httpClient import create_session
+from utils.loadtest.replay import Recorder, Trace, import_har, infer_correlations, replay, request_template
+from utils.loadtest.standin import StandInApp, StandInThread, running_standin
+
+A, B = "a" * 24, "b" * 24
+
+
+def entry(t, url, produces=(), elapsed=0.1, body=None):
+    return {"t": t, "stream": 0, "method": "GET", "url": url, "headers": {}, "body": body, "status": 200,
+            "elapsed": elapsed, "produces": [[["id"], value] for value in produces]}
+
+
+def test_only_values_sent_back_after_their_response_are_rules():
+    entries = infer_correlations([
+        entry(0.5, f"/api/courses/{A}"),                # A before its response arrived: static
+        entry(0.0, "/api/courses", produces=[A, B], elapsed=1.0),
+        entry(2.0, f"/api/courses/{A}", body=json.dumps({"other": B})),
+        entry(3.0, f"/api/courses/{A}/lessons", produces=[A]),
+    ])
+    assert [e["uses"] for e in entries] == [[], [], [A, B], [A]]
+    assert [len(e["produces"]) for e in entries] == [2, 0, 0, 0]
+
+
+def test_request_template():
+    assert request_template("PUT", f"http://h/api/lessons/{A}/toggle-completion?x=1") == \
+        "PUT /api/lessons/:id/toggle-completion"
+
+
+def record(host, path):
+    recorder = Recorder()
+    session = recorder.attach(create_session(persist_cookies=True))
+    session.post(f"{host}/api/auth/login", json={"email": "admin1@email.com", "password": "password1"})
+    course = session.post(f"{host}/api/courses", json={"title": "Grabado", "category": "Secundaria"}).json()
+    session.post(f"{host}/api/lessons", json={"courseId": course["id"], "title": "L1"})
+    session.get(f"{host}/api/courses/{course['id']}/lessons")
+    assert recorder.save(path) == 4
+    return Trace(path)
+
+
+def test_replay_creates_fresh_objects_per_copy(tmp_path):
+    with running_standin() as host:
+        trace = record(host, str(tmp_path / "trace.ndjson.gz"))
+    assert trace.header["rules"] == 2  # the token cookie and the course id
+    assert [len(e["uses"]) for e in trace.entries] == [0, 1, 2, 2]
+
+    app = StandInApp()
+    app.load_accounts()
+    server = StandInThread(app).start()
+    try:
+        stats, replays = replay([trace], host=server.url, speed=0, copies=2)
+    finally:
+        server.stop()
+    assert [(r.failed, r.skipped) for r in replays] == [(0, 0), (0, 0)]
+    courses = [c["_id"] for c in app.store.courses.values() if c["title"] == "Grabado"]
+    assert len(courses) == 2 and all(len(app.store.lessons_by_course[c]) == 1 for c in courses)
+    assert {row["transaction"]: row["pass"] for row in stats.report()}["GET /api/courses/:id/lessons"] == 2
+
+
+def test_har_import(tmp_path):
+    har = {"log": {"entries": [
+        {"startedDateTime": "2026-01-01T00:00:00.000Z", "time": 50, "connection": "7",
+         "request": {"method": "POST", "url": "http://h/api/courses", "headers": [{"name": "content-type",
+                     "value": "application/json"}], "postData": {"text": "{}"}},
+         "response": {"status": 201, "headers": [{"name": "Set-Cookie", "value": "x=1"}],
+                      "content": {"mimeType": "application/json", "text": json.dumps({"id": A})}}},
+        {"startedDateTime": "2026-01-01T00:00:01.000Z", "time": 20, "connection": "7",
+         "request": {"method": "GET", "url": f"http://h/api/courses/{A}?full=1"},
+         "response": {"status": 200, "content": {}}},
+    ]}}
+    path = tmp_path / "capture.har"
+    path.write_text(json.dumps(har))
+    recorder = import_har(str(path))
+    assert recorder.host == "http://h"
+    recorder.save(str(tmp_path / "trace.ndjson"))
+    trace = Trace(str(tmp_path / "trace.ndjson"))
+    first, second = trace.entries
+    assert first["headers"] == {"Content-Type": "application/json"} and first["produces"] == [[["id"], A]]
+    assert second["t"] == 1.0 and second["url"] == f"/api/courses/{A}?full=1" and second["uses"] == [A]
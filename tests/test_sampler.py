@@ -0,0 +1,106 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from array import array
+
+import pytest
+
+from utils.loadtest import sampler
+from utils.loadtest.stats import TransactionStats
+
+pytestmark = pytest.mark.skipif(not os.path.isdir("/proc/self"), reason="reads /proc")
+
+
+def test_samples_a_process_and_the_host():
+    resources = sampler.ResourceSampler(processes={"self": os.getpid()}, interval=0.1)
+    assert resources.sample() is None  # primes the counters
+    busy_until = time.process_time() + 0.05  # a few clock ticks of CPU
+    while time.process_time() < busy_until:
+        pass
+    sample = resources.sample()
+    assert sample["self"]["pid"] == os.getpid() and sample["self"]["cpu"] > 0
+    assert sample["self"]["rss"] > 0 and sample["self"]["threads"] >= 1
+    assert 0 <= sample["system"]["cpu"] <= 100 and sample["system"]["mem_available"] > 0
+
+
+def test_processes_are_found_by_command_line_and_dropped_on_exit():
+    marker = "sampler-test-marker"
+    child = subprocess.Popen([sys.executable, "-c", "import time; print(flush=True); time.sleep(30)", marker],
+                             stdout=subprocess.PIPE)
+    try:
+        child.stdout.readline()  # exec'd: /proc shows the new command line
+        assert sampler.find_processes({"child": marker}) == {"child": child.pid}
+        resources = sampler.ResourceSampler(patterns={"child": marker})
+        assert resources.probes["child"].pid == child.pid
+        resources.sample()
+        child.kill()
+        child.wait()
+        assert "child" not in resources.sample() and "child" not in resources.probes
+        resources._rescan()
+        assert "child" not in resources.probes
+    finally:
+        child.kill()
+        child.wait()
+        child.stdout.close()
+
+
+class Collector:
+    def __init__(self, *stats):
+        self.stats = {s.name: s for s in stats}
+
+    def merged(self):
+        return self.stats
+
+
+def timeline_stats(name, events):
+    stats = TransactionStats(name, timeline=True)
+    stats.events = array("d", [v for event in events for v in event])
+    return stats
+
+
+def test_transaction_timeline_buckets_by_interval():
+    collector = Collector(timeline_stats("T01", [(100.2, 0.1), (100.7, 0.3), (101.1, -2.0), (102.5, 0.2)]),
+                          TransactionStats("T02", timeline=True))
+    rows = sampler.transaction_timeline(collector, 1.0)
+    assert [(r["t"], r["count"], r["errors"], r["max"]) for r in rows] == \
+        [(101.0, 2, 0, 0.3), (102.0, 1, 1, 0.0), (103.0, 1, 0, 0.2)]
+    assert sampler.transaction_timeline(None, 1.0) == []
+
+
+def write_timeline(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    return str(path)
+
+
+def sample(t, disk_util=0.0, rss=100 * sampler.MB):
+    return {"type": "sample", "t": t,
+            "system": {"cpu": 10, "iowait": 1, "disk_util": disk_util},
+            "node": {"cpu": 5, "rss": rss, "write": 0, "sockets": 3, "threads": 11, "pid": 1}}
+
+
+def tx(t, p99):
+    return {"type": "tx", "t": t, "name": "T01", "count": 10, "errors": 0, "p50": p99 / 2, "p99": p99, "max": p99}
+
+
+def test_spikes_are_attributed_across_files(tmp_path, capsys):
+    client = write_timeline(tmp_path / "client.ndjson", [{"type": "meta", "interval": 1.0}]
+                            + [tx(t, 0.05) for t in range(1, 8) if t not in (3, 6)] + [tx(3, 0.5), tx(6, 0.5)])
+    server = write_timeline(tmp_path / "server.ndjson", [{"type": "meta", "interval": 1.0}]
+                            + [sample(t) for t in range(1, 8) if t not in (3, 6)]
+                            + [sample(3, disk_util=95), sample(6, rss=50 * sampler.MB)])
+    spikes = sampler.print_timeline([client, server])
+    assert [(offset, causes) for offset, _, causes in spikes] == [
+        (2.0, ["disk saturated (95% util, 1% iowait)"]),
+        (5.0, ["node RSS fell 50 MB (major GC?)"]),
+    ]
+    assert "2 intervals with p99 above" in capsys.readouterr().out
+    assert sampler.print_timeline([write_timeline(tmp_path / "empty.ndjson", [])]) == []
+
+
+def test_parse_targets():
+    assert sampler.parse_targets(["node=123", "mongod=mongod --port 1"]) == \
+        ({"node": 123}, {"mongod": "mongod --port 1"})
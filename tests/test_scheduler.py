@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from utils.loadtest.scheduler import ArrivalProfile, _segment_offset, arrival_times, parse_profile
+
+
+def cumulative(t, duration, start_rate, end_rate):
+    """Arrivals accumulated t seconds into a segment."""
+    return start_rate * t + (end_rate - start_rate) * t * t / (2 * duration)
+
+
+@pytest.mark.parametrize("segment", [(10, 5, 5), (4, 0, 10), (4, 10, 0), (3, 2, 8), (3, 8, 2), (1, 0.5, 0.25)])
+def test_segment_offset_inverts_the_cumulative_rate(segment):
+    duration, start_rate, end_rate = segment
+    area = duration * (start_rate + end_rate) / 2
+    previous = -1.0
+    for i in range(11):
+        n = area * i / 10
+        t = _segment_offset(n, *segment)
+        assert 0 <= t <= duration + 1e-9
+        assert t > previous
+        assert cumulative(t, *segment) == pytest.approx(n, abs=1e-9)
+        previous = t
+
+
+def test_segment_offset_ramp_down_reaches_the_end():
+    assert _segment_offset(20, 4, 10, 0) == pytest.approx(4)
+
+
+def test_constant_is_evenly_spaced():
+    times = list(arrival_times(ArrivalProfile.constant(2, 3)))
+    assert times == pytest.approx([0, 0.5, 1, 1.5, 2, 2.5])
+
+
+def test_ramp_up_and_down():
+    up = list(arrival_times(ArrivalProfile.ramp(0, 10, 2)))
+    assert up == pytest.approx([(n / 2.5) ** 0.5 for n in range(10)])
+    down = list(arrival_times(ArrivalProfile.ramp(10, 0, 2)))
+    assert len(down) == 10
+    assert down == sorted(down)
+    assert all(t < 2 for t in down)
+    # Gaps widen as the rate falls
+    gaps = [b - a for a, b in zip(down, down[1:])]
+    assert gaps == sorted(gaps)
+
+
+def test_zero_rate_steps_are_gaps():
+    profile = ArrivalProfile.steps([(2, 1), (0, 5), (2, 1)])
+    assert list(arrival_times(profile)) == pytest.approx([0, 0.5, 6, 6.5])
+    assert list(arrival_times(ArrivalProfile.steps([(0, 10)]))) == []
+    assert list(arrival_times(ArrivalProfile.steps([(0, 10)]), poisson=True, rng=random.Random(1))) == []
+
+
+def test_poisson_follows_the_profile():
+    profile = ArrivalProfile.steps([(20, 10), (0, 10), (20, 10)])
+    counts, in_gap = [], 0
+    for seed in range(50):
+        times = list(arrival_times(profile, poisson=True, rng=random.Random(seed)))
+        assert times == sorted(times)
+        assert all(0 <= t < profile.duration for t in times)
+        in_gap += sum(10 <= t < 20 for t in times)
+        counts.append(len(times))
+    assert in_gap == 0
+    assert sum(counts) / len(counts) == pytest.approx(profile.expected, rel=0.05)
+
+
+def test_poisson_is_reproducible():
+    profile = ArrivalProfile.ramp(1, 30, 5)
+    assert (list(arrival_times(profile, poisson=True, rng=random.Random(3)))
+            == list(arrival_times(profile, poisson=True, rng=random.Random(3))))
+
+
+def test_parse_and_scale():
+    profile = parse_profile("step:5x60,60x20,5x60")
+    assert profile.segments == [(60, 5, 5), (20, 60, 60), (60, 5, 5)]
+    assert profile.expected == 1800
+    assert parse_profile("ramp:1:80", duration=10).scaled(0.5).segments == [(10, 0.5, 40)]
+    with pytest.raises(ValueError):
+        parse_profile("constant:5")
+    with pytest.raises(ValueError):
+        parse_profile("burst:5")
+    with pytest.raises(ValueError):
+        ArrivalProfile([(0, 1, 1)])
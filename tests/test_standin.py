@@ -0,0 +1,106 @@
+import json
+import socket
+import time
+
+import pytest
+
+from utils.httpClient import create_session
+from utils.loadtest.standin import JSTypeError, is_answer_correct, js_round, js_sorted_json, js_string, running_standin
+
+
+# Expected values are what node prints for the same expressions
+@pytest.mark.parametrize("value, expected", [
+    ("cab", '["a","b","c"]'),
+    ([10, 9, 1], "[1,10,9]"),                 # the default sort compares strings
+    ([2.0, 1], "[1,2]"),
+    ([True, None], "[null,true]"),           # "null" < "true"
+    (["｡", "\U0001f600"], '["\U0001f600","｡"]'),  # UTF-16 code units, not code points
+    ("a\U0001f600", '["a","\U0001f600"]'),   # the spread keeps surrogate pairs together
+    ([[2, 1], 1], "[1,[2,1]]"),
+])
+def test_sorted_json(value, expected):
+    assert js_sorted_json(value) == expected
+
+
+@pytest.mark.parametrize("value", [5, True, {"a": 1}, None])
+def test_sorted_json_of_a_non_iterable_throws(value):
+    with pytest.raises(JSTypeError):
+        js_sorted_json(value)
+
+
+def test_string_and_round():
+    assert [js_string(v) for v in (None, True, 1.0, 1.5, [1, [2, None]], {})] == \
+        ["null", "true", "1", "1.5", "1,2,", "[object Object]"]
+    assert [js_round(v) for v in (0.5, 1.5, -0.5, -1.5, 2.4)] == [1, 2, 0, -1, 2]
+
+
+@pytest.mark.parametrize("correct, answer, expected", [
+    ("abc", "cba", True),
+    (["a", "b"], ["b", "a"], True),
+    ([1, "1"], ["1", 1], False),             # a stable sort leaves 1 and "1" where they were
+    ("ab", ["a", "b"], False),               # typeof differs
+    ({"a": 1}, ["a"], False),                # both "object", lengths undefined vs 1
+    (["a"], "a", False),
+])
+def test_answer_comparison(correct, answer, expected):
+    assert is_answer_correct({"correctAnswer": correct}, answer) is expected
+
+
+@pytest.mark.parametrize("correct, answer", [(1, 1), (True, True), (None, ["a"]), ({}, {})])
+def test_answer_comparison_throws(correct, answer):
+    with pytest.raises(JSTypeError):
+        is_answer_correct({"correctAnswer": correct}, answer)
+
+
+@pytest.fixture
+def quiz():
+    """(host, quiz_id, student session, student id) on a fresh stand-in."""
+    with running_standin() as host:
+        admin = create_session(persist_cookies=True)
+        admin.post(f"{host}/api/auth/login", json={"email": "admin1@email.com", "password": "password1"})
+        quiz_id = admin.post(f"{host}/api/quizzes", json={"title": "t", "description": "", "questions": []}).json()["_id"]
+        admin.put(f"{host}/api/quizzes/{quiz_id}", json={"title": "t", "deleteAttempts": False, "questions": [
+            {"title": "p1", "type": "multiple-choice", "options": ["ab", "ba"], "correctAnswer": "ab", "value": 1},
+            {"title": "p2", "type": "number", "correctAnswer": 3, "value": 2},
+        ]})
+        student = create_session(persist_cookies=True)
+        user = student.post(f"{host}/api/auth/login",
+                            json={"email": "student1@email.com", "password": "password1"}).json()["user"]
+        yield host, quiz_id, student, user["id"]
+
+
+def test_submit_answer_routes(quiz):
+    host, quiz_id, student, user_id = quiz
+    submit = f"{host}/api/quizzes/submit-answer"
+    assert student.post(submit, json={"quizId": quiz_id, "questionIndex": "0", "answer": "ba"}).status_code == 400
+    res = student.post(submit, json={"quizId": quiz_id, "questionIndex": 0, "answer": "ba"})
+    assert res.json() == {"correct": True, "answer": "ab"}
+    res = student.post(f"{host}/api/quizzes/no-auth-submit-answer",
+                       json={"quizId": quiz_id, "userId": user_id, "questionIndex": 1, "answer": 3})
+    assert (res.status_code, res.json()) == (500, {"message": "Server error while creating quiz."})
+    score = student.get(f"{host}/api/quizzes/quiz-score", params={"quizId": quiz_id}).json()
+    assert score["score"] == 33.33
+
+
+def test_submit_attempt_route(quiz):
+    host, quiz_id, student, user_id = quiz
+    url = f"{host}/api/quizzes/no-auth-submit-attempt"
+    assert student.post(url, json={"quizId": quiz_id, "userId": user_id, "answers": ["ab", 3]}).status_code == 500
+    res = student.post(url, json={"quizId": quiz_id, "userId": user_id, "answers": ["x", "3"]})
+    assert res.json() == {"results": [{"correct": False, "answer": "ab"}, {"correct": False, "answer": 3}]}
+    res = student.post(url, json={"quizId": quiz_id, "userId": user_id, "answers": ["ab"], "startIndex": 2})
+    assert (res.status_code, res.json()) == (404, {"message": "Question not found"})
+
+
+def test_chunked_body_split_anywhere():
+    body = json.dumps({"email": "student1@email.com", "password": "password1"}).encode()
+    wire = b"%x\r\n%s\r\n0\r\n\r\n" % (len(body), body)
+    head = b"POST /api/auth/login HTTP/1.1\r\nContent-Type: application/json\r\nTransfer-Encoding: chunked\r\n\r\n"
+    with running_standin() as host:
+        address = ("127.0.0.1", int(host.rsplit(":", 1)[1]))
+        for cut in range(1, len(wire)):
+            with socket.create_connection(address, timeout=2) as sock:
+                sock.sendall(head + wire[:cut])
+                time.sleep(0.001)
+                sock.sendall(wire[cut:])
+                assert sock.recv(12) == b"HTTP/1.1 200", cut
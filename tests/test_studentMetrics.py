@@ -0,0 +1,99 @@
+import pytest
+
+from utils.httpClient import create_session
+from utils.loadtest.standin import StandInApp, StandInThread
+from utils.studentMetrics import StudentMetrics, compare, public
+
+QUESTION = {"title": "p", "type": "multiple-choice", "options": ["si", "no"], "correctAnswer": "si"}
+
+
+@pytest.fixture
+def standin():
+    app = StandInApp()
+    app.load_accounts()
+    server = StandInThread(app).start()
+    try:
+        yield app, server.url
+    finally:
+        server.stop()
+
+
+def login(host, email, password):
+    session = create_session(persist_cookies=True)
+    user = session.post(f"{host}/api/auth/login", json={"email": email, "password": password}).json()["user"]
+    return session, user["id"]
+
+
+def build(host):
+    """Four courses for admin1 with lessons, quizzes, completions and attempts by three students."""
+    admin, _ = login(host, "admin1@email.com", "password1")
+    students = [login(host, f"student{i}@email.com", f"password{i}") for i in (1, 2, 3)]
+    plan = {"Robótica": ([0, 1, 2], 3, [1, 2]), "Álgebra": ([0, 2], 2, [3]), "Física": ([1], 1, []),
+            "Química": ([0], 1, [])}
+    for title, (enrolled, lesson_count, values) in plan.items():
+        course_id = admin.post(f"{host}/api/courses", json={
+            "title": title, "description": "", "category": "Secundaria",
+            "accessList": [f"student{i + 1}@email.com" for i in enrolled]}).json()["id"]
+        lessons = [admin.post(f"{host}/api/lessons", json={"courseId": course_id, "title": f"L{n}"}).json()["_id"]
+                   for n in range(lesson_count)]
+        quiz_id = None
+        if values:
+            quiz_id = admin.post(f"{host}/api/quizzes", json={"title": "q", "description": "", "questions": []}).json()["_id"]
+            admin.put(f"{host}/api/quizzes/{quiz_id}", json={
+                "title": "q", "lessonId": lessons[0], "deleteAttempts": False,
+                "questions": [dict(QUESTION, value=v) for v in values]})
+        for n, i in enumerate(enrolled):
+            session, user_id = students[i]
+            for lesson_id in lessons[:n + 1]:
+                session.put(f"{host}/api/lessons/{lesson_id}/toggle-completion", json={"completed": True})
+            for index, answer in enumerate(["si", "no"][:len(values) - n]):
+                session.post(f"{host}/api/quizzes/no-auth-submit-answer",
+                             json={"quizId": quiz_id, "userId": user_id, "questionIndex": index, "answer": answer})
+    return admin
+
+
+def dump(store):
+    return {"users": store.users.values(), "courses": store.courses.values(), "lessons": store.lessons.values(),
+            "quizzes": store.quizzes.values(), "enrollments": store.enrollments.values(),
+            "quizattempts": store.attempts.values()}
+
+
+def test_matches_the_endpoint(standin):
+    app, host = standin
+    admin = build(host)
+    live = admin.get(f"{host}/api/enrollments/my-students").json()
+    rows = StudentMetrics().load(**dump(app.store)).for_admin("admin1@email.com")
+    report = compare(rows, live)
+    assert not report["missing"] and not report["extra"] and not report["fields"] and not report["order"]
+    assert [public(row) for row in rows] == live
+    assert live[0]["courses"] == ["Robótica", "Álgebra", "Química"] and live[0]["totalCourses"] == 3
+
+
+def test_deleted_student_makes_the_endpoint_fail(standin):
+    app, host = standin
+    admin = build(host)
+    del app.store.users[app.store.users_by_email["student2@email.com"]["_id"]]
+    assert admin.get(f"{host}/api/enrollments/my-students").status_code == 500
+    metrics = StudentMetrics().load(**dump(app.store))
+    assert metrics.for_admin("admin1@email.com") is None
+    assert metrics.for_admin("admin2@email.com") == []
+    with pytest.raises(KeyError):
+        metrics.for_admin("nobody@email.com")
+
+
+def test_derived_fields_are_recomputed():
+    """A generated dataset has no studentProgress, currentScore or maxScore: they come from the hooks' rules."""
+    metrics = StudentMetrics().load(
+        users=[{"_id": "a", "name": "Admin", "role": "admin"}, {"_id": "s", "name": "S", "email": "s@x"}],
+        courses=[{"_id": "c", "owner": "a", "title": "C"}],
+        lessons=[{"_id": f"l{i}", "courseId": "c"} for i in range(3)],
+        quizzes=[{"_id": "q1", "lessonId": "l0", "questions": [{"value": 2}, {}]},
+                 {"_id": "q2", "lessonId": "l1", "questions": [], "maxScore": 0}],
+        enrollments=[{"student": "s", "course": "c", "completedLessons": ["l0", "l1"]}],
+        quizattempts=[{"userId": "s", "quizId": "q1", "answers": [{"correct": True}, {"correct": False}]},
+                      {"userId": "s", "quizId": "q2", "currentScore": 50, "answers": [{}]},
+                      {"userId": "s", "quizId": "q2", "currentScore": 90, "answers": []}],
+    )
+    [row] = metrics.for_admin("a")
+    # (2/3 + 50/100) / 2 of the completed attempts; 2 of 3 lessons
+    assert (row["lessonProgress"], row["quizAverage"], row["courses"]) == (67, 58, ["C"])
@@ -0,0 +1,78 @@
+import os
+import random
+
+from utils.syntheticData import COLLECTIONS, DatasetWriter, ObjectIds, SyntheticDataset, ZipfSampler, read_docs
+
+
+def generate(out, fmt="ndjson", seed=7, **kwargs):
+    dataset = SyntheticDataset(seed=seed, students=60, courses=8, admins=2, **kwargs)
+    return dataset.generate(DatasetWriter(str(out), fmt))
+
+
+def load(out, manifest):
+    return {name: list(read_docs(os.path.join(str(out), manifest["files"][name]))) for name in manifest["files"]}
+
+
+def test_same_seed_same_files(tmp_path):
+    generate(tmp_path / "a")
+    generate(tmp_path / "b")
+    generate(tmp_path / "c", seed=8)
+    for name in COLLECTIONS:
+        a = (tmp_path / "a" / f"{name}.ndjson").read_bytes()
+        assert a == (tmp_path / "b" / f"{name}.ndjson").read_bytes()
+        assert a != (tmp_path / "c" / f"{name}.ndjson").read_bytes()
+
+
+def test_csv_reads_back_as_the_ndjson_documents(tmp_path):
+    manifest = generate(tmp_path / "n")
+    csv_manifest = generate(tmp_path / "c", fmt="csv")
+    assert csv_manifest["counts"] == manifest["counts"]
+    ndjson, csv = load(tmp_path / "n", manifest), load(tmp_path / "c", csv_manifest)
+    for name in COLLECTIONS:
+        assert csv[name] == ndjson[name], name
+
+
+def test_references_hold(tmp_path):
+    manifest = generate(tmp_path, quiz_rate=1.0, attempt_rate=1.0)
+    docs = load(tmp_path, manifest)
+    assert manifest["counts"]["users"] == 62
+    ids = [d["_id"] for name in COLLECTIONS for d in docs[name]]
+    assert len(ids) == len(set(ids)) and all(len(i) == 24 for i in ids)
+
+    users = {u["_id"]: u for u in docs["users"]}
+    courses = {c["_id"] for c in docs["courses"]}
+    lessons = {lesson["_id"]: lesson["courseId"] for lesson in docs["lessons"]}
+    quizzes = {q["_id"]: q for q in docs["quizzes"]}
+    assert {c["owner"] for c in docs["courses"]} <= {i for i, u in users.items() if u["role"] == "admin"}
+    assert set(lessons.values()) <= courses
+    for enrollment in docs["enrollments"]:
+        assert users[enrollment["student"]]["role"] == "student"
+        assert all(lessons[lesson] == enrollment["course"] for lesson in enrollment["completedLessons"])
+    pairs = set()
+    for attempt in docs["quizattempts"]:
+        quiz = quizzes[attempt["quizId"]]
+        assert quiz["lessonId"] == attempt["lessonId"]
+        assert len(attempt["answers"]) == attempt["questionsAnswered"] <= len(quiz["questions"])
+        assert attempt["completed"] == (attempt["questionsAnswered"] == len(quiz["questions"]))
+        pairs.add((attempt["quizId"], attempt["userId"]))
+    assert len(pairs) == len(docs["quizattempts"])  # the backend keeps one attempt per pair
+
+
+def test_object_ids_do_not_repeat_when_the_counter_wraps():
+    ids = ObjectIds(random.Random(1))
+    ids.counter = 0xFFFFFE
+    created = SyntheticDataset().epoch
+    made = [ids.new(created) for _ in range(3)]
+    assert len(set(made)) == 3
+    assert made[0][:8] == f"{int(created.timestamp()):08x}"
+
+
+def test_zipf_sampler_favours_the_head():
+    rng = random.Random(3)
+    sampler = ZipfSampler(20, 1.1, rng)
+    assert sampler.sample(rng, 50) == list(range(20))
+    counts = [0] * 20
+    for _ in range(2000):
+        for index in sampler.sample(rng, 1):
+            counts[index] += 1
+    assert counts[sampler.order[0]] > counts[sampler.order[-1]] * 5
@@ -0,0 +1,88 @@
+import base64
+import json
+import os
+
+import pytest
+
+from utils import runLedger, teardown
+from utils.httpClient import create_session
+from utils.loadtest.standin import running_standin
+from utils.runLedger import RunLedger
+from utils.tokenPool import TokenPool
+
+ADMIN = ("admin1@email.com", "password1")
+
+
+def fake_token(**claims):
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).decode().rstrip("=")
+    return f"header.{payload}.signature"
+
+
+@pytest.fixture
+def runs_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(runLedger, "RUNS_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_ledger_round_trip(runs_dir):
+    ledger = RunLedger("run-1")
+    token = fake_token(sub="u" * 24, email="owner@x.com")
+    host = "http://staging:5000"
+    ledger.observe("POST", "/api/courses", {"title": "c"}, 201, {"id": "c1"}, token, host=host)
+    ledger.observe("POST", "/api/lessons", {"courseId": "c1"}, 201, {"_id": "l1"}, token, host=host)
+    ledger.observe("POST", "/api/quizzes", {}, 201, {"_id": "q1"}, token, host=host)
+    ledger.observe("POST", "/api/quizzes/submit-answer", {"quizId": "q1"}, 200, {}, token, host=host)
+    ledger.observe("POST", "/api/courses", {}, 400, {"id": "bad"}, token, host=host)
+    ledger.observe("GET", "/api/courses", None, 200, {"id": "c2"}, token, host=host)
+
+    with open(ledger.path, encoding="utf-8") as f:
+        content = f.read()
+    assert token not in content
+    assert content.count('"kind":"host"') == 1
+    with open(ledger.path, "a", encoding="utf-8") as f:
+        f.write('{"kind":"course","id":')  # cut short by a crash
+
+    reread = RunLedger("run-1")
+    records = reread.load()
+    assert records["course"] == {"c1": {"kind": "course", "id": "c1", "owner": "owner@x.com"}}
+    assert records["lesson"]["l1"]["course"] == "c1"
+    assert list(records["quiz"]) == ["q1"]
+    assert records["attempt"][f"q1:{'u' * 24}"]["user"] == "u" * 24
+    assert reread.hosts() == [host]
+    assert runLedger.list_runs() == ["run-1"]
+
+    reread.rewrite({"quiz": records["quiz"]}, reread.hosts())
+    assert RunLedger("run-1").hosts() == [host]
+    assert {kind: list(items) for kind, items in RunLedger("run-1").load().items() if items} == {"quiz": ["q1"]}
+    reread.rewrite({}, [host])
+    assert not os.path.exists(reread.path)
+
+
+def test_teardown_deletes_on_the_recorded_host(runs_dir, monkeypatch, capsys):
+    monkeypatch.setattr(teardown, "TokenPool", lambda base_url: TokenPool(cache_file=None, base_url=base_url))
+    with running_standin() as host:
+        session = create_session(persist_cookies=True)
+        ledger = RunLedger("run-2")
+        ledger.attach(session)
+        assert session.post(f"{host}/api/auth/login", json=dict(zip(("email", "password"), ADMIN))).ok
+        course = session.post(f"{host}/api/courses", json={
+            "title": "teardown", "description": "", "category": "Secundaria", "accessList": []}).json()
+        lesson = session.post(f"{host}/api/lessons", json={
+            "courseId": course["id"], "title": "l", "description": "", "contents": []}).json()
+        assert ledger.hosts() == [host]
+        assert set(ledger.load()["lesson"]) == {lesson["_id"]}
+
+        # Run from another directory: the ledger is still found and names the server
+        monkeypatch.chdir(runs_dir)
+        assert teardown.main(["run-2", "--admin", ":".join(ADMIN)]) == 0
+        assert f"via the API at {host}" in capsys.readouterr().out
+        assert session.get(f"{host}/api/courses/{course['id']}").status_code == 404
+        assert not os.path.exists(ledger.path)
+
+
+def test_teardown_refuses_mixed_hosts(runs_dir, capsys):
+    for run_id, host in (("a", "http://one:5000"), ("b", "http://two:5000")):
+        RunLedger(run_id).observe("POST", "/api/quizzes", {}, 201, {"_id": run_id}, host=host)
+    assert teardown.main(["a", "b"]) == 1
+    assert "http://one:5000, http://two:5000" in capsys.readouterr().out
+    assert teardown.main(["a", "b", "--host", "http://one:5000", "--dry-run"]) == 0
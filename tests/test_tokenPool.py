@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from utils.httpClient import create_session
+from utils.loadtest.standin import running_standin
+from utils.tokenPool import TokenPool, token_expiry
+
+STUDENTS = [(f"student{i}@email.com", f"password{i}") for i in range(1, 6)]
+
+
+@pytest.fixture
+def host():
+    with running_standin() as url:
+        yield url
+
+
+def pool(host, cache_file):
+    return TokenPool(cache_file=str(cache_file), base_url=f"{host}/api", workers=4)
+
+
+def test_tokens_are_reused_across_pools(host, tmp_path):
+    cache = tmp_path / "tokens.json"
+    first = pool(host, cache)
+    entries = first.login_many(STUDENTS)
+    assert first.logins == 5 and all(entries.values())
+    assert entries["student1@email.com"]["expiresAt"] == token_expiry(entries["student1@email.com"]["token"])
+
+    second = pool(host, cache)
+    assert second.login_many(STUDENTS) == entries
+    assert (second.logins, second.hits) == (0, 5)
+    # Another password is not served from the cache, and the server refuses it
+    assert second.get("student1@email.com", "password2") is None
+    assert second.logins == 0
+
+
+def test_register_when_login_fails(host, tmp_path):
+    tokens = pool(host, tmp_path / "tokens.json")
+    assert tokens.get("new@test.com", "password123") is None
+    entry = tokens.get("new@test.com", "password123", name="New")
+    assert entry["userId"] and tokens.logins == 1
+
+
+def test_cache_from_a_reset_server_is_dropped(tmp_path, capsys):
+    cache = tmp_path / "tokens.json"
+    with running_standin() as host:
+        pool(host, cache).login_many(STUDENTS)
+    port = int(host.rsplit(":", 1)[1])
+    # Same URL and accounts, fresh database: the cached tokens mean nothing there
+    with running_standin(port=port):
+        tokens = pool(host, cache)
+        assert all(tokens.login_many(STUDENTS).values())
+        assert (tokens.logins, tokens.hits) == (5, 0)
+    assert "no longer valid" in capsys.readouterr().out
+
+
+def test_watch_drops_a_rejected_token(host, tmp_path):
+    cache = tmp_path / "tokens.json"
+    tokens = pool(host, cache)
+    entry = tokens.get(*STUDENTS[0])
+    http = tokens.watch(create_session())
+    assert http.get(f"{host}/api/auth/me", cookies={"token": entry["token"]}).status_code == 200
+    assert tokens.lookup(STUDENTS[0][0]) == entry
+    assert http.get(f"{host}/api/auth/me", cookies={"token": entry["token"] + "x"}).status_code == 401
+    assert tokens.lookup(STUDENTS[0][0]) == entry  # not the token it holds
+    tokens._entries[STUDENTS[0][0]]["token"] += "x"
+    http.get(f"{host}/api/auth/me", cookies={"token": entry["token"]})
+    assert tokens.lookup(STUDENTS[0][0]) is None
+    assert STUDENTS[0][0] not in json.loads(cache.read_text())["servers"][f"{host}/api"]
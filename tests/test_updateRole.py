@@ -0,0 +1,51 @@
+from utils.updateRole import UserIndex, plan_role_changes, read_role_changes
+
+ALICE = {"_id": "a" * 24, "email": "Alice@x.com", "role": "student"}
+BOB = {"_id": "b" * 24, "email": "bob@x.com", "role": "admin"}
+CAROL = {"_id": "c" * 24, "email": "carol@x.com", "role": "student"}
+INDEX = UserIndex([ALICE, BOB, CAROL])
+
+
+def test_changes_and_skips():
+    changes, skipped, failures = plan_role_changes([("alice@x.com", "admin", 1), (BOB["_id"], "admin", 2)], INDEX)
+    assert changes == [(ALICE, "admin")]
+    assert skipped == [(BOB, "admin")]
+    assert failures == []
+
+
+def test_invalid_rows_fail_with_their_line():
+    rows = [("nobody@x.com", "admin", 3), ("carol@x.com", "teacher", 4), ("carol@x.com", None, 5), ("d" * 24, "admin", 6)]
+    changes, skipped, failures = plan_role_changes(rows, INDEX)
+    assert changes == [] and skipped == []
+    assert failures == [
+        ("nobody@x.com", "admin", "line 3: user not found"),
+        ("carol@x.com", "teacher", "line 4: role must be one of student, admin"),
+        ("carol@x.com", "", "line 5: role must be one of student, admin"),
+        ("d" * 24, "admin", "line 6: user not found"),
+    ]
+
+
+def test_repeating_the_same_change_applies_it_once():
+    rows = [("alice@x.com", "admin", 1), (ALICE["_id"], "admin", 2), ("ALICE@X.COM", "admin", 3)]
+    changes, skipped, failures = plan_role_changes(rows, INDEX)
+    assert changes == [(ALICE, "admin")]
+    assert failures == []
+
+
+def test_conflicting_roles_fail_every_row_of_that_user():
+    rows = [("alice@x.com", "admin", 2), ("carol@x.com", "admin", 3), (ALICE["_id"], "student", 4),
+            ("alice@x.com", "admin", 7)]
+    changes, skipped, failures = plan_role_changes(rows, INDEX)
+    assert changes == [(CAROL, "admin")]
+    assert skipped == []
+    assert [(key, role) for key, role, _ in failures] == [
+        ("alice@x.com", "admin"), (ALICE["_id"], "student"), ("alice@x.com", "admin")]
+    assert failures[0][2] == "line 2: conflicting roles admin/student for this user (lines 2, 4, 7); nothing applied"
+    assert failures[1][2].startswith("line 4: ")
+
+
+def test_read_role_changes(tmp_path):
+    path = tmp_path / "roles.csv"
+    path.write_text("# promotions\nrole,email\nADMIN, alice@x.com\n\nstudent,bob@x.com\nbroken\n")
+    assert read_role_changes(str(path)) == [
+        ("alice@x.com", "admin", 3), ("bob@x.com", "student", 5), ("broken", None, 6)]
@@ -0,0 +1,61 @@
+import os
+import re
+
+import pytest
+
+from utils.httpClient import create_session
+from utils.loadtest import upload
+from utils.loadtest.standin import running_standin
+
+
+@pytest.mark.parametrize("size, expected", [(0, 411), (100, 411), (2000, 2000), (9_999, 9_999), (10_000, 10_000),
+                                            (300_000, 300_000)])
+def test_generated_pdf_has_the_requested_size(tmp_path, size, expected):
+    path = upload.generate_pdf(str(tmp_path / "f.pdf"), size)
+    data = open(path, "rb").read()
+    assert len(data) == expected  # below 411 bytes the objects alone are bigger
+    assert data.startswith(b"%PDF-1.4") and data.endswith(b"%%EOF\n")
+    xref = int(re.search(rb"startxref\n(\d+)", data).group(1))
+    assert data[xref:].startswith(b"xref")
+    length = int(re.search(rb"/Length (\d+)", data).group(1))
+    start = data.index(b"stream\n") + len(b"stream\n")
+    assert data[start + length:].startswith(b"\nendstream")
+    for offset in re.findall(rb"(\d{10}) 00000 n", data):
+        assert re.match(rb"\d+ 0 obj", data[int(offset):])
+
+
+def test_multipart_body_reads_and_iterates_the_same(tmp_path):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(os.urandom(1000))
+    body = upload.MultipartFile(str(path), chunk_size=64)
+    read = b"".join(iter(lambda: body.read(100), b""))
+    assert len(read) == len(body) == body.sent
+    assert read.startswith(f"--{body.boundary}\r\n".encode()) and read.endswith(f"\r\n--{body.boundary}--\r\n".encode())
+    assert path.read_bytes() in read
+
+    again = upload.MultipartFile(str(path), chunk_size=64)
+    again.boundary, again._preamble, again._epilogue = body.boundary, body._preamble, body._epilogue
+    chunks = list(again)
+    assert b"".join(chunks) == read and max(map(len, chunks)) == 64
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_upload_reaches_the_server_intact(tmp_path, chunked):
+    path = upload.generate_pdf(str(tmp_path / "small.pdf"), 700_000)
+    with running_standin() as host:
+        res, sent = upload.upload_file(create_session(), f"{host}/api/upload", path, filename="a b.pdf",
+                                       chunked=chunked)
+        assert res.status_code == 200 and sent == len(upload.MultipartFile(path, filename="a b.pdf"))
+        url = res.json()["url"]
+        assert url.endswith("-a-b.pdf")
+        stored = create_session().get(f"{host}/uploads/{url.rsplit('/', 1)[1]}")
+    assert stored.content == open(path, "rb").read()
+
+
+def test_run_counts_every_upload(tmp_path):
+    paths = list(upload.generate_tiers(str(tmp_path), {"tiny": 20_000, "small": 60_000}).values())
+    with running_standin() as host:
+        stats, results, _ = upload.run(host, paths, vusers=3, iterations=2)
+    assert [(r.uploads, r.failures) for r in results] == [(2, 0)] * 3
+    assert sorted((row["transaction"], row["pass"]) for row in stats.report()) == \
+        [("T03_UploadPDF_small", 3), ("T03_UploadPDF_tiny", 3)]
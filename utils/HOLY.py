@@ -1,12 +1,26 @@
+import argparse
 import requests
+import os
 import random
 import sys
 import time
+from contextlib import nullcontext
+
+if __package__ in (None, ""):
+    # Run as a file rather than with -m: put the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.attemptPipeline import run_attempts
+from utils.httpClient import BASE_URL, auth_headers, get_session
+from utils.loadtest.dashboard import live
+from utils.loadtest.instrument import get_collector, instrument_session, report, transaction
+from utils.tokenPool import get_token_pool
+
+session = instrument_session(get_session())
 
 # ==========================================
 # CONFIGURATION
 # ==========================================
-BASE_URL = "http://localhost:5000/api"
 AUTH_LOGIN_URL = f"{BASE_URL}/auth/login"
 AUTH_REGISTER_URL = f"{BASE_URL}/auth/register"
 COURSE_URL = f"{BASE_URL}/courses"
@@ -14,6 +28,10 @@ LESSON_URL = f"{BASE_URL}/lessons"
 QUIZ_URL = f"{BASE_URL}/quizzes"
 QUIZ_ATTEMPT_URL = f"{BASE_URL}/quizzes/no-auth-submit-answer"
 
+# Attempt submission: "serial", "pipelined" or "batch" (see attemptPipeline.py)
+ATTEMPT_MODE = "pipelined"
+ATTEMPT_WORKERS = 16
+
 # ==========================================
 # DATASETS
 # ==========================================
@@ -78,71 +96,38 @@ QUESTION_BANK = [
 # ==========================================
 
 def get_admin_token():
-    """Logs in or Registers the Admin/Director."""
+    """Logs in or Registers the Admin/Director (token reused from the cache when valid)."""
     email = "jaramillovictorarmando@gmail.com"
     password = "Hola1234"
     name = "Director Académico"
 
     print(f"🔑 Logging in as Admin ({email})...")
-    try:
-        res = requests.post(AUTH_LOGIN_URL, json={"email": email, "password": password})
-        if res.status_code == 200:
-            return res.json().get("token")
-        
-        print("   ↳ Account not found. Creating Admin account...")
-        requests.post(AUTH_REGISTER_URL, json={"name": name, "email": email, "password": password})
-        
-        res = requests.post(AUTH_LOGIN_URL, json={"email": email, "password": password})
-        if res.status_code == 200:
-            return res.json().get("token")
-    except Exception as e:
-        print(f"❌ Connection Error: {e}")
+    with transaction("T01_LoginAdmin"):
+        entry = get_token_pool().get(email, password, name=name)
+    if entry:
+        return entry["token"]
     
     print("❌ Critical: Could not authenticate Admin.")
     return None
 
 def get_or_create_students(amount=5):
     """
-    Logs in or Registers test students. 
+    Logs in or Registers test students concurrently, reusing cached tokens.
     Returns a list of dictionaries: [{'id': '...', 'email': '...'}]
     """
-    students = []
     print(f"👥 Preparing {amount} Test Students...")
 
-    for i in range(1, amount + 1):
-        email = f"test_{i}@test.com"
-        password = "password123"
-        name = f"Test Student {i}"
-        
-        # Try Login
-        user_data = None
-        res = requests.post(AUTH_LOGIN_URL, json={"email": email, "password": password})
-        
-        if res.status_code == 200:
-            data = res.json()
-            if 'user' in data and '_id' in data['user']:
-                user_data = {'id': data['user']['_id'], 'email': email}
-            elif 'id' in data:
-                 user_data = {'id': data['id'], 'email': email}
-            else:
-                pass 
+    accounts = [(f"test_{i}@test.com", "password123", f"Test Student {i}") for i in range(1, amount + 1)]
+    pool = get_token_pool()
+    with transaction("T02_PrepareStudents"):
+        entries = pool.login_many(accounts)
 
-        else:
-            # Try Register
-            res_reg = requests.post(AUTH_REGISTER_URL, json={"name": name, "email": email, "password": password})
-            if res_reg.status_code in [200, 201]:
-                data = res_reg.json()
-                if 'user' in data and '_id' in data['user']:
-                    user_data = {'id': data['user']['_id'], 'email': email}
-                elif '_id' in data:
-                    user_data = {'id': data['_id'], 'email': email}
-        
-        if user_data:
-            students.append(user_data)
-        else:
-            students.append({'id': None, 'email': email})
+    students = []
+    for email, _, _ in accounts:
+        entry = entries.get(email)
+        students.append({'id': entry["userId"] if entry else None, 'email': email})
 
-    print(f"   ↳ {len(students)} students ready.")
+    print(f"   ↳ {len(students)} students ready ({pool.hits} cached, {pool.logins} logged in).")
     return students
 
 # ==========================================
@@ -151,7 +136,7 @@ def get_or_create_students(amount=5):
 
 def create_course(token, course_info, student_emails):
     """Creates a course and enrolls students."""
-    headers = {"Authorization": f"Bearer {token}"}
+    headers = auth_headers(token)
     
     # Randomly enroll subset
     subset_size = random.randint(min(3, len(student_emails)), len(student_emails))
@@ -165,7 +150,8 @@ def create_course(token, course_info, student_emails):
     }
 
     try:
-        res = requests.post(COURSE_URL, json=payload, headers=headers)
+        with transaction("T03_CreateCourse"):
+            res = session.post(COURSE_URL, json=payload, headers=headers)
         if res.status_code in [200, 201]:
             data = res.json()
             c_id = data.get("id") or data.get("_id")
@@ -183,7 +169,7 @@ def add_lessons(token, course_id):
     Adds video lessons to the course.
     UPDATED: Returns a list of lesson IDs so we can attach quizzes to them.
     """
-    headers = {"Authorization": f"Bearer {token}"}
+    headers = auth_headers(token)
     num_lessons = random.randint(3, 5)
     created_lesson_ids = []
 
@@ -202,7 +188,8 @@ def add_lessons(token, course_id):
         }
         
         try:
-            res = requests.post(LESSON_URL, json=payload, headers=headers)
+            with transaction("T04_CreateLesson"):
+                res = session.post(LESSON_URL, json=payload, headers=headers)
             if res.status_code in [200, 201]:
                 data = res.json()
                 l_id = data.get("id") or data.get("_id")
@@ -219,7 +206,7 @@ def add_quizzes(token, lesson_ids):
     1. Crea el quiz (POST /api/quizzes).
     2. Agrega la referencia del quiz a la lección (PUT /api/lessons/:id).
     """
-    headers = {"Authorization": f"Bearer {token}"}
+    headers = auth_headers(token)
     created_quizzes_info = [] 
 
     print(f"   🔄 Creating quizzes and linking them to {len(lesson_ids)} lessons...")
@@ -248,7 +235,8 @@ def add_quizzes(token, lesson_ids):
 
         try:
             # POST al endpoint de Quizzes
-            res = requests.post(QUIZ_URL, json=quiz_payload, headers=headers)
+            with transaction("T05_CreateQuiz"):
+                res = session.post(QUIZ_URL, json=quiz_payload, headers=headers)
             if res.status_code in [200, 201]:
                 quiz_data = res.json()
                 quiz_id = quiz_data.get("id") or quiz_data.get("_id")
@@ -266,7 +254,8 @@ def add_quizzes(token, lesson_ids):
         if quiz_id:
             try:
                 # A. Obtener contenidos actuales (GET)
-                get_res = requests.get(f"{LESSON_URL}/{lesson_id}", headers=headers)
+                with transaction("T06_GetLesson"):
+                    get_res = session.get(f"{LESSON_URL}/{lesson_id}", headers=headers)
                 if get_res.status_code != 200:
                     print("      ⚠️ No se pudo obtener la lección para actualizar.")
                     continue
@@ -289,7 +278,8 @@ def add_quizzes(token, lesson_ids):
                     "contents": current_contents
                 }
 
-                put_res = requests.put(f"{LESSON_URL}/{lesson_id}", json=put_payload, headers=headers)
+                with transaction("T07_LinkQuiz"):
+                    put_res = session.put(f"{LESSON_URL}/{lesson_id}", json=put_payload, headers=headers)
 
                 if put_res.status_code == 200:
                     # Guardamos info para la simulación de intentos
@@ -303,9 +293,12 @@ def add_quizzes(token, lesson_ids):
     print(f"   ↳ Created and Linked {len(created_quizzes_info)} Quizzes.")
     return created_quizzes_info
 
-def simulate_attempts(student_list, quizzes):
-    """Simulates students taking the quizzes."""
-    attempts_count = 0
+def simulate_attempts(student_list, quizzes, mode=None):
+    """
+    Simulates students taking the quizzes.
+    `mode` is one of attemptPipeline.ATTEMPT_MODES (defaults to ATTEMPT_MODE).
+    """
+    attempts = []
     
     for quiz_obj in quizzes:
         quiz_id = quiz_obj["id"]
@@ -317,36 +310,36 @@ def simulate_attempts(student_list, quizzes):
             # 50% chance a student takes a specific quiz
             if random.random() < 0.5: continue
 
-            # Loop through questions in the quiz
-            for idx, question in enumerate(quiz_data.get("questions", [])):
+            # Decide every answer up front; the pipeline keeps them in order per student
+            answers = []
+            for question in quiz_data.get("questions", []):
                 
                 # Determine answer (Correct or Garbage)
                 ans = question.get("correctAnswer")
                 if random.random() < 0.2: # 20% chance to fail
                     ans = "Wrong Answer Value"
+                answers.append(ans)
 
-                payload = {
-                    "quizId": quiz_id,
-                    "userId": student['id'],
-                    "questionIndex": idx,
-                    "answer": ans
-                }
-                
-                try:
-                    requests.post(QUIZ_ATTEMPT_URL, json=payload)
-                except:
-                    pass
-            
-            attempts_count += 1
+            attempts.append((quiz_id, student['id'], answers))
 
-    if attempts_count > 0:
-        print(f"   ↳ 🤖 Simulated {attempts_count} student attempts on these quizzes.")
+    if not attempts:
+        return
+
+    completed, _ = run_attempts(attempts, mode=mode or ATTEMPT_MODE, workers=ATTEMPT_WORKERS)
+    print(f"   ↳ 🤖 Simulated {len(attempts)} student attempts on these quizzes ({completed} fully accepted).")
 
 # ==========================================
 # MAIN EXECUTION
 # ==========================================
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed courses, lessons, quizzes and attempts through the API.")
+    parser.add_argument("--json", metavar="FILE", help="write the transaction summary as JSON")
+    parser.add_argument("--csv", metavar="FILE", help="write the transaction summary as CSV")
+    parser.add_argument("--live", action="store_true",
+                        help="show a live dashboard instead of a line per created object")
+    args = parser.parse_args(argv)
+
     print("==========================================")
     print("   FULL SEED: COURSES, LESSONS, QUIZZES")
     print("==========================================\n")
@@ -363,28 +356,31 @@ def main():
     print("--- Starting Content Generation ---")
 
     # 3. Loop through Course Data
-    for info in COURSE_DATA:
-        # A. Create Course
-        course_id = create_course(token, info, student_emails)
-        
-        if course_id:
-            # B. Add Video Lessons (UPDATED to return IDs)
-            lesson_ids = add_lessons(token, course_id)
-            
-            # C. Add Quizzes (UPDATED to take lesson_ids)
-            if lesson_ids:
-                created_quizzes = add_quizzes(token, lesson_ids)
-                
-                # D. Simulate Attempts
-                if created_quizzes and students:
-                    simulate_attempts(students, created_quizzes)
+    with live(get_collector(), title="Seeding") if args.live else nullcontext():
+        for info in COURSE_DATA:
+            # A. Create Course
+            course_id = create_course(token, info, student_emails)
+
+            if course_id:
+                # B. Add Video Lessons (UPDATED to return IDs)
+                lesson_ids = add_lessons(token, course_id)
 
-            time.sleep(0.2) # Prevent race conditions/locks
+                # C. Add Quizzes (UPDATED to take lesson_ids)
+                if lesson_ids:
+                    created_quizzes = add_quizzes(token, lesson_ids)
+
+                    # D. Simulate Attempts
+                    if created_quizzes and students:
+                        simulate_attempts(students, created_quizzes)
+
+                time.sleep(0.2) # Prevent race conditions/locks
 
     print("\n==========================================")
     print("✅ SUCCESS: Database populated.")
     print("==========================================")
 
+    report(json_path=args.json, csv_path=args.csv)
+
 if __name__ == "__main__":
     try:
         main()
@@ -1,6 +1,27 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
 import requests
 
-API_URL = "http://localhost:5000/api/user"
+if __package__ in (None, ""):
+    # Run as a file rather than with -m: put the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.httpClient import BASE_URL, get_session
+
+session = get_session()
+
+API_URL = f"{BASE_URL}/user"
+
+# Streaming export (--export): pages of PAGE_SIZE users, NDJSON or CSV
+PAGE_SIZE = 1000
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_FIELDS = ["_id", "name", "email", "role", "createdAt"]
+WRITE_BUFFER = 1024 * 1024
 
 def get_all_users():
     """
@@ -10,7 +31,7 @@ def get_all_users():
     print("🔄 Fetching all users...")
     
     try:
-        response = requests.get(API_URL)
+        response = session.get(API_URL)
         response.raise_for_status()
         
         users = response.json()
@@ -87,9 +108,15 @@ def count_users_by_role(users):
     
     role_count = {}
     for user in users:
-        role = user.get('role', 'unknown')
-        role_count[role] = role_count.get(role, 0) + 1
+        add_to_role_count(role_count, user)
     
+    print_role_count(role_count)
+
+def add_to_role_count(role_count, user):
+    role = user.get('role', 'unknown')
+    role_count[role] = role_count.get(role, 0) + 1
+
+def print_role_count(role_count):
     print(f"\n📈 User Statistics:")
     for role, count in role_count.items():
         print(f"   {role.capitalize()}: {count} user(s)")
@@ -116,7 +143,133 @@ def save_users_to_file(users, filename="users_export.txt"):
     except Exception as e:
         print(f"❌ Error saving to file: {e}")
 
-if __name__ == "__main__":
+# ==========================================
+# STREAMING EXPORT
+# ==========================================
+
+def iter_user_pages(page_size=PAGE_SIZE, after=None):
+    """
+    Yield pages of users in _id order using ?limit=&after= cursors.
+    A backend without paging answers the whole list at once; that comes
+    back as a single page, even when it holds exactly page_size users.
+    """
+    while True:
+        params = {"limit": page_size}
+        if after:
+            params["after"] = after
+        response = session.get(API_URL, params=params)
+        response.raise_for_status()
+        page = response.json()
+        if not page:
+            return
+        if after and (page[0]["_id"] <= after or page[-1]["_id"] == after):
+            return  # the cursor was ignored: this is a page we already have
+        yield page
+        if len(page) != page_size:  # last page, or a backend that ignores limit
+            return
+        after = page[-1]["_id"]
+
+def export_state_path(filename):
+    return f"{filename}.state"
+
+def load_export_state(filename):
+    try:
+        with open(export_state_path(filename), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def save_export_state(filename, state):
+    """Checkpoint after a page; written aside and renamed so a crash never leaves half a state file."""
+    path = export_state_path(filename)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(f"{path}.tmp", path)
+
+def export_format(filename, fmt=None):
+    if fmt:
+        return fmt
+    return "csv" if filename.lower().endswith(".csv") else "ndjson"
+
+def export_users(filename, fmt=None, page_size=PAGE_SIZE, resume=False):
+    """
+    Stream every user to `filename` as NDJSON or CSV, one page in memory at
+    a time, counting roles on the way. After each page the cursor, the
+    byte offset and the counts are checkpointed in FILENAME.state; with
+    resume=True an interrupted export continues from there. Returns the
+    role counts.
+    """
+    fmt = export_format(filename, fmt)
+    state = load_export_state(filename) if resume else None
+    if state and state.get("format") != fmt:
+        raise ValueError(f"{filename} was started as {state.get('format')}, not {fmt}")
+
+    if state:
+        # Drop anything written after the last checkpoint
+        with open(filename, "r+b") as f:
+            f.truncate(state["bytes"])
+        print(f"⏩ Resuming after {state['exported']:,} users (cursor {state['after']})")
+    else:
+        state = {"format": fmt, "after": None, "exported": 0, "bytes": 0, "roles": {}}
+
+    started = time.perf_counter()
+    with open(filename, "a" if state["bytes"] else "w", encoding="utf-8", newline="", buffering=WRITE_BUFFER) as f:
+        writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS, extrasaction="ignore") if fmt == "csv" else None
+        if writer and not state["bytes"]:
+            writer.writeheader()
+
+        for page in iter_user_pages(page_size, after=state["after"]):
+            for user in page:
+                if writer:
+                    writer.writerow(user)
+                else:
+                    f.write(json.dumps(user, ensure_ascii=False, separators=(",", ":")))
+                    f.write("\n")
+                add_to_role_count(state["roles"], user)
+            f.flush()
+            state["after"] = page[-1]["_id"]
+            state["exported"] += len(page)
+            state["bytes"] = f.tell()
+            save_export_state(filename, state)
+            elapsed = time.perf_counter() - started
+            print(f"   ↳ {state['exported']:,} users ({state['exported'] / max(elapsed, 1e-9):,.0f}/s)", end="\r")
+
+    os.remove(export_state_path(filename))
+    print(f"\n💾 {state['exported']:,} users exported to: {filename}")
+    return state["roles"]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List users, or stream them to NDJSON/CSV with --export.")
+    parser.add_argument("--export", metavar="FILE", help="stream every user to FILE (.csv or .ndjson)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="export format (default: from the file extension)")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="users per request (default: %(default)s)")
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted --export")
+    args = parser.parse_args(argv)
+
+    if not args.export:
+        interactive()
+        return 0
+    if args.page_size < 1:
+        parser.error("--page-size must be at least 1")
+
+    print(f"🔄 Exporting users to {args.export}...")
+    try:
+        role_count = export_users(args.export, fmt=args.format, page_size=args.page_size, resume=args.resume)
+    except requests.exceptions.ConnectionError:
+        print("\n❌ Error: Cannot connect to server. Make sure the server is running on http://localhost:5000")
+        return 1
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"\n❌ Export stopped: {e}")
+        if os.path.exists(export_state_path(args.export)):
+            print("   ↳ Run again with --resume to continue")
+        return 1
+    except KeyboardInterrupt:
+        print("\n🛑 Export interrupted; run again with --resume to continue")
+        return 1
+    print_role_count(role_count)
+    return 0
+
+def interactive():
     print("=== User Management System ===")
     print("🔄 Connecting to server...")
     
@@ -145,4 +298,7 @@ if __name__ == "__main__":
         
         print(f"\n✅ Successfully retrieved {len(users)} user(s)")
     else:
-        print("❌ Failed to retrieve users list")
\ No newline at end of file
+        print("❌ Failed to retrieve users list")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+import aiohttp
+
+if __package__ in (None, ""):
+    # Run as a file rather than with -m: put the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.HOLY import COURSE_DATA, QUESTION_BANK, YOUTUBE_LINKS
+from utils.httpClient import BASE_URL
+from utils.runLedger import current_ledger
+from utils.tokenPool import TokenPool, is_auth_failure
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+ADMIN_EMAIL = "jaramillovictorarmando@gmail.com"
+ADMIN_PASSWORD = "Hola1234"
+ADMIN_NAME = "Director Académico"
+STUDENT_PASSWORD = "password123"
+
+# Max in-flight requests per stage/endpoint
+DEFAULT_CONCURRENCY = {
+    "auth": 20,       # bcrypt-bound login/register
+    "courses": 20,
+    "lessons": 50,
+    "quizzes": 50,
+    "lesson_put": 50,
+    "attempts": 100,  # (student, quiz) pairs answered in parallel
+}
+
+STAGES = ["auth", "courses", "lessons", "quizzes", "lesson_put", "attempts"]
+
+
+class StageStats:
+    """Counts objects created by one pipeline stage and how long it was active."""
+
+    def __init__(self, name):
+        self.name = name
+        self.ok = 0
+        self.failed = 0
+        self.first_start = None
+        self.last_end = None
+
+    def begin(self):
+        now = time.perf_counter()
+        if self.first_start is None:
+            self.first_start = now
+        return now
+
+    def end(self, ok):
+        self.last_end = time.perf_counter()
+        if ok:
+            self.ok += 1
+        else:
+            self.failed += 1
+
+    @property
+    def elapsed(self):
+        if self.first_start is None or self.last_end is None:
+            return 0.0
+        return self.last_end - self.first_start
+
+    @property
+    def rate(self):
+        return self.ok / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class Seeder:
+    """
+    Dependency-aware async seeding pipeline:
+    course -> lessons -> quiz -> lesson PUT -> attempts.
+
+    Every course is an independent branch, so branches run in parallel and
+    only the per-stage semaphores limit how hard each endpoint is hit.
+    """
+
+    def __init__(self, session, base_url=BASE_URL, concurrency=None, rng=None, attempt_mode="pipelined"):
+        self.session = session
+        self.attempt_mode = attempt_mode
+        self.base_url = base_url
+        limits = dict(DEFAULT_CONCURRENCY, **(concurrency or {}))
+        self.limits = {name: asyncio.Semaphore(limits[name]) for name in STAGES}
+        self.stats = {name: StageStats(name) for name in STAGES}
+        self.rng = rng or random.Random()
+        self.ledger = current_ledger()
+        self.tokens = TokenPool(base_url=base_url, workers=limits["auth"])
+        self.token = None
+
+    # ------------------------------------------
+    # HTTP
+    # ------------------------------------------
+
+    async def call(self, stage, method, path, payload=None, expect=(200, 201), token=None):
+        """Run one request under the stage's semaphore; returns JSON or None."""
+        token = token or self.token
+        cookies = {"token": token} if token else None
+        headers = {"Authorization": f"Bearer {token}"} if token else None
+        stats = self.stats[stage]
+
+        async with self.limits[stage]:
+            stats.begin()
+            try:
+                async with self.session.request(method, f"{self.base_url}{path}", json=payload,
+                                                cookies=cookies, headers=headers) as res:
+                    if res.status not in expect:
+                        stats.end(False)
+                        if token and res.status in (401, 404):
+                            data = await res.json(content_type=None) if res.status == 404 else None
+                            if is_auth_failure(res.status, data):
+                                self.tokens.invalidate_token(token)
+                        return None
+                    data = await res.json(content_type=None)
+                    stats.end(True)
+                    if self.ledger:
+                        self.ledger.observe(method, res.url.path, payload, res.status, data, token,
+                                            host=str(res.url.origin()))
+                    return data
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                stats.end(False)
+                return None
+
+    # ------------------------------------------
+    # AUTH
+    # ------------------------------------------
+
+    async def login_admin(self):
+        entry = await asyncio.to_thread(self.tokens.get, ADMIN_EMAIL, ADMIN_PASSWORD, ADMIN_NAME)
+        self.token = entry["token"] if entry else None
+        return self.token
+
+    async def get_or_create_students(self, amount):
+        """Concurrent login/register through the token pool; cached tokens skip bcrypt entirely."""
+        accounts = [(f"test_{i}@test.com", STUDENT_PASSWORD, f"Test Student {i}") for i in range(1, amount + 1)]
+        stats = self.stats["auth"]
+        stats.begin()
+        entries = await asyncio.to_thread(self.tokens.login_many, accounts)
+        students = []
+        for email, _, _ in accounts:
+            entry = entries.get(email)
+            stats.end(entry is not None)
+            students.append({"id": entry["userId"] if entry else None, "email": email})
+        return students
+
+    # ------------------------------------------
+    # PIPELINE
+    # ------------------------------------------
+
+    async def seed_course(self, info, students, max_enrolled):
+        pool = [s for s in students if s["id"]]  # students whose login/register failed can't take quizzes
+        high = max(0, min(len(pool), max_enrolled))
+        subset_size = self.rng.randint(min(3, high), high)
+        enrollees = self.rng.sample(pool, k=subset_size)
+
+        course = await self.call("courses", "POST", "/courses", {
+            "title": info["title"],
+            "description": info["desc"],
+            "category": info["cat"],
+            "accessList": [s["email"] for s in enrollees],
+        })
+        course_id = course and (course.get("id") or course.get("_id"))
+        if not course_id:
+            return
+
+        num_lessons = self.rng.randint(3, 5)
+        await asyncio.gather(*(self.seed_lesson(course_id, i, enrollees) for i in range(1, num_lessons + 1)))
+
+    async def seed_lesson(self, course_id, i, enrollees):
+        contents = [{"title": f"Video del Tema {i}", "type": "video", "url": self.rng.choice(YOUTUBE_LINKS)}]
+        lesson = await self.call("lessons", "POST", "/lessons", {
+            "courseId": course_id,
+            "title": f"Lección {i}: Conceptos Fundamentales",
+            "description": "Visualizar el video completo para asistencia.",
+            "contents": contents,
+        })
+        lesson_id = lesson and (lesson.get("id") or lesson.get("_id"))
+        if not lesson_id:
+            return
+
+        questions = [q.copy() for q in QUESTION_BANK if self.rng.random() > 0.3] or [QUESTION_BANK[0].copy()]
+        for q in questions:
+            q["value"] = self.rng.randint(1, 10)
+        quiz_title = f"Quiz {i}: Evaluación Práctica"
+        quiz = await self.call("quizzes", "POST", "/quizzes", {
+            "title": quiz_title,
+            "description": "Demuestra lo aprendido en esta lección.",
+            "lessonId": lesson_id,
+            "questions": questions,
+        })
+        quiz_id = quiz and (quiz.get("id") or quiz.get("_id"))
+        if not quiz_id:
+            return
+
+        # We created the lesson, so its contents are already known: no GET before the PUT.
+        contents = (lesson.get("contents") or contents) + [{"title": quiz_title, "type": "quiz", "quizId": quiz_id}]
+        linked = await self.call("lesson_put", "PUT", f"/lessons/{lesson_id}", {"contents": contents})
+        if not linked:
+            return
+
+        takers = [s for s in enrollees if s["id"] and self.rng.random() >= 0.5]
+        await asyncio.gather(*(self.take_quiz(quiz_id, questions, s["id"]) for s in takers))
+
+    async def take_quiz(self, quiz_id, questions, user_id):
+        """
+        One (student, quiz) pair. questionIndex must be sequential per pair,
+        so answers go in order here while other pairs run concurrently.
+        Like attemptPipeline.submit_answers, a rejected answer does not stop
+        the rest from being sent. In "batch" mode the whole attempt is a
+        single request.
+        """
+        answers = []
+        for question in questions:
+            ans = question.get("correctAnswer")
+            if self.rng.random() < 0.2:
+                ans = "Wrong Answer Value"
+            answers.append(ans)
+
+        if self.attempt_mode == "batch":
+            await self.call("attempts", "POST", "/quizzes/no-auth-submit-attempt", {
+                "quizId": quiz_id, "userId": user_id, "startIndex": 0, "answers": answers,
+            }, expect=(200,))
+            return
+
+        for idx, ans in enumerate(answers):
+            await self.call("attempts", "POST", "/quizzes/no-auth-submit-answer", {
+                "quizId": quiz_id, "userId": user_id, "questionIndex": idx, "answer": ans,
+            }, expect=(200,))
+
+    async def run(self, students_amount, courses_amount, max_enrolled):
+        if not await self.login_admin():
+            print("❌ Critical: Could not authenticate Admin.")
+            return False
+
+        students = await self.get_or_create_students(students_amount)
+        print(f"👥 {sum(1 for s in students if s['id'])}/{len(students)} students ready.")
+
+        courses = []
+        for n in range(courses_amount):
+            info = dict(COURSE_DATA[n % len(COURSE_DATA)])
+            if courses_amount > len(COURSE_DATA):
+                info["title"] = f"{info['title']} #{n + 1}"
+            courses.append(info)
+
+        await asyncio.gather(*(self.seed_course(info, students, max_enrolled) for info in courses))
+        return True
+
+    def print_report(self, wall_time):
+        print(f"\n📊 Seeding Throughput ({wall_time:.1f}s total)")
+        print("=" * 60)
+        print(f"{'Stage':<12} {'OK':>8} {'Failed':>8} {'Active (s)':>12} {'Obj/s':>10}")
+        print("-" * 60)
+        for stats in self.stats.values():
+            print(f"{stats.name:<12} {stats.ok:>8} {stats.failed:>8} {stats.elapsed:>12.2f} {stats.rate:>10.1f}")
+
+
+async def seed(args):
+    rng = random.Random(args.seed)
+    concurrency = {name: getattr(args, f"max_{name}") for name in STAGES}
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    connector = aiohttp.TCPConnector(limit=sum(concurrency.values()))
+
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        seeder = Seeder(session, args.base_url, concurrency, rng, args.attempt_mode)
+        started = time.perf_counter()
+        ok = await seeder.run(args.students, args.courses, args.max_enrolled)
+        seeder.print_report(time.perf_counter() - started)
+        return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent seed of courses, lessons, quizzes and attempts.")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--students", type=int, default=5, help="test_{i}@test.com accounts to use")
+    parser.add_argument("--courses", type=int, default=len(COURSE_DATA), help="courses to create")
+    parser.add_argument("--max-enrolled", type=int, default=50, help="max students enrolled per course")
+    parser.add_argument("--seed", type=int, help="random seed for reproducible datasets")
+    parser.add_argument("--attempt-mode", choices=["pipelined", "batch"], default="pipelined",
+                        help="answer-by-answer per pair, or one bulk request per attempt")
+    parser.add_argument("--timeout", type=float, default=60, help="per-request timeout in seconds")
+    for name in STAGES:
+        parser.add_argument(f"--max-{name.replace('_', '-')}", type=int, default=DEFAULT_CONCURRENCY[name],
+                            dest=f"max_{name}", help=f"max concurrent {name} requests")
+    args = parser.parse_args(argv)
+
+    print("==========================================")
+    print("   ASYNC SEED: COURSES, LESSONS, QUIZZES")
+    print("==========================================\n")
+
+    if not asyncio.run(seed(args)):
+        sys.exit(1)
+
+    print("\n==========================================")
+    print("✅ SUCCESS: Database populated.")
+    print("==========================================")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n🛑 Script stopped")
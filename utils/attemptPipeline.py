@@ -0,0 +1,107 @@
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.httpClient import BASE_URL, get_session
+from utils.loadtest.instrument import instrument_session, transaction
+
+session = instrument_session(get_session())
+
+QUIZ_ATTEMPT_URL = f"{BASE_URL}/quizzes/no-auth-submit-answer"
+QUIZ_ATTEMPT_BATCH_URL = f"{BASE_URL}/quizzes/no-auth-submit-attempt"
+
+# How simulated attempts are sent:
+# - "serial":    one answer at a time, one pair after another (old behaviour)
+# - "pipelined": pairs run concurrently, answers of a pair stay in order
+# - "batch":     one request per attempt to the bulk endpoint
+ATTEMPT_MODES = ("serial", "pipelined", "batch")
+DEFAULT_WORKERS = 16
+
+
+def build_queues(attempts):
+    """
+    Group (quiz_id, user_id, answers) tuples into one ordered queue per
+    (user, quiz) pair. questionIndex is sequential per pair on the server,
+    so a pair's answers must never be split across workers. The server
+    keeps one attempt per pair, so only the first attempt of a pair is
+    queued; later ones are skipped rather than appended to it.
+    """
+    queues = OrderedDict()
+    duplicates = 0
+    for quiz_id, user_id, answers in attempts:
+        if (quiz_id, user_id) in queues:
+            duplicates += 1
+            continue
+        queues[(quiz_id, user_id)] = deque(answers)
+    if duplicates:
+        print(f"⚠️ Skipped {duplicates} attempt(s) for a (quiz, user) pair that already had one")
+    return queues
+
+
+def submit_answers(quiz_id, user_id, answers, start_index=0):
+    """
+    Post the answers of one pair in questionIndex order. Like the old
+    loop, a rejected answer does not stop the rest from being sent;
+    returns how many were accepted.
+    """
+    accepted = 0
+    for idx, ans in enumerate(answers, start_index):
+        payload = {
+            "quizId": quiz_id,
+            "userId": user_id,
+            "questionIndex": idx,
+            "answer": ans
+        }
+        try:
+            with transaction("T08_SubmitAnswer"):
+                res = session.post(QUIZ_ATTEMPT_URL, json=payload)
+        except Exception:
+            continue
+        if res.status_code == 200:
+            accepted += 1
+    return accepted
+
+
+def submit_attempt_batch(quiz_id, user_id, answers, start_index=0):
+    """Send a whole attempt in one request; returns how many answers were stored."""
+    payload = {
+        "quizId": quiz_id,
+        "userId": user_id,
+        "startIndex": start_index,
+        "answers": list(answers)
+    }
+    try:
+        with transaction("T08_SubmitAttempt"):
+            res = session.post(QUIZ_ATTEMPT_BATCH_URL, json=payload)
+    except Exception:
+        return 0
+    if res.status_code != 200:
+        return 0
+    return len(res.json().get("results", []))
+
+
+def run_attempts(attempts, mode="pipelined", workers=DEFAULT_WORKERS):
+    """
+    Submit simulated attempts. `attempts` is an iterable of
+    (quiz_id, user_id, answers). Returns (pairs_completed, answers_accepted).
+    """
+    if mode not in ATTEMPT_MODES:
+        raise ValueError(f"Unknown attempt mode '{mode}', expected one of {', '.join(ATTEMPT_MODES)}")
+
+    queues = build_queues(attempts)
+    submit = submit_attempt_batch if mode == "batch" else submit_answers
+
+    def drain(item):
+        (quiz_id, user_id), queue = item
+        if not queue:
+            return 0, 0
+        return len(queue), submit(quiz_id, user_id, queue)
+
+    if mode == "serial":
+        results = [drain(item) for item in queues.items()]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(drain, queues.items()))
+
+    completed = sum(1 for expected, accepted in results if expected and accepted == expected)
+    accepted = sum(accepted for _, accepted in results)
+    return completed, accepted
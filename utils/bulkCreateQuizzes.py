@@ -1,7 +1,17 @@
-import requests
+import os
 import random
+import sys
 
-API_URL = "http://localhost:5000/api"
+if __package__ in (None, ""):
+    # Run as a file rather than with -m: put the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.attemptPipeline import run_attempts, submit_answers
+from utils.httpClient import BASE_URL, get_session
+
+session = get_session()
+
+API_URL = BASE_URL
 
 
 # List of course ID's to create mock quizzes for
@@ -16,6 +26,10 @@ USERS = [
 
 QUIZZES_PER_COURSE = 5;
 
+# Attempt submission: "serial", "pipelined" or "batch" (see attemptPipeline.py)
+ATTEMPT_MODE = "pipelined"
+ATTEMPT_WORKERS = 16
+
 question_bank = [
     # Multiple-Choice
     {
@@ -97,15 +111,17 @@ def create_new_quiz(course_id, index):
         "questions" : questions
     }
 
-    response = requests.post(f"{API_URL}/quizzes", json=quiz)
+    response = session.post(f"{API_URL}/quizzes", json=quiz)
     print(f"✅ Quiz {index} created")
 
     q_id = response.json()["_id"]
     quiz_ids.append(q_id)
     quizzes[q_id] = quiz
 
-def create_attempt(user_id, quiz_id):
+def build_attempt(quiz_id):
+    """Pick the answers one student gives (may stop early, 20% wrong)."""
     quiz = quizzes[quiz_id]
+    answers = []
 
     for i in range(len(quiz["questions"])):
         if random.random() < .05:
@@ -114,14 +130,12 @@ def create_attempt(user_id, quiz_id):
         ans = quiz["questions"][i]["correctAnswer"]
         if random.random() < 0.2:
             ans = "Wrong answer ._."
-            
-        response = requests.post(f"{API_URL}/quizzes/no-auth-submit-answer", json={
-            "quizId": quiz_id,
-            "userId": user_id,
-            "questionIndex": i,
-            "answer": ans
-        })
-    
+        answers.append(ans)
+
+    return answers
+
+def create_attempt(user_id, quiz_id):
+    submit_answers(quiz_id, user_id, build_attempt(quiz_id))
     print(f"✅ Quiz attempt created")
 
 if __name__ == "__main__":
@@ -130,6 +144,6 @@ if __name__ == "__main__":
         for i in range(QUIZZES_PER_COURSE):
             create_new_quiz(c_id, i+1)
     
-    for u_id in USERS:
-        for q_id in quiz_ids:
-            create_attempt(u_id, q_id)
\ No newline at end of file
+    attempts = [(q_id, u_id, build_attempt(q_id)) for u_id in USERS for q_id in quiz_ids]
+    completed, accepted = run_attempts(attempts, mode=ATTEMPT_MODE, workers=ATTEMPT_WORKERS)
+    print(f"✅ {completed}/{len(attempts)} quiz attempts created ({accepted} answers)")
@@ -0,0 +1,239 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+try:
+    import bcrypt
+except ImportError:  # only needed when the dataset has users
+    bcrypt = None
+
+from bson import ObjectId
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError
+
+if __package__ in (None, ""):
+    # Run as a file rather than with -m: put the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.syntheticData import COLLECTIONS, read_docs
+
+# Same database the backend uses when MONGO_URI has no db name (mongoose's default)
+DEFAULT_MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017/test")
+BATCH_SIZE = 10_000
+BCRYPT_ROUNDS = 10  # matches bcrypt.hash(password, 10) in models/User.js
+
+# ObjectId-valued fields per collection (refs and ref arrays)
+ID_FIELDS = {
+    "users": [],
+    "courses": ["owner"],
+    "lessons": ["courseId"],
+    "quizzes": ["lessonId"],
+    "enrollments": ["student", "course", "completedLessons"],
+    "quizattempts": ["quizId", "userId", "lessonId"],
+}
+# Collections created with { timestamps: true }
+TIMESTAMPED = {"users", "courses", "lessons", "quizzes", "enrollments"}
+
+
+def js_round_2(value):
+    """Math.round(value * 100) / 100, rounding halves up like JS does."""
+    return math.floor(value * 100 + 0.5) / 100
+
+
+def parse_date(text):
+    if not text:
+        return datetime.now(timezone.utc)
+    return datetime.fromisoformat(text.replace("Z", "+00:00"))
+
+
+def to_object_id(value):
+    if isinstance(value, list):
+        return [ObjectId(v) for v in value]
+    return ObjectId(value) if value else value
+
+
+class PasswordHasher:
+    """bcrypt is slow on purpose, so each distinct password is hashed only once."""
+
+    def __init__(self, rounds=BCRYPT_ROUNDS):
+        self.rounds = rounds
+        self._hashes = {}
+
+    def __call__(self, password):
+        if password.startswith("$2"):
+            return password  # already hashed
+        if password not in self._hashes:
+            if bcrypt is None:
+                raise RuntimeError("bcrypt is not installed (pip install bcrypt); it is needed to hash user passwords")
+            salt = bcrypt.gensalt(self.rounds)
+            self._hashes[password] = bcrypt.hashpw(password.encode(), salt).decode()
+        return self._hashes[password]
+
+
+class BulkLoader:
+    """
+    Writes a generated dataset straight into the backend's collections with
+    ordered insert_many batches, filling in what mongoose would have added:
+    `__v`, timestamps, subdocument `_id`s, and the values computed by the
+    model hooks (User password hash, Quiz.maxScore, QuizAttempt
+    completed/currentScore, Enrollment.studentProgress, Course.progress).
+    """
+
+    def __init__(self, db, batch_size=BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+        self.hash_password = PasswordHasher()
+        self.counts = {name: 0 for name in COLLECTIONS}
+        # Lookups the hooks need; all sized by the catalog, not by students
+        self._lessons_per_course = {}
+        self._question_values = {}
+        self._progress = {}
+
+    # ------------------------------------------
+    # SCHEMA / HOOKS
+    # ------------------------------------------
+
+    def _base(self, collection, doc):
+        for field in ["_id"] + ID_FIELDS[collection]:
+            if field in doc:
+                doc[field] = to_object_id(doc[field])
+        if collection in TIMESTAMPED:
+            created = parse_date(doc.get("createdAt"))
+            doc["createdAt"] = created
+            doc["updatedAt"] = created
+        doc["__v"] = 0
+        return doc
+
+    def prepare(self, collection, doc):
+        doc = self._base(collection, doc)
+
+        if collection == "users":
+            doc["password"] = self.hash_password(doc["password"])
+            doc.setdefault("role", "student")
+
+        elif collection == "courses":
+            doc["progress"] = 0
+
+        elif collection == "lessons":
+            self._lessons_per_course[doc["courseId"]] = self._lessons_per_course.get(doc["courseId"], 0) + 1
+            for content in doc.get("contents") or []:
+                content["_id"] = ObjectId()
+                if content.get("quizId"):
+                    content["quizId"] = ObjectId(content["quizId"])
+
+        elif collection == "quizzes":
+            for question in doc.get("questions") or []:
+                question["_id"] = ObjectId()
+                question.setdefault("value", 1)
+            doc["maxScore"] = sum(q["value"] for q in doc.get("questions") or [])
+            self._question_values[doc["_id"]] = [q["value"] for q in doc.get("questions") or []]
+
+        elif collection == "enrollments":
+            total = self._lessons_per_course.get(doc["course"], 0)
+            progress = min(len(doc["completedLessons"]) / total * 100, 100) if total else 0
+            doc["studentProgress"] = progress
+            stats = self._progress.setdefault(doc["course"], [0.0, 0])
+            stats[0] += progress
+            stats[1] += 1
+
+        elif collection == "quizattempts":
+            values = self._question_values.get(doc["quizId"], [])
+            answers = doc.get("answers") or []
+            for i, answer in enumerate(answers):
+                answer["_id"] = ObjectId()
+                # Answers past the quiz's questions, or to a quiz not in the dataset, score nothing
+                answer["score"] = values[i] if i < len(values) and answer.get("correct") else 0
+            doc["questionsAnswered"] = doc.get("questionsAnswered", len(answers))
+            # QuizAttempt's pre("save") hook: any answer marks it completed
+            doc["completed"] = bool(answers) or bool(doc.get("completed"))
+            doc["currentScore"] = sum(a["score"] for a in answers)
+
+        return doc
+
+    # ------------------------------------------
+    # LOADING
+    # ------------------------------------------
+
+    def insert(self, collection, docs):
+        target = self.db[collection]
+        batch = []
+        for doc in docs:
+            batch.append(self.prepare(collection, doc))
+            if len(batch) >= self.batch_size:
+                target.insert_many(batch, ordered=True)
+                self.counts[collection] += len(batch)
+                batch = []
+        if batch:
+            target.insert_many(batch, ordered=True)
+            self.counts[collection] += len(batch)
+
+    def update_course_progress(self):
+        """Course.progress = rounded average studentProgress, as Enrollment's post("save") hook does."""
+        ops = [UpdateOne({"_id": course_id}, {"$set": {"progress": js_round_2(total / count)}})
+               for course_id, (total, count) in self._progress.items()]
+        for start in range(0, len(ops), self.batch_size):
+            self.db["courses"].bulk_write(ops[start:start + self.batch_size], ordered=False)
+        return len(ops)
+
+    def load_dir(self, data_dir, drop=False):
+        with open(os.path.join(data_dir, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        if drop:
+            for collection in COLLECTIONS:
+                self.db[collection].delete_many({})
+
+        for collection in COLLECTIONS:
+            name = manifest.get("files", {}).get(collection)
+            if not name:
+                continue
+            started = time.perf_counter()
+            self.insert(collection, read_docs(os.path.join(data_dir, name)))
+            print(f"   ↳ {collection:<13} {self.counts[collection]:>12,} docs in {time.perf_counter() - started:.1f}s")
+
+        updated = self.update_course_progress()
+        print(f"   ↳ progress updated on {updated:,} courses")
+        return self.counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-load a utils.syntheticData dataset straight into MongoDB.")
+    parser.add_argument("data_dir", nargs="?", default="synthetic_data", help="dataset directory (default: %(default)s)")
+    parser.add_argument("--mongo-uri", default=DEFAULT_MONGO_URI, help="default: $MONGO_URI or %(default)s")
+    parser.add_argument("--db", help="database name (default: the one in the URI)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--drop", action="store_true",
+                        help="empty users, courses, lessons, quizzes, enrollments and quizattempts first")
+    args = parser.parse_args(argv)
+
+    client = MongoClient(args.mongo_uri)
+    db = client[args.db] if args.db else client.get_default_database("test")
+    loader = BulkLoader(db, batch_size=args.batch_size)
+
+    print(f"📦 Loading {args.data_dir}/ into {db.name}{' (dropping existing data)' if args.drop else ''}")
+    started = time.perf_counter()
+    try:
+        loader.load_dir(args.data_dir, drop=args.drop)
+    except BulkWriteError as e:
+        first = (e.details.get("writeErrors") or [{}])[0]
+        print(f"❌ Bulk insert stopped: {first.get('errmsg', e)}")
+        print("   ↳ Use --drop or a new --email-prefix/--seed if the dataset was loaded before.")
+        return 1
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        client.close()
+
+    total = sum(loader.counts.values())
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ {total:,} documents in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} docs/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
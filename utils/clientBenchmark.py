@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+if __package__ in (None, ""):
+    # Run as a file rather than with -m: put the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.httpClient import create_session
+
+ANSWER_PAYLOAD = {
+    "quizId": "68fa7e2c8612fb2797cde20e",
+    "userId": "691ced2d11c9f360f5783b10",
+    "questionIndex": 0,
+    "answer": "float",
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers every POST like no-auth-submit-answer does, with keep-alive."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body are separate writes; avoid delayed-ACK stalls
+    body = json.dumps({"correct": True, "answer": "float"}).encode()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_benchmark(post, url, total, workers):
+    """Send `total` POSTs with `workers` threads; returns requests/sec."""
+    def task(_):
+        res = post(url, json=ANSWER_PAYLOAD)
+        res.raise_for_status()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(task, range(total)))
+    return total / (time.perf_counter() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Module-level requests vs shared pooled Session.")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per run")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent client threads")
+    args = parser.parse_args(argv)
+
+    server = start_stub_server()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/quizzes/no-auth-submit-answer"
+    print(f"🧪 Stub server on {url}")
+    print(f"   ↳ {args.requests} small POSTs per run, {args.workers} threads\n")
+
+    try:
+        before = run_benchmark(requests.post, url, args.requests, args.workers)
+        print(f"   Before (requests.post, new connection each): {before:>9.1f} req/s")
+
+        session = create_session(pool_maxsize=args.workers)
+        run_benchmark(session.post, url, min(100, args.requests), args.workers)  # warm the pool
+        after = run_benchmark(session.post, url, args.requests, args.workers)
+        session.close()
+        print(f"   After  (shared Session, keep-alive pool):    {after:>9.1f} req/s")
+
+        print(f"\n📈 Speed-up: {after / before:.2f}x")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,16 @@
 import requests
+import os
+import sys
 
-API_URL = "http://localhost:5000/api/courses"
+if __package__ in (None, ""):
+    # Run as a file rather than with -m: put the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.httpClient import BASE_URL, get_session
+
+session = get_session()
+
+API_URL = f"{BASE_URL}/courses"
 
 def create_course(title, description, category, access_list=None):
     if access_list is None:
@@ -14,7 +24,7 @@ def create_course(title, description, category, access_list=None):
     }
 
     try:
-        response = requests.post(API_URL, json=payload)
+        response = session.post(API_URL, json=payload)
         response.raise_for_status()
         print("✅ Course created:", response.json())
     except requests.exceptions.RequestException as e:
@@ -1,10 +1,20 @@
 import requests
+import os
+import sys
 
-API_URL = "http://localhost:5000/api/quizzes"
+if __package__ in (None, ""):
+    # Run as a file rather than with -m: put the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.httpClient import BASE_URL, get_session
+
+session = get_session()
+
+API_URL = f"{BASE_URL}/quizzes"
 
 def create_course(quiz_object):
     try:
-        response = requests.post(API_URL, json=quiz_object)
+        response = session.post(API_URL, json=quiz_object)
         response.raise_for_status()
         print("✅ Quiz created:", response.json())
     except requests.exceptions.RequestException as e:
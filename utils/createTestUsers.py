@@ -1,8 +1,17 @@
 import requests
+import os
 import sys
 
+if __package__ in (None, ""):
+    # Run as a file rather than with -m: put the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.httpClient import BASE_URL, get_session
+
+session = get_session()
+
 def generate_users(amount=10):
-    url = "http://localhost:5000/api/auth/register"
+    url = f"{BASE_URL}/auth/register"
     headers = {
         "Content-Type": "application/json"
     }
@@ -23,7 +32,7 @@ def generate_users(amount=10):
         }
 
         try:
-            response = requests.post(url, json=payload, headers=headers)
+            response = session.post(url, json=payload, headers=headers)
             
             if response.status_code in [200, 201]:
                 print(f"[OK] Usuario creado: {email}")
@@ -1,10 +1,20 @@
 import requests
+import os
+import sys
 
-API_URL = "http://localhost:5000/api/quizzes/"
+if __package__ in (None, ""):
+    # Run as a file rather than with -m: put the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.httpClient import BASE_URL, get_session
+
+session = get_session()
+
+API_URL = f"{BASE_URL}/quizzes/"
 
 def create_course(quiz_id):
     try:
-        response = requests.get(API_URL+quiz_id)
+        response = session.get(API_URL+quiz_id)
         response.raise_for_status()
         print("✅ Quiz returned by the server:", response.json())
     except requests.exceptions.RequestException as e:
@@ -0,0 +1,113 @@
+import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.runLedger import RUN_ENV, current_ledger
+
+# ==========================================
+# CONFIGURATION
+# ==========================================
+HOST = "http://localhost:5000"
+BASE_URL = f"{HOST}/api"
+
+# Connections kept alive per host. Requests beyond this wait for a free
+# connection instead of opening extra sockets (pool_block=True).
+POOL_MAXSIZE = 32
+# Distinct hosts kept in the pool manager (API + CDN/uploads is plenty).
+POOL_CONNECTIONS = 4
+
+RETRIES = 3
+BACKOFF_FACTOR = 0.3
+RETRY_STATUSES = (502, 503, 504)
+
+# Set to a trace file name to record every session's traffic (see utils/loadtest/replay.py)
+RECORD_ENV = "LOADTEST_RECORD"
+# Set to a file name to sample the server from /proc while the process runs (see utils/loadtest/sampler.py)
+SAMPLE_ENV = "LOADTEST_SAMPLE"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def create_session(pool_maxsize=POOL_MAXSIZE, pool_connections=POOL_CONNECTIONS,
+                   retries=RETRIES, backoff_factor=BACKOFF_FACTOR, pool_block=True,
+                   persist_cookies=False):
+    """
+    Build a requests.Session with keep-alive pooling and retries.
+
+    Connection errors are retried for every method (nothing reached the
+    server). Read errors and 502/503/504 are only retried for idempotent
+    methods, so POSTs like no-auth-submit-answer are never sent twice.
+
+    Cookies are not kept by default, so one script's login never leaks
+    into another call made through the shared session; pass
+    persist_cookies=True for a per-user session that should keep `token`.
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+        pool_block=pool_block,
+    )
+
+    session = requests.Session()
+    if not persist_cookies:
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if os.environ.get(RECORD_ENV):
+        from utils.loadtest.replay import global_recorder  # imported here: replay imports this module
+        global_recorder().attach(session)
+    if os.environ.get(RUN_ENV):
+        current_ledger().attach(session)
+    if os.environ.get(SAMPLE_ENV):
+        from utils.loadtest.sampler import global_sampler
+        global_sampler()
+    return session
+
+
+def get_session():
+    """The process-wide shared Session every utils script uses."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def close_session():
+    """Close the shared Session (its pooled connections)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def api_url(path):
+    """Join a path onto BASE_URL, e.g. api_url("/quizzes") -> ".../api/quizzes"."""
+    return f"{BASE_URL}{path}"
+
+
+def auth_headers(token):
+    """
+    Headers for an authenticated call. The backend reads the `token`
+    cookie; the Bearer header is kept for the scripts that already send it.
+    """
+    if not token:
+        return {}
+    return {"Authorization": f"Bearer {token}", "Cookie": f"token={token}"}
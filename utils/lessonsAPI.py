@@ -1,6 +1,16 @@
 import requests
+import os
+import sys
 
-API_URL = "http://localhost:5000/api/lessons"
+if __package__ in (None, ""):
+    # Run as a file rather than with -m: put the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.httpClient import BASE_URL, get_session
+
+session = get_session()
+
+API_URL = f"{BASE_URL}/lessons"
 
 def create_lesson(course_id, title, description="", content=None):
     if content is None:
@@ -14,7 +24,7 @@ def create_lesson(course_id, title, description="", content=None):
     }
 
     try:
-        res = requests.post(API_URL, json=payload)
+        res = session.post(API_URL, json=payload)
         res.raise_for_status()
         print("✅ Lesson created:", res.json())
         return res.json()
@@ -23,7 +33,7 @@ def create_lesson(course_id, title, description="", content=None):
         
 def get_lessons(course_id):
     try:
-        res = requests.get(f"{API_URL}/{course_id}")
+        res = session.get(f"{API_URL}/{course_id}")
         res.raise_for_status()
         print("✅ Lessons fetched:", res.json())
         return res.json()
@@ -32,7 +42,7 @@ def get_lessons(course_id):
         
 def delete_lesson(lesson_id):
     try:
-        res = requests.delete(f"{API_URL}/{lesson_id}")
+        res = session.delete(f"{API_URL}/{lesson_id}")
         res.raise_for_status()
         print("✅ Lesson deleted:", res.json())
         return res.json()
@@ -47,15 +57,64 @@ def update_lesson(lesson_id, title=None, description=None, content=None):
     if content: payload["content"] = content
 
     try:
-        res = requests.put(f"{API_URL}/{lesson_id}", json=payload)
+        res = session.put(f"{API_URL}/{lesson_id}", json=payload)
         res.raise_for_status()
         print("✅ Lesson updated:", res.json())
         return res.json()
     except requests.exceptions.RequestException as e:
         print("❌ Error updating lesson:", e)
         
+def get_content(content_id):
+    """GET /api/lessons/content/:contentId -> the content plus lessonTitle/lessonId/courseId."""
+    try:
+        res = session.get(f"{API_URL}/content/{content_id}")
+        res.raise_for_status()
+        return res.json()
+    except requests.exceptions.RequestException as e:
+        print("❌ Error fetching content:", e)
+
+def download_content(url, dest=None, start=0, chunk_size=64 * 1024):
+    """
+    Stream a content url (e.g. a PDF under /uploads) in chunks, to `dest` or
+    nowhere. A `start` > 0 resumes with a Range request; a server that
+    answers 200 instead of 206 sends the whole file, which then replaces
+    `dest` from the top. Returns bytes read.
+    """
+    headers = {"Range": f"bytes={start}-"} if start else {}
+    received = 0
+    if dest and start and (not os.path.exists(dest) or os.path.getsize(dest) < start):
+        print(f"❌ Error downloading content: {dest} has fewer than the {start} bytes to resume after")
+        return received
+    try:
+        with session.get(url, headers=headers, stream=True) as res:
+            res.raise_for_status()
+            if start and res.status_code != 206:
+                print(f"⚠️ Range ignored (HTTP {res.status_code}); downloading {url} from the start")
+                start = 0
+            elif start:
+                content_range = res.headers.get("Content-Range", "")
+                if not content_range.startswith(f"bytes {start}-"):
+                    print(f"❌ Error downloading content: asked for bytes {start}- but got "
+                          f"Content-Range '{content_range}'")
+                    return received
+            out = open(dest, "ab" if start else "wb") if dest else None
+            try:
+                if out and start and out.tell() > start:
+                    # Drop anything past the resume point, e.g. half a chunk from the failed attempt
+                    out.truncate(start)
+                for chunk in res.iter_content(chunk_size):
+                    received += len(chunk)
+                    if out:
+                        out.write(chunk)
+            finally:
+                if out:
+                    out.close()
+    except requests.exceptions.RequestException as e:
+        print("❌ Error downloading content:", e)
+    return received
+
 def toggle_lesson_completed(lesson_id, completed):
-    response = requests.put(f"{API_URL}/lessons/{lesson_id}/completed", json={"completed": completed})
+    response = session.put(f"{API_URL}/lessons/{lesson_id}/completed", json={"completed": completed})
     return response.json()
         
 if __name__ == "__main__":
@@ -0,0 +1,16 @@
+"""
+Python load engine for the scenarios in QA_Performance_Test_Scenarios.md.
+
+Run it from the repository root:
+
+    python -m utils.loadtest --vusers 10 --duration 120
+
+Scenario 1 gives every VUser its own row of parametros/student_credentials.dat,
+so larger runs need more rows there or --student-mode round-robin.
+"""
+from .engine import LoadTestConfig, TransactionFailed, allocate_vusers, run
+from .scenarios import SCENARIOS, Scenario
+from .scheduler import ArrivalProfile, ArrivalScheduler, arrival_times, parse_profile, run_open
+from .histogram import Histogram
+from .instrument import report, timed, transaction
+from .stats import StatsCollector, print_report, write_csv, write_json
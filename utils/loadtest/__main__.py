@@ -0,0 +1,206 @@
+import argparse
+import os
+import sys
+
+from utils.runLedger import RUN_ENV, new_run_id
+
+from .dashboard import DEFAULT_INTERVAL as DASHBOARD_INTERVAL, Dashboard
+from .engine import DEFAULT_HOST, DEFAULT_MIX, LoadTestConfig, check_pools, run, vuser_plan
+from .params import MODES, ParameterPool, PoolExhausted, default_pools
+from .scenarios import SCENARIOS
+from .sampler import DEFAULT_INTERVAL, ResourceSampler, parse_targets, print_timeline
+from .scheduler import parse_profile, print_schedule, run_open
+from .stats import StatsCollector, print_report, write_csv, write_json
+
+
+def parse_mix(text):
+    """Parse "1=50,2=20,3a=10,3b=20" into {"1": 50, ...}."""
+    mix = {}
+    for part in text.split(","):
+        key, _, weight = part.partition("=")
+        mix[key.strip()] = float(weight)
+    return mix
+
+
+def parse_account(text):
+    email, _, password = text.partition(":")
+    return email, password
+
+
+def build_parser(prog="python -m utils.loadtest"):
+    parser = argparse.ArgumentParser(prog=prog,
+                                     description="Run the QA performance scenarios against the API.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="backend base URL (default: %(default)s)")
+    parser.add_argument("--vusers", type=int, default=10,
+                        help="total virtual users (open model: most VUsers in flight)")
+    parser.add_argument("--duration", type=float, default=60, help="test duration in seconds (0 = until iterations are done)")
+    parser.add_argument("--iterations", type=int, help="iterations per VUser")
+    parser.add_argument("--ramp-up", type=float, default=0, help="seconds to start all VUsers")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="scenario VUser percentages, e.g. 1=50,2=20,3a=10,3b=20")
+    parser.add_argument("--pacing-interval", type=float, metavar="SECONDS",
+                        help="closed model: start each VUser's iterations every SECONDS")
+    parser.add_argument("--arrivals", metavar="PROFILE",
+                        help="open model: constant:RATE, ramp:START:END or step:RATExSECONDS,... (arrivals/s)")
+    parser.add_argument("--poisson", action="store_true", help="open model: Poisson arrivals instead of evenly spaced")
+    parser.add_argument("--think-scale", type=float, default=1.0, help="multiplier for think times (0 disables them)")
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    parser.add_argument("--admin", action="append", type=parse_account, metavar="EMAIL:PASSWORD",
+                        help="admin account (repeatable)")
+    parser.add_argument("--admin-pool", metavar="FILE", help="adminEmail,adminPassword CSV (default: parametros/admin_credentials.dat)")
+    parser.add_argument("--student-pool", metavar="FILE", help="studentEmail,studentPassword CSV (default: parametros/student_credentials.dat)")
+    parser.add_argument("--student-mode", choices=MODES, default="unique", help="allocation of student rows (default: %(default)s)")
+    parser.add_argument("--reader-mode", choices=MODES, default="round-robin",
+                        help="allocation of student rows for the download scenario (default: %(default)s)")
+    parser.add_argument("--pdf-dir", metavar="DIR", help="directory holding the pdf_files.dat files")
+    parser.add_argument("--seed", type=int, help="random seed for reproducible think times")
+    parser.add_argument("--run-id", help="tag what the run creates for python -m utils.teardown "
+                                          "(default: a new id; 'none' to not tag)")
+    parser.add_argument("--sample", metavar="FILE",
+                        help="sample the local Node server, mongod and host from /proc and write a timeline "
+                             "lined up with the transactions (see utils/loadtest/sampler.py)")
+    parser.add_argument("--sample-interval", type=float, default=DEFAULT_INTERVAL, metavar="SECONDS")
+    parser.add_argument("--sample-process", action="append", metavar="NAME=PID|REGEX",
+                        help="process to sample instead of node (server.js) and mongod; repeatable")
+    parser.add_argument("--live", nargs="?", type=float, const=DASHBOARD_INTERVAL, metavar="SECONDS",
+                        help="live dashboard of rates, rolling percentiles, VUsers and bytes, "
+                             f"redrawn every SECONDS (default: {DASHBOARD_INTERVAL:g})")
+    parser.add_argument("--json", metavar="FILE", help="write the transaction summary as JSON")
+    parser.add_argument("--csv", metavar="FILE", help="write the transaction summary as CSV")
+    return parser
+
+
+def build_config(args):
+    """LoadTestConfig for parsed arguments; ValueError for an invalid combination."""
+    arrivals = None
+    if args.arrivals:
+        arrivals = parse_profile(args.arrivals, args.duration)
+    elif args.poisson:
+        raise ValueError("--poisson needs --arrivals")
+
+    pools = default_pools(args.seed)
+    if args.admin_pool:
+        pools["admin"] = ParameterPool(args.admin_pool, mode="round-robin")
+    pools["student"] = ParameterPool(args.student_pool or pools["student"].file, mode=args.student_mode,
+                                     update="once", seed=args.seed)
+    pools["reader"] = ParameterPool(args.student_pool or pools["reader"].file, mode=args.reader_mode,
+                                    update="once", seed=args.seed)
+
+    config = LoadTestConfig(
+        host=args.host,
+        vusers=args.vusers,
+        duration=args.duration,
+        iterations=args.iterations,
+        ramp_up=args.ramp_up,
+        mix=args.mix,
+        think_scale=args.think_scale,
+        timeout=args.timeout,
+        pools=pools,
+        admins=args.admin,
+        pdf_dir=args.pdf_dir,
+        seed=args.seed,
+        pacing_interval=args.pacing_interval,
+        arrivals=arrivals,
+        poisson=args.poisson,
+    )
+    if not arrivals:
+        try:
+            check_pools(config, SCENARIOS, vuser_plan(config))
+        except PoolExhausted as e:
+            raise ValueError(str(e)) from None
+    return config
+
+
+def iteration_rows(scenarios, keys):
+    """Iteration counts per scenario, JSON-safe so worker processes can send them."""
+    return [{
+        "key": key,
+        "title": scenarios[key].title,
+        "passed": scenarios[key].iterations_passed,
+        "failed": scenarios[key].iterations_failed,
+        "last_error": scenarios[key].last_error,
+    } for key in keys]
+
+
+def print_iterations(rows):
+    print("\n🔁 Iterations:")
+    for row in rows:
+        print(f"   {row['key']:<3} {row['title']:<28} ✅ {row['passed']:<6} ❌ {row['failed']}")
+        if row["last_error"]:
+            print(f"       ↳ last error: {row['last_error']}")
+
+
+def save_summary(args, rows, wall_time):
+    if args.json:
+        write_json(args.json, rows, wall_time)
+        print(f"\n💾 Summary saved to: {args.json}")
+    if args.csv:
+        write_csv(args.csv, rows)
+        print(f"\n💾 Summary saved to: {args.csv}")
+
+
+def tag_run(run_id):
+    """
+    Log every object this process creates under `run_id` (a new one when
+    None) in runs/; returns the id, or None for "none".
+    """
+    if run_id == "none":
+        return None
+    run_id = run_id or new_run_id()
+    os.environ[RUN_ENV] = run_id
+    return run_id
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        config = build_config(args)
+    except ValueError as e:
+        parser.error(str(e))
+    run_id = tag_run(args.run_id)
+
+    stats, sampler, dashboard = None, None, None
+    if args.sample or args.live:
+        stats = StatsCollector(timeline=bool(args.sample))
+    if args.sample:
+        pids, patterns = parse_targets(args.sample_process)
+        sampler = ResourceSampler(pids, args.sample_interval, collector=stats,
+                                  patterns=patterns if args.sample_process else None).start()
+        print(f"🔎 Sampling {', '.join(f'{n} ({p.pid})' for n, p in sampler.probes.items()) or 'the host only'}")
+
+    if args.live:
+        dashboard = Dashboard(stats, interval=args.live, title=f"Load test against {config.host}").start()
+
+    scheduler = None
+    try:
+        if config.arrivals:
+            stats, scheduler = run_open(config, SCENARIOS, stats=stats)
+        else:
+            stats = run(config, SCENARIOS, stats=stats)
+    except (ValueError, PoolExhausted) as e:
+        print(f"❌ {e}")
+        return 2
+    finally:
+        if dashboard:
+            dashboard.stop()
+        if sampler:
+            sampler.stop().write(args.sample)
+
+    rows = stats.report()
+    print_report(rows, stats.wall_time)
+    if scheduler:
+        print_schedule(scheduler.summary())
+
+    print_iterations(iteration_rows(SCENARIOS, config.mix))
+    save_summary(args, rows, stats.wall_time)
+    if sampler:
+        print_timeline([args.sample], spikes_only=True)
+        print(f"💾 Timeline saved to: {args.sample} (python -m utils.loadtest.sampler report {args.sample})")
+    if run_id:
+        print(f"\n🏷️  Run {run_id}; remove what it created with: python -m utils.teardown {run_id}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
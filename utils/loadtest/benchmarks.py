@@ -0,0 +1,671 @@
+"""
+Benchmark suite: named workloads against the hot endpoints, with results
+stored per git commit and regressions gated for CI.
+
+Every workload sends a fixed number of requests from a fixed number of
+workers, `--repeat` times. A round's p95 and throughput are one sample
+each, and a run is compared with its baseline on those samples with a
+one-sided Mann-Whitney U test: a workload regresses when its p95 rises
+(or its throughput falls) by more than --threshold percent *and* the
+test says the shift is not noise (p < --alpha). Any regression makes the
+command exit with 1.
+
+Results go to bench_results/<commit>.json (<commit>-dirty.json for a tree
+with local changes). The default baseline is the newest clean result of
+an ancestor commit, so running the suite on main's merges and on a branch
+compares the branch with where it forked.
+
+    python -m utils.loadtest.benchmarks run
+    python -m utils.loadtest.benchmarks run -w login_burst,my_students_100 --repeat 3
+    python -m utils.loadtest.benchmarks compare main HEAD
+    python -m utils.loadtest.benchmarks list
+"""
+import argparse
+import json
+import math
+import os
+import secrets
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+
+import requests
+
+from utils.httpClient import auth_headers, create_session
+from utils.tokenPool import TokenPool
+
+from .__main__ import tag_run
+from .engine import DEFAULT_HOST, rebase_url
+from .stats import percentile
+from .upload import TIERS, generate_pdf, upload_file
+
+RESULTS_DIR = "bench_results"
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 10.0  # percent
+DEFAULT_ALPHA = 0.05
+EXACT_LIMIT = 20  # Mann-Whitney: exact distribution up to this many samples per side (and no ties)
+
+BENCH_PASSWORD = "benchmark123"
+LOGIN_ACCOUNTS = 20
+SUBMIT_QUESTIONS = 20
+DOWNLOAD_CHUNK = 64 * 1024
+# An operation raising one of these counts as a failed request
+REQUEST_ERRORS = (requests.exceptions.RequestException, ValueError, KeyError)
+
+
+# ==========================================
+# FIXTURES
+# ==========================================
+
+class Bench:
+    """
+    What the workloads share: the host, one pooled session, benchmark
+    accounts (bench_student_N@bench.test, registered on first use and
+    cached in the token pool) and the cleanups to run at the end.
+    """
+
+    def __init__(self, host, max_workers):
+        self.host = host.rstrip("/")
+        self.session = create_session(pool_maxsize=max_workers, retries=0)
+        self.tokens = TokenPool(base_url=f"{self.host}/api")
+        self.tokens.watch(self.session)
+        self.cleanups = []
+        self._students = []
+        self._tmp = None
+
+    def url(self, path):
+        return f"{self.host}{path}"
+
+    def students(self, count):
+        """The first `count` benchmark students as token entries."""
+        known = {s["email"] for s in self._students}
+        accounts = [(f"bench_student_{i}@bench.test", BENCH_PASSWORD, f"Bench Student {i}") for i in range(1, count + 1)]
+        accounts = [account for account in accounts if account[0] not in known]
+        if accounts:
+            entries = self.tokens.login_many(accounts)
+            missing = [email for email, _, _ in accounts if not entries.get(email)]
+            if missing:
+                raise RuntimeError(f"could not log in or register {len(missing)} benchmark students")
+            self._students += [entries[email] for email, _, _ in accounts]
+            self._students.sort(key=lambda s: int(s["email"].split("_")[2].split("@")[0]))
+        return self._students[:count]
+
+    def account(self, name):
+        entry = self.tokens.get(f"bench_{name}@bench.test", BENCH_PASSWORD, f"Bench {name}")
+        if not entry:
+            raise RuntimeError(f"could not log in or register bench_{name}@bench.test")
+        return entry
+
+    def course(self, owner_name, student_count):
+        """
+        A new course of bench_<owner_name> with the first `student_count`
+        students enrolled; deleted again at cleanup. Returns (owner, course).
+        Cached tokens of accounts a database reset removed are dropped and
+        the accounts registered again (the owner, then the students).
+        """
+        for attempt in range(3):
+            retry = attempt < 2
+            owner = self.account(owner_name)
+            students = self.students(student_count)
+            res = self.session.post(self.url("/api/courses"), headers=auth_headers(owner["token"]), json={
+                "title": f"Benchmark course ({student_count} students)", "description": "utils.loadtest.benchmarks",
+                "category": "Secundaria", "accessList": [s["email"] for s in students],
+            })
+            if res.status_code == 401 and retry:
+                self.tokens.invalidate(owner["email"])
+                continue
+            if res.status_code != 201:
+                raise RuntimeError(f"POST /api/courses answered {res.status_code}")
+            course = res.json()
+            delete = partial(self.session.delete, self.url(f"/api/courses/{course['id']}"),
+                             headers=auth_headers(owner["token"]))
+            missing = {s["email"] for s in students} - set(course.get("students", []))
+            if missing and retry:
+                delete()
+                for email in missing:
+                    self.tokens.invalidate(email)
+                self._students = [s for s in self._students if s["email"] not in missing]
+                continue
+            self.cleanups.append(delete)
+            return owner, course
+
+    def tmpdir(self):
+        if self._tmp is None:
+            self._tmp = tempfile.TemporaryDirectory(prefix="bench-")
+        return self._tmp.name
+
+    def close(self):
+        for cleanup in reversed(self.cleanups):
+            try:
+                cleanup()
+            except requests.exceptions.RequestException as e:
+                print(f"   ⚠️ Cleanup failed: {e}")
+        self.cleanups.clear()
+        if self._tmp:
+            self._tmp.cleanup()
+        self.session.close()
+
+
+# ==========================================
+# WORKLOADS
+# ==========================================
+
+class Workload:
+    """
+    `setup(bench)` prepares once and returns a state; `op(bench, state,
+    local, k)` sends a worker's k-th request and returns True when it
+    passed. `local` is a dict private to the worker for one round.
+    """
+
+    def __init__(self, name, description, setup, op, requests=200, concurrency=10, warmup=10, default=True):
+        self.name = name
+        self.description = description
+        self.setup = setup
+        self.op = op
+        self.requests = requests
+        self.concurrency = concurrency
+        self.warmup = warmup
+        self.default = default
+
+
+def setup_login(bench):
+    return [(s["email"], BENCH_PASSWORD) for s in bench.students(LOGIN_ACCOUNTS)]
+
+
+def op_login(bench, accounts, local, k):
+    email, password = accounts[(local["worker"] + k * local["workers"]) % len(accounts)]
+    return bench.session.post(bench.url("/api/auth/login"), json={"email": email, "password": password}).status_code == 200
+
+
+def setup_course_listing(bench):
+    bench.course("owner_listing", 1)
+    return bench.students(1)[0]["token"]
+
+
+def op_course_listing(bench, token, local, k):
+    return bench.session.get(bench.url("/api/courses"), headers=auth_headers(token)).status_code == 200
+
+
+def my_students_setup(count):
+    def setup(bench):
+        owner, _ = bench.course(f"owner_{count}", count)
+        rows = bench.session.get(bench.url("/api/enrollments/my-students"), headers=auth_headers(owner["token"])).json()
+        if len(rows) != count:
+            print(f"   ⚠️ bench_owner_{count} sees {len(rows)} students, not {count} (leftover courses?)")
+        return owner["token"]
+    return setup
+
+
+def op_my_students(bench, token, local, k):
+    return bench.session.get(bench.url("/api/enrollments/my-students"), headers=auth_headers(token)).status_code == 200
+
+
+def setup_submit(bench):
+    quiz = {"title": "Benchmark quiz", "description": "utils.loadtest.benchmarks",
+            "questions": [{"title": f"q{i}", "type": "true-false", "correctAnswer": "True", "value": 1}
+                          for i in range(SUBMIT_QUESTIONS)]}
+    res = bench.session.post(bench.url("/api/quizzes"), json=quiz)
+    if res.status_code != 201:
+        raise RuntimeError(f"POST /api/quizzes answered {res.status_code}")
+    quiz_id = res.json()["_id"]
+    # There is no quiz delete route; clearing its attempts is what can be undone
+    bench.cleanups.append(lambda: bench.session.put(bench.url(f"/api/quizzes/{quiz_id}"),
+                                                    json=dict(quiz, deleteAttempts=True)))
+    return quiz_id
+
+
+def op_submit(bench, quiz_id, local, k):
+    # The route takes any userId and wants each attempt's questions in order,
+    # so every worker walks fresh attempts question by question
+    index = k % SUBMIT_QUESTIONS
+    if index == 0:
+        local["user"] = secrets.token_hex(12)
+    return bench.session.post(bench.url("/api/quizzes/no-auth-submit-answer"), json={
+        "quizId": quiz_id, "userId": local["user"], "questionIndex": index, "answer": "True",
+    }).status_code == 200
+
+
+def tier_file(bench, tier):
+    path = os.path.join(bench.tmpdir(), f"{tier}.pdf")
+    if not os.path.exists(path):
+        generate_pdf(path, TIERS[tier])
+    return path
+
+
+def upload_setup(tier):
+    return lambda bench: tier_file(bench, tier)
+
+
+def op_upload(bench, path, local, k):
+    res, _ = upload_file(bench.session, bench.url("/api/upload"), path)
+    return res.status_code == 200
+
+
+def download_setup(tier):
+    def setup(bench):
+        res, _ = upload_file(bench.session, bench.url("/api/upload"), tier_file(bench, tier))
+        if res.status_code != 200:
+            raise RuntimeError(f"POST /api/upload answered {res.status_code}")
+        return rebase_url(res.json()["url"], bench.host), TIERS[tier]
+    return setup
+
+
+def op_download(bench, state, local, k):
+    url, size = state
+    with bench.session.get(url, stream=True) as res:
+        received = sum(len(chunk) for chunk in res.iter_content(DOWNLOAD_CHUNK))
+    return res.status_code == 200 and received == size
+
+
+WORKLOADS = {w.name: w for w in [
+    Workload("login_burst", "POST /api/auth/login, 20 accounts", setup_login, op_login, requests=200, concurrency=20),
+    Workload("course_listing", "GET /api/courses as an enrolled student", setup_course_listing, op_course_listing),
+    Workload("my_students_10", "GET /api/enrollments/my-students, 10 enrolled", my_students_setup(10), op_my_students),
+    Workload("my_students_100", "GET /api/enrollments/my-students, 100 enrolled", my_students_setup(100),
+             op_my_students),
+    Workload("my_students_1000", "GET /api/enrollments/my-students, 1000 enrolled", my_students_setup(1000),
+             op_my_students, requests=100, concurrency=5, warmup=5),
+    Workload("submit_answer", "POST /api/quizzes/no-auth-submit-answer stream", setup_submit, op_submit,
+             requests=400, concurrency=20, warmup=20),
+    Workload("upload_small", "POST /api/upload, 500 KB PDF", upload_setup("small"), op_upload,
+             requests=60, concurrency=6, warmup=3),
+    Workload("upload_medium", "POST /api/upload, 5 MB PDF", upload_setup("medium"), op_upload,
+             requests=20, concurrency=4, warmup=2),
+    Workload("upload_large", "POST /api/upload, 50 MB PDF", upload_setup("large"), op_upload,
+             requests=6, concurrency=2, warmup=1, default=False),
+    Workload("download_small", "GET /uploads/..., 500 KB PDF", download_setup("small"), op_download,
+             requests=100, concurrency=10, warmup=5),
+    Workload("download_medium", "GET /uploads/..., 5 MB PDF", download_setup("medium"), op_download,
+             requests=40, concurrency=8, warmup=4),
+    Workload("download_large", "GET /uploads/..., 50 MB PDF", download_setup("large"), op_download,
+             requests=8, concurrency=4, warmup=2, default=False),
+]}
+
+
+# ==========================================
+# RUNNING
+# ==========================================
+
+def run_round(bench, workload, state, count):
+    """
+    `count` operations split over workload.concurrency workers.
+    Returns {"wall_time", "failed", "latencies"} (passed requests, seconds).
+    """
+    latencies, failed = [], [0]
+    lock = threading.Lock()
+    workers = min(workload.concurrency, count)
+
+    def worker(index):
+        local = {"worker": index, "workers": workers}
+        mine, bad = [], 0
+        for k in range(count // workers + (index < count % workers)):
+            started = time.perf_counter()
+            try:
+                ok = workload.op(bench, state, local, k)
+            except REQUEST_ERRORS:
+                ok = False
+            elapsed = time.perf_counter() - started
+            if ok:
+                mine.append(elapsed)
+            else:
+                bad += 1
+        with lock:
+            latencies.extend(mine)
+            failed[0] += bad
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(worker, range(workers)))
+    return {"wall_time": time.perf_counter() - started, "failed": failed[0],
+            "latencies": [round(v, 6) for v in sorted(latencies)]}
+
+
+def run_workload(bench, workload, repeat, scale=1.0):
+    count = max(1, round(workload.requests * scale))
+    print(f"▶️  {workload.name}: {workload.description} "
+          f"({repeat}×{count} requests, {workload.concurrency} workers)")
+    state = workload.setup(bench)
+    if workload.warmup:
+        run_round(bench, workload, state, workload.warmup)
+    rounds = []
+    for number in range(1, repeat + 1):
+        result = run_round(bench, workload, state, count)
+        rounds.append(result)
+        summary = round_summary(result)
+        print(f"   round {number}: p50 {summary['p50'] * 1000:.1f} ms, p95 {summary['p95'] * 1000:.1f} ms, "
+              f"{summary['throughput']:.1f} req/s" + (f", ❌ {result['failed']} failed" if result["failed"] else ""))
+    return {"description": workload.description, "requests": count,
+            "concurrency": workload.concurrency, "rounds": rounds}
+
+
+def round_summary(result):
+    latencies = result["latencies"]
+    return {
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "throughput": len(latencies) / result["wall_time"] if result["wall_time"] > 0 else 0.0,
+    }
+
+
+def summarize(entry):
+    """Pooled latency percentiles plus the per-round samples the tests use."""
+    rounds = entry["rounds"]
+    pooled = sorted(v for r in rounds for v in r["latencies"])
+    passed = len(pooled)
+    failed = sum(r["failed"] for r in rounds)
+    per_round = [round_summary(r) for r in rounds]
+    return {
+        "p50": percentile(pooled, 50),
+        "p95": percentile(pooled, 95),
+        "p99": percentile(pooled, 99),
+        "throughput": sum(r["throughput"] for r in per_round) / len(per_round) if per_round else 0.0,
+        "error_rate": failed / (passed + failed) if passed + failed else 0.0,
+        "round_p95": [r["p95"] for r in per_round],
+        "round_throughput": [r["throughput"] for r in per_round],
+    }
+
+
+# ==========================================
+# STATISTICS
+# ==========================================
+
+def _u_distribution(n1, n2):
+    """Number of orderings of n1 x's and n2 y's giving each U = 0..n1*n2 (no ties)."""
+    # counts[m][n] is the distribution for m x's and n y's, built up one sample at a time
+    counts = [[None] * (n2 + 1) for _ in range(n1 + 1)]
+    for m in range(n1 + 1):
+        for n in range(n2 + 1):
+            if m == 0 or n == 0:
+                counts[m][n] = [1]
+                continue
+            # The largest value is an x (beats all n y's) or a y (beats none)
+            with_x, with_y = counts[m - 1][n], counts[m][n - 1]
+            dist = [0] * (m * n + 1)
+            for u, c in enumerate(with_x):
+                dist[u + n] += c
+            for u, c in enumerate(with_y):
+                dist[u] += c
+            counts[m][n] = dist
+    return counts[n1][n2]
+
+
+def mann_whitney_greater(x, y):
+    """
+    One-sided Mann-Whitney U test: the p-value of "values in x tend to be
+    larger than in y". Exact for small samples without ties, otherwise
+    the normal approximation with tie and continuity corrections.
+    """
+    n1, n2 = len(x), len(y)
+    if not n1 or not n2:
+        return 1.0
+    combined = sorted([(v, 0) for v in x] + [(v, 1) for v in y])
+    rank_sum, tie_term, i = 0.0, 0, 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        rank = (i + j) / 2 + 1
+        rank_sum += rank * sum(1 for k in range(i, j + 1) if combined[k][1] == 0)
+        tie_term += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+    u = rank_sum - n1 * (n1 + 1) / 2
+
+    if not tie_term and n1 <= EXACT_LIMIT and n2 <= EXACT_LIMIT:
+        dist = _u_distribution(n1, n2)
+        return sum(dist[int(round(u)):]) / math.comb(n1 + n2, n1)
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0  # every value is the same
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare_workload(baseline, candidate, threshold, alpha):
+    """
+    Rows of (metric, baseline value, candidate value, change %, p, verdict)
+    for p95 (worse when higher) and throughput (worse when lower).
+    """
+    base, cand = summarize(baseline), summarize(candidate)
+    rows = []
+    for metric, higher_is_worse in (("p95", True), ("throughput", False)):
+        before, after = base[metric], cand[metric]
+        change = (after - before) / before * 100 if before else 0.0
+        samples_before, samples_after = base[f"round_{metric}"], cand[f"round_{metric}"]
+        worse_p = mann_whitney_greater(samples_after, samples_before) if higher_is_worse \
+            else mann_whitney_greater(samples_before, samples_after)
+        better_p = mann_whitney_greater(samples_before, samples_after) if higher_is_worse \
+            else mann_whitney_greater(samples_after, samples_before)
+        worse = change > threshold if higher_is_worse else change < -threshold
+        better = change < -threshold if higher_is_worse else change > threshold
+        if worse and worse_p < alpha:
+            verdict, p = "regression", worse_p
+        elif better and better_p < alpha:
+            verdict, p = "improvement", better_p
+        elif worse or better:
+            verdict, p = "not significant", min(worse_p, better_p)
+        else:
+            verdict, p = "ok", min(worse_p, better_p)
+        rows.append((metric, before, after, change, p, verdict))
+    return rows
+
+
+def compare_results(baseline, candidate, threshold=DEFAULT_THRESHOLD, alpha=DEFAULT_ALPHA):
+    """Print the comparison of two result files; returns the number of regressions."""
+    print(f"\n⚖️  {label(candidate)} vs baseline {label(baseline)} "
+          f"(threshold {threshold:g}%, α {alpha:g}, one-sided Mann-Whitney U on per-round values)")
+    print(f"{'Workload':<18} {'Metric':<10} {'Baseline':>11} {'Candidate':>11} {'Change':>8} {'p':>7}  Verdict")
+    print("-" * 84)
+    icons = {"regression": "❌", "improvement": "🚀", "not significant": "〰️", "ok": "✅"}
+    regressions = 0
+    for name, entry in candidate["workloads"].items():
+        if name not in baseline["workloads"]:
+            print(f"{name:<18} (no baseline)")
+            continue
+        for metric, before, after, change, p, verdict in compare_workload(baseline["workloads"][name], entry,
+                                                                          threshold, alpha):
+            unit, scale = (" ms", 1000) if metric == "p95" else ("/s", 1)
+            print(f"{name:<18} {metric:<10} {before * scale:>8.1f}{unit:<3} {after * scale:>8.1f}{unit:<3} "
+                  f"{change:>+7.1f}% {p:>7.3f}  {icons[verdict]} {verdict}")
+            regressions += verdict == "regression"
+        errors = summarize(entry)["error_rate"]
+        if errors > summarize(baseline["workloads"][name])["error_rate"]:
+            print(f"{'':<18} ⚠️ error rate {errors * 100:.1f}%")
+    return regressions
+
+
+# ==========================================
+# RESULT STORE
+# ==========================================
+
+def git(*args):
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def current_revision():
+    """(commit, dirty); commit is None outside a git checkout."""
+    commit = git("rev-parse", "HEAD")
+    dirty = bool(git("status", "--porcelain", "--untracked-files=no")) if commit else False
+    return commit, dirty
+
+
+def result_path(commit, dirty, directory=RESULTS_DIR):
+    return os.path.join(directory, f"{commit[:12] if commit else 'nogit'}{'-dirty' if dirty else ''}.json")
+
+
+def label(result):
+    commit = result.get("commit")
+    return f"{commit[:12] if commit else 'nogit'}{'-dirty' if result.get('dirty') else ''}"
+
+
+def load_results(directory=RESULTS_DIR):
+    results = []
+    try:
+        names = sorted(os.listdir(directory))
+    except FileNotFoundError:
+        return results
+    for name in names:
+        if name.endswith(".json"):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                results.append(json.load(f))
+    return sorted(results, key=lambda r: r["created"])
+
+
+def save_result(result, directory=RESULTS_DIR):
+    """Merge into the commit's stored result: re-run workloads are replaced, others kept."""
+    path = result_path(result["commit"], result["dirty"], directory)
+    os.makedirs(directory, exist_ok=True)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            stored = json.load(f)
+        stored["workloads"].update(result["workloads"])
+        result = dict(result, workloads=stored["workloads"])
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+    return path
+
+
+def find_result(ref, directory=RESULTS_DIR):
+    """A stored result by file path, git ref or commit prefix (None when there is none)."""
+    if os.path.isfile(ref):
+        with open(ref, encoding="utf-8") as f:
+            return json.load(f)
+    commit = git("rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}") or ref
+    dirty = commit.endswith("-dirty")
+    commit = commit[:-len("-dirty")] if dirty else commit
+    matches = [r for r in load_results(directory)
+               if r["commit"] and r["commit"].startswith(commit) and r["dirty"] == dirty]
+    return matches[-1] if matches else None
+
+
+def default_baseline(candidate, directory=RESULTS_DIR):
+    """Newest clean result of an ancestor of the candidate commit (the commit itself when it is dirty)."""
+    for result in reversed(load_results(directory)):
+        if result["dirty"] or not result["commit"] or label(result) == label(candidate):
+            continue
+        if git("merge-base", "--is-ancestor", result["commit"], candidate["commit"]) is not None:
+            return result
+    return None
+
+
+def print_results(results):
+    if not results:
+        print(f"No stored results in {RESULTS_DIR}/.")
+        return
+    print(f"{'Result':<20} {'Created':<20} {'Workloads'}")
+    for result in results:
+        print(f"{label(result):<20} {result['created'][:19]:<20} {', '.join(result['workloads'])}")
+
+
+# ==========================================
+# CLI
+# ==========================================
+
+def select_workloads(text):
+    if not text:
+        return [w for w in WORKLOADS.values() if w.default]
+    names = [name.strip() for name in text.split(",") if name.strip()]
+    unknown = [name for name in names if name not in WORKLOADS]
+    if unknown:
+        raise ValueError(f"Unknown workloads: {', '.join(unknown)} (known: {', '.join(WORKLOADS)})")
+    return [WORKLOADS[name] for name in names]
+
+
+def cmd_run(args):
+    try:
+        workloads = select_workloads(args.workloads)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+    commit, dirty = current_revision()
+    run_id = tag_run(None)  # what cleanup cannot delete (the quiz) stays traceable
+    result = {"commit": commit, "dirty": dirty, "subject": git("log", "-1", "--format=%s") if commit else None,
+              "created": datetime.now(timezone.utc).isoformat(), "host": args.host, "workloads": {}}
+    print(f"🏁 Benchmarking {label(result)} against {args.host}: {len(workloads)} workloads, {args.repeat} rounds each")
+
+    bench = Bench(args.host, max(w.concurrency for w in workloads))
+    try:
+        for workload in workloads:
+            try:
+                result["workloads"][workload.name] = run_workload(bench, workload, args.repeat, args.scale)
+            except (RuntimeError, *REQUEST_ERRORS) as e:
+                print(f"   ❌ {workload.name} skipped: {e}")
+    except KeyboardInterrupt:
+        print("\n🛑 Interrupted; nothing saved")
+        return 130
+    finally:
+        bench.close()
+    print(f"   ↳ Run {run_id}; leftovers: python -m utils.teardown {run_id}")
+
+    if not result["workloads"]:
+        return 2
+    if args.save:
+        print(f"💾 Saved to {save_result(result, args.results)}")
+    if args.baseline == "none":
+        return 0
+    baseline = find_result(args.baseline, args.results) if args.baseline else default_baseline(result, args.results)
+    if not baseline:
+        print(f"\nℹ️  No baseline{' for ' + args.baseline if args.baseline else ''} yet; this run is the first one")
+        return 0
+    regressions = compare_results(baseline, result, args.threshold, args.alpha)
+    return 1 if regressions else 0
+
+
+def cmd_compare(args):
+    baseline, candidate = find_result(args.baseline, args.results), find_result(args.candidate, args.results)
+    for ref, found in ((args.baseline, baseline), (args.candidate, candidate)):
+        if not found:
+            print(f"❌ No stored result for {ref}")
+            return 2
+    return 1 if compare_results(baseline, candidate, args.threshold, args.alpha) else 0
+
+
+def cmd_list(args):
+    print("Workloads (* = run by default):")
+    for workload in WORKLOADS.values():
+        print(f"  {'*' if workload.default else ' '} {workload.name:<18} {workload.description}")
+    print()
+    print_results(load_results(args.results))
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utils.loadtest.benchmarks",
+                                     description="Benchmark workloads, stored per commit, gated on regressions.")
+    parser.add_argument("--results", default=RESULTS_DIR, help="results directory (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run workloads, save them and compare with a baseline")
+    run_parser.add_argument("-w", "--workloads", help="comma-separated names (default: all marked * in list)")
+    run_parser.add_argument("--host", default=DEFAULT_HOST, help="backend base URL (default: %(default)s)")
+    run_parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="rounds per workload (default: %(default)s)")
+    run_parser.add_argument("--scale", type=float, default=1.0, help="multiplier for requests per round")
+    run_parser.add_argument("--baseline", help="git ref, commit or result file (default: newest ancestor result; "
+                                               "'none' to skip the comparison)")
+    run_parser.add_argument("--no-save", dest="save", action="store_false", help="do not store this run")
+
+    compare_parser = commands.add_parser("compare", help="compare two stored results")
+    compare_parser.add_argument("baseline", help="git ref, commit or result file")
+    compare_parser.add_argument("candidate", nargs="?", default="HEAD", help="default: %(default)s")
+
+    for sub in (run_parser, compare_parser):
+        sub.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                         help="percent change that counts as a regression (default: %(default)s)")
+        sub.add_argument("--alpha", type=float, default=DEFAULT_ALPHA,
+                         help="significance level of the test (default: %(default)s)")
+    commands.add_parser("list", help="list workloads and stored results")
+
+    args = parser.parse_args(argv)
+    return {"run": cmd_run, "compare": cmd_compare, "list": cmd_list}[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""
+Live terminal dashboard for a running test.
+
+Printing a line per request costs more than the request once a few
+hundred VUsers run: the console serialises every thread. The dashboard
+instead redraws one screen at a fixed rate from what the StatsCollector
+already keeps per thread (histograms, failures, byte and VUser meters),
+so nothing on the hot path prints or takes a lock:
+
+    python -m utils.loadtest --vusers 200 --ramp-up 120 --student-mode round-robin --live
+    python -m utils.HOLY --live
+    python -m utils.loadtest.distributed --processes 4 -- --vusers 800 --student-mode round-robin --live
+
+Per transaction it shows the request rate of the last refresh and
+p50/p95/p99 and failures over a rolling window, plus active VUsers,
+bytes in/out and a history of the total rate and p95: the knee is where
+the rate flattens while p95 climbs. When stdout is not a terminal it
+prints one summary line per refresh instead.
+"""
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, redirect_stdout
+
+from .histogram import Histogram
+
+DEFAULT_INTERVAL = 1.0      # seconds between refreshes
+DEFAULT_WINDOW = 10.0       # seconds covered by the rolling percentiles and failures
+HISTORY = 60                # refreshes kept for the sparklines
+SPARKS = "▁▂▃▄▅▆▇█"
+NAME_WIDTH = 28
+
+
+def format_bytes(count):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(count) < 1024 or unit == "GB":
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+
+
+def sparkline(values):
+    top = max(values, default=0)
+    if top <= 0:
+        return SPARKS[0] * len(values)
+    return "".join(SPARKS[min(int(v / top * len(SPARKS)), len(SPARKS) - 1)] for v in values)
+
+
+class Frame:
+    """What one refresh shows, computed from two cumulative collector readings."""
+
+    def __init__(self, elapsed, rows, total, gauges, sent_rate, received_rate):
+        self.elapsed = elapsed
+        self.rows = rows
+        self.total = total
+        self.gauges = gauges
+        self.sent_rate = sent_rate
+        self.received_rate = received_rate
+
+
+class Dashboard:
+    """
+    Redraw `source` every `interval` seconds on a background thread.
+
+    `source` is a StatsCollector, or a callable returning one (e.g. a
+    distributed Coordinator's merged()). Rates are over the last refresh;
+    percentiles and failures over the last `window` seconds, by
+    subtracting the cumulative histograms read `window` seconds ago.
+    """
+
+    def __init__(self, source, interval=DEFAULT_INTERVAL, window=DEFAULT_WINDOW, stream=None, title="Load test"):
+        self.source = source if callable(source) else (lambda: source)
+        self.interval = interval
+        self.window = max(window, interval)
+        self.stream = stream or sys.stdout
+        self.title = title
+        self.tty = self.stream.isatty()
+        self.stopping = threading.Event()
+        self.started_at = None
+        self.history = deque()  # (time, {name: TransactionStats}, gauges), oldest first
+        self.rates = deque(maxlen=HISTORY)
+        self.p95s = deque(maxlen=HISTORY)
+        self._thread = None
+
+    # ------------------------------------------
+    # Computing
+    # ------------------------------------------
+
+    def read(self):
+        """Take one reading of the source and return the Frame it gives."""
+        now = time.time()
+        collector = self.source()
+        merged = collector.merged()
+        gauges = collector.gauges()
+        previous = self.history[-1] if self.history else (self.started_at or now, {}, None)
+        while len(self.history) > 1 and self.history[1][0] <= now - self.window:
+            self.history.popleft()
+        # Until a reading is `window` old, the window reaches back to the start
+        base = self.history[0] if self.history and self.history[0][0] <= now - self.window else (None, {}, None)
+        self.history.append((now, merged, gauges))
+
+        # Never under one interval: the frame drawn by stop() comes early, and a distributed
+        # run's last snapshots land all at once
+        elapsed = max(now - previous[0], self.interval)
+        rows = []
+        total = Histogram()
+        total_rate = total_failures = total_all_failures = 0
+        for name, stats in merged.items():
+            before = previous[1].get(name)
+            done = stats.passed + stats.failures
+            rate = (done - (before.passed + before.failures if before else 0)) / elapsed
+            rolling = stats.histogram.copy()
+            failures = stats.failures
+            old = base[1].get(name)
+            if old is not None:
+                rolling.subtract(old.histogram)
+                failures -= old.failures
+            pcts = rolling.percentiles((50, 95, 99))
+            rows.append({"transaction": name, "rps": rate, "p50": pcts[50], "p95": pcts[95], "p99": pcts[99],
+                         "window_fail": failures, "pass": stats.passed, "fail": stats.failures})
+            total.merge(rolling)
+            total_rate += rate
+            total_failures += failures
+            total_all_failures += stats.failures
+        pcts = total.percentiles((50, 95, 99))
+        total_row = {"transaction": "ALL", "rps": total_rate, "p50": pcts[50], "p95": pcts[95], "p99": pcts[99],
+                     "window_fail": total_failures, "pass": sum(r["pass"] for r in rows),
+                     "fail": total_all_failures}
+        self.rates.append(total_rate)
+        self.p95s.append(pcts[95])
+
+        last = previous[2] or {"sent": 0, "received": 0}
+        return Frame(now - (self.started_at or now), rows, total_row, gauges,
+                     (gauges["sent"] - last["sent"]) / elapsed,
+                     (gauges["received"] - last["received"]) / elapsed)
+
+    # ------------------------------------------
+    # Drawing
+    # ------------------------------------------
+
+    def render(self, frame):
+        """The screen for `frame` as a list of lines."""
+        gauges = frame.gauges
+        lines = [
+            f"📡 {self.title}  {frame.elapsed:6.0f}s   VUsers {gauges['active']:<5}  "
+            f"↑ {format_bytes(frame.sent_rate)}/s  ↓ {format_bytes(frame.received_rate)}/s  "
+            f"(total ↑ {format_bytes(gauges['sent'])}  ↓ {format_bytes(gauges['received'])})",
+            "=" * 100,
+            f"{'Transaction':<{NAME_WIDTH}} {'RPS':>8} {'p50':>9} {'p95':>9} {'p99':>9} "
+            f"{f'Fail {self.window:g}s':>10} {'Pass':>9} {'Fail':>7}",
+            "-" * 100,
+        ]
+        for row in frame.rows + [frame.total]:
+            if row is frame.total:
+                lines.append("-" * 100)
+            lines.append(f"{row['transaction'][:NAME_WIDTH]:<{NAME_WIDTH}} {row['rps']:>8.1f} "
+                         f"{row['p50'] * 1000:>9.1f} {row['p95'] * 1000:>9.1f} {row['p99'] * 1000:>9.1f} "
+                         f"{row['window_fail']:>10} {row['pass']:>9} {row['fail']:>7}")
+        lines += [
+            "",
+            f"RPS {max(self.rates, default=0):>8.1f} max  {sparkline(self.rates)}",
+            f"p95 {max(self.p95s, default=0) * 1000:>8.1f} ms   {sparkline(self.p95s)}",
+            "",
+            f"Times in ms; percentiles over the last {self.window:g}s. Ctrl+C stops the test.",
+        ]
+        return lines
+
+    def summary_line(self, frame):
+        """The non-terminal form: one line per refresh."""
+        total = frame.total
+        return (f"   ⏱️  {frame.elapsed:6.0f}s  VUsers {frame.gauges['active']}  {total['rps']:,.1f} rps  "
+                f"p50 {total['p50'] * 1000:.1f} p95 {total['p95'] * 1000:.1f} p99 {total['p99'] * 1000:.1f} ms  "
+                f"fail {total['fail']:,}  ↓ {format_bytes(frame.received_rate)}/s")
+
+    def draw(self):
+        frame = self.read()
+        if self.tty:
+            # Home the cursor and overwrite in place; \x1b[K and \x1b[J clear what the last frame left
+            screen = "\x1b[H" + "".join(f"{line}\x1b[K\n" for line in self.render(frame)) + "\x1b[J"
+            self.stream.write(screen)
+        else:
+            self.stream.write(self.summary_line(frame) + "\n")
+        self.stream.flush()
+        return frame
+
+    # ------------------------------------------
+    # Lifecycle
+    # ------------------------------------------
+
+    def _run(self):
+        next_at = time.time()
+        while not self.stopping.is_set():
+            try:
+                self.draw()
+            except (OSError, ValueError):
+                pass  # the stream went away; keep the test running
+            next_at += self.interval
+            self.stopping.wait(max(0.0, next_at - time.time()))
+
+    def start(self):
+        self.started_at = time.time()
+        self.history.clear()
+        if self.tty:
+            self.stream.write("\x1b[2J")
+        self._thread = threading.Thread(target=self._run, daemon=True, name="dashboard")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop refreshing and leave the last frame on screen."""
+        self.stopping.set()
+        if self._thread:
+            self._thread.join(self.interval + 1)
+            self.draw()
+        return self
+
+
+@contextmanager
+def live(source, interval=DEFAULT_INTERVAL, window=DEFAULT_WINDOW, title="Load test", quiet=True):
+    """
+    Show a Dashboard of `source` while the block runs. With quiet=True the
+    block's own prints go to /dev/null (the dashboard keeps the real
+    stdout), so per-object progress lines cost nothing.
+    """
+    dashboard = Dashboard(source, interval, window, stream=sys.stdout, title=title).start()
+    try:
+        if quiet:
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                yield dashboard
+        else:
+            yield dashboard
+    finally:
+        dashboard.stop()
@@ -0,0 +1,383 @@
+"""
+Multi-process load generation.
+
+One Python process tops out at a single core: JSON decoding of
+/api/enrollments/all, TLS and response parsing saturate the generator long
+before the server. Here a coordinator hands one test out to several worker
+processes and merges what they measured:
+
+    python -m utils.loadtest.distributed --processes 4 -- --vusers 400 --duration 300 --student-mode round-robin
+
+Workers connect to the coordinator's TCP socket, so some of them can run
+on other machines (same checkout and parametros/ files):
+
+    python -m utils.loadtest.distributed --listen 0.0.0.0:7070 --processes 4 --remote 4 -- --vusers 2000 --student-mode round-robin
+    python -m utils.loadtest.distributed --connect coordinator-host:7070      # on each other machine
+
+Every worker runs a share of the test: every Nth VUser of the closed-model
+plan, or 1/N of the arrival rate in the open model (independent Poisson
+streams add up to the full one). Unique parameter pools are split into
+disjoint row ranges. Workers stream cumulative histogram snapshots back,
+which merge losslessly into the usual report.
+"""
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+
+from .__main__ import build_config, build_parser, iteration_rows, print_iterations, save_summary, tag_run
+from .dashboard import Dashboard
+from .engine import run, vuser_plan
+from .histogram import Histogram
+from .scenarios import SCENARIOS
+from .scheduler import print_schedule, run_open
+from .stats import StatsCollector, print_report
+
+REPORT_INTERVAL = 5        # seconds between worker snapshots / progress lines
+CONNECT_TIMEOUT = 60       # seconds to wait for every worker to connect
+START_DELAY = 2            # seconds between the assignment and the common start
+SEED_STRIDE = 1_000_003    # keeps each worker's random streams apart
+
+
+# ==========================================
+# WIRE FORMAT: one JSON object per line
+# ==========================================
+
+class Channel:
+    """Newline-delimited JSON over a socket; send() is safe from several threads."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self._reader = sock.makefile("rb")
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        data = json.dumps(message, separators=(",", ":")).encode() + b"\n"
+        with self._lock:
+            self.sock.sendall(data)
+
+    def receive(self):
+        """Next message, or None once the peer has closed the connection."""
+        line = self._reader.readline()
+        return json.loads(line) if line else None
+
+    def close(self):
+        self._reader.close()
+        self.sock.close()
+
+
+def parse_address(text):
+    host, _, port = text.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+# ==========================================
+# WORKER
+# ==========================================
+
+def partition_config(config, index, count):
+    """
+    Narrow `config` to worker `index` of `count`. Returns the closed-model
+    plan slice and the VUser id sequence for the open model, so VUser ids
+    (and the course titles / upload names built from them) never collide
+    across workers.
+    """
+    config.pools = {name: pool.partition(index, count) for name, pool in config.pools.items()}
+    if config.seed is not None:
+        config.seed += index * SEED_STRIDE
+    plan = vuser_plan(config)[index::count]
+    if config.arrivals:
+        config.arrivals = config.arrivals.scaled(1 / count)
+        config.vusers = max(1, math.ceil(config.vusers / count))
+    return plan, itertools.count(index + 1, count)
+
+
+def run_worker(channel, quiet=False):
+    """Take one assignment from the coordinator, run it and report back."""
+    channel.send({"type": "hello", "host": socket.gethostname(), "pid": os.getpid()})
+    assignment = channel.receive()
+    if not assignment:
+        return
+    index, count = assignment["index"], assignment["count"]
+    stats = StatsCollector()
+    done = threading.Event()
+
+    def stream_snapshots():
+        while not done.wait(assignment["interval"]):
+            channel.send({"type": "stats", "index": index, "snapshot": stats.snapshot()})
+
+    result = {"type": "done", "index": index, "error": None, "schedule": None, "iterations": []}
+    out = open(os.devnull, "w") if quiet else sys.stdout
+    try:
+        with redirect_stdout(out):
+            args = build_parser().parse_args(assignment["argv"])
+            config = build_config(args)
+            tag_run(args.run_id)
+            plan, vuser_ids = partition_config(config, index, count)
+            time.sleep(max(0.0, assignment["start_at"] - time.time()))
+            threading.Thread(target=stream_snapshots, daemon=True, name="snapshots").start()
+            if config.arrivals:
+                _, scheduler = run_open(config, SCENARIOS, stats=stats, vuser_ids=vuser_ids)
+                result["schedule"] = {"summary": scheduler.summary(), "lag": scheduler.lag.to_dict(),
+                                      "wall_time": scheduler.wall_time}
+            else:
+                run(config, SCENARIOS, plan=plan, stats=stats)
+            result["iterations"] = iteration_rows(SCENARIOS, config.mix)
+    except (Exception, SystemExit) as e:  # SystemExit: argparse rejected the arguments
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        done.set()
+        if quiet:
+            out.close()
+    result["snapshot"] = stats.snapshot()
+    channel.send(result)
+
+
+def worker_main(address, quiet=False):
+    """Entry point of a worker process: connect to the coordinator at `address` and run."""
+    channel = Channel(socket.create_connection(address, timeout=CONNECT_TIMEOUT))
+    channel.sock.settimeout(None)
+    try:
+        run_worker(channel, quiet=quiet)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        channel.close()
+
+
+# ==========================================
+# COORDINATOR
+# ==========================================
+
+class Coordinator:
+    """
+    Accepts `expected` workers, gives each the same loadtest arguments
+    plus its index, and keeps the latest snapshot of every worker. A
+    worker that disconnects early still counts with what it last sent.
+    """
+
+    def __init__(self, argv, expected, listen=("127.0.0.1", 0), interval=REPORT_INTERVAL):
+        self.argv = list(argv)
+        self.expected = expected
+        self.interval = interval
+        self.server = socket.create_server(listen)
+        self.address = self.server.getsockname()[:2]
+        self.channels = []
+        self.snapshots = {}
+        self.results = {}
+        self.lost = set()
+        self._lock = threading.Lock()
+        self._all_done = threading.Event()
+
+    def accept(self, timeout=CONNECT_TIMEOUT):
+        deadline = time.time() + timeout
+        while len(self.channels) < self.expected:
+            self.server.settimeout(max(0.1, deadline - time.time()))
+            try:
+                sock, peer = self.server.accept()
+            except socket.timeout:
+                raise TimeoutError(f"Only {len(self.channels)} of {self.expected} workers connected")
+            sock.settimeout(None)
+            channel = Channel(sock)
+            hello = channel.receive()
+            if not hello or hello.get("type") != "hello":
+                channel.close()
+                continue
+            self.channels.append(channel)
+            print(f"   ↳ Worker {len(self.channels)}/{self.expected}: {hello['host']} pid {hello['pid']} ({peer[0]})")
+        self.server.close()
+
+    def _listen(self, index, channel):
+        while True:
+            try:
+                message = channel.receive()
+            except (OSError, ValueError):
+                message = None
+            with self._lock:
+                if message is None:
+                    if index not in self.results:
+                        self.lost.add(index)
+                else:
+                    self.snapshots[index] = message["snapshot"]
+                    if message["type"] == "done":
+                        self.results[index] = message
+                if len(self.results) + len(self.lost) >= len(self.channels):
+                    self._all_done.set()
+            if message is None or message["type"] == "done":
+                return
+
+    def merged(self):
+        with self._lock:
+            return StatsCollector.from_snapshots(list(self.snapshots.values()))
+
+    def run(self, progress=True):
+        """Start the workers and wait for them; `progress` prints a line every interval."""
+        start_at = time.time() + START_DELAY
+        for index, channel in enumerate(self.channels):
+            channel.send({"type": "assign", "index": index, "count": len(self.channels), "argv": self.argv,
+                          "start_at": start_at, "interval": self.interval})
+        for index, channel in enumerate(self.channels):
+            threading.Thread(target=self._listen, args=(index, channel), daemon=True).start()
+
+        try:
+            while not self._all_done.wait(self.interval):
+                if progress:
+                    print_progress(self.merged(), max(0.0, time.time() - start_at), len(self.results),
+                                   len(self.channels))
+        except KeyboardInterrupt:
+            print("\n🛑 Waiting for workers to stop (Ctrl+C again to abandon them)...")
+            try:
+                self._all_done.wait()
+            except KeyboardInterrupt:
+                pass
+        for channel in self.channels:
+            channel.close()
+        return self.merged()
+
+
+def print_progress(stats, elapsed, done, workers):
+    """One live line: totals over every worker's latest snapshot."""
+    merged = Histogram()
+    failures = 0
+    for transaction in stats.merged().values():
+        merged.merge(transaction.histogram)
+        failures += transaction.failures
+    p95 = merged.percentile(95) * 1000
+    print(f"   ⏱️  {elapsed:6.0f}s  workers done {done}/{workers}  pass {merged.total:,}  fail {failures:,}  "
+          f"{merged.total / max(stats.wall_time, 1e-9):,.1f} tps  p95 {p95:.1f} ms")
+
+
+def combine_iterations(results):
+    rows = {}
+    for result in results:
+        for row in result["iterations"]:
+            total = rows.setdefault(row["key"], dict(row, passed=0, failed=0, last_error=None))
+            total["passed"] += row["passed"]
+            total["failed"] += row["failed"]
+            total["last_error"] = row["last_error"] or total["last_error"]
+    return list(rows.values())
+
+
+def combine_schedules(results, profile):
+    """One scheduler summary for all workers; start lag histograms are merged exactly."""
+    schedules = [r["schedule"] for r in results if r.get("schedule")]
+    if not schedules:
+        return None
+    lag = Histogram()
+    for schedule in schedules:
+        lag.merge(Histogram.from_dict(schedule["lag"]))
+    summary = dict(schedules[0]["summary"], profile=profile.describe())
+    for field in ("expected", "planned", "started", "dropped", "completed", "failed", "abandoned",
+                  "peak_in_flight"):
+        summary[field] = sum(s["summary"][field] for s in schedules)
+    wall_time = max(s["wall_time"] for s in schedules)
+    summary["start_rate"] = summary["started"] / wall_time if wall_time > 0 else 0.0
+    pcts = lag.percentiles((50, 99))
+    summary.update(lag_p50=pcts[50], lag_p99=pcts[99], lag_max=lag.max / 1_000_000)
+    return summary
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    loadtest_argv = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, loadtest_argv = argv[:split], argv[split + 1:]
+
+    parser = argparse.ArgumentParser(
+        prog="python -m utils.loadtest.distributed",
+        description="Run python -m utils.loadtest across several processes (and hosts); "
+                    "loadtest options go after --.")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1,
+                        help="local worker processes (default: one per core)")
+    parser.add_argument("--remote", type=int, default=0, metavar="N",
+                        help="also wait for N workers started elsewhere with --connect")
+    parser.add_argument("--listen", type=parse_address, metavar="HOST:PORT",
+                        help="coordinator address (default: 127.0.0.1 on a free port)")
+    parser.add_argument("--connect", type=parse_address, metavar="HOST:PORT",
+                        help="run as a worker of the coordinator at HOST:PORT")
+    parser.add_argument("--interval", type=float, default=REPORT_INTERVAL,
+                        help="seconds between snapshots and progress lines (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if args.connect:
+        worker_main(args.connect)
+        return 0
+    if args.processes < 0 or args.remote < 0 or args.processes + args.remote < 1:
+        parser.error("at least one worker is needed")
+    if args.remote and not args.listen:
+        parser.error("--remote needs --listen on an address the other hosts can reach")
+
+    loadtest_parser = build_parser()
+    loadtest_args = loadtest_parser.parse_args(loadtest_argv)
+    try:
+        config = build_config(loadtest_args)
+    except ValueError as e:
+        loadtest_parser.error(str(e))
+    # Resolved here so every worker logs under the same run id
+    run_id = tag_run(loadtest_args.run_id)
+    loadtest_argv += ["--run-id", run_id or "none"]
+
+    expected = args.processes + args.remote
+    # With --live, workers send snapshots at the dashboard's refresh rate
+    coordinator = Coordinator(loadtest_argv, expected, listen=args.listen or ("127.0.0.1", 0),
+                              interval=loadtest_args.live or args.interval)
+    host, port = coordinator.address
+    print(f"🛰️  Coordinator on {host}:{port}, waiting for {expected} workers")
+    if args.remote:
+        print(f"   ↳ Start the others with: python -m utils.loadtest.distributed --connect {host}:{port}")
+
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=worker_main, args=((host if host != "0.0.0.0" else "127.0.0.1", port), True),
+                                 name=f"loadtest-worker-{i}", daemon=True)
+                 for i in range(args.processes)]
+    for process in processes:
+        process.start()
+
+    try:
+        coordinator.accept()
+    except TimeoutError as e:
+        print(f"❌ {e}")
+        return 2
+    print(f"🚀 {expected} workers starting in {START_DELAY}s")
+    if loadtest_args.live:
+        dashboard = Dashboard(coordinator.merged, interval=loadtest_args.live,
+                              title=f"{expected} workers against {config.host}").start()
+        try:
+            stats = coordinator.run(progress=False)
+        finally:
+            dashboard.stop()
+    else:
+        stats = coordinator.run()
+    for process in processes:
+        process.join(5)
+
+    results = [coordinator.results[i] for i in sorted(coordinator.results)]
+    for result in results:
+        if result["error"]:
+            print(f"❌ Worker {result['index']}: {result['error']}")
+    for index in sorted(coordinator.lost):
+        print(f"⚠️ Worker {index} disconnected; its last snapshot is included")
+
+    rows = stats.report()
+    print_report(rows, stats.wall_time)
+    schedule = combine_schedules(results, config.arrivals)
+    if schedule:
+        print_schedule(schedule)
+    print_iterations(combine_iterations(results))
+    save_summary(loadtest_args, rows, stats.wall_time)
+    if run_id:
+        print(f"\n🏷️  Run {run_id}; remove what it created with: python -m utils.teardown {run_id}"
+              + (" (on every worker host)" if args.remote else ""))
+    return 1 if coordinator.lost or any(r["error"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+"""
+Concurrent static-PDF download driver for scenario 3B (T06_DownloadPDF).
+
+Every reader logs in as a student and follows the same correlation as the
+browser: /api/courses -> /api/courses/{id}/lessons (T04) ->
+/api/lessons/content/{contentId} (T05) -> /uploads/{file} (T06). With
+--url, readers skip the correlation and all hit one file, which is how a
+popular PDF gets thousands of concurrent readers.
+
+Bodies are read in fixed-size chunks and thrown away, so memory stays flat
+whatever the file size. --range-size downloads in HTTP Range pieces and
+--resume-at drops the connection part-way and resumes with a Range.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+import aiohttp
+
+from .engine import DEFAULT_HOST, rebase_url
+from .histogram import Histogram
+from .params import ParameterPool, parametros_path
+from .stats import StatsCollector, print_report, write_csv, write_json
+
+CHUNK_SIZE = 64 * 1024
+MB = 1024 * 1024
+
+
+class DownloadFailed(Exception):
+    pass
+
+
+class ReaderResult:
+    def __init__(self, reader_id):
+        self.reader_id = reader_id
+        self.downloads = 0
+        self.failures = 0
+        self.bytes = 0
+        self.busy = 0.0
+        self.last_error = None
+
+    @property
+    def bytes_per_s(self):
+        return self.bytes / self.busy if self.busy else 0.0
+
+
+async def read_body(response, chunk_size, limit=None):
+    """Drain the body into nothing, stopping once `limit` bytes are in; returns the byte count."""
+    received = 0
+    async for chunk in response.content.iter_chunked(chunk_size):
+        received += len(chunk)
+        if limit is not None and received >= limit:
+            break
+    return received
+
+
+async def fetch(session, url, chunk_size=CHUNK_SIZE, start=None, end=None, stop_after=None):
+    """
+    GET `url` (optionally bytes=start-end) and discard the body.
+    Returns (bytes, ttfb, total size or None). ttfb is request start to
+    response headers; with `stop_after` the connection is dropped early.
+    """
+    headers = {}
+    if start is not None:
+        headers["Range"] = f"bytes={start}-{'' if end is None else end}"
+    started = time.perf_counter()
+    async with session.get(url, headers=headers) as res:
+        ttfb = time.perf_counter() - started
+        if res.status not in (200, 206):
+            raise DownloadFailed(f"GET {url} -> {res.status}")
+        if start is not None and res.status != 206:
+            raise DownloadFailed(f"GET {url} ignored Range (status {res.status})")
+        if not res.headers.get("Content-Type", "").startswith("application/pdf"):
+            raise DownloadFailed(f"Unexpected Content-Type {res.headers.get('Content-Type')}")
+        total = content_total(res)
+        received = await read_body(res, chunk_size, limit=stop_after)
+        if stop_after is not None and received < (total or 0):
+            res.close()  # abandon the rest, like a dropped connection
+    return received, ttfb, total
+
+
+def content_total(res):
+    """Full file size from Content-Range (206) or Content-Length (200)."""
+    content_range = res.headers.get("Content-Range", "")
+    if "/" in content_range:
+        size = content_range.rsplit("/", 1)[1]
+        return int(size) if size.isdigit() else None
+    return res.content_length
+
+
+class Downloader:
+    def __init__(self, host, readers, iterations, chunk_size=CHUNK_SIZE, url=None, range_size=None,
+                 resume_at=None, timeout=300, students=None):
+        self.host = host
+        self.readers = readers
+        self.iterations = iterations
+        self.chunk_size = chunk_size
+        self.url = url
+        self.range_size = range_size
+        self.resume_at = resume_at
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.students = students
+        self.stats = StatsCollector()
+        self.ttfb = Histogram()
+
+    # ------------------------------------------
+    # CORRELATION (T01..T05)
+    # ------------------------------------------
+
+    async def _json(self, session, method, path, name, **kwargs):
+        started = time.perf_counter()
+        try:
+            async with session.request(method, f"{self.host}{path}", **kwargs) as res:
+                if res.status != 200:
+                    raise DownloadFailed(f"{method} {path} -> {res.status}")
+                data = await res.json()
+        except Exception:
+            self.stats.record(name, time.perf_counter() - started, ok=False)
+            raise
+        self.stats.record(name, time.perf_counter() - started, ok=True)
+        return data
+
+    async def login(self, session, reader_id):
+        row = self.students.next(reader_id)
+        email, password = row["studentEmail"], row["studentPassword"]
+        data = await self._json(session, "POST", "/api/auth/login", "T01_Login_Student",
+                                json={"email": email, "password": password})
+        if data.get("message") != "Login exitoso":
+            raise DownloadFailed(f"Login failed for {email}")
+        courses = await self._json(session, "GET", "/api/courses", "T03_GetMyCourses")
+        if not courses:
+            raise DownloadFailed(f"{email} is not enrolled in any course")
+        return [c["id"] for c in courses]
+
+    async def resolve(self, session, course_ids, rng):
+        course_id = rng.choice(course_ids)
+        lessons = await self._json(session, "GET", f"/api/courses/{course_id}/lessons", "T04_GetCourseLessons")
+        pdfs = [c for lesson in lessons for c in (lesson.get("contents") or []) if c.get("type") == "pdf"]
+        if not pdfs:
+            raise DownloadFailed(f"Course {course_id} has no pdf content")
+        content_id = rng.choice(pdfs)["_id"]
+        content = await self._json(session, "GET", f"/api/lessons/content/{content_id}", "T05_GetContentDetail")
+        if content.get("type") != "pdf" or not content.get("url"):
+            raise DownloadFailed("Content is not a pdf with a url")
+        return rebase_url(content["url"], self.host)
+
+    # ------------------------------------------
+    # DOWNLOAD (T06)
+    # ------------------------------------------
+
+    async def download(self, session, url):
+        """Whole file, as one GET, as Range pieces, or dropped and resumed."""
+        if self.range_size:
+            received, ttfb, total = await fetch(session, url, self.chunk_size, start=0, end=self.range_size - 1)
+            while total is not None and received < total:
+                got, _, _ = await fetch(session, url, self.chunk_size, start=received,
+                                        end=min(received + self.range_size, total) - 1)
+                if not got:
+                    raise DownloadFailed(f"Empty range at byte {received} of {url}")
+                received += got
+            return received, ttfb
+
+        if self.resume_at:
+            async with session.head(url) as res:
+                size = res.content_length or 0
+            cut = max(1, int(size * self.resume_at))
+            first, ttfb, total = await fetch(session, url, self.chunk_size, stop_after=cut)
+            rest = 0
+            if total is None or first < total:  # a small file can arrive whole in the first read
+                rest, _, _ = await fetch(session, url, self.chunk_size, start=first)
+            if total is not None and first + rest != total:
+                raise DownloadFailed(f"Resumed download of {url} has {first + rest} of {total} bytes")
+            return first + rest, ttfb
+
+        received, ttfb, total = await fetch(session, url, self.chunk_size)
+        if total is not None and received != total:
+            raise DownloadFailed(f"Short read on {url}: {received} of {total} bytes")
+        return received, ttfb
+
+    async def reader(self, reader_id, session, rng):
+        result = ReaderResult(reader_id)
+        course_ids = None
+        for _ in range(self.iterations):
+            try:
+                url = self.url
+                if url is None:
+                    if course_ids is None:
+                        course_ids = await self.login(session, reader_id)
+                    url = await self.resolve(session, course_ids, rng)
+            except Exception as e:
+                result.failures += 1
+                result.last_error = f"{type(e).__name__}: {e}"
+                continue
+
+            started = time.perf_counter()
+            try:
+                received, ttfb = await self.download(session, url)
+                if not received:
+                    raise DownloadFailed(f"Downloaded an empty file from {url}")
+            except Exception as e:
+                self.stats.record("T06_DownloadPDF", time.perf_counter() - started, ok=False)
+                result.failures += 1
+                result.last_error = f"{type(e).__name__}: {e}"
+                continue
+            elapsed = time.perf_counter() - started
+            self.stats.record("T06_DownloadPDF", elapsed, ok=True)
+            self.ttfb.record(ttfb)
+            result.downloads += 1
+            result.bytes += received
+            result.busy += elapsed
+        return result
+
+    async def run(self, seed=None):
+        self.stats.start()
+        connector = aiohttp.TCPConnector(limit=0)
+        try:
+            if self.url is not None:
+                # One popular file: every reader shares the connection pool
+                async with aiohttp.ClientSession(connector=connector, timeout=self.timeout) as session:
+                    results = await asyncio.gather(*(
+                        self.reader(i, session, random.Random(None if seed is None else seed + i))
+                        for i in range(self.readers)))
+            else:
+                # Each reader is a logged-in student with its own cookie jar
+                async def own_session(i):
+                    # unsafe=True: the default jar drops cookies set by IP hosts like 127.0.0.1
+                    async with aiohttp.ClientSession(connector=connector, connector_owner=False,
+                                                     cookie_jar=aiohttp.CookieJar(unsafe=True),
+                                                     timeout=self.timeout) as session:
+                        return await self.reader(i, session, random.Random(None if seed is None else seed + i))
+                results = await asyncio.gather(*(own_session(i) for i in range(self.readers)))
+        finally:
+            await connector.close()
+            self.stats.stop()
+        return results
+
+
+def print_bandwidth(results, ttfb, wall_time):
+    print("\n📥 Download bandwidth")
+    pcts = ttfb.percentiles((50, 90, 99))
+    print(f"   TTFB: p50 {pcts[50] * 1000:.1f} ms, p90 {pcts[90] * 1000:.1f} ms, "
+          f"p99 {pcts[99] * 1000:.1f} ms, max {ttfb.max / 1000:.1f} ms")
+
+    active = [r for r in results if r.downloads]
+    if active:
+        rates = sorted(r.bytes_per_s for r in active)
+        print(f"   Per reader: min {rates[0] / MB:.2f} MB/s, median {rates[len(rates) // 2] / MB:.2f} MB/s, "
+              f"max {rates[-1] / MB:.2f} MB/s over {len(active)} readers")
+    total = sum(r.bytes for r in results)
+    print(f"   Aggregate: {total / MB:.1f} MB in {wall_time:.1f}s = {total / MB / wall_time if wall_time else 0:.2f} MB/s")
+
+    errors = [r for r in results if r.last_error]
+    if errors:
+        print(f"   ❌ {sum(r.failures for r in results)} failures; last: {errors[-1].last_error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utils.loadtest.download",
+                                     description="Concurrent PDF downloads from /uploads with TTFB and bandwidth.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="backend base URL (default: %(default)s)")
+    parser.add_argument("--url", help="download this file directly (e.g. /uploads/x.pdf) instead of correlating")
+    parser.add_argument("--readers", type=int, default=10, help="concurrent readers")
+    parser.add_argument("--iterations", type=int, default=1, help="downloads per reader")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="read size in bytes")
+    parser.add_argument("--range-size", type=int, help="download in Range requests of this many bytes")
+    parser.add_argument("--resume-at", type=float, help="drop the connection at this fraction (0-1) and resume")
+    parser.add_argument("--student-pool", metavar="FILE", help="studentEmail,studentPassword CSV "
+                                                                 "(default: parametros/student_credentials.dat)")
+    parser.add_argument("--timeout", type=float, default=300, help="per-download timeout in seconds")
+    parser.add_argument("--seed", type=int, help="random seed for course/content choices")
+    parser.add_argument("--json", metavar="FILE", help="write the transaction summary as JSON")
+    parser.add_argument("--csv", metavar="FILE", help="write the transaction summary as CSV")
+    args = parser.parse_args(argv)
+
+    if args.resume_at is not None and not 0 < args.resume_at < 1:
+        parser.error("--resume-at must be between 0 and 1")
+
+    url = args.url
+    if url and url.startswith("/"):
+        url = f"{args.host}{url}"
+    students = None
+    if url is None:
+        students = ParameterPool(args.student_pool or parametros_path("student_credentials.dat"), mode="round-robin")
+
+    downloader = Downloader(args.host, args.readers, args.iterations, chunk_size=args.chunk_size, url=url,
+                            range_size=args.range_size, resume_at=args.resume_at, timeout=args.timeout,
+                            students=students)
+    print(f"🚀 {args.readers} readers x {args.iterations} downloads from {url or args.host + ' (T04→T05→T06)'}")
+    results = asyncio.run(downloader.run(seed=args.seed))
+
+    rows = downloader.stats.report()
+    print_report(rows, downloader.stats.wall_time)
+    print_bandwidth(results, downloader.ttfb, downloader.stats.wall_time)
+    if args.json:
+        write_json(args.json, rows, downloader.stats.wall_time)
+    if args.csv:
+        write_csv(args.csv, rows)
+    return 0 if all(not r.failures for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
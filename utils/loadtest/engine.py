@@ -0,0 +1,344 @@
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from utils.httpClient import HOST, create_session
+
+from .params import PARAMETROS_DIR, ListFile, ParameterPool, PoolExhausted, default_pools
+from .stats import StatsCollector
+
+DEFAULT_HOST = HOST
+
+# VUser % per scenario from the "Summary for Controller Execution" table.
+DEFAULT_MIX = {"1": 50, "2": 20, "3a": 10, "3b": 20}
+
+
+class TransactionFailed(Exception):
+    """Raised by a scenario when a validation step fails."""
+
+
+class TestStopping(Exception):
+    """Raised inside a VUser when the run is over, to abandon its iteration."""
+
+
+class LoadTestConfig:
+    """
+    Settings for one load test run.
+
+    think_scale multiplies every think time and random pacing delay, so
+    0 runs the scenarios back to back (useful against a stand-in backend).
+    pacing_interval starts each VUser's iterations every N seconds instead
+    of the scenario's own pacing. arrivals (a scheduler.ArrivalProfile)
+    selects the open model, see scheduler.run_open().
+    """
+
+    def __init__(self, host=DEFAULT_HOST, vusers=10, duration=60, iterations=None,
+                 ramp_up=0, mix=None, think_scale=1.0, random_pacing=(0, 5),
+                 timeout=30, pools=None, admins=None, pdf_dir=None, seed=None,
+                 pacing_interval=None, arrivals=None, poisson=False):
+        self.host = host.rstrip("/")
+        self.vusers = vusers
+        self.duration = duration
+        self.iterations = iterations
+        self.ramp_up = ramp_up
+        self.mix = dict(mix or DEFAULT_MIX)
+        self.think_scale = think_scale
+        self.random_pacing = random_pacing
+        self.pacing_interval = pacing_interval
+        self.arrivals = arrivals
+        self.poisson = poisson
+        self.timeout = timeout
+        self.seed = seed
+        # Where pdf_files.dat names are looked up; missing files are generated
+        self.pdf_dir = pdf_dir or PARAMETROS_DIR
+        # Parameter pools by name ("admin", "student", "lesson", "pdf"), see params.py
+        self.pools = dict(pools) if pools is not None else default_pools(seed)
+        if admins:
+            self.pools["admin"] = ParameterPool(ListFile(["adminEmail", "adminPassword"], admins),
+                                                mode="round-robin")
+
+    @property
+    def api_url(self):
+        return f"{self.host}/api"
+
+
+def rebase_url(url, host):
+    """
+    Keep the path and query of `url` but point it at `host`.
+    The upload route always answers with https://www.omiags.online/uploads/...
+    """
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    return f"{host}{path}"
+
+
+class VUser:
+    """
+    One virtual user: its own HTTP session (and therefore its own `token`
+    cookie), correlated values, and helpers to time transactions.
+    """
+
+    def __init__(self, vuser_id, scenario, config, stats, stop_event):
+        self.id = vuser_id
+        self.scenario = scenario
+        self.config = config
+        self.stats = stats
+        self.stop_event = stop_event
+        # Own cookie jar for the `token` cookie; no retries so failures show up as failures.
+        self.session = create_session(pool_maxsize=4, retries=0, persist_cookies=True)
+        self.session.hooks["response"].append(stats.meter_response)
+        self.random = random.Random(None if config.seed is None else config.seed + vuser_id)
+        self.iteration = 0
+        self.vars = {}
+        self._params = {}
+        self._params_once = {}
+
+    def new_iteration(self):
+        self.iteration += 1
+        self.vars.clear()
+        self._params.clear()
+        self.session.cookies.clear()
+
+    def param(self, name):
+        """
+        Current row of parameter pool `name`. Like VuGen, the value stays the
+        same for the whole iteration, or the whole run for update="once" pools.
+        """
+        pool = self.config.pools[name]
+        cache = self._params_once if pool.update == "once" else self._params
+        if name not in cache:
+            cache[name] = pool.next(self.id)
+        return cache[name]
+
+    def admin(self):
+        row = self.param("admin")
+        return row["adminEmail"], row["adminPassword"]
+
+    def student(self):
+        """The student account of this VUser (unique pool: never shared with another VUser)."""
+        row = self.param("student")
+        return row["studentEmail"], row["studentPassword"]
+
+    def reader(self):
+        """A student account for read-only scenarios; other VUsers may share it."""
+        row = self.param("reader")
+        return row["studentEmail"], row["studentPassword"]
+
+    # ------------------------------------------
+    # HTTP helpers
+    # ------------------------------------------
+
+    def url(self, path):
+        """Build an absolute URL; paths starting with /api or /uploads hit the host."""
+        if path.startswith("http://") or path.startswith("https://"):
+            return path
+        return f"{self.config.host}{path}"
+
+    def local_url(self, url):
+        """Map a URL returned by the backend onto the configured host."""
+        return rebase_url(url, self.config.host)
+
+    def request(self, method, path, **kwargs):
+        kwargs.setdefault("timeout", self.config.timeout)
+        return self.session.request(method, self.url(path), **kwargs)
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.request("PUT", path, **kwargs)
+
+    def patch(self, path, **kwargs):
+        return self.request("PATCH", path, **kwargs)
+
+    # ------------------------------------------
+    # Transaction helpers
+    # ------------------------------------------
+
+    @contextmanager
+    def transaction(self, name):
+        """Time the block as transaction `name`; any exception marks it failed."""
+        started = time.perf_counter()
+        try:
+            yield
+        except TestStopping:
+            raise
+        except Exception:
+            self.stats.record(name, time.perf_counter() - started, ok=False)
+            raise
+        self.stats.record(name, time.perf_counter() - started, ok=True)
+
+    def check(self, condition, message):
+        if not condition:
+            raise TransactionFailed(message)
+
+    def expect(self, response, *statuses):
+        """Validate the status code and return the decoded JSON body."""
+        if response.status_code not in statuses:
+            raise TransactionFailed(
+                f"{response.request.method} {response.url} -> {response.status_code}: {response.text[:200]}"
+            )
+        try:
+            return response.json()
+        except ValueError:
+            raise TransactionFailed(f"{response.url} did not return JSON")
+
+    def think(self, low, high=None):
+        """Sleep for a random think time, cut short when the test is stopping."""
+        high = low if high is None else high
+        delay = self.random.uniform(low, high) * self.config.think_scale
+        if delay > 0:
+            self.stop_event.wait(delay)
+        if self.stop_event.is_set():
+            raise TestStopping()
+
+
+def allocate_vusers(total, mix):
+    """
+    Split `total` VUsers across scenarios by percentage using the
+    largest-remainder method, so 10 VUsers at 50/20/10/20 gives 5/2/1/2.
+    """
+    weight_sum = sum(mix.values())
+    if total <= 0 or weight_sum <= 0:
+        return []
+
+    exact = {name: total * weight / weight_sum for name, weight in mix.items()}
+    counts = {name: int(value) for name, value in exact.items()}
+    leftover = total - sum(counts.values())
+    for name in sorted(exact, key=lambda n: exact[n] - counts[n], reverse=True)[:leftover]:
+        counts[name] += 1
+
+    plan = []
+    for name in mix:
+        plan.extend([name] * counts[name])
+    return plan
+
+
+def run_vuser(vuser, deadline):
+    with vuser.stats.working():
+        vuser_loop(vuser, deadline)
+    vuser.session.close()
+
+
+def vuser_loop(vuser, deadline):
+    scenario = vuser.scenario
+    while not vuser.stop_event.is_set():
+        if vuser.config.iterations is not None and vuser.iteration >= vuser.config.iterations:
+            break
+        if deadline is not None and time.time() >= deadline:
+            break
+
+        vuser.new_iteration()
+        started = time.perf_counter()
+        try:
+            scenario.run(vuser)
+            scenario.iteration_done(True)
+        except TestStopping:
+            break
+        except PoolExhausted as e:
+            # Out of unique rows: the VUser aborts instead of failing every retry in a tight loop
+            scenario.iteration_done(False, f"{type(e).__name__}: {e}")
+            break
+        except Exception as e:
+            scenario.iteration_done(False, f"{type(e).__name__}: {e}")
+
+        if vuser.config.pacing_interval:
+            # Fixed-interval pacing: an iteration longer than the interval starts the next one late
+            remaining = vuser.config.pacing_interval - (time.perf_counter() - started)
+            if remaining > 0 and vuser.stop_event.wait(remaining):
+                break
+        elif scenario.pacing == "random":
+            try:
+                vuser.think(*vuser.config.random_pacing)
+            except TestStopping:
+                break
+
+
+def vuser_plan(config):
+    """[(vuser_id, scenario key)] for the whole test, ids from 1."""
+    return list(enumerate(allocate_vusers(config.vusers, config.mix), 1))
+
+
+def check_pools(config, scenarios, plan):
+    """
+    Raise PoolExhausted when a unique pool has fewer rows than the VUsers
+    of `plan` that draw from it will take, before any VUser starts.
+    """
+    for name, pool in config.pools.items():
+        if pool.mode != "unique" or pool.on_exhausted == "cycle":
+            continue
+        keys = sorted({key for _, key in plan if name in scenarios[key].params})
+        consumers = sum(1 for _, key in plan if key in keys)
+        if not consumers:
+            continue
+        if pool.update == "iteration" and config.iterations is not None:
+            needed = consumers * config.iterations
+        else:
+            # Every VUser reserves a block; only the last one may get a partial block
+            needed = (consumers - 1) * pool.block_size + 1
+        rows = len(pool.file)
+        if rows < needed:
+            source = os.path.relpath(pool.file.path) if getattr(pool.file, "path", None) else f"the {name} pool"
+            raise PoolExhausted(
+                f"{source} has {rows} unique {name} row(s) but {consumers} VUsers of scenario(s) "
+                f"{', '.join(keys)} need at least {needed}: add rows, lower --vusers, change --mix "
+                f"or use a mode that shares rows (e.g. --{name}-mode round-robin)")
+
+
+def run(config, scenarios, plan=None, stats=None):
+    """
+    Run the VUser mix described by `config` against `scenarios`
+    (a dict of scenario key -> Scenario). Returns the StatsCollector.
+
+    `plan` limits the run to some (vuser_id, key) pairs of vuser_plan(),
+    e.g. one worker process's share; `stats` records into an existing
+    collector.
+    """
+    unknown = set(config.mix) - set(scenarios)
+    if unknown:
+        raise ValueError(f"Unknown scenarios in mix: {', '.join(sorted(unknown))}")
+
+    stats = stats or StatsCollector()
+    stop_event = threading.Event()
+    plan = vuser_plan(config) if plan is None else plan
+    check_pools(config, scenarios, plan)
+
+    for scenario in scenarios.values():
+        scenario.reset()
+
+    print(f"🚀 Starting {len(plan)} VUsers against {config.host}")
+    for key in config.mix:
+        print(f"   ↳ Scenario {key} ({scenarios[key].title}): {sum(1 for _, k in plan if k == key)} VUsers")
+
+    stats.start()
+    deadline = time.time() + config.duration if config.duration else None
+    threads = []
+    for vuser_id, key in plan:
+        vuser = VUser(vuser_id, scenarios[key], config, stats, stop_event)
+        thread = threading.Thread(target=run_vuser, args=(vuser, deadline), daemon=True,
+                                  name=f"vuser-{vuser_id}")
+        threads.append(thread)
+        thread.start()
+        if config.ramp_up and len(plan) > 1:
+            if stop_event.wait(config.ramp_up / (len(plan) - 1)):
+                break
+
+    try:
+        for thread in threads:
+            remaining = None if deadline is None else max(0.0, deadline - time.time())
+            thread.join(remaining)
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping VUsers...")
+    finally:
+        stop_event.set()
+        for thread in threads:
+            thread.join(config.timeout)
+        stats.stop()
+
+    return stats
@@ -0,0 +1,198 @@
+"""
+HDR-style latency histogram.
+
+Values are recorded as integer microseconds into log-linear buckets: each
+power-of-two range is split into the same number of linear sub-buckets,
+so every recorded value keeps `significant_figures` digits of precision
+from 1 µs to an hour in a few thousand counters. Recording is a couple of
+bit operations and a list increment, and histograms merge by adding
+counts.
+"""
+import math
+
+LOWEST = 1                      # µs
+HIGHEST = 3600 * 1_000_000      # 1 hour in µs
+SIGNIFICANT_FIGURES = 2
+
+
+class Histogram:
+    def __init__(self, highest=HIGHEST, significant_figures=SIGNIFICANT_FIGURES):
+        if not 1 <= significant_figures <= 5:
+            raise ValueError("significant_figures must be between 1 and 5")
+        self.highest = highest
+        self.significant_figures = significant_figures
+
+        largest_single_unit = 2 * 10 ** significant_figures
+        self._half_magnitude = max(int(math.ceil(math.log2(largest_single_unit))) - 1, 0)
+        self._sub_bucket_count = 1 << (self._half_magnitude + 1)
+        self._half_count = self._sub_bucket_count // 2
+        self._sub_bucket_mask = self._sub_bucket_count - 1
+
+        buckets = 1
+        smallest_untrackable = self._sub_bucket_count
+        while smallest_untrackable <= highest:
+            smallest_untrackable <<= 1
+            buckets += 1
+        self.counts = [0] * ((buckets + 1) * self._half_count)
+
+        self.total = 0
+        self.sum = 0
+        self.min = 0
+        self.max = 0
+
+    # ------------------------------------------
+    # Indexing
+    # ------------------------------------------
+
+    def _index(self, value):
+        bucket = (value | self._sub_bucket_mask).bit_length() - (self._half_magnitude + 1)
+        sub_bucket = value >> bucket
+        return ((bucket + 1) << self._half_magnitude) + sub_bucket - self._half_count
+
+    def _value_at(self, index):
+        bucket = (index >> self._half_magnitude) - 1
+        sub_bucket = (index & (self._half_count - 1)) + self._half_count
+        if bucket < 0:
+            sub_bucket -= self._half_count
+            bucket = 0
+        return sub_bucket << bucket
+
+    def _highest_equivalent(self, index):
+        bucket = max((index >> self._half_magnitude) - 1, 0)
+        return self._value_at(index) + (1 << bucket) - 1
+
+    # ------------------------------------------
+    # Recording
+    # ------------------------------------------
+
+    def record_value(self, micros, count=1):
+        micros = min(max(int(micros), 0), self.highest)
+        self.counts[self._index(micros)] += count
+        if not self.total or micros < self.min:
+            self.min = micros
+        if micros > self.max:
+            self.max = micros
+        self.total += count
+        self.sum += micros * count
+
+    def record(self, seconds):
+        """Record one latency given in seconds."""
+        self.record_value(seconds * 1_000_000 + 0.5)
+
+    def merge(self, other):
+        """Add `other`'s counts into this histogram (same layout required)."""
+        if len(other.counts) != len(self.counts):
+            raise ValueError("Cannot merge histograms with different ranges or precision")
+        if not other.total:
+            return self
+        for i, count in enumerate(other.counts):
+            if count:
+                self.counts[i] += count
+        self.min = other.min if not self.total else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.total += other.total
+        self.sum += other.sum
+        return self
+
+    def subtract(self, other):
+        """
+        Remove `other`'s counts, `other` being an earlier copy of this
+        histogram: what is left is what was recorded in between. min and
+        max stay those of the whole histogram.
+        """
+        if len(other.counts) != len(self.counts):
+            raise ValueError("Cannot subtract histograms with different ranges or precision")
+        if not other.total:
+            return self
+        for i, count in enumerate(other.counts):
+            if count:
+                self.counts[i] -= count
+        self.total -= other.total
+        self.sum -= other.sum
+        return self
+
+    def copy(self):
+        clone = Histogram(self.highest, self.significant_figures)
+        return clone.merge(self)
+
+    # ------------------------------------------
+    # Serialization
+    # ------------------------------------------
+
+    def to_dict(self):
+        """
+        JSON-safe form with only the non-zero counters, as a flat
+        [index, count, index, count, ...] list; from_dict() restores it
+        exactly, so histograms from other processes merge losslessly.
+        """
+        counts = []
+        for index, count in enumerate(self.counts):
+            if count:
+                counts += (index, count)
+        return {
+            "highest": self.highest,
+            "significant_figures": self.significant_figures,
+            "total": self.total,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "counts": counts,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data["highest"], data["significant_figures"])
+        counts = data["counts"]
+        for i in range(0, len(counts), 2):
+            histogram.counts[counts[i]] = counts[i + 1]
+        histogram.total = data["total"]
+        histogram.sum = data["sum"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        return histogram
+
+    # ------------------------------------------
+    # Queries (seconds)
+    # ------------------------------------------
+
+    def percentile(self, pct):
+        """Value at `pct` percent, in seconds; never above the recorded max."""
+        if not self.total:
+            return 0.0
+        wanted = max(1, int(math.ceil(pct / 100.0 * self.total)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= wanted:
+                return min(self._highest_equivalent(index), self.max) / 1_000_000
+        return self.max / 1_000_000
+
+    def percentiles(self, pcts):
+        """Several percentiles in one pass over the counts."""
+        if not self.total:
+            return {pct: 0.0 for pct in pcts}
+        wanted = sorted((max(1, int(math.ceil(p / 100.0 * self.total))), p) for p in pcts)
+        result = {}
+        seen = 0
+        pending = iter(wanted)
+        target, pct = next(pending)
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            seen += count
+            while seen >= target:
+                result[pct] = min(self._highest_equivalent(index), self.max) / 1_000_000
+                try:
+                    target, pct = next(pending)
+                except StopIteration:
+                    return result
+        for _, pct in wanted:
+            result.setdefault(pct, self.max / 1_000_000)
+        return result
+
+    @property
+    def mean(self):
+        return self.sum / self.total / 1_000_000 if self.total else 0.0
+
+    def __len__(self):
+        return self.total
@@ -0,0 +1,95 @@
+"""
+Named transactions for the seeding and simulation scripts in utils/.
+
+    from utils.loadtest.instrument import transaction, instrument_session, report
+
+    instrument_session(session)
+    with transaction("T04_GetMyStudents"):
+        res = session.get(...)
+
+A transaction times its block. It fails if the block raises or if any
+request made on an instrumented session inside it gets a 4xx/5xx, so the
+scripts keep their own status handling and still get an error rate.
+"""
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+from .stats import StatsCollector, print_report, write_csv, write_json
+
+_collector = StatsCollector()
+_local = threading.local()
+
+
+def get_collector():
+    """The process-wide StatsCollector the scripts record into."""
+    return _collector
+
+
+def _mark_response(response, *args, **kwargs):
+    stack = getattr(_local, "stack", None)
+    if stack and response.status_code >= 400:
+        stack[-1]["ok"] = False
+    return response
+
+
+def instrument_session(session):
+    """
+    Let `session`'s responses fail the enclosing transaction and count
+    their bytes (see dashboard.py); idempotent.
+    """
+    hooks = session.hooks.setdefault("response", [])
+    if _mark_response not in hooks:
+        hooks.append(_mark_response)
+    if _collector.meter_response not in hooks:
+        hooks.append(_collector.meter_response)
+    return session
+
+
+@contextmanager
+def transaction(name):
+    if _collector.started_at is None:
+        _collector.start()
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    state = {"ok": True}
+    stack.append(state)
+    started = time.perf_counter()
+    # A thread counts as an active VUser while it is inside a transaction
+    with _collector.working():
+        try:
+            yield state
+        except Exception:
+            _collector.record(name, time.perf_counter() - started, ok=False)
+            raise
+        else:
+            _collector.record(name, time.perf_counter() - started, ok=state["ok"])
+        finally:
+            stack.pop()
+
+
+def timed(name):
+    """Decorator form of transaction()."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with transaction(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def report(json_path=None, csv_path=None):
+    """Print the transaction table and optionally export it."""
+    _collector.stop()
+    rows = _collector.report()
+    print_report(rows, _collector.wall_time)
+    if json_path:
+        write_json(json_path, rows, _collector.wall_time)
+        print(f"💾 Transactions saved to: {json_path}")
+    if csv_path:
+        write_csv(csv_path, rows)
+        print(f"💾 Transactions saved to: {csv_path}")
+    return rows
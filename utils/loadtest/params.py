@@ -0,0 +1,282 @@
+"""
+LoadRunner-style parameter pools over the CSV files in parametros/.
+
+Files are memory-mapped and rows are decoded only when handed out, so a
+pool costs the same whether it has five rows or five million. Random
+access builds a lazy offset index (8 bytes per row); every other mode
+just walks byte offsets.
+"""
+import csv
+import mmap
+import os
+import random
+import threading
+from array import array
+
+PARAMETROS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                              "parametros")
+
+MODES = ("sequential", "round-robin", "random", "unique")
+UPDATES = ("iteration", "once")
+
+
+class PoolExhausted(Exception):
+    """A unique pool ran out of rows."""
+
+
+def parametros_path(name):
+    return os.path.join(PARAMETROS_DIR, name)
+
+
+class ParameterFile:
+    """
+    Read-only, memory-mapped CSV with a header row. Offsets are byte
+    positions of row starts, so cursors are plain integers.
+    """
+
+    def __init__(self, path, encoding="utf-8"):
+        self.path = path
+        self.encoding = encoding
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self._index = None
+        self._index_lock = threading.Lock()
+
+        header_end = self._line_end(0)
+        self.columns = self._decode(0, header_end) if header_end else []
+        self.first_row = self._skip_blank(self._next_start(header_end))
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    # ------------------------------------------
+    # Offsets
+    # ------------------------------------------
+
+    def _line_end(self, offset):
+        end = self._map.find(b"\n", offset)
+        return len(self._map) if end == -1 else end
+
+    def _next_start(self, line_end):
+        return min(line_end + 1, len(self._map))
+
+    def _skip_blank(self, offset):
+        while offset < len(self._map) and self._map[offset:self._line_end(offset)].strip() == b"":
+            offset = self._next_start(self._line_end(offset))
+        return offset
+
+    def _decode(self, start, end):
+        line = self._map[start:end].decode(self.encoding).rstrip("\r")
+        return next(csv.reader([line]))
+
+    def read_at(self, offset):
+        """Return (row dict, offset of the next row). offset must be a row start."""
+        end = self._line_end(offset)
+        values = self._decode(offset, end)
+        return dict(zip(self.columns, values)), self._skip_blank(self._next_start(end))
+
+    def at_end(self, offset):
+        return offset >= len(self._map)
+
+    def rows(self):
+        """Stream every row without building an index."""
+        offset = self.first_row
+        while not self.at_end(offset):
+            row, offset = self.read_at(offset)
+            yield row
+
+    # ------------------------------------------
+    # Random access
+    # ------------------------------------------
+
+    def index(self):
+        """Row-start offsets, built once on first use."""
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    offsets = array("Q")
+                    offset = self.first_row
+                    while not self.at_end(offset):
+                        offsets.append(offset)
+                        offset = self._skip_blank(self._next_start(self._line_end(offset)))
+                    self._index = offsets
+        return self._index
+
+    def __len__(self):
+        return len(self.index())
+
+    def row(self, i):
+        return self.read_at(self.index()[i])[0]
+
+
+class ListFile:
+    """Same interface as ParameterFile for rows given in code (e.g. --admin flags)."""
+
+    def __init__(self, columns, rows):
+        self.columns = list(columns)
+        self._rows = [dict(zip(self.columns, r)) for r in rows]
+        self.first_row = 0
+
+    def read_at(self, offset):
+        return self._rows[offset], offset + 1
+
+    def at_end(self, offset):
+        return offset >= len(self._rows)
+
+    def rows(self):
+        return iter(self._rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def row(self, i):
+        return self._rows[i]
+
+    def close(self):
+        pass
+
+
+class PartitionFile:
+    """
+    Rows [start, stop) of another file, with the same interface. Offsets
+    are row numbers within the slice, so cursors stay plain integers.
+    """
+
+    def __init__(self, source, start, stop):
+        self.source = source
+        self.path = getattr(source, "path", None)
+        self.columns = source.columns
+        self.start = start
+        self.stop = stop
+        self.first_row = 0
+
+    def read_at(self, offset):
+        return self.source.row(self.start + offset), offset + 1
+
+    def at_end(self, offset):
+        return self.start + offset >= self.stop
+
+    def rows(self):
+        return (self.source.row(i) for i in range(self.start, self.stop))
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def row(self, i):
+        return self.source.row(self.start + i)
+
+    def close(self):
+        pass
+
+
+class ParameterPool:
+    """
+    Hands out rows the way a VuGen parameter does:
+
+    - sequential:  every VUser walks the file from the top with its own cursor
+    - round-robin: one shared cursor, wrapping around at the end
+    - random:      any row, independently per request
+    - unique:      each row is handed out once across all VUsers; block_size
+                   rows are reserved per VUser at a time
+
+    `update` is "iteration" (a new value each iteration) or "once" (a VUser
+    keeps its first value for the whole run). The VUser does the caching.
+    """
+
+    def __init__(self, source, mode="sequential", update="iteration", block_size=1,
+                 on_exhausted="abort", seed=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown parameter mode '{mode}', expected one of {', '.join(MODES)}")
+        if update not in UPDATES:
+            raise ValueError(f"Unknown update policy '{update}', expected one of {', '.join(UPDATES)}")
+        self.file = ParameterFile(source) if isinstance(source, str) else source
+        self.mode = mode
+        self.update = update
+        self.block_size = max(1, block_size)
+        self.on_exhausted = on_exhausted
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._shared = self.file.first_row
+        self._cursors = {}
+        self._blocks = {}
+
+    @property
+    def columns(self):
+        return self.file.columns
+
+    def _wrap(self, offset):
+        return self.file.first_row if self.file.at_end(offset) else offset
+
+    def next(self, vuser_id=0):
+        """Next row dict for `vuser_id` according to the pool's mode."""
+        with self._lock:
+            if self.mode == "random":
+                if not len(self.file):
+                    raise PoolExhausted("Parameter pool is empty")
+                return self.file.row(self._random.randrange(len(self.file)))
+
+            if self.mode == "round-robin":
+                self._shared = self._wrap(self._shared)
+                row, self._shared = self.file.read_at(self._shared)
+                return row
+
+            if self.mode == "sequential":
+                offset = self._wrap(self._cursors.get(vuser_id, self.file.first_row))
+                row, self._cursors[vuser_id] = self.file.read_at(offset)
+                return row
+
+            return self._next_unique(vuser_id)
+
+    def _next_unique(self, vuser_id):
+        block = self._blocks.get(vuser_id)
+        if not block:
+            block = self._blocks[vuser_id] = self._reserve_block()
+        return block.pop(0)
+
+    def _reserve_block(self):
+        block = []
+        while len(block) < self.block_size:
+            if self.file.at_end(self._shared):
+                if block:
+                    break
+                if self.on_exhausted != "cycle":
+                    raise PoolExhausted(f"No unique rows left in {getattr(self.file, 'path', 'pool')}")
+                self._shared = self.file.first_row
+                if self.file.at_end(self._shared):
+                    raise PoolExhausted("Parameter pool is empty")
+            row, self._shared = self.file.read_at(self._shared)
+            block.append(row)
+        return block
+
+    def partition(self, index, count):
+        """
+        This pool as seen by worker `index` of `count` processes. A unique
+        pool gets its own contiguous share of the rows, so no row is handed
+        out twice across processes; other modes share every row and just
+        get their own random seed.
+        """
+        if self.mode != "unique" or count <= 1:
+            return ParameterPool(self.file, self.mode, self.update, self.block_size, self.on_exhausted,
+                                 seed=self._random.getrandbits(64) + index)
+        total = len(self.file)
+        start, stop = total * index // count, total * (index + 1) // count
+        return ParameterPool(PartitionFile(self.file, start, stop), self.mode, self.update,
+                             self.block_size, self.on_exhausted)
+
+    def close(self):
+        self.file.close()
+
+
+def default_pools(seed=None):
+    """The pools the QA scenarios use, straight from parametros/."""
+    return {
+        "admin": ParameterPool(parametros_path("admin_credentials.dat"), mode="round-robin"),
+        "student": ParameterPool(parametros_path("student_credentials.dat"), mode="unique", update="once"),
+        # Same accounts for scenarios that only read, so they don't use up unique rows
+        "reader": ParameterPool(parametros_path("student_credentials.dat"), mode="round-robin", update="once"),
+        "lesson": ParameterPool(parametros_path("lesson_data.dat"), mode="random", seed=seed),
+        "pdf": ParameterPool(parametros_path("pdf_files.dat"), mode="round-robin"),
+    }
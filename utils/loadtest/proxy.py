@@ -0,0 +1,564 @@
+"""
+Fault- and latency-injecting reverse proxy, for tail-latency experiments.
+
+It sits between the client and the backend and, per route, adds latency
+drawn from a distribution, caps bandwidth, answers with 5xx instead of
+forwarding, or resets the connection. Every request and what was done to
+it goes to an NDJSON log, so a run can show how the client flows (token
+login, the T05 -> T06 correlation, sequential submit-answer) amplify
+backend slowness and how retries pile up, without touching the backend:
+
+    python -m utils.loadtest.proxy --listen 127.0.0.1:8080 --config faults.json --log injected.ndjson
+    python -m utils.loadtest --host http://127.0.0.1:8080 --vusers 50 --duration 120 --student-mode round-robin
+
+The utils scripts always call localhost:5000, so for them the proxy takes
+that port and the backend moves (e.g. PORT=5001 node server.js):
+
+    python -m utils.loadtest.proxy --listen 127.0.0.1:5000 --upstream http://localhost:5001 --latency exp:40
+
+The config lists rules; the first whose `match` (a regex on the path)
+and `method` fit a request applies, and quick flags (--latency,
+--error-rate, ...) add a catch-all rule at the end:
+
+    {
+      "upstream": "http://localhost:5000",
+      "seed": 7,
+      "rules": [
+        {"name": "login", "match": "^/api/auth/login$", "latency": "lognormal:80:0.5"},
+        {"name": "submit", "match": "^/api/quizzes/(no-auth-)?submit-answer$", "method": "POST",
+         "latency": "5-15+spike:0.01:2000", "error_rate": 0.02, "error_status": 503,
+         "reset_rate": 0.005, "reset_after_rate": 0.005},
+        {"name": "files", "match": "^/(uploads/|api/upload)", "bandwidth": "512KB"}
+      ]
+    }
+
+Latencies are in ms: "40" (fixed), "10-50" (uniform), "exp:MEAN",
+"normal:MEAN:SD", "lognormal:MEDIAN:SIGMA", "pareto:SCALE:ALPHA" and
+"spike:PROBABILITY:MS", added up with "+". A reset drops the client
+connection with an RST before the request is forwarded; reset_after
+forwards it, lets the backend do the work, then drops the connection
+before the answer: what a client retrying a POST must survive. Draws
+depend only on the seed, the rule and how many requests the rule has
+seen, so a run with the same requests injects the same faults.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import signal
+import socket
+import struct
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from .standin import new_event_loop
+
+DEFAULT_UPSTREAM = "http://localhost:5000"
+MAX_HEAD = 64 * 1024
+RELAY_CHUNK = 64 * 1024
+NO_BODY_STATUSES = (204, 304)
+SIZE_UNITS = {"": 1, "B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+REASONS = {500: "Internal Server Error", 502: "Bad Gateway", 503: "Service Unavailable", 504: "Gateway Timeout"}
+
+
+class ConfigError(ValueError):
+    """A fault config or flag that cannot be parsed."""
+
+
+# ==========================================
+# CONFIG
+# ==========================================
+
+def parse_delay(text):
+    """
+    A latency spec (ms, see the module docstring) -> function(rng) giving
+    seconds; None for an empty spec.
+    """
+    if not text:
+        return None
+    terms = []
+    for term in str(text).replace(" ", "").split("+"):
+        kind, _, args = term.partition(":")
+        try:
+            if not args:
+                low, _, high = kind.partition("-")
+                low, high = float(low), float(high or low)
+                terms.append(lambda rng, low=low, high=high: rng.uniform(low, high))
+                continue
+            values = [float(v) for v in args.split(":")]
+            if kind == "exp":
+                mean, = values
+                terms.append(lambda rng, mean=mean: rng.expovariate(1.0 / mean) if mean > 0 else 0.0)
+            elif kind == "normal":
+                mean, sd = values
+                terms.append(lambda rng, mean=mean, sd=sd: max(0.0, rng.gauss(mean, sd)))
+            elif kind == "lognormal":
+                median, sigma = values
+                terms.append(lambda rng, mu=math.log(median), sigma=sigma: rng.lognormvariate(mu, sigma))
+            elif kind == "pareto":
+                scale, alpha = values
+                terms.append(lambda rng, scale=scale, alpha=alpha: scale * rng.paretovariate(alpha))
+            elif kind == "spike":
+                probability, ms = values
+                terms.append(lambda rng, p=probability, ms=ms: ms if rng.random() < p else 0.0)
+            else:
+                raise ConfigError(f"unknown latency distribution {kind!r}")
+        except (ValueError, TypeError) as e:
+            if isinstance(e, ConfigError):
+                raise
+            raise ConfigError(f"bad latency term {term!r}") from None
+    return lambda rng: sum(term(rng) for term in terms) / 1000
+
+
+def parse_size(text):
+    """'512KB', '2MB' or a plain number of bytes -> bytes; None for an empty value."""
+    if text in (None, ""):
+        return None
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMG]?B?)\s*", str(text), re.IGNORECASE)
+    if not match:
+        raise ConfigError(f"bad size {text!r}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+
+class Rule:
+    """One route's faults; `requests` numbers the requests it has matched, for reproducible draws."""
+
+    def __init__(self, name, match=".", method=None, latency=None, bandwidth=None, error_rate=0.0,
+                 error_status=503, reset_rate=0.0, reset_after_rate=0.0):
+        self.name = name
+        self.pattern = re.compile(match)
+        self.methods = {method.upper()} if isinstance(method, str) else {m.upper() for m in method or ()}
+        self.latency_spec = latency
+        self.latency = parse_delay(latency)
+        self.bandwidth = parse_size(bandwidth)
+        self.error_rate = float(error_rate)
+        self.error_status = int(error_status)
+        self.reset_rate = float(reset_rate)
+        self.reset_after_rate = float(reset_after_rate)
+        self.requests = 0
+
+    @classmethod
+    def from_dict(cls, data, default_name):
+        known = {"name", "match", "method", "latency", "bandwidth", "error_rate", "error_status", "reset_rate",
+                 "reset_after_rate"}
+        unknown = set(data) - known
+        if unknown:
+            raise ConfigError(f"rule {data.get('name', default_name)!r}: unknown field(s) {', '.join(sorted(unknown))}")
+        return cls(**dict({"name": default_name}, **data))
+
+    def matches(self, method, path):
+        return (not self.methods or method in self.methods) and self.pattern.search(path) is not None
+
+    def draw(self, seed):
+        """
+        The faults for this rule's next request: (delay s, fault or None).
+        The fault is "error", "reset" or "reset_after".
+        """
+        self.requests += 1
+        rng = random.Random(f"{seed}:{self.name}:{self.requests}")
+        delay = self.latency(rng) if self.latency else 0.0
+        roll = rng.random()
+        for fault, rate in (("reset", self.reset_rate), ("error", self.error_rate),
+                            ("reset_after", self.reset_after_rate)):
+            if roll < rate:
+                return delay, fault
+            roll -= rate
+        return delay, None
+
+
+def load_config(path=None):
+    """{"upstream", "seed", "rules": [Rule]} from a JSON config file (or the defaults)."""
+    data = {}
+    if path:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    rules = [Rule.from_dict(rule, f"rule{n}") for n, rule in enumerate(data.get("rules", []), 1)]
+    return {"upstream": data.get("upstream"), "seed": data.get("seed"), "rules": rules}
+
+
+# ==========================================
+# PROXY
+# ==========================================
+
+class Throttle:
+    """Token bucket shared by both directions of one request."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.ready_at = time.monotonic()
+
+    async def pace(self, size):
+        now = time.monotonic()
+        self.ready_at = max(self.ready_at, now) + size / self.rate
+        if self.ready_at > now:
+            await asyncio.sleep(self.ready_at - now)
+
+
+class Message:
+    """Head of a request or response as parsed off the wire."""
+
+    def __init__(self, head):
+        lines = head.decode("latin-1").split("\r\n")
+        self.start = lines[0]
+        self.headers = []
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                self.headers.append((name.strip(), value.strip()))
+
+    def header(self, name):
+        name = name.lower()
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return None
+
+    @property
+    def chunked(self):
+        return "chunked" in (self.header("Transfer-Encoding") or "").lower()
+
+    def encode(self, extra=()):
+        lines = [self.start] + [f"{k}: {v}" for k, v in self.headers] + [f"{k}: {v}" for k, v in extra]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def read_head(reader):
+    """The next message head, or None when the peer closed between messages."""
+    try:
+        return Message(await reader.readuntil(b"\r\n\r\n"))
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise ConnectionError("connection closed inside a message head") from None
+        return None
+
+
+async def relay_body(reader, writer, message, throttle=None, until_close=False):
+    """
+    Copy one message body from `reader` to `writer` (None discards it),
+    paced by `throttle`. Returns the body size.
+    """
+    async def forward(data):
+        if throttle:
+            step = max(1, min(RELAY_CHUNK, throttle.rate // 10))  # ~10 writes a second at the cap
+            for i in range(0, len(data), step):
+                piece = data[i:i + step]
+                await throttle.pace(len(piece))
+                if writer:
+                    writer.write(piece)
+                    await writer.drain()
+        elif writer:
+            writer.write(data)
+            await writer.drain()
+
+    size = 0
+    if message.chunked:
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            chunk = int(line.split(b";")[0].strip() or b"0", 16)
+            await forward(line)
+            if chunk == 0:
+                while True:  # trailers, up to the empty line
+                    trailer = await reader.readuntil(b"\r\n")
+                    await forward(trailer)
+                    if trailer == b"\r\n":
+                        return size
+            await forward(await reader.readexactly(chunk + 2))
+            size += chunk
+    length = message.header("Content-Length")
+    if length is not None:
+        remaining = int(length)
+        while remaining:
+            data = await reader.read(min(remaining, RELAY_CHUNK))
+            if not data:
+                raise ConnectionError("connection closed inside a message body")
+            remaining -= len(data)
+            size += len(data)
+            await forward(data)
+    elif until_close:
+        while True:
+            data = await reader.read(RELAY_CHUNK)
+            if not data:
+                break
+            size += len(data)
+            await forward(data)
+    return size
+
+
+def reset(writer):
+    """Close with an RST instead of a FIN, like a crashed or overloaded peer."""
+    sock = writer.get_extra_info("socket")
+    if sock is not None:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+    writer.transport.abort()
+
+
+class FaultProxy:
+    """
+    Reverse proxy from `listen` to `upstream` applying `rules`. Each client
+    connection gets its own upstream connection, so keep-alive behaves as
+    it does without the proxy. `counts` sums what was injected per rule.
+    `connections` holds the open client transports.
+    """
+
+    def __init__(self, upstream=DEFAULT_UPSTREAM, rules=(), seed=None, log_path=None):
+        parts = urlsplit(upstream)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ConfigError(f"bad upstream URL {upstream!r}")
+        self.upstream = upstream
+        self.upstream_host = parts.hostname
+        self.upstream_port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.upstream_ssl = parts.scheme == "https"
+        self.rules = list(rules) + [Rule("pass")]
+        self.seed = seed
+        self.log_path = log_path
+        self._log = open(log_path, "a", encoding="utf-8", buffering=1) if log_path else None
+        self.connections = set()
+        self.counts = {rule.name: {"requests": 0, "delayed": 0, "delay": 0.0, "max_delay": 0.0, "error": 0,
+                                   "reset": 0, "reset_after": 0, "upstream_errors": 0, "bytes": 0}
+                       for rule in self.rules}
+
+    def rule_for(self, method, path):
+        return next(rule for rule in self.rules if rule.matches(method, path))
+
+    def record(self, entry):
+        counts = self.counts[entry["rule"]]
+        counts["requests"] += 1
+        if entry["delay_ms"]:
+            counts["delayed"] += 1
+            counts["delay"] += entry["delay_ms"]
+            counts["max_delay"] = max(counts["max_delay"], entry["delay_ms"])
+        if entry["fault"]:
+            counts[entry["fault"]] += 1
+        if entry["status"] == 502 and not entry["fault"]:
+            counts["upstream_errors"] += 1
+        counts["bytes"] += entry["bytes"]
+        if self._log:
+            self._log.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    async def handle(self, reader, writer):
+        upstream = None
+        self.connections.add(writer.transport)
+        try:
+            while True:
+                request = await read_head(reader)
+                if request is None:
+                    return
+                upstream, keep_open = await self.exchange(request, reader, writer, upstream)
+                if not keep_open:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            self.connections.discard(writer.transport)
+            if upstream:
+                upstream[1].close()
+            if not writer.transport.is_closing():
+                writer.close()
+
+    async def exchange(self, request, reader, writer, upstream):
+        """Serve one request; returns (upstream connection or None, whether to keep the client connection)."""
+        method, target, _ = (request.start.split(" ", 2) + ["", ""])[:3]
+        path = target.split("?", 1)[0]
+        rule = self.rule_for(method, path)
+        delay, fault = rule.draw(self.seed)
+        throttle = Throttle(rule.bandwidth) if rule.bandwidth else None
+        entry = {"t": time.time(), "method": method, "path": path, "rule": rule.name,
+                 "delay_ms": round(delay * 1000, 3), "fault": fault, "status": None, "bytes": 0}
+        started = time.perf_counter()
+        keep_alive = (request.header("Connection") or "").lower() != "close"
+        try:
+            if fault == "reset":
+                reset(writer)
+                return upstream, False
+            if delay:
+                await asyncio.sleep(delay)
+            if fault == "error":
+                await relay_body(reader, None, request)
+                body = json.dumps({"message": "Injected fault", "rule": rule.name}).encode()
+                head = (f"HTTP/1.1 {rule.error_status} {REASONS.get(rule.error_status, 'Error')}\r\n"
+                        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                        f"X-Fault: {rule.name} error\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+                writer.write(head.encode("latin-1") + body)
+                await writer.drain()
+                entry["status"] = rule.error_status
+                return upstream, keep_alive
+
+            if upstream is None:
+                try:
+                    upstream = await asyncio.open_connection(self.upstream_host, self.upstream_port,
+                                                             ssl=self.upstream_ssl or None, limit=MAX_HEAD)
+                except OSError:
+                    body = b'{"message":"Upstream unreachable"}'
+                    writer.write(b"HTTP/1.1 502 Bad Gateway\r\nContent-Type: application/json\r\n"
+                                 b"Content-Length: %d\r\nConnection: close\r\n\r\n" % len(body) + body)
+                    await writer.drain()
+                    entry["status"] = 502
+                    return None, False
+            up_reader, up_writer = upstream
+            up_writer.write(request.encode())
+            await relay_body(reader, up_writer, request, throttle)
+            await up_writer.drain()
+
+            response = await read_head(up_reader)
+            if response is None:
+                raise ConnectionError("upstream closed the connection")
+            status = int(response.start.split(" ", 2)[1])
+            entry["status"] = status
+            has_body = method != "HEAD" and status not in NO_BODY_STATUSES and status >= 200
+            until_close = has_body and not response.chunked and response.header("Content-Length") is None
+            upstream_open = not until_close and (response.header("Connection") or "").lower() != "close"
+            if fault == "reset_after":
+                if has_body:
+                    entry["bytes"] = await relay_body(up_reader, None, response, until_close=until_close)
+                reset(writer)
+                return (upstream if upstream_open else None), False
+
+            extra = [("X-Fault", f"{rule.name} {entry['delay_ms']:g}ms")] if delay or throttle else []
+            writer.write(response.encode(extra))
+            if has_body:
+                entry["bytes"] = await relay_body(up_reader, writer, response, throttle, until_close=until_close)
+            await writer.drain()
+            if not upstream_open:
+                up_writer.close()
+                upstream = None
+            return upstream, keep_alive and not until_close
+        finally:
+            entry["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            self.record(entry)
+
+    def close(self):
+        if self._log:
+            self._log.close()
+            self._log = None
+
+
+def print_counts(proxy):
+    """Per-rule summary of what was injected (delays in ms)."""
+    print(f"\n💉 Injected ({proxy.upstream})")
+    print(f"{'Rule':<16} {'Requests':>9} {'Delayed':>8} {'Avg ms':>8} {'Max ms':>8} {'5xx':>6} "
+          f"{'Reset':>6} {'RstAft':>6} {'Bytes':>12}")
+    print("-" * 87)
+    for name, c in proxy.counts.items():
+        if not c["requests"]:
+            continue
+        avg = c["delay"] / c["delayed"] if c["delayed"] else 0.0
+        print(f"{name[:16]:<16} {c['requests']:>9} {c['delayed']:>8} {avg:>8.1f} {c['max_delay']:>8.1f} "
+              f"{c['error']:>6} {c['reset']:>6} {c['reset_after']:>6} {c['bytes']:>12,}")
+    lost = sum(c["upstream_errors"] for c in proxy.counts.values())
+    if lost:
+        print(f"   ⚠️ {lost} request(s) got 502 because the upstream could not be reached")
+
+
+async def serve(proxy, host="127.0.0.1", port=8080):
+    return await asyncio.start_server(proxy.handle, host, port, limit=MAX_HEAD, reuse_address=True, backlog=4096)
+
+
+@contextmanager
+def running_proxy(upstream=DEFAULT_UPSTREAM, rules=(), seed=None, log_path=None, port=0):
+    """`with running_proxy(host, rules) as (url, proxy):` runs a FaultProxy on a daemon thread."""
+    proxy = FaultProxy(upstream, rules, seed, log_path)
+    loop = new_event_loop()
+    ready = threading.Event()
+    state = {}
+
+    def run():
+        asyncio.set_event_loop(loop)
+        state["server"] = loop.run_until_complete(serve(proxy, "127.0.0.1", port))
+        ready.set()
+        loop.run_forever()
+        # Drop kept-alive connections too, so pooled clients don't wait on a stopped proxy
+        for transport in list(proxy.connections):
+            transport.abort()
+        tasks = asyncio.all_tasks(loop)
+        for task in tasks:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        loop.close()
+
+    thread = threading.Thread(target=run, daemon=True, name="fault-proxy")
+    thread.start()
+    ready.wait()
+    try:
+        yield f"http://127.0.0.1:{state['server'].sockets[0].getsockname()[1]}", proxy
+    finally:
+        loop.call_soon_threadsafe(lambda: (state["server"].close(), loop.stop()))
+        thread.join(5)
+        proxy.close()
+
+
+# ==========================================
+# CLI
+# ==========================================
+
+def parse_listen(text):
+    host, _, port = text.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utils.loadtest.proxy",
+                                     description="Reverse proxy injecting latency, bandwidth caps, 5xx and resets.")
+    parser.add_argument("--listen", type=parse_listen, default=("127.0.0.1", 8080), metavar="HOST:PORT",
+                        help="proxy address (default: 127.0.0.1:8080)")
+    parser.add_argument("--upstream", help=f"backend base URL (default: the config's, else {DEFAULT_UPSTREAM})")
+    parser.add_argument("--config", metavar="FILE", help="JSON fault rules (see the module docstring)")
+    parser.add_argument("--log", metavar="FILE", help="append every request and what was injected as NDJSON")
+    parser.add_argument("--seed", type=int, help="seed for the fault draws (default: the config's, else 0)")
+    quick = parser.add_argument_group("catch-all rule", "applied to requests no config rule matches")
+    quick.add_argument("--match", default=".", metavar="REGEX", help="limit the catch-all rule to these paths")
+    quick.add_argument("--latency", metavar="SPEC", help="e.g. 20, 10-50, exp:40, lognormal:40:0.8, 5+spike:0.01:2000")
+    quick.add_argument("--bandwidth", metavar="SIZE", help="bytes per second each way, e.g. 512KB")
+    quick.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with --error-status")
+    quick.add_argument("--error-status", type=int, default=503)
+    quick.add_argument("--reset-rate", type=float, default=0.0, help="share of connections reset before forwarding")
+    quick.add_argument("--reset-after-rate", type=float, default=0.0,
+                       help="share of connections reset after the backend answered")
+    args = parser.parse_args(argv)
+
+    try:
+        config = load_config(args.config)
+        rules = config["rules"]
+        if args.latency or args.bandwidth or args.error_rate or args.reset_rate or args.reset_after_rate:
+            rules.append(Rule("flags", args.match, latency=args.latency, bandwidth=args.bandwidth,
+                              error_rate=args.error_rate, error_status=args.error_status,
+                              reset_rate=args.reset_rate, reset_after_rate=args.reset_after_rate))
+        seed = args.seed if args.seed is not None else config["seed"] or 0
+        proxy = FaultProxy(args.upstream or config["upstream"] or DEFAULT_UPSTREAM, rules, seed, args.log)
+    except (OSError, ValueError, re.error) as e:
+        parser.error(str(e))
+
+    loop = new_event_loop()
+    asyncio.set_event_loop(loop)
+    host, port = args.listen
+    server = loop.run_until_complete(serve(proxy, host, port))
+    signal.signal(signal.SIGTERM, lambda *_: loop.call_soon_threadsafe(loop.stop))  # `kill` still gets the summary
+    print(f"💉 Fault proxy on http://{host}:{port} -> {proxy.upstream} "
+          f"({len(proxy.rules) - 1} rule(s), seed {seed}{f', log {args.log}' if args.log else ''})")
+    for rule in proxy.rules[:-1]:
+        faults = [f"latency {rule.latency_spec}" if rule.latency else "",
+                  f"{rule.bandwidth:,} B/s" if rule.bandwidth else "",
+                  f"{rule.error_rate:.1%} {rule.error_status}" if rule.error_rate else "",
+                  f"{rule.reset_rate:.1%} reset" if rule.reset_rate else "",
+                  f"{rule.reset_after_rate:.1%} reset after" if rule.reset_after_rate else ""]
+        print(f"   ↳ {rule.name}: {rule.pattern.pattern}{' ' + '/'.join(sorted(rule.methods)) if rule.methods else ''}"
+              f" -> {', '.join(f for f in faults if f) or 'pass through'}")
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        loop.close()
+        proxy.close()
+    print_counts(proxy)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
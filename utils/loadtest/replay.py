@@ -0,0 +1,523 @@
+"""
+Record API traffic into a trace file and replay it at any speed.
+
+Recording hooks the requests sessions of the utils scripts. Set
+LOADTEST_RECORD and every session made by httpClient.create_session() is
+captured, with no change to the script:
+
+    LOADTEST_RECORD=traces/progress.ndjson.gz python -m utils.simulate_progress
+
+Traffic captured by a proxy or a browser (mitmproxy, ZAP, DevTools...)
+comes in as a HAR export:
+
+    python -m utils.loadtest.replay import capture.har -o traces/incident.ndjson.gz
+
+A trace is NDJSON (gzip when the name ends in .gz): a header line, then
+one line per request with its start offset, stream, request, status and
+response time. Correlations are inferred when the trace is written. An
+ObjectId or a JWT that a response (JSON body or Set-Cookie) produced and
+a later request sent back is a rule: "take entry 12's `id` and put it
+where 1f0c... was". Replay applies the rules to fresh responses, so new
+courses/lessons/quizzes and new tokens flow through the whole trace:
+
+    python -m utils.loadtest.replay play traces/incident.ndjson.gz --speed 4 --copies 20
+    python -m utils.loadtest.replay info traces/incident.ndjson.gz
+
+Each stream (one session on one thread) replays in order on its own
+thread at its recorded offsets divided by --speed (or back to back with
+--speed max). A request that needs a value waits for the response that
+produces it. Copies and traces all replay concurrently, each copy with
+its own values.
+"""
+import argparse
+import atexit
+import base64
+import gzip
+import json
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from utils.httpClient import HOST, RECORD_ENV, create_session
+
+from .stats import StatsCollector, print_report, write_csv, write_json
+
+TRACE_VERSION = 1
+MAX_BODY = 1024 * 1024         # larger request bodies are left out and their requests skipped on replay
+DEPENDENCY_TIMEOUT = 60        # seconds a request waits for the response producing one of its values
+RECORDED_HEADERS = ("Authorization", "Cookie", "Content-Type", "Range", "Accept")
+
+# Values worth correlating: Mongo ObjectIds and JWTs (the `token` cookie)
+CORRELATED = re.compile(r"\b[0-9a-fA-F]{24}\b|\beyJ[\w-]+\.[\w-]+\.[\w-]+")
+OBJECT_ID = re.compile(r"\b[0-9a-fA-F]{24}\b")
+
+
+def open_trace(path, mode="r"):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def request_template(method, url):
+    """Transaction name for a request: method and path with ids replaced, e.g. "GET /api/courses/:id"."""
+    return f"{method} {OBJECT_ID.sub(':id', urlsplit(url).path)}"
+
+
+def find_values(data, path=()):
+    """Yield (json path, value) for every correlatable string in a decoded JSON document."""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            yield from find_values(value, path + (key,))
+    elif isinstance(data, list):
+        for index, value in enumerate(data):
+            yield from find_values(value, path + (index,))
+    elif isinstance(data, str) and CORRELATED.fullmatch(data):
+        yield list(path), data
+
+
+def value_at(data, path):
+    for step in path:
+        try:
+            data = data[step]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return data if isinstance(data, str) else None
+
+
+def encode_body(body):
+    """Request body as trace JSON: text when it decodes, base64 otherwise, omitted when too large."""
+    if body is None:
+        return None
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    if not isinstance(body, bytes):
+        return {"omitted": None}  # a streamed body (file object / generator)
+    if len(body) > MAX_BODY:
+        return {"omitted": len(body)}
+    try:
+        return body.decode("utf-8")
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(body).decode("ascii")}
+
+
+# ==========================================
+# RECORDING
+# ==========================================
+
+class Recorder:
+    """
+    Collects requests from the sessions it is attached to and writes a
+    trace, with correlation rules, on save().
+    """
+
+    def __init__(self, host=None):
+        self.host = host
+        self.entries = []
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._streams = {}
+        self._sessions = 0
+
+    def attach(self, session):
+        """Record `session`'s requests; each (session, thread) pair becomes one stream. Idempotent."""
+        if getattr(session, "trace_recorder", None) is self:
+            return session
+        session.trace_recorder = self
+        with self._lock:
+            self._sessions += 1
+            session_key = self._sessions
+        session.hooks.setdefault("response", []).append(
+            lambda response, *args, **kwargs: self._record(session_key, response, **kwargs))
+        return session
+
+    def _stream(self, session_key):
+        key = (session_key, threading.get_ident())
+        with self._lock:
+            return self._streams.setdefault(key, len(self._streams))
+
+    def _record(self, session_key, response, **kwargs):
+        request = response.request
+        finished = time.time()
+        produced = []
+        # A streamed body (downloads) is left unread so the caller still gets it
+        if not kwargs.get("stream") and "json" in response.headers.get("Content-Type", ""):
+            try:
+                produced = list(find_values(response.json()))
+            except ValueError:
+                pass
+        produced += [[["$cookie", name], value] for name, value in response.cookies.items()
+                     if CORRELATED.fullmatch(value)]
+        parts = urlsplit(request.url)
+        self.add({
+            "t": finished - response.elapsed.total_seconds() - self.started,
+            "stream": self._stream(session_key),
+            "method": request.method,
+            "url": parts.path + (f"?{parts.query}" if parts.query else ""),
+            "headers": {h: request.headers[h] for h in RECORDED_HEADERS if h in request.headers},
+            "body": encode_body(request.body),
+            "status": response.status_code,
+            "elapsed": response.elapsed.total_seconds(),
+            "produces": produced,
+        }, host=f"{parts.scheme}://{parts.netloc}")
+
+    def add(self, entry, host=None):
+        with self._lock:
+            if self.host is None and host:
+                self.host = host
+            self.entries.append(entry)
+
+    def save(self, path):
+        entries = infer_correlations(self.entries)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open_trace(path, "w") as f:
+            f.write(json.dumps({
+                "type": "trace",
+                "version": TRACE_VERSION,
+                "host": self.host,
+                "recorded_at": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+                "requests": len(entries),
+                "streams": len({e["stream"] for e in entries}),
+                "rules": sum(len(e["produces"]) for e in entries),
+            }) + "\n")
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        return len(entries)
+
+
+def infer_correlations(entries):
+    """
+    Sort entries by start time, number them, and keep only the produced
+    values a later request sends back; each such request lists the
+    values it uses. A value only counts as produced if its response had
+    arrived before the later request started.
+    """
+    entries = sorted(entries, key=lambda e: e["t"])
+    producers = {}
+    used = set()
+    for index, entry in enumerate(entries):
+        entry["i"] = index
+        sent = " ".join([entry["url"], *entry["headers"].values(),
+                         entry["body"] if isinstance(entry["body"], str) else ""])
+        entry["uses"] = sorted({value for value in CORRELATED.findall(sent)
+                                if value in producers and producers[value][1] <= entry["t"]})
+        used.update(entry["uses"])
+        for _, value in entry["produces"]:
+            producers.setdefault(value, (index, entry["t"] + entry["elapsed"]))
+    for entry in entries:
+        seen = set()
+        entry["produces"] = [[path, value] for path, value in entry["produces"]
+                             if value in used and producers[value][0] == entry["i"]
+                             and not (value in seen or seen.add(value))]
+    return entries
+
+
+_recorder = None
+
+
+def global_recorder():
+    """
+    The recorder httpClient attaches every new session to when
+    LOADTEST_RECORD is set; the trace is written there at exit.
+    """
+    global _recorder
+    if _recorder is None:
+        _recorder = Recorder()
+        path = os.environ[RECORD_ENV]
+        atexit.register(lambda: print(f"🎙️  {_recorder.save(path)} requests recorded to {path}"))
+    return _recorder
+
+
+def import_har(path):
+    """Build a Recorder from a HAR capture; one stream per HAR connection (or page)."""
+    with open(path, encoding="utf-8") as f:
+        har = json.load(f)
+    entries = har["log"]["entries"]
+    if not entries:
+        return Recorder()
+    starts = [datetime.fromisoformat(e["startedDateTime"].replace("Z", "+00:00")).timestamp() for e in entries]
+    recorder = Recorder()
+    recorder.started = min(starts)
+    streams = {}
+    for started, item in zip(starts, entries):
+        request, response = item["request"], item["response"]
+        parts = urlsplit(request["url"])
+        headers = {h["name"].title(): h["value"] for h in request.get("headers", [])}
+        produced = []
+        content = response.get("content", {})
+        if "json" in content.get("mimeType", "") and content.get("text"):
+            text = content["text"]
+            if content.get("encoding") == "base64":
+                text = base64.b64decode(text).decode("utf-8", "replace")
+            try:
+                produced = list(find_values(json.loads(text)))
+            except ValueError:
+                pass
+        for header in response.get("headers", []):
+            if header["name"].lower() == "set-cookie":
+                name, _, rest = header["value"].partition("=")
+                value = rest.split(";", 1)[0]
+                if CORRELATED.fullmatch(value):
+                    produced.append([["$cookie", name.strip()], value])
+        stream_key = item.get("connection") or item.get("pageref") or ""
+        recorder.add({
+            "t": started - recorder.started,
+            "stream": streams.setdefault(stream_key, len(streams)),
+            "method": request["method"],
+            "url": parts.path + (f"?{parts.query}" if parts.query else ""),
+            "headers": {h: headers[h] for h in RECORDED_HEADERS if h in headers},
+            "body": encode_body(request.get("postData", {}).get("text")),
+            "status": response["status"],
+            "elapsed": max(item.get("time", 0), 0) / 1000,
+            "produces": produced,
+        }, host=f"{parts.scheme}://{parts.netloc}")
+    return recorder
+
+
+# ==========================================
+# REPLAY
+# ==========================================
+
+class Trace:
+    def __init__(self, path):
+        self.path = path
+        with open_trace(path) as f:
+            self.header = json.loads(f.readline())
+            self.entries = [json.loads(line) for line in f if line.strip()]
+        if self.header.get("type") != "trace":
+            raise ValueError(f"{path} is not a trace file")
+        self.producer = {value: entry["i"] for entry in self.entries for _, value in entry["produces"]}
+
+    def streams(self):
+        streams = {}
+        for entry in self.entries:
+            streams.setdefault(entry["stream"], []).append(entry)
+        return streams
+
+    @property
+    def duration(self):
+        return max((e["t"] + e["elapsed"] for e in self.entries), default=0.0)
+
+
+class TraceReplay:
+    """
+    One copy of a trace: its own sessions and its own recorded → fresh
+    value map. Streams run on their own threads; a request waits for the
+    responses that produce the values it uses.
+    """
+
+    def __init__(self, trace, host, speed, stats, timeout=30, stop_event=None):
+        self.trace = trace
+        self.host = host.rstrip("/")
+        self.speed = speed
+        self.stats = stats
+        self.timeout = timeout
+        self.stop_event = stop_event or threading.Event()
+        self.values = {}
+        self.done = [threading.Event() for _ in trace.entries]
+        self.skipped = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def substitute(self, text):
+        return CORRELATED.sub(lambda m: self.values.get(m.group(0), m.group(0)), text)
+
+    def _send(self, session, entry):
+        body = entry["body"]
+        if isinstance(body, dict) and "omitted" in body:
+            with self._lock:
+                self.skipped += 1
+            return
+        for value in entry["uses"]:
+            producer = self.trace.producer.get(value)
+            if producer is not None and not self.done[producer].wait(DEPENDENCY_TIMEOUT):
+                raise TimeoutError(f"entry {entry['i']} waited too long for entry {producer}")
+        if isinstance(body, dict):
+            data = base64.b64decode(body["base64"])
+        elif body is not None:
+            data = self.substitute(body).encode("utf-8")
+        else:
+            data = None
+        headers = {name: self.substitute(value) for name, value in entry["headers"].items()}
+
+        name = request_template(entry["method"], entry["url"])
+        started = time.perf_counter()
+        try:
+            response = session.request(entry["method"], self.host + self.substitute(entry["url"]),
+                                       data=data, headers=headers, timeout=self.timeout)
+        except Exception:
+            self.stats.record(name, time.perf_counter() - started, ok=False)
+            raise
+        elapsed = time.perf_counter() - started
+        ok = response.status_code // 100 == entry["status"] // 100
+        self.stats.record(name, elapsed, ok=ok)
+        if not ok:
+            with self._lock:
+                self.failed += 1
+
+        if entry["produces"]:
+            try:
+                document = response.json()
+            except ValueError:
+                document = None
+            for path, old in entry["produces"]:
+                new = response.cookies.get(path[1]) if path and path[0] == "$cookie" else value_at(document, path)
+                if new:
+                    with self._lock:
+                        self.values[old] = new
+
+    def _run_stream(self, entries, started):
+        session = create_session(pool_maxsize=2, retries=0)
+        try:
+            for entry in entries:
+                if self.speed:
+                    delay = started + entry["t"] / self.speed - time.perf_counter()
+                    if delay > 0 and self.stop_event.wait(delay):
+                        return
+                if self.stop_event.is_set():
+                    return
+                try:
+                    self._send(session, entry)
+                except Exception:
+                    with self._lock:
+                        self.failed += 1
+                finally:
+                    self.done[entry["i"]].set()
+        finally:
+            session.close()
+            for entry in entries:
+                self.done[entry["i"]].set()  # never leave another stream waiting on an abandoned one
+
+    def start(self):
+        started = time.perf_counter()
+        self.threads = [threading.Thread(target=self._run_stream, args=(entries, started), daemon=True,
+                                         name=f"replay-stream-{stream}")
+                        for stream, entries in self.trace.streams().items()]
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def join(self):
+        for thread in self.threads:
+            thread.join()
+
+
+def replay(traces, host=HOST, speed=1.0, copies=1, timeout=30, stagger=0.0):
+    """
+    Replay every trace `copies` times at once. speed is the time factor
+    (2 = twice as fast, 0 = back to back); copy k starts k * stagger
+    seconds late. Returns (StatsCollector, replays).
+    """
+    stats = StatsCollector()
+    stop_event = threading.Event()
+    replays = []
+    stats.start()
+    try:
+        for copy in range(copies):
+            if copy and stagger and stop_event.wait(stagger):
+                break
+            for trace in traces:
+                replays.append(TraceReplay(trace, host, speed, stats, timeout, stop_event).start())
+        for item in replays:
+            item.join()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping replay...")
+        stop_event.set()
+        for item in replays:
+            item.join()
+    finally:
+        stats.stop()
+    return stats, replays
+
+
+def parse_speed(text):
+    if text.lower() in ("max", "0"):
+        return 0.0
+    speed = float(text.lower().rstrip("x"))
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be positive or 'max'")
+    return speed
+
+
+def print_trace_info(trace):
+    header = trace.header
+    rules = sum(len(e["produces"]) for e in trace.entries)
+    static = sorted({v for e in trace.entries for v in OBJECT_ID.findall(e["url"]) if v not in trace.producer})
+    print(f"🎞️  {trace.path}")
+    print(f"   Recorded: {header.get('recorded_at')} against {header.get('host')}")
+    print(f"   Requests: {len(trace.entries)} in {len(trace.streams())} streams over {trace.duration:.1f}s")
+    print(f"   Correlation rules: {rules}   Static ids (replayed as recorded): {len(static)}")
+    counts = {}
+    for entry in trace.entries:
+        name = request_template(entry["method"], entry["url"])
+        counts[name] = counts.get(name, 0) + 1
+    for name, count in sorted(counts.items(), key=lambda item: -item[1]):
+        print(f"   {count:>6}  {name}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utils.loadtest.replay",
+                                     description="Import, inspect and replay API traffic traces.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    har = commands.add_parser("import", help="convert a HAR capture into a trace")
+    har.add_argument("har")
+    har.add_argument("-o", "--output", required=True, help="trace file (.ndjson or .ndjson.gz)")
+
+    info = commands.add_parser("info", help="summarize traces")
+    info.add_argument("traces", nargs="+")
+
+    play = commands.add_parser("play", help="replay traces")
+    play.add_argument("traces", nargs="+")
+    play.add_argument("--host", default=HOST, help="backend base URL (default: %(default)s)")
+    play.add_argument("--speed", type=parse_speed, default=1.0,
+                      help="time factor: 1 = as recorded, 4 = four times faster, max = back to back")
+    play.add_argument("--copies", type=int, default=1, help="concurrent copies of every trace")
+    play.add_argument("--stagger", type=float, default=0.0, help="seconds between the starts of two copies")
+    play.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    play.add_argument("--json", metavar="FILE", help="write the transaction summary as JSON")
+    play.add_argument("--csv", metavar="FILE", help="write the transaction summary as CSV")
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        count = import_har(args.har).save(args.output)
+        print(f"💾 {count} requests written to {args.output}")
+        print_trace_info(Trace(args.output))
+        return 0
+
+    try:
+        traces = [Trace(path) for path in args.traces]
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 2
+    if args.command == "info":
+        for trace in traces:
+            print_trace_info(trace)
+        return 0
+
+    if args.copies < 1:
+        parser.error("--copies must be at least 1")
+    speed = "max speed" if not args.speed else f"{args.speed:g}x"
+    print(f"▶️  Replaying {len(traces)} trace(s) x {args.copies} against {args.host} at {speed}")
+    stats, replays = replay(traces, host=args.host, speed=args.speed, copies=args.copies,
+                            timeout=args.timeout, stagger=args.stagger)
+    rows = stats.report()
+    print_report(rows, stats.wall_time)
+    failed = sum(r.failed for r in replays)
+    skipped = sum(r.skipped for r in replays)
+    print(f"\n🔁 {len(replays)} replays: {failed} requests failed or answered differently, "
+          f"{skipped} skipped (body not recorded)")
+    if args.json:
+        write_json(args.json, rows, stats.wall_time)
+        print(f"💾 Summary saved to: {args.json}")
+    if args.csv:
+        write_csv(args.csv, rows)
+        print(f"💾 Summary saved to: {args.csv}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
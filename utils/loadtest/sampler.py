@@ -0,0 +1,495 @@
+"""
+Server-side resource sampler, lined up with client latencies.
+
+A background thread reads /proc every `interval` seconds for the Node
+server and mongod (found by command line, or given by PID) and for the
+host: CPU, RSS, disk read/write bytes, open sockets and threads per
+process; CPU/iowait, disk utilisation, network bytes and available memory
+for the system. Reading /proc costs a few file reads per tick, nothing
+is spawned.
+
+Samples are stamped with time.time(), the clock StatsCollector timelines
+use, so one timeline file holds both and `report` shows them interval by
+interval. Intervals whose p99 spikes are flagged with the server-side
+reading that stands out (disk saturation, CPU, a drop in Node's RSS that
+points at a major GC).
+
+    python -m utils.loadtest --sample run.ndjson ...        # load test + sampler, same host
+    LOADTEST_SAMPLE=seed.ndjson python -m utils.HOLY         # any utils script
+    python -m utils.loadtest.sampler record server.ndjson   # on the server host, Ctrl-C to stop
+    python -m utils.loadtest.sampler report run.ndjson [server.ndjson]
+
+Across hosts, the timestamps are only as close as the hosts' clocks (NTP).
+"""
+import argparse
+import atexit
+import json
+import math
+import os
+import re
+import signal
+import socket
+import sys
+import threading
+import time
+
+from .stats import percentile
+
+DEFAULT_INTERVAL = 1.0
+# name -> regex over the command line (NUL-separated argv joined by spaces)
+DEFAULT_PROCESSES = {
+    "node": r"(^|/)node(js)?\s.*server\.js",
+    "mongod": r"(^|/)mongod(\s|$)",
+}
+RESCAN_TICKS = 5  # look for a missing process again every this many ticks
+SPIKE_FACTOR = 2.0  # p99 above this many times the run's median p99
+CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+SECTOR = 512
+MB = 1024 * 1024
+
+
+def _read(path):
+    with open(path, encoding="ascii", errors="replace") as f:
+        return f.read()
+
+
+# ==========================================
+# PROBES
+# ==========================================
+
+def find_processes(patterns=None):
+    """{name: pid} of the first process whose command line matches each pattern."""
+    patterns = {name: re.compile(p) for name, p in (patterns or DEFAULT_PROCESSES).items()}
+    found = {}
+    own = os.getpid()
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit() or int(entry) == own:
+            continue
+        try:
+            cmdline = _read(f"/proc/{entry}/cmdline").replace("\0", " ").strip()
+        except OSError:
+            continue
+        for name, pattern in patterns.items():
+            if name not in found and cmdline and pattern.search(cmdline):
+                found[name] = int(entry)
+    return found
+
+
+class ProcessProbe:
+    """Cumulative counters of one PID; read() raises OSError once it is gone."""
+
+    def __init__(self, name, pid):
+        self.name = name
+        self.pid = pid
+        self.io_readable = True
+
+    def read(self):
+        stat = _read(f"/proc/{self.pid}/stat")
+        fields = stat[stat.rindex(")") + 2:].split()  # the command name may contain spaces
+        counters = {
+            "cpu": (int(fields[11]) + int(fields[12])) / CLK_TCK,  # utime + stime
+            "threads": int(fields[17]),
+            "rss": int(_read(f"/proc/{self.pid}/statm").split()[1]) * PAGE_SIZE,
+            "read": None,
+            "write": None,
+        }
+        if self.io_readable:
+            try:
+                for line in _read(f"/proc/{self.pid}/io").splitlines():
+                    key, _, value = line.partition(":")
+                    if key == "read_bytes":
+                        counters["read"] = int(value)
+                    elif key == "write_bytes":
+                        counters["write"] = int(value)
+            except PermissionError:
+                self.io_readable = False  # another user's process; needs root
+        counters["sockets"] = self._sockets()
+        return counters
+
+    def _sockets(self):
+        count = 0
+        fd_dir = f"/proc/{self.pid}/fd"
+        try:
+            for fd in os.listdir(fd_dir):
+                try:
+                    count += os.readlink(f"{fd_dir}/{fd}").startswith("socket:")
+                except OSError:
+                    pass  # closed while we were looking
+        except PermissionError:
+            return None
+        return count
+
+
+class SystemProbe:
+    """Host-wide cumulative counters."""
+
+    def __init__(self):
+        self.disks = [name for name in os.listdir("/sys/block")
+                      if not name.startswith(("loop", "ram", "zram", "dm-"))] if os.path.isdir("/sys/block") else []
+
+    def read(self):
+        cpu = [int(v) for v in _read("/proc/stat").splitlines()[0].split()[1:9]]
+        counters = {"cpu_total": sum(cpu), "cpu_idle": cpu[3], "cpu_iowait": cpu[4],
+                    "disk_read": 0, "disk_write": 0, "disk_busy": {}}
+        for line in _read("/proc/diskstats").splitlines():
+            parts = line.split()
+            if len(parts) >= 13 and parts[2] in self.disks:
+                counters["disk_read"] += int(parts[5]) * SECTOR
+                counters["disk_write"] += int(parts[9]) * SECTOR
+                counters["disk_busy"][parts[2]] = int(parts[12]) / 1000  # io_ticks, ms
+        rx = tx = 0
+        for line in _read("/proc/net/dev").splitlines()[2:]:
+            name, _, data = line.partition(":")
+            if name.strip() != "lo":
+                values = data.split()
+                rx += int(values[0])
+                tx += int(values[8])
+        counters["net_rx"], counters["net_tx"] = rx, tx
+        for line in _read("/proc/meminfo").splitlines():
+            if line.startswith("MemAvailable:"):
+                counters["mem_available"] = int(line.split()[1]) * 1024
+        return counters
+
+
+def _rate(now, before, key, dt):
+    if now.get(key) is None or before.get(key) is None:
+        return None
+    return max(now[key] - before[key], 0) / dt
+
+
+def process_sample(now, before, dt):
+    return {
+        "cpu": _rate(now, before, "cpu", dt) * 100,
+        "rss": now["rss"],
+        "read": _rate(now, before, "read", dt),
+        "write": _rate(now, before, "write", dt),
+        "sockets": now["sockets"],
+        "threads": now["threads"],
+    }
+
+
+def system_sample(now, before, dt):
+    total = max(now["cpu_total"] - before["cpu_total"], 1)
+    idle = now["cpu_idle"] - before["cpu_idle"]
+    iowait = now["cpu_iowait"] - before["cpu_iowait"]
+    busy = [max(now["disk_busy"][d] - before["disk_busy"].get(d, now["disk_busy"][d]), 0) / dt
+            for d in now["disk_busy"]]
+    return {
+        "cpu": (total - idle - iowait) / total * 100,
+        "iowait": iowait / total * 100,
+        "disk_util": min(max(busy, default=0.0) * 100, 100.0),
+        "disk_read": _rate(now, before, "disk_read", dt),
+        "disk_write": _rate(now, before, "disk_write", dt),
+        "net_rx": _rate(now, before, "net_rx", dt),
+        "net_tx": _rate(now, before, "net_tx", dt),
+        "mem_available": now.get("mem_available"),
+    }
+
+
+# ==========================================
+# SAMPLER
+# ==========================================
+
+class ResourceSampler:
+    """
+    Sample `processes` ({name: pid}, or patterns to look for) and the host
+    every `interval` seconds on a daemon thread. `collector` is a
+    StatsCollector(timeline=True) whose transactions write() adds to the
+    file, bucketed on the same interval.
+    """
+
+    def __init__(self, processes=None, interval=DEFAULT_INTERVAL, collector=None, patterns=None):
+        self.interval = interval
+        self.collector = collector
+        self.patterns = patterns if patterns is not None else ({} if processes else DEFAULT_PROCESSES)
+        self.probes = {name: ProcessProbe(name, pid) for name, pid in (processes or {}).items()}
+        self.system = SystemProbe()
+        self.samples = []
+        self.started_at = None
+        self._previous = {}
+        self.stopping = threading.Event()
+        self._thread = None
+        self._rescan()
+
+    def _rescan(self):
+        missing = {name: p for name, p in self.patterns.items() if name not in self.probes}
+        if missing:
+            for name, pid in find_processes(missing).items():
+                self.probes[name] = ProcessProbe(name, pid)
+
+    def _counters(self):
+        counters = {"system": self.system.read()}
+        for name, probe in list(self.probes.items()):
+            try:
+                counters[name] = probe.read()
+            except OSError:  # exited (or restarted under a new PID)
+                del self.probes[name]
+                self._previous.pop(name, None)
+        return counters
+
+    def sample(self):
+        """Take one sample now; the first one only primes the counters."""
+        now = time.time()
+        counters = self._counters()
+        previous, self._previous = self._previous, dict(counters, t=now)
+        if not previous:
+            return None
+        dt = max(now - previous["t"], 1e-6)
+        sample = {"type": "sample", "t": now}
+        for name, values in counters.items():
+            if name in previous:
+                sample[name] = system_sample(values, previous[name], dt) if name == "system" \
+                    else dict(process_sample(values, previous[name], dt), pid=self.probes[name].pid)
+        self.samples.append(sample)
+        return sample
+
+    def _run(self):
+        ticks = 0
+        next_at = time.time()
+        while not self.stopping.is_set():
+            try:
+                self.sample()
+            except OSError:
+                pass  # /proc unavailable for one tick
+            ticks += 1
+            if ticks % RESCAN_TICKS == 0:
+                self._rescan()
+            next_at += self.interval
+            self.stopping.wait(max(0.0, next_at - time.time()))
+
+    def start(self):
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="resource-sampler")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.stopping.set()
+        if self._thread:
+            self._thread.join(self.interval + 1)
+        return self
+
+    def write(self, path):
+        """The timeline file: a meta line, the samples and the collector's transaction buckets."""
+        meta = {"type": "meta", "host": socket.gethostname(), "interval": self.interval,
+                "started_at": self.started_at,
+                "processes": {name: probe.pid for name, probe in self.probes.items()}}
+        with open(path, "w", encoding="utf-8") as f:
+            for record in [meta] + self.samples + transaction_timeline(self.collector, self.interval):
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        return path
+
+
+def transaction_timeline(collector, interval):
+    """Per-interval count, errors and latency percentiles of every transaction with events."""
+    if collector is None:
+        return []
+    rows = []
+    for name, stats in collector.merged().items():
+        if not stats.events:
+            continue
+        buckets = {}
+        events = stats.events
+        for i in range(0, len(events), 2):
+            buckets.setdefault(math.floor(events[i] / interval), []).append(events[i + 1])
+        for bucket, values in sorted(buckets.items()):
+            passed = sorted(v for v in values if v >= 0)
+            rows.append({"type": "tx", "t": (bucket + 1) * interval, "name": name, "count": len(values),
+                         "errors": len(values) - len(passed), "p50": percentile(passed, 50),
+                         "p99": percentile(passed, 99), "max": passed[-1] if passed else 0.0})
+    return rows
+
+
+# ==========================================
+# REPORT
+# ==========================================
+
+def load_timeline(paths):
+    """(meta list, samples, tx rows) from one or more timeline files, merged by time."""
+    metas, samples, txs = [], [], []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                {"meta": metas, "sample": samples, "tx": txs}.get(record.get("type"), []).append(record)
+    samples.sort(key=lambda s: s["t"])
+    txs.sort(key=lambda r: r["t"])
+    return metas, samples, txs
+
+
+def process_names(samples):
+    """Sampled process names, node and mongod first."""
+    names = {name for sample in samples for name in sample if name not in ("type", "t", "system")}
+    return sorted(names, key=lambda n: (n not in DEFAULT_PROCESSES, list(DEFAULT_PROCESSES).index(n)
+                                        if n in DEFAULT_PROCESSES else 0, n))
+
+
+def attribute(sample, previous):
+    """What on the server side stands out in `sample` (empty when nothing does)."""
+    if not sample:
+        return []
+    causes = []
+    system = sample.get("system", {})
+    if system.get("disk_util", 0) >= 80 or system.get("iowait", 0) >= 20:
+        causes.append(f"disk saturated ({system['disk_util']:.0f}% util, {system['iowait']:.0f}% iowait)")
+    for name in process_names([sample]):
+        proc = sample[name]
+        if proc["cpu"] >= 90:
+            causes.append(f"{name} CPU {proc['cpu']:.0f}%")
+        if proc.get("write") and proc["write"] >= 20 * MB:
+            causes.append(f"{name} writing {proc['write'] / MB:.0f} MB/s")
+        before = (previous or {}).get(name)
+        # V8 hands memory back after a major GC; a 10% RSS drop is the visible trace of one
+        if before and proc["rss"] < before["rss"] * 0.9:
+            causes.append(f"{name} RSS fell {(before['rss'] - proc['rss']) / MB:.0f} MB (major GC?)")
+    if system.get("cpu", 0) >= 90:
+        causes.append(f"host CPU {system['cpu']:.0f}%")
+    return causes
+
+
+def _fmt(value, scale=1.0, digits=0):
+    return "-" if value is None else f"{value / scale:.{digits}f}"
+
+
+def print_timeline(paths, spikes_only=False):
+    """
+    One line per interval: requests, worst p99 and its transaction, then
+    each process's CPU %, RSS, write MB/s and sockets and the host's CPU,
+    iowait and disk utilisation. Spikes (p99 over SPIKE_FACTOR times the
+    median) are flagged with attribute()'s findings. Returns the spikes
+    as (offset, bucket, causes).
+    """
+    metas, samples, txs = load_timeline(paths)
+    if not samples and not txs:
+        print("📭 Empty timeline")
+        return []
+    interval = max((m.get("interval") or DEFAULT_INTERVAL for m in metas), default=DEFAULT_INTERVAL)
+    by_bucket = {}
+    for row in txs:
+        bucket = by_bucket.setdefault(round(row["t"] / interval), {"count": 0, "errors": 0, "p99": 0.0, "name": ""})
+        bucket["count"] += row["count"]
+        bucket["errors"] += row["errors"]
+        if row["p99"] >= bucket["p99"]:
+            bucket["p99"], bucket["name"] = row["p99"], row["name"]
+    sample_at = {}
+    for sample in samples:
+        sample_at.setdefault(round(sample["t"] / interval), sample)
+    keys = sorted(set(by_bucket) | set(sample_at))
+    names = process_names(samples)
+    median = percentile(sorted(b["p99"] for b in by_bucket.values() if b["count"]), 50)
+    empty = {"count": 0, "errors": 0, "p99": 0.0, "name": ""}
+
+    print(f"\n📈 Timeline ({interval:g}s intervals; latencies in ms, I/O in MB/s)")
+    print(f"{'t':>6} {'req/s':>7} {'err':>4} {'p99':>8}  {'slowest':<22}"
+          + "".join(f"{name[:6] + ' cpu%':>12} {'rssMB':>6} {'wMB/s':>6} {'sock':>5}" for name in names)
+          + f" {'cpu%':>5} {'iow%':>5} {'disk%':>6}")
+    spikes = []
+    previous = None
+    for key in keys:
+        bucket = by_bucket.get(key, empty)
+        sample = sample_at.get(key) or {}
+        spike = bool(median) and bucket["p99"] > SPIKE_FACTOR * median
+        causes = attribute(sample, previous) if spike else []
+        if spike:
+            spikes.append(((key - keys[0]) * interval, bucket, causes))
+        previous = sample or previous
+        if spikes_only and not spike:
+            continue
+        line = (f"{(key - keys[0]) * interval:>6.0f} {bucket['count'] / interval:>7.1f} {bucket['errors']:>4} "
+                f"{bucket['p99'] * 1000:>8.1f}  {bucket['name'][:21]:<22}")
+        for name in names:
+            proc = sample.get(name) or {}
+            line += (f"{_fmt(proc.get('cpu')):>12} {_fmt(proc.get('rss'), MB):>6} "
+                     f"{_fmt(proc.get('write'), MB, 1):>6} {_fmt(proc.get('sockets')):>5}")
+        system = sample.get("system") or {}
+        line += f" {_fmt(system.get('cpu')):>5} {_fmt(system.get('iowait')):>5} {_fmt(system.get('disk_util')):>6}"
+        if spike:
+            line += "  ⚠️ " + ("; ".join(causes) or "no server-side cause seen")
+        print(line)
+    if spikes:
+        print(f"\n⚠️ {len(spikes)} intervals with p99 above {SPIKE_FACTOR:g}× the median ({median * 1000:.1f} ms)")
+    else:
+        print(f"   ✅ No p99 spikes (median p99 {median * 1000:.1f} ms)")
+    return spikes
+
+
+# ==========================================
+# PROCESS-WIDE SAMPLER
+# ==========================================
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def global_sampler(path=None):
+    """
+    Start the process-wide sampler once (LOADTEST_SAMPLE names its file)
+    with instrument's collector keeping a timeline; the file is written
+    when the process exits.
+    """
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            from .instrument import get_collector
+            from utils.httpClient import SAMPLE_ENV
+            path = path or os.environ[SAMPLE_ENV]
+            collector = get_collector()
+            collector.timeline = True
+            _sampler = ResourceSampler(collector=collector).start()
+            atexit.register(lambda: _sampler.stop().write(path))
+        return _sampler
+
+
+# ==========================================
+# CLI
+# ==========================================
+
+def parse_targets(values):
+    """NAME=PID pairs to {name: pid} and NAME=REGEX pairs to {name: regex}."""
+    pids, patterns = {}, {}
+    for value in values or ():
+        name, _, target = value.partition("=")
+        if target.isdigit():
+            pids[name] = int(target)
+        else:
+            patterns[name] = target
+    return pids, patterns
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utils.loadtest.sampler",
+                                     description="Sample the Node server, mongod and the host from /proc.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="sample until Ctrl-C or --duration")
+    record.add_argument("out", help="timeline file to write (NDJSON)")
+    record.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="seconds (default: %(default)s)")
+    record.add_argument("--duration", type=float, help="stop after this many seconds")
+    record.add_argument("--process", action="append", metavar="NAME=PID|REGEX",
+                        help="process to sample (default: node running server.js and mongod)")
+    report = commands.add_parser("report", help="print timeline files merged by time")
+    report.add_argument("files", nargs="+")
+    report.add_argument("--spikes", action="store_true", help="only the intervals with a p99 spike")
+    args = parser.parse_args(argv)
+
+    if args.command == "report":
+        print_timeline(args.files, spikes_only=args.spikes)
+        return 0
+
+    pids, patterns = parse_targets(args.process)
+    sampler = ResourceSampler(pids, args.interval, patterns=patterns if args.process else None)
+    found = ", ".join(f"{probe.name} ({probe.pid})" for probe in sampler.probes.values()) or "no processes found"
+    print(f"🔎 Sampling {found} and the host every {args.interval:g}s into {args.out}")
+    signal.signal(signal.SIGTERM, lambda *_: sampler.stopping.set())
+    sampler.start()
+    try:
+        sampler.stopping.wait(args.duration)
+    except KeyboardInterrupt:
+        pass
+    sampler.stop().write(args.out)
+    print(f"💾 {len(sampler.samples)} samples written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+"""
+The scenarios from QA_Performance_Test_Scenarios.md written as code.
+
+Only the API steps are modelled: frontend page loads, favicon and CORS
+preflights are served by the static site / browser and are left out.
+Think times are the ones from the controller summary table, and the
+admin/student/lesson/pdf values come from the parametros/ pools.
+"""
+import os
+import threading
+
+ADMIN_THINK = (3, 5)
+STUDENT_QUESTION_THINK = (5, 10)
+UPLOAD_THINK = (5, 10)
+READ_PDF_THINK = (15, 30)
+
+CATEGORIES = ["Secundaria", "Preparatoria"]
+
+QUIZ_QUESTIONS = [
+    {"title": "pregunta1", "type": "multiple-choice", "options": ["si", "no"], "correctAnswer": "si", "value": 1},
+    {"title": "pregunta 2", "type": "true-false", "correctAnswer": "True", "value": 1},
+]
+QUIZ_ANSWERS = ["si", "True"]
+
+
+def minimal_pdf(label="OMIAGS load test"):
+    """A tiny but valid single-page PDF, used when no PDF tier is given."""
+    text = f"BT /F1 12 Tf 72 720 Td ({label}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length " + str(len(text)).encode() + b" >>\nstream\n" + text + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+class Scenario:
+    """
+    A named sequence of transactions. `pacing` is "sequential" (next
+    iteration starts right away) or "random" (random delay in between).
+    `params` names the parameter pools the action draws from, so unique
+    pools can be checked against the VUser plan before a run starts.
+    """
+
+    def __init__(self, key, title, action, pacing="sequential", params=()):
+        self.key = key
+        self.title = title
+        self.action = action
+        self.pacing = pacing
+        self.params = tuple(params)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.iterations_passed = 0
+        self.iterations_failed = 0
+        self.last_error = None
+
+    def run(self, vuser):
+        self.action(vuser)
+
+    def iteration_done(self, ok, error=None):
+        with self._lock:
+            if ok:
+                self.iterations_passed += 1
+            else:
+                self.iterations_failed += 1
+                self.last_error = error
+
+
+def login(vuser, email, password, role):
+    """POST /api/auth/login + GET /api/auth/me; the `token` cookie stays in the session."""
+    data = vuser.expect(vuser.post("/api/auth/login", json={"email": email, "password": password}), 200)
+    vuser.check(data.get("message") == "Login exitoso", f"Login failed for {email}")
+    me = vuser.expect(vuser.get("/api/auth/me"), 200)
+    vuser.check(me.get("role") == role, f"{email} has role {me.get('role')}, expected {role}")
+    return me
+
+
+# ==========================================
+# SCENARIO 1: ADMIN SETUP -> STUDENT QUIZ
+# ==========================================
+
+def admin_setup_student_quiz(vuser):
+    admin_email, admin_password = vuser.admin()
+    student_email, student_password = vuser.student()
+    suffix = f"{vuser.id}-{vuser.iteration}"
+
+    with vuser.transaction("T01_LOGIN_ADMIN"):
+        login(vuser, admin_email, admin_password, "admin")
+    vuser.think(*ADMIN_THINK)
+
+    with vuser.transaction("T02_CREAR_CURSO"):
+        vuser.expect(vuser.get("/api/courses"), 200)
+        course = vuser.expect(vuser.post("/api/courses", json={
+            "title": f"cursoQuiz {suffix}",
+            "description": "cursoQuizDescripcion",
+            "category": "Secundaria",
+            "accessList": [student_email],
+        }), 201)
+        vuser.check(course.get("id"), "POST /api/courses did not return an id")
+        course_id = vuser.vars["courseId"] = course["id"]
+        vuser.expect(vuser.get("/api/enrollments/all"), 200)
+    vuser.think(1)
+
+    with vuser.transaction("T03_CREAR_QUIZ"):
+        vuser.expect(vuser.get(f"/api/lessons/{course_id}/lessons"), 200)
+        quiz = vuser.expect(vuser.post("/api/quizzes", json={
+            "title": "QuizTitulo", "description": "quizDescripcion", "questions": [],
+        }), 201)
+        vuser.check(quiz.get("_id"), "POST /api/quizzes did not return an _id")
+        quiz_id = vuser.vars["quizId"] = quiz["_id"]
+
+        vuser.expect(vuser.get(f"/api/quizzes/{quiz_id}"), 200)
+        vuser.expect(vuser.get("/api/quizzes/attempts", params={"quizId": quiz_id}), 200)
+        updated = vuser.expect(vuser.put(f"/api/quizzes/{quiz_id}", json={
+            "id": quiz_id,
+            "title": "QuizTitulo",
+            "description": "quizDescripcion",
+            "questions": QUIZ_QUESTIONS,
+            "deleteAttempts": False,
+        }), 200)
+        vuser.check(updated.get("maxScore") == 2, f"maxScore is {updated.get('maxScore')}, expected 2")
+
+        lesson = vuser.expect(vuser.post("/api/lessons", json={
+            "courseId": course_id,
+            "title": "leccionQuiz",
+            "description": "",
+            "contents": [{"title": "QuizTitulo", "type": "quiz", "quizId": quiz_id}],
+        }), 201)
+        vuser.check(lesson.get("_id"), "POST /api/lessons did not return an _id")
+        lesson_id = vuser.vars["lessonId"] = lesson["_id"]
+
+        vuser.expect(vuser.patch(f"/api/quizzes/{quiz_id}", json={"lessonId": lesson_id}), 200)
+        vuser.expect(vuser.get("/api/courses"), 200)
+        vuser.expect(vuser.get(f"/api/lessons/{course_id}/lessons"), 200)
+    vuser.think(*ADMIN_THINK)
+
+    with vuser.transaction("T04_LOGOUT_ADMIN"):
+        data = vuser.expect(vuser.post("/api/auth/logout"), 200)
+        vuser.check(data.get("message") == "Logout exitoso", "Logout failed")
+
+    with vuser.transaction("T05_LOGIN_STUDENT"):
+        login(vuser, student_email, student_password, "student")
+    vuser.think(*ADMIN_THINK)
+
+    with vuser.transaction("T06_NAVEGAR_CURSO"):
+        courses = vuser.expect(vuser.get("/api/courses"), 200)
+        vuser.check(any(c.get("id") == course_id for c in courses),
+                    f"Course {course_id} missing from {student_email}'s courses")
+        vuser.expect(vuser.get(f"/api/enrollments/status/{course_id}"), 200)
+        vuser.expect(vuser.get(f"/api/courses/{course_id}"), 200)
+    vuser.think(*STUDENT_QUESTION_THINK)
+
+    with vuser.transaction("T07_CONTESTAR_QUIZ"):
+        vuser.expect(vuser.get(f"/api/quizzes/{quiz_id}"), 200)
+        for index, answer in enumerate(QUIZ_ANSWERS):
+            res = vuser.post("/api/quizzes/submit-answer",
+                             json={"quizId": quiz_id, "questionIndex": index, "answer": answer})
+            vuser.check(not (res.status_code == 400 and "Question not allowed" in res.text),
+                        f"Question {index} not allowed for {student_email}")
+            result = vuser.expect(res, 200)
+            vuser.check(isinstance(result.get("correct"), bool) and "answer" in result,
+                        "submit-answer response is missing correct/answer")
+        score = vuser.expect(vuser.get("/api/quizzes/quiz-score", params={"quizId": quiz_id}), 200)
+        vuser.check("status" in score, "quiz-score response has no status")
+
+
+# ==========================================
+# SCENARIO 2: ADMIN DASHBOARD
+# ==========================================
+
+def admin_dashboard(vuser):
+    email, password = vuser.admin()
+
+    with vuser.transaction("T01_Login"):
+        data = vuser.expect(vuser.post("/api/auth/login", json={"email": email, "password": password}), 200)
+        vuser.check(data.get("message") == "Login exitoso", f"Login failed for {email}")
+    with vuser.transaction("T02_GetMe"):
+        me = vuser.expect(vuser.get("/api/auth/me"), 200)
+        vuser.check(me.get("role") == "admin", f"{email} is not an admin")
+    vuser.think(*ADMIN_THINK)
+
+    with vuser.transaction("T03_GetAdminCourses"):
+        courses = vuser.expect(vuser.get("/api/courses"), 200)
+    course_ids = [c["id"] for c in courses if c.get("id")]
+    vuser.think(*ADMIN_THINK)
+
+    with vuser.transaction("T04_GetMyStudents"):
+        students = vuser.expect(vuser.get("/api/enrollments/my-students"), 200)
+        vuser.check(isinstance(students, list), "my-students did not return an array")
+        for student in students:
+            missing = {"name", "email", "lessonProgress", "quizAverage"} - set(student)
+            vuser.check(not missing, f"my-students entry missing {', '.join(sorted(missing))}")
+    vuser.think(*ADMIN_THINK)
+
+    with vuser.transaction("T05_GetAllEnrollments"):
+        enrollments = vuser.expect(vuser.get("/api/enrollments/all"), 200)
+        vuser.check(isinstance(enrollments, list), "enrollments/all did not return an array")
+    vuser.think(*ADMIN_THINK)
+
+    if course_ids:
+        with vuser.transaction("T06_GetCourseDetail"):
+            vuser.expect(vuser.get(f"/api/courses/{vuser.random.choice(course_ids)}"), 200)
+        vuser.think(*ADMIN_THINK)
+
+    access_list = [s["email"] for s in students[:5] if s.get("email")]
+    with vuser.transaction("T07_CreateCourse"):
+        course = vuser.expect(vuser.post("/api/courses", json={
+            "title": f"LoadTest_Course_{vuser.id}_{vuser.iteration}",
+            "description": "Curso generado por la prueba de carga",
+            "category": vuser.random.choice(CATEGORIES),
+            "accessList": access_list,
+        }), 201)
+        vuser.check(course.get("id"), "POST /api/courses did not return an id")
+
+
+# ==========================================
+# SCENARIO 3: PDF UPLOAD & READING
+# ==========================================
+
+def pdf_upload(vuser):
+    email, password = vuser.admin()
+
+    with vuser.transaction("T01_Login_Admin"):
+        data = vuser.expect(vuser.post("/api/auth/login", json={"email": email, "password": password}), 200)
+        vuser.check(data.get("message") == "Login exitoso", f"Login failed for {email}")
+    with vuser.transaction("T02_GetMe"):
+        me = vuser.expect(vuser.get("/api/auth/me"), 200)
+        vuser.check(me.get("role") == "admin", f"{email} is not an admin")
+    vuser.think(*UPLOAD_THINK)
+
+    pdf_name = vuser.param("pdf")["pdfFile"]
+    pdf_path = os.path.join(vuser.config.pdf_dir, pdf_name)
+    # Unique name per iteration so concurrent uploads never collide on disk
+    filename = f"{os.path.splitext(pdf_name)[0]}-{vuser.id}-{vuser.iteration}.pdf"
+    with vuser.transaction("T03_UploadPDF"):
+        if os.path.exists(pdf_path):
+            with open(pdf_path, "rb") as pdf:
+                res = vuser.post("/api/upload", files={"file": (filename, pdf, "application/pdf")})
+        else:
+            res = vuser.post("/api/upload", files={"file": (filename, minimal_pdf(filename), "application/pdf")})
+        data = vuser.expect(res, 200)
+        vuser.check(str(data.get("url", "")).endswith(".pdf"), "Upload response has no .pdf url")
+        pdf_url = data["url"]
+
+    with vuser.transaction("T04_GetAdminCourses"):
+        courses = vuser.expect(vuser.get("/api/courses"), 200)
+        vuser.check(courses, f"{email} owns no courses")
+        course_id = courses[0]["id"]
+
+    with vuser.transaction("T05_GetCourseLessons"):
+        lessons = vuser.expect(vuser.get(f"/api/courses/{course_id}/lessons"), 200)
+        vuser.check(lessons, f"Course {course_id} has no lessons")
+        lesson = lessons[0]
+
+    with vuser.transaction("T06_UpdateLesson"):
+        contents = list(lesson.get("contents") or [])
+        contents.append({"title": vuser.param("lesson")["lessonTitle"], "type": "pdf", "url": pdf_url})
+        data = vuser.expect(vuser.put(f"/api/lessons/{lesson['_id']}", json={"contents": contents}), 200)
+        vuser.check(data.get("message") == "Lesson updated", "Lesson update was not confirmed")
+
+
+def pdf_download(vuser, chunk_size=64 * 1024):
+    email, password = vuser.reader()
+
+    with vuser.transaction("T01_Login_Student"):
+        data = vuser.expect(vuser.post("/api/auth/login", json={"email": email, "password": password}), 200)
+        vuser.check(data.get("message") == "Login exitoso", f"Login failed for {email}")
+    with vuser.transaction("T02_GetMe"):
+        me = vuser.expect(vuser.get("/api/auth/me"), 200)
+        vuser.check(me.get("id"), "auth/me returned no id")
+
+    with vuser.transaction("T03_GetMyCourses"):
+        courses = vuser.expect(vuser.get("/api/courses"), 200)
+        vuser.check(courses, f"{email} is not enrolled in any course")
+        course_id = courses[0]["id"]
+
+    with vuser.transaction("T04_GetCourseLessons"):
+        lessons = vuser.expect(vuser.get(f"/api/courses/{course_id}/lessons"), 200)
+        pdfs = [c for lesson in lessons for c in (lesson.get("contents") or []) if c.get("type") == "pdf"]
+        vuser.check(pdfs, f"Course {course_id} has no pdf content")
+        content_id = vuser.random.choice(pdfs)["_id"]
+
+    with vuser.transaction("T05_GetContentDetail"):
+        content = vuser.expect(vuser.get(f"/api/lessons/content/{content_id}"), 200)
+        vuser.check(content.get("type") == "pdf" and content.get("url"), "Content is not a pdf with a url")
+
+    with vuser.transaction("T06_DownloadPDF"):
+        received = 0
+        with vuser.get(vuser.local_url(content["url"]), stream=True) as res:
+            vuser.check(res.status_code == 200, f"Download returned {res.status_code}")
+            vuser.check(res.headers.get("Content-Type", "").startswith("application/pdf"),
+                        f"Unexpected Content-Type {res.headers.get('Content-Type')}")
+            for chunk in res.iter_content(chunk_size):
+                received += len(chunk)
+        vuser.check(received > 0, "Downloaded an empty file")
+    vuser.think(*READ_PDF_THINK)
+
+
+SCENARIOS = {
+    "1": Scenario("1", "Admin Setup + Student Quiz", admin_setup_student_quiz, pacing="sequential",
+                  params=("admin", "student")),
+    "2": Scenario("2", "Admin Dashboard", admin_dashboard, pacing="random", params=("admin",)),
+    "3a": Scenario("3a", "PDF Upload (Admin)", pdf_upload, pacing="sequential", params=("admin", "pdf", "lesson")),
+    "3b": Scenario("3b", "PDF Download (Student)", pdf_download, pacing="random", params=("reader",)),
+}
@@ -0,0 +1,321 @@
+"""
+Open-model (arrival-rate) scheduling.
+
+The engine's default run is a closed model: N VUsers loop with think
+time and pacing, so when the server slows down the request rate drops
+with it and queueing never shows. Here iterations start on a schedule
+instead, whatever the response times are:
+
+    constant:20             20 arrivals/s for the whole test
+    ramp:1:80               1/s rising linearly to 80/s
+    step:5x60,60x20,5x60    5/s for 60s, a 60/s spike for 20s, back to 5/s
+
+Arrivals are evenly spaced, or a (non-homogeneous) Poisson process with
+poisson=True. An iteration that would exceed the concurrency cap is
+dropped and counted, never queued, so a late start is never mistaken
+for a slow response.
+
+    python -m utils.loadtest --arrivals step:5x60,60x20,5x60 --poisson --vusers 200
+"""
+import itertools
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .engine import TestStopping, VUser
+from .histogram import Histogram
+from .stats import StatsCollector
+
+DEFAULT_MAX_IN_FLIGHT = 100
+PROFILE_KINDS = ("constant", "ramp", "step")
+
+
+class ArrivalProfile:
+    """
+    Arrival rate over time as linear segments of (seconds, start_rate,
+    end_rate), rates in arrivals per second. A constant rate is one flat
+    segment, a ramp one sloped segment, steps several flat ones.
+    """
+
+    def __init__(self, segments):
+        self.segments = [(float(d), float(a), float(b)) for d, a, b in segments]
+        for duration, start_rate, end_rate in self.segments:
+            if duration <= 0 or start_rate < 0 or end_rate < 0:
+                raise ValueError("Arrival segments need a positive duration and non-negative rates")
+
+    @classmethod
+    def constant(cls, rate, duration):
+        return cls([(duration, rate, rate)])
+
+    @classmethod
+    def ramp(cls, start_rate, end_rate, duration):
+        return cls([(duration, start_rate, end_rate)])
+
+    @classmethod
+    def steps(cls, steps):
+        """`steps` is a list of (rate, seconds)."""
+        return cls([(duration, rate, rate) for rate, duration in steps])
+
+    def scaled(self, factor):
+        """The same shape at `factor` times the rate, e.g. one worker's share."""
+        return ArrivalProfile([(d, a * factor, b * factor) for d, a, b in self.segments])
+
+    @property
+    def duration(self):
+        return sum(d for d, _, _ in self.segments)
+
+    @property
+    def expected(self):
+        """Expected number of arrivals (the area under the rate)."""
+        return sum(d * (a + b) / 2 for d, a, b in self.segments)
+
+    def rate_at(self, t):
+        for duration, start_rate, end_rate in self.segments:
+            if t < duration:
+                return start_rate + (end_rate - start_rate) * t / duration
+            t -= duration
+        return 0.0
+
+    def describe(self):
+        parts = []
+        for duration, start_rate, end_rate in self.segments:
+            if start_rate == end_rate:
+                parts.append(f"{start_rate:g}/s for {duration:g}s")
+            else:
+                parts.append(f"{start_rate:g}→{end_rate:g}/s over {duration:g}s")
+        return ", then ".join(parts)
+
+
+def parse_profile(text, duration=None):
+    """
+    Parse "constant:RATE", "ramp:START:END" or "step:RATExSECONDS,..."
+    into an ArrivalProfile. constant and ramp last `duration` seconds.
+    """
+    kind, _, spec = text.partition(":")
+    kind = kind.strip().lower()
+    try:
+        if kind == "step":
+            steps = []
+            for part in spec.split(","):
+                rate, _, seconds = part.partition("x")
+                steps.append((float(rate), float(seconds)))
+            return ArrivalProfile.steps(steps)
+        if kind in ("constant", "ramp"):
+            if not duration:
+                raise ValueError(f"A {kind} profile needs a duration")
+            if kind == "constant":
+                return ArrivalProfile.constant(float(spec), duration)
+            start_rate, _, end_rate = spec.partition(":")
+            return ArrivalProfile.ramp(float(start_rate), float(end_rate), duration)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid arrival profile '{text}': {e}")
+    raise ValueError(f"Unknown arrival profile '{kind}', expected one of {', '.join(PROFILE_KINDS)}")
+
+
+def _segment_offset(n, duration, start_rate, end_rate):
+    """Time into a segment at which `n` arrivals have accumulated (inverse of its cumulative rate)."""
+    k = (end_rate - start_rate) / (2 * duration)
+    if abs(k) < 1e-12:
+        return n / start_rate
+    return (-start_rate + math.sqrt(max(start_rate * start_rate + 4 * k * n, 0.0))) / (2 * k)
+
+
+def arrival_times(profile, poisson=False, rng=None):
+    """
+    Yield arrival offsets in seconds from the start of the test.
+
+    Arrival k happens where the cumulative rate reaches k: evenly spaced
+    counts give the deterministic schedule (first arrival at 0), and unit
+    exponential gaps give a Poisson process that follows the profile
+    (time-rescaling), so ramps and steps work for both.
+    """
+    rng = rng or random.Random()
+    n = rng.expovariate(1.0) if poisson else 0.0
+    segment_start, segment_count = 0.0, 0.0
+    for duration, start_rate, end_rate in profile.segments:
+        area = duration * (start_rate + end_rate) / 2
+        while n < segment_count + area:
+            yield segment_start + _segment_offset(n - segment_count, duration, start_rate, end_rate)
+            n += rng.expovariate(1.0) if poisson else 1.0
+        segment_start += duration
+        segment_count += area
+
+
+class ArrivalScheduler:
+    """
+    Start `action(number)` at every arrival of `profile` on a thread pool
+    of at most `max_in_flight` workers.
+
+    The dispatcher never waits for a worker: when all are busy the
+    arrival is dropped and counted. The delay between an arrival's
+    scheduled time and its actual start goes into `lag`, so a client that
+    cannot keep up is visible rather than silently lowering the rate.
+    """
+
+    def __init__(self, profile, poisson=False, max_in_flight=DEFAULT_MAX_IN_FLIGHT, seed=None):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.profile = profile
+        self.poisson = poisson
+        self.max_in_flight = max_in_flight
+        self.seed = seed
+        self.lag = Histogram()
+        self.planned = 0
+        self.started = 0
+        self.dropped = 0
+        self.completed = 0
+        self.failed = 0
+        self.abandoned = 0
+        self.peak_in_flight = 0
+        self.wall_time = 0.0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _run_one(self, action, number):
+        outcome = "completed"
+        try:
+            action(number)
+        except TestStopping:
+            outcome = "abandoned"
+        except Exception:
+            outcome = "failed"
+        with self._lock:
+            self._in_flight -= 1
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def run(self, action, stop_event=None, drain=True):
+        """
+        Dispatch every arrival, then wait for the iterations in flight.
+        With drain=False, `stop_event` is set when the schedule ends so
+        iterations can abandon their think times, as a timed closed run
+        does at its deadline.
+        """
+        stop_event = stop_event or threading.Event()
+        rng = random.Random(self.seed)
+        pool = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="arrival")
+        started = time.perf_counter()
+        try:
+            for number, offset in enumerate(arrival_times(self.profile, self.poisson, rng), 1):
+                delay = started + offset - time.perf_counter()
+                if delay > 0 and stop_event.wait(delay):
+                    break
+                if stop_event.is_set():
+                    break
+                self.planned += 1
+                with self._lock:
+                    if self._in_flight >= self.max_in_flight:
+                        self.dropped += 1
+                        continue
+                    self._in_flight += 1
+                    self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+                self.started += 1
+                self.lag.record(max(0.0, time.perf_counter() - started - offset))
+                pool.submit(self._run_one, action, number)
+        except KeyboardInterrupt:
+            print("\n🛑 Stopping arrivals...")
+            stop_event.set()
+        finally:
+            if not drain:
+                stop_event.set()
+            pool.shutdown(wait=True)
+            self.wall_time = time.perf_counter() - started
+        return self
+
+    def summary(self):
+        lag = self.lag.percentiles((50, 99))
+        return {
+            "profile": self.profile.describe(),
+            "poisson": self.poisson,
+            "expected": self.profile.expected,
+            "planned": self.planned,
+            "started": self.started,
+            "dropped": self.dropped,
+            "completed": self.completed,
+            "failed": self.failed,
+            "abandoned": self.abandoned,
+            "peak_in_flight": self.peak_in_flight,
+            "start_rate": self.started / self.wall_time if self.wall_time > 0 else 0.0,
+            "lag_p50": lag[50],
+            "lag_p99": lag[99],
+            "lag_max": self.lag.max / 1_000_000,
+        }
+
+
+def print_schedule(summary):
+    """Print what the scheduler achieved against the profile (lag in ms)."""
+    print(f"\n⏱️  Arrivals ({'Poisson' if summary['poisson'] else 'evenly spaced'}): {summary['profile']}")
+    print(f"   Planned: {summary['planned']} (expected ~{summary['expected']:.0f})   "
+          f"Started: {summary['started']}   Dropped: {summary['dropped']}   "
+          f"Peak in flight: {summary['peak_in_flight']}")
+    print(f"   Iterations: ✅ {summary['completed']}  ❌ {summary['failed']}  ⏹️ {summary['abandoned']} cut off   "
+          f"Start rate: {summary['start_rate']:.2f}/s")
+    print(f"   Start lag: p50 {summary['lag_p50'] * 1000:.1f} ms, p99 {summary['lag_p99'] * 1000:.1f} ms, "
+          f"max {summary['lag_max'] * 1000:.1f} ms")
+    if summary["dropped"]:
+        print("   ⚠️ Arrivals were dropped at the concurrency cap; raise it or the results understate the load")
+
+
+def run_open(config, scenarios, stats=None, vuser_ids=None):
+    """
+    Open-model counterpart of engine.run(): config.arrivals drives when
+    iterations start, each arrival picks a scenario by config.mix weight
+    and runs one iteration on an idle VUser of that scenario (a new one
+    when none is idle). config.vusers caps the VUsers in flight.
+    `vuser_ids` numbers new VUsers (default 1, 2, ...). Returns
+    (StatsCollector, ArrivalScheduler).
+    """
+    unknown = set(config.mix) - set(scenarios)
+    if unknown:
+        raise ValueError(f"Unknown scenarios in mix: {', '.join(sorted(unknown))}")
+
+    stats = stats or StatsCollector()
+    vuser_ids = vuser_ids or itertools.count(1)
+    stop_event = threading.Event()
+    keys = [key for key, weight in config.mix.items() if weight > 0]
+    weights = [config.mix[key] for key in keys]
+    rng = random.Random(config.seed)
+    lock = threading.Lock()
+    idle = {key: [] for key in keys}
+    vusers = []
+
+    for scenario in scenarios.values():
+        scenario.reset()
+
+    def iteration(number):
+        with lock:
+            key = rng.choices(keys, weights)[0]
+            vuser = idle[key].pop() if idle[key] else None
+            if vuser is None:
+                vuser = VUser(next(vuser_ids), scenarios[key], config, stats, stop_event)
+                vusers.append(vuser)
+        vuser.new_iteration()
+        try:
+            with stats.working():
+                vuser.scenario.run(vuser)
+            vuser.scenario.iteration_done(True)
+        except TestStopping:
+            raise
+        except Exception as e:
+            vuser.scenario.iteration_done(False, f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            with lock:
+                idle[key].append(vuser)
+
+    scheduler = ArrivalScheduler(config.arrivals, poisson=config.poisson,
+                                 max_in_flight=config.vusers, seed=config.seed)
+    print(f"🚀 Open model against {config.host}: {config.arrivals.describe()}"
+          f"{' (Poisson)' if config.poisson else ''}, at most {config.vusers} VUsers in flight")
+    for key in keys:
+        print(f"   ↳ Scenario {key} ({scenarios[key].title}): {config.mix[key]:g}% of arrivals")
+
+    stats.start()
+    try:
+        scheduler.run(iteration, stop_event, drain=False)
+    finally:
+        stats.stop()
+        for vuser in vusers:
+            vuser.session.close()
+    return stats, scheduler
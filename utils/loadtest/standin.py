@@ -0,0 +1,1555 @@
+"""
+In-process stand-in for the Node backend, for running the utils scripts and
+the load engine without Node or MongoDB.
+
+It speaks plain HTTP/1.1 (keep-alive, pipelining, chunked request bodies)
+on a bare asyncio.Protocol and keeps everything in memory. Routes mirror
+backend/routes/*.js closely enough that the scripts can't tell the
+difference, including the quirks they depend on: sequential questionIndex
+per attempt, the JS answer comparison, the inverted quiz-score status and
+the my-students aggregation.
+
+    python -m utils.loadtest.standin --port 5000 --demo
+    python -m utils.loadtest.standin --port 5000 --latency 2-10 --login-latency 70
+    python -m utils.loadtest.standin --student-password password123   # for HOLY/asyncSeeder/manifestSeed
+
+or, from code (e.g. CI):
+
+    with running_standin(demo=True) as host:
+        ...
+"""
+import argparse
+import asyncio
+import base64
+import bisect
+import hashlib
+import hmac
+import itertools
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, unquote
+
+try:
+    import uvloop
+except ImportError:  # optional; the stdlib loop is fast enough for most runs
+    uvloop = None
+
+from .params import ParameterFile, parametros_path
+
+JWT_SECRET = b"cambia-esto"
+TOKEN_TTL = 7 * 24 * 60 * 60
+JSON_LIMIT = 100 * 1024           # express.json() default
+UPLOAD_LIMIT = 500 * 1024 * 1024  # multer limit in routes/upload
+UPLOAD_KEEP = 8 * 1024 * 1024     # bigger uploads keep their size, not their bytes
+MAX_HEAD = 64 * 1024
+STREAM_CHUNK = 256 * 1024
+MAX_PAGE_SIZE = 5000             # routes/user GET /?limit=
+UPLOAD_URL = "https://www.omiags.online/uploads"
+# Password of the --test-students accounts unless --student-password says otherwise
+DEFAULT_STUDENT_PASSWORD = "testtest"
+
+REASONS = {200: "OK", 201: "Created", 206: "Partial Content", 400: "Bad Request", 401: "Unauthorized",
+           403: "Forbidden", 404: "Not Found", 409: "Conflict", 413: "Payload Too Large",
+           416: "Range Not Satisfiable", 431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+OBJECT_ID = re.compile(r"^[0-9a-fA-F]{24}$")
+WHITESPACE = re.compile(r"\s+")
+
+
+class CastError(Exception):
+    """An id that isn't an ObjectId; mongoose turns these into 500s (or 400s where a route says so)."""
+
+
+class JSTypeError(Exception):
+    """What the JS comparison throws for booleans, numbers and objects."""
+
+
+# ==========================================
+# JS SEMANTICS
+# ==========================================
+
+def js_typeof(value):
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    return "object"  # list, dict and null
+
+
+def js_string(value):
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, list):
+        return ",".join("" if v is None else js_string(v) for v in value)
+    if isinstance(value, dict):
+        return "[object Object]"
+    return str(value)
+
+
+def _utf16_key(value):
+    return js_string(value).encode("utf-16-be")
+
+
+def _normalise(value):
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, list):
+        return [_normalise(v) for v in value]
+    return value
+
+
+def js_sorted_json(value):
+    """JSON.stringify([...value].sort())"""
+    if isinstance(value, str):
+        items = list(value)  # spread iterates code points
+    elif isinstance(value, list):
+        items = list(value)
+    else:
+        raise JSTypeError(f"{js_typeof(value)} is not iterable")
+    items.sort(key=_utf16_key)
+    return json.dumps(_normalise(items), ensure_ascii=False, separators=(",", ":"))
+
+
+def js_length(value):
+    if value is None:
+        raise JSTypeError("Cannot read properties of null (reading 'length')")
+    return len(value) if isinstance(value, (str, list)) else None
+
+
+def is_answer_correct(question, answer):
+    """
+    The comparison in routes/quizzes.js. `typeof answer === String` is never
+    true, so strings compare as sorted characters, and booleans/numbers
+    reach the spread and throw (the route answers 500).
+    """
+    correct = question.get("correctAnswer")
+    if js_typeof(answer) != js_typeof(correct):
+        return False
+    if js_length(answer) != js_length(correct):
+        return False
+    return js_sorted_json(answer) == js_sorted_json(correct)
+
+
+def js_round(value):
+    """Math.round: halves go up."""
+    return math.floor(value + 0.5)
+
+
+def now_iso():
+    moment = datetime.now(timezone.utc)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}Z"
+
+
+# ==========================================
+# IN-MEMORY STORE
+# ==========================================
+
+class Store:
+    """Documents keyed by id, plus the secondary indexes the routes query by."""
+
+    def __init__(self):
+        self._machine = random.getrandbits(40)
+        self._counter = itertools.count(random.getrandbits(20))
+        self.users = {}
+        self.users_by_email = {}
+        self.courses = {}
+        self.lessons = {}
+        self.lessons_by_course = {}
+        self.content_to_lesson = {}
+        self.quizzes = {}
+        self.enrollments = {}
+        self.enrollment_by_pair = {}
+        self.enrollments_by_course = {}
+        self.enrollments_by_student = {}
+        self.attempts = {}
+        self.attempt_by_pair = {}
+        self.uploads = {}
+        self.tokens = {}
+
+    def new_id(self):
+        return f"{int(time.time()):08x}{self._machine:010x}{next(self._counter) & 0xFFFFFF:06x}"
+
+    @staticmethod
+    def check_id(value):
+        if not isinstance(value, str) or not OBJECT_ID.match(value):
+            raise CastError(f'Cast to ObjectId failed for value "{value}"')
+        return value
+
+    def get(self, collection, doc_id):
+        if doc_id is None:
+            return None
+        return getattr(self, collection).get(self.check_id(doc_id))
+
+    # ------------------------------------------
+    # Writes (with what the mongoose hooks do)
+    # ------------------------------------------
+
+    def _stamp(self, doc):
+        stamp = now_iso()
+        doc.setdefault("createdAt", stamp)
+        doc["updatedAt"] = stamp
+        doc.setdefault("__v", 0)
+        return doc
+
+    def add_user(self, name, email, password, role="student"):
+        user = self._stamp({"_id": self.new_id(), "name": name, "email": email, "password": password, "role": role})
+        self.users[user["_id"]] = user
+        self.users_by_email[email] = user
+        return user
+
+    def add_course(self, owner, title, description=None, category=None):
+        course = self._stamp({"_id": self.new_id(), "title": title, "description": description,
+                              "owner": owner, "category": category, "progress": 0})
+        self.courses[course["_id"]] = course
+        return course
+
+    def set_contents(self, lesson, contents):
+        for content in lesson.get("contents") or []:
+            self.content_to_lesson.pop(content["_id"], None)
+        stored = []
+        for item in contents or []:
+            content = {k: item[k] for k in ("title", "type", "url", "textContent", "quizId") if item.get(k) is not None}
+            content["_id"] = item.get("_id") if isinstance(item.get("_id"), str) else self.new_id()
+            self.content_to_lesson[content["_id"]] = lesson["_id"]
+            stored.append(content)
+        lesson["contents"] = stored
+
+    def add_lesson(self, course_id, title, description=None, contents=None):
+        lesson = self._stamp({"_id": self.new_id(), "courseId": course_id, "title": title, "description": description})
+        self.set_contents(lesson, contents)
+        self.lessons[lesson["_id"]] = lesson
+        self.lessons_by_course.setdefault(course_id, []).append(lesson["_id"])
+        return lesson
+
+    def delete_lesson(self, lesson):
+        self.set_contents(lesson, [])
+        self.lessons.pop(lesson["_id"], None)
+        ids = self.lessons_by_course.get(lesson["courseId"], [])
+        if lesson["_id"] in ids:
+            ids.remove(lesson["_id"])
+
+    def set_questions(self, quiz, questions):
+        stored = []
+        for item in questions or []:
+            question = dict(item)
+            question.setdefault("value", 1)
+            question["_id"] = item.get("_id") if isinstance(item.get("_id"), str) else self.new_id()
+            stored.append(question)
+        quiz["questions"] = stored
+        quiz["maxScore"] = sum(q["value"] for q in stored if isinstance(q["value"], (int, float)))
+
+    def add_quiz(self, title, description=None, lesson_id=None, questions=None):
+        quiz = {"_id": self.new_id(), "title": title.strip() if isinstance(title, str) else title,
+                "description": description.strip() if isinstance(description, str) else description,
+                "maxScore": 0}
+        if lesson_id:
+            quiz["lessonId"] = lesson_id
+        self.set_questions(quiz, questions)
+        self.quizzes[quiz["_id"]] = self._stamp(quiz)
+        return quiz
+
+    def enroll(self, student_id, course_id):
+        enrollment = self._stamp({"_id": self.new_id(), "student": student_id, "course": course_id,
+                                  "completedLessons": [], "studentProgress": 0})
+        self.enrollments[enrollment["_id"]] = enrollment
+        self.enrollment_by_pair[(student_id, course_id)] = enrollment
+        self.enrollments_by_course.setdefault(course_id, []).append(enrollment["_id"])
+        self.enrollments_by_student.setdefault(student_id, []).append(enrollment["_id"])
+        return enrollment
+
+    def course_enrollments(self, course_id):
+        return [self.enrollments[e] for e in self.enrollments_by_course.get(course_id, []) if e in self.enrollments]
+
+    def save_enrollment(self, enrollment, lessons_changed):
+        """Enrollment pre/post("save"): studentProgress, then the course average."""
+        if lessons_changed:
+            total = len(self.lessons_by_course.get(enrollment["course"], []))
+            progress = len(enrollment["completedLessons"]) / total * 100 if total else 0
+            enrollment["studentProgress"] = min(progress, 100)
+        enrollment["updatedAt"] = now_iso()
+        course = self.courses.get(enrollment["course"])
+        if course:
+            rows = self.course_enrollments(course["_id"])
+            average = sum(e["studentProgress"] for e in rows) / len(rows) if rows else 0
+            course["progress"] = js_round(average * 100) / 100
+
+    def delete_course(self, course):
+        for lesson_id in list(self.lessons_by_course.get(course["_id"], [])):
+            self.delete_lesson(self.lessons[lesson_id])
+        for enrollment in self.course_enrollments(course["_id"]):
+            self.enrollments.pop(enrollment["_id"], None)
+            self.enrollment_by_pair.pop((enrollment["student"], enrollment["course"]), None)
+            student = self.enrollments_by_student.get(enrollment["student"], [])
+            if enrollment["_id"] in student:
+                student.remove(enrollment["_id"])
+        self.enrollments_by_course.pop(course["_id"], None)
+        self.lessons_by_course.pop(course["_id"], None)
+        self.courses.pop(course["_id"], None)
+
+    def attempt(self, user_id, quiz):
+        return self.attempt_by_pair.get((user_id, quiz["_id"]))
+
+    def save_attempt(self, user_id, quiz, answers):
+        """Create/extend an attempt; QuizAttempt's pre("save") marks any answered attempt completed."""
+        attempt = self.attempt(user_id, quiz)
+        if attempt is None:
+            attempt = {"_id": self.new_id(), "userId": user_id, "quizId": quiz["_id"], "lessonId": quiz.get("lessonId"),
+                       "completed": False, "questionsAnswered": 0, "currentScore": 0, "answers": [], "__v": 0}
+            self.attempts[attempt["_id"]] = attempt
+            self.attempt_by_pair[(user_id, quiz["_id"])] = attempt
+        for answer in answers:
+            attempt["answers"].append(dict(answer, _id=self.new_id()))
+            attempt["questionsAnswered"] += 1
+        if attempt["answers"]:
+            attempt["completed"] = True
+            attempt["currentScore"] = sum(a["score"] for a in attempt["answers"])
+        return attempt
+
+    def delete_attempts(self, quiz_id):
+        for attempt in [a for a in self.attempts.values() if a["quizId"] == quiz_id]:
+            self.attempts.pop(attempt["_id"], None)
+            self.attempt_by_pair.pop((attempt["userId"], quiz_id), None)
+
+    # ------------------------------------------
+    # Tokens
+    # ------------------------------------------
+
+    def issue_token(self, user):
+        """A real HS256 JWT, so TokenPool can read its exp."""
+        def part(data):
+            return base64.urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode()).rstrip(b"=")
+        now = int(time.time())
+        signing = part({"alg": "HS256", "typ": "JWT"}) + b"." + part(
+            {"sub": user["_id"], "email": user["email"], "name": user["name"], "iat": now, "exp": now + TOKEN_TTL})
+        signature = base64.urlsafe_b64encode(hmac.new(JWT_SECRET, signing, hashlib.sha256).digest()).rstrip(b"=")
+        token = (signing + b"." + signature).decode()
+        self.tokens[token] = (user["_id"], now + TOKEN_TTL)
+        return token
+
+    def user_for_token(self, token):
+        entry = self.tokens.get(token) if token else None
+        if not entry or entry[1] < time.time():
+            return None
+        return self.users.get(entry[0])
+
+
+# ==========================================
+# HTTP PLUMBING
+# ==========================================
+
+class Request:
+    __slots__ = ("method", "path", "query", "headers", "body", "keep_alive", "_json", "_cookies")
+
+    def __init__(self, method, target, headers, keep_alive):
+        self.method = method
+        path, _, query = target.partition("?")
+        self.path = unquote(path)
+        self.query = {k: v[0] for k, v in parse_qs(query).items()} if query else {}
+        self.headers = headers
+        self.body = b""
+        self.keep_alive = keep_alive
+        self._json = None
+        self._cookies = None
+
+    @property
+    def json(self):
+        if self._json is None:
+            body = self.body
+            content_type = self.headers.get("content-type", "")
+            if body and "json" in content_type:
+                try:
+                    self._json = json.loads(body)
+                except ValueError:
+                    self._json = {}
+            else:
+                self._json = {}
+            if not isinstance(self._json, dict):
+                self._json = {}
+        return self._json
+
+    @property
+    def cookies(self):
+        if self._cookies is None:
+            self._cookies = {}
+            for part in self.headers.get("cookie", "").split(";"):
+                name, _, value = part.strip().partition("=")
+                if name:
+                    self._cookies[name] = value
+        return self._cookies
+
+
+class Response:
+    __slots__ = ("status", "body", "content_type", "headers", "stream")
+
+    def __init__(self, status, body=b"", content_type="application/json; charset=utf-8", headers=None, stream=None):
+        self.status = status
+        self.body = body
+        self.content_type = content_type
+        self.headers = headers or []
+        self.stream = stream  # (size, iterator of bytes) for big bodies
+
+
+def reply(status, data, headers=None):
+    return Response(status, json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode(), headers=headers)
+
+
+class BodySink:
+    """Counts the whole body, keeps the first `limit` bytes."""
+
+    __slots__ = ("data", "size", "limit")
+
+    def __init__(self, limit):
+        self.data = bytearray()
+        self.size = 0
+        self.limit = limit
+
+    def feed(self, chunk):
+        self.size += len(chunk)
+        room = self.limit - len(self.data)
+        if room > 0:
+            self.data += chunk[:room]
+
+
+class HTTPProtocol(asyncio.Protocol):
+    def __init__(self, app):
+        self.app = app
+        self.transport = None
+        self.buffer = bytearray()
+        self.request = None
+        self.sink = None
+        self.remaining = 0
+        self.chunked = False
+        self.chunk_left = -1
+        self.pending = deque()
+        self.worker = None
+        self.can_write = asyncio.Event()
+        self.can_write.set()
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.app.connections.add(self)
+
+    def connection_lost(self, exc):
+        self.app.connections.discard(self)
+        self.can_write.set()
+        if self.worker:
+            self.worker.cancel()
+
+    def pause_writing(self):
+        self.can_write.clear()
+
+    def resume_writing(self):
+        self.can_write.set()
+
+    # ------------------------------------------
+    # Parsing
+    # ------------------------------------------
+
+    def data_received(self, data):
+        self.buffer += data
+        try:
+            self._parse()
+        except ValueError:  # bad Content-Length or chunk size
+            self.buffer.clear()
+            self._write(Response(400, b""), keep_alive=False)
+
+    def _parse(self):
+        while self.buffer and not self.transport.is_closing():
+            if self.request is None:
+                end = self.buffer.find(b"\r\n\r\n")
+                if end < 0:
+                    if len(self.buffer) > MAX_HEAD:
+                        self._write(Response(431, b""), keep_alive=False)
+                    return
+                if not self._start_request(bytes(self.buffer[:end]).decode("latin-1")):
+                    return
+                del self.buffer[:end + 4]
+            if not self._feed_body():
+                return
+            request, self.request = self.request, None
+            request.body = bytes(self.sink.data)
+            request.headers["x-body-size"] = self.sink.size
+            self.sink = None
+            self._dispatch(request)
+
+    def _start_request(self, head):
+        lines = head.split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            self._write(Response(400, b""), keep_alive=False)
+            return False
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        self.request = Request(method, target, headers, keep_alive)
+
+        self.chunked = "chunked" in headers.get("transfer-encoding", "").lower()
+        self.remaining = 0 if self.chunked else int(headers.get("content-length") or 0)
+        self.chunk_left = -1
+        upload = self.request.path.startswith("/api/upload")
+        self.sink = BodySink(self.app.upload_keep if upload else max(JSON_LIMIT * 16, 1))
+        return True
+
+    def _feed_body(self):
+        """Move body bytes from the buffer into the sink; True once the body is complete."""
+        if not self.chunked:
+            take = min(self.remaining, len(self.buffer))
+            if take:
+                self.sink.feed(self.buffer[:take])
+                del self.buffer[:take]
+                self.remaining -= take
+            return self.remaining == 0
+
+        while True:
+            if self.chunk_left == -1:
+                end = self.buffer.find(b"\r\n")
+                if end < 0:
+                    return False
+                size = int(bytes(self.buffer[:end]).split(b";")[0] or b"0", 16)
+                del self.buffer[:end + 2]
+                if size == 0:
+                    self.chunk_left = -2  # trailers
+                else:
+                    self.chunk_left = size
+            if self.chunk_left == -2:
+                end = self.buffer.find(b"\r\n")
+                if end < 0:
+                    return False
+                del self.buffer[:end + 2]
+                if end == 0:
+                    return True
+                continue
+            take = min(self.chunk_left, len(self.buffer))
+            self.sink.feed(self.buffer[:take])
+            del self.buffer[:take]
+            self.chunk_left -= take
+            if self.chunk_left:
+                return False
+            if len(self.buffer) < 2:
+                self.chunk_left = 0
+                return False
+            del self.buffer[:2]
+            self.chunk_left = -1
+
+    # ------------------------------------------
+    # Responding
+    # ------------------------------------------
+
+    def _dispatch(self, request):
+        if self.worker is None and not self.pending and not self.app.delay_for(request):
+            response = self.app.handle(request)
+            if response.stream is None:
+                self._write(response, request.keep_alive)
+                return
+            self.pending.append((request, response))
+        else:
+            self.pending.append((request, None))
+        if self.worker is None:
+            self.worker = asyncio.ensure_future(self._drain())
+
+    async def _drain(self):
+        """Answer queued requests in order, with injected latency and flow control."""
+        try:
+            while self.pending:
+                request, response = self.pending.popleft()
+                if response is None:
+                    delay = self.app.delay_for(request)
+                    if delay:
+                        await asyncio.sleep(delay)
+                    response = self.app.handle(request)
+                if response.stream is None:
+                    self._write(response, request.keep_alive)
+                else:
+                    self.transport.write(self._head(response, request.keep_alive, response.stream[0]))
+                    for chunk in response.stream[1]:
+                        await self.can_write.wait()
+                        if self.transport.is_closing():
+                            return
+                        self.transport.write(chunk)
+                    if not request.keep_alive:
+                        self.transport.close()
+        finally:
+            self.worker = None
+
+    @staticmethod
+    def _head(response, keep_alive, length):
+        lines = [f"HTTP/1.1 {response.status} {REASONS.get(response.status, 'OK')}",
+                 f"Content-Type: {response.content_type}",
+                 f"Content-Length: {length}",
+                 "Connection: keep-alive" if keep_alive else "Connection: close"]
+        lines += [f"{name}: {value}" for name, value in response.headers]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    def _write(self, response, keep_alive=True):
+        if self.transport.is_closing():
+            return
+        self.transport.write(self._head(response, keep_alive, len(response.body)) + response.body)
+        if not keep_alive:
+            self.transport.close()
+
+
+# ==========================================
+# ROUTES
+# ==========================================
+
+def route(method, pattern, error="Server error"):
+    """Register a handler; `error` is the 500 message the JS route answers with."""
+    def decorate(func):
+        func.route = (method, tuple(pattern.strip("/").split("/")), error)
+        return func
+    return decorate
+
+
+class StandInApp:
+    def __init__(self, latency=(0.0, 0.0), login_latency=0.0, upload_keep=UPLOAD_KEEP, seed=None):
+        self.store = Store()
+        self.latency = latency
+        self.login_latency = login_latency
+        self.upload_keep = upload_keep
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.connections = set()
+        self._routes = {}
+        for name in dir(self):
+            handler = getattr(self, name)
+            spec = getattr(handler, "route", None)
+            if spec:
+                method, parts, error = spec
+                self._routes.setdefault((method, len(parts)), []).append((parts, handler, error))
+        # Literal segments win over ":params", as in the Express registration order that matters here
+        for candidates in self._routes.values():
+            candidates.sort(key=lambda c: [p.startswith(":") for p in c[0]])
+
+    # ------------------------------------------
+    # Dispatch
+    # ------------------------------------------
+
+    def delay_for(self, request):
+        low, high = self.latency
+        delay = low if high <= low else self.random.uniform(low, high)
+        if self.login_latency and request.path in ("/api/auth/login", "/api/auth/register"):
+            delay += self.login_latency
+        return delay
+
+    def handle(self, request):
+        self.requests += 1
+        method = "GET" if request.method == "HEAD" else request.method
+        parts = tuple(request.path.strip("/").split("/"))
+        for pattern, handler, error in self._routes.get((method, len(parts)), ()):
+            params = []
+            for want, got in zip(pattern, parts):
+                if want.startswith(":"):
+                    params.append(got)
+                elif want != got:
+                    break
+            else:
+                try:
+                    if request.headers["x-body-size"] > JSON_LIMIT and "json" in request.headers.get("content-type", ""):
+                        return reply(413, {"message": "request entity too large"})
+                    response = handler(request, *params)
+                except CastError:
+                    response = reply(400 if getattr(handler, "cast_400", False) else 500, {"message": error})
+                except (JSTypeError, KeyError, TypeError, ValueError, AttributeError):
+                    response = reply(500, {"message": error})
+                if request.method == "HEAD":
+                    # Same headers, Content-Length included, and no body
+                    length = response.stream[0] if response.stream else len(response.body)
+                    response = Response(response.status, b"", response.content_type, response.headers,
+                                        stream=(length, iter(())))
+                return response
+        return Response(404, f"Cannot {request.method} {request.path}".encode(), "text/html; charset=utf-8")
+
+    def current_user(self, request):
+        """requireAuth (middleware/auth.js is not in this tree): cookie or Bearer token."""
+        token = request.cookies.get("token")
+        if not token:
+            auth = request.headers.get("authorization", "")
+            token = auth[7:] if auth.startswith("Bearer ") else None
+        return self.store.user_for_token(token)
+
+    @staticmethod
+    def unauthorized():
+        return reply(401, {"message": "No autorizado"})
+
+    @staticmethod
+    def token_cookie(token):
+        return [("Set-Cookie", f"token={token}; Max-Age={TOKEN_TTL}; Path=/; HttpOnly; SameSite=Lax")]
+
+    # ------------------------------------------
+    # Serialisation (what mongoose would send)
+    # ------------------------------------------
+
+    @staticmethod
+    def public_user(user, fields=("name", "email", "role", "createdAt")):
+        return dict({"_id": user["_id"]}, **{f: user[f] for f in fields})
+
+    @staticmethod
+    def course_doc(course):
+        return {k: v for k, v in course.items() if v is not None}
+
+    @staticmethod
+    def lesson_doc(lesson):
+        return {k: v for k, v in lesson.items() if v is not None}
+
+    def course_lessons(self, course_id):
+        return [self.store.lessons[i] for i in self.store.lessons_by_course.get(course_id, [])]
+
+    # ------------------------------------------
+    # /health, /api/auth
+    # ------------------------------------------
+
+    @route("GET", "/health")
+    def health(self, request):
+        return Response(200, b"ok", "text/html; charset=utf-8")
+
+    @route("POST", "/api/auth/login", error="Error interno")
+    def login(self, request):
+        body = request.json
+        email, password = body.get("email"), body.get("password")
+        if not email or not password:
+            return reply(400, {"error": "Faltan campos"})
+        user = self.store.users_by_email.get(email)
+        if not user or user["password"] != password:
+            return reply(401, {"error": "Credenciales inválidas"})
+        token = self.store.issue_token(user)
+        return reply(200, {"message": "Login exitoso",
+                           "user": {"id": user["_id"], "name": user["name"], "email": user["email"]}},
+                     headers=self.token_cookie(token))
+
+    @route("POST", "/api/auth/logout")
+    def logout(self, request):
+        return reply(200, {"message": "Logout exitoso"},
+                     headers=[("Set-Cookie", "token=; Path=/; Expires=Thu, 01 Jan 1970 00:00:00 GMT")])
+
+    @route("POST", "/api/auth/register", error="Error interno")
+    def register(self, request):
+        body = request.json
+        name, email, password = body.get("name"), body.get("email"), body.get("password")
+        if not name or not email or not password:
+            return reply(400, {"error": "Faltan campos"})
+        if len(password) < 8:
+            return reply(400, {"error": "La contraseña debe tener al menos 8 caracteres"})
+        if email in self.store.users_by_email:
+            return reply(409, {"error": "El email ya está registrado"})
+        user = self.store.add_user(name, email, password)
+        token = self.store.issue_token(user)
+        return reply(201, {"message": "Registro exitoso",
+                           "user": {"id": user["_id"], "name": user["name"], "email": user["email"]}},
+                     headers=self.token_cookie(token))
+
+    @route("GET", "/api/auth/me")
+    def me(self, request):
+        token = request.cookies.get("token")
+        if not token:
+            return reply(401, {"error": "No token"})
+        user = self.store.user_for_token(token)
+        if not user:
+            return reply(401, {"error": "Token inválido o expirado"})
+        return reply(200, {"id": user["_id"], "name": user["name"], "email": user["email"],
+                           "role": user["role"], "lastUpdate": user["updatedAt"]})
+
+    # ------------------------------------------
+    # /api/courses
+    # ------------------------------------------
+
+    @route("GET", "/api/courses")
+    def list_courses(self, request):
+        user = self.current_user(request)
+        if not user:
+            return self.unauthorized()
+        store = self.store
+        if user["role"] == "student":
+            rows = []
+            for enrollment_id in store.enrollments_by_student.get(user["_id"], []):
+                enrollment = store.enrollments.get(enrollment_id)
+                course = enrollment and store.courses.get(enrollment["course"])
+                if course:
+                    rows.append((course, enrollment["studentProgress"]))
+        else:
+            rows = [(c, 0) for c in store.courses.values() if c["owner"] == user["_id"]]
+        return reply(200, [{
+            "id": course["_id"],
+            "name": course["title"],
+            "description": course["description"],
+            "category": course["category"],
+            "lessons": len(store.lessons_by_course.get(course["_id"], [])),
+            "studentsCount": len(store.course_enrollments(course["_id"])),
+            "personalProgress": progress or 0,
+        } for course, progress in rows])
+
+    @route("GET", "/api/courses/:courseId")
+    def get_course(self, request, course_id):
+        user = self.current_user(request)
+        if not user:
+            return self.unauthorized()
+        course = self.store.get("courses", course_id)
+        if not course:
+            return reply(404, {"message": "Course not found"})
+        is_owner = course["owner"] == user["_id"]
+        enrollment = self.store.enrollment_by_pair.get((user["_id"], course_id))
+        if not is_owner and not enrollment:
+            return reply(403, {"message": "Access denied. Not enrolled."})
+        students = []
+        if is_owner:
+            students = [self.store.users[e["student"]]["email"] for e in self.store.course_enrollments(course_id)
+                        if e["student"] in self.store.users]
+        return reply(200, {"id": course["_id"], "title": course["title"], "description": course["description"],
+                           "progress": enrollment["studentProgress"] if enrollment else course["progress"],
+                           "category": course["category"], "students": students})
+
+    @route("GET", "/api/courses/:courseId/lessons")
+    def get_course_lessons(self, request, course_id):
+        user = self.current_user(request)
+        if not user:
+            return self.unauthorized()
+        course = self.store.get("courses", course_id)
+        if not course:
+            return reply(404, {"message": "Course not found"})
+        enrollment = self.store.enrollment_by_pair.get((user["_id"], course_id))
+        if course["owner"] != user["_id"] and not enrollment:
+            return reply(403, {"message": "Access denied"})
+        completed = set(enrollment["completedLessons"]) if enrollment else set()
+        return reply(200, [{"_id": l["_id"], "title": l["title"], "description": l["description"],
+                            "completed": l["_id"] in completed, "contents": l["contents"]}
+                           for l in self.course_lessons(course_id)])
+
+    def _enroll_emails(self, course_id, emails):
+        wanted = set(e for e in emails if isinstance(e, str))
+        # User.find({email: {$in}}) returns users in insertion order, not accessList order
+        found = [u for u in self.store.users.values() if u["email"] in wanted]
+        for user in found:
+            if (user["_id"], course_id) not in self.store.enrollment_by_pair:
+                self.store.enroll(user["_id"], course_id)
+        return found
+
+    @route("POST", "/api/courses")
+    def create_course(self, request):
+        user = self.current_user(request)
+        if not user:
+            return self.unauthorized()
+        body = request.json
+        if not body.get("title") or body.get("category") not in ("Secundaria", "Preparatoria"):
+            return reply(500, {"message": "Server error"})  # mongoose validation error
+        course = self.store.add_course(user["_id"], body["title"], body.get("description"), body["category"])
+        enrolled = []
+        if isinstance(body.get("accessList"), list) and body["accessList"]:
+            enrolled = [u["email"] for u in self._enroll_emails(course["_id"], body["accessList"])]
+        return reply(201, {"id": course["_id"], "title": course["title"], "description": course["description"],
+                           "category": course["category"], "owner": course["owner"], "students": enrolled})
+
+    @route("PUT", "/api/courses/:id")
+    def update_course(self, request, course_id):
+        user = self.current_user(request)
+        if not user:
+            return self.unauthorized()
+        course = self.store.get("courses", course_id)
+        if not course:
+            return reply(404, {"message": "Not found"})
+        if course["owner"] != user["_id"]:
+            return reply(403, {"message": "Not allowed"})
+        body = request.json
+        for field in ("title", "description", "category"):
+            if body.get(field):
+                course[field] = body[field]
+        course["updatedAt"] = now_iso()
+        if isinstance(body.get("students"), list):
+            self._enroll_emails(course_id, body["students"])
+        emails = [self.store.users[e["student"]]["email"] for e in self.store.course_enrollments(course_id)]
+        return reply(200, {"id": course["_id"], "title": course["title"], "description": course["description"],
+                           "category": course["category"], "students": emails})
+
+    @route("DELETE", "/api/courses/:id")
+    def delete_course(self, request, course_id):
+        user = self.current_user(request)
+        if not user:
+            return self.unauthorized()
+        course = self.store.get("courses", course_id)
+        if not course:
+            return reply(404, {"message": "Not found"})
+        if course["owner"] != user["_id"]:
+            return reply(403, {"message": "Not allowed"})
+        self.store.delete_course(course)
+        return reply(200, {"message": "Deleted course, lessons and enrollments"})
+
+    # ------------------------------------------
+    # /api/lessons
+    # ------------------------------------------
+
+    @staticmethod
+    def validate_contents(contents):
+        if not isinstance(contents, list):
+            return "Contents must be an array"
+        for item in contents:
+            if not isinstance(item, dict) or not item.get("title"):
+                return "All contents must have a title"
+            if item.get("type") not in ("video", "pdf", "text", "quiz"):
+                return f"Invalid content type: {item.get('type')}"
+            if item["type"] in ("video", "pdf") and not item.get("url"):
+                return f'Content "{item["title"]}" requires a URL'
+            if item["type"] == "text" and not item.get("textContent"):
+                return f'Content "{item["title"]}" requires textContent'
+            if item["type"] == "quiz" and not item.get("quizId"):
+                return f'Content "{item["title"]}" requires a quizId'
+        return None
+
+    @route("GET", "/api/lessons/:id")
+    def get_lesson(self, request, lesson_id):
+        lesson = self.store.get("lessons", lesson_id)
+        if not lesson:
+            return reply(404, {"message": "Lesson not found"})
+        doc = self.lesson_doc(lesson)
+        doc["courseId"] = self.course_doc(self.store.courses[lesson["courseId"]]) \
+            if lesson["courseId"] in self.store.courses else None
+        return reply(200, doc)
+
+    @route("GET", "/api/lessons/:courseId/lessons")
+    def list_lessons(self, request, course_id):
+        self.store.check_id(course_id)
+        return reply(200, [self.lesson_doc(l) for l in self.course_lessons(course_id)])
+
+    @route("POST", "/api/lessons")
+    def create_lesson(self, request):
+        body = request.json
+        if not body.get("courseId") or not body.get("title"):
+            return reply(400, {"message": "courseId and title required"})
+        contents = body.get("contents")
+        if contents:
+            error = self.validate_contents(contents)
+            if error:
+                return reply(400, {"message": error})
+        lesson = self.store.add_lesson(self.store.check_id(body["courseId"]), body["title"],
+                                       body.get("description"), contents)
+        return reply(201, self.lesson_doc(lesson))
+
+    @route("PUT", "/api/lessons/:id")
+    def update_lesson(self, request, lesson_id):
+        lesson = self.store.get("lessons", lesson_id)
+        if not lesson:
+            return reply(404, {"message": "Lesson not found"})
+        body = request.json
+        if "title" in body:
+            lesson["title"] = body["title"]
+        if "description" in body:
+            lesson["description"] = body["description"]
+        if "contents" in body:
+            error = self.validate_contents(body["contents"])
+            if error:
+                return reply(400, {"message": error})
+            self.store.set_contents(lesson, body["contents"])
+        lesson["updatedAt"] = now_iso()
+        return reply(200, {"message": "Lesson updated", "lesson": self.lesson_doc(lesson)})
+
+    @route("DELETE", "/api/lessons/:id")
+    def delete_lesson(self, request, lesson_id):
+        lesson = self.store.get("lessons", lesson_id)
+        if not lesson:
+            return reply(404, {"message": "Lesson not found"})
+        self.store.delete_lesson(lesson)
+        return reply(200, {"message": "Lesson deleted"})
+
+    @route("PUT", "/api/lessons/:id/toggle-completion")
+    def toggle_completion(self, request, lesson_id):
+        user = self.current_user(request)
+        if not user:
+            return self.unauthorized()
+        completed = request.json.get("completed")
+        if not isinstance(completed, bool):
+            return reply(400, {"message": "Completed must be boolean"})
+        lesson = self.store.get("lessons", lesson_id)
+        if not lesson:
+            return reply(404, {"message": "Lesson not found"})
+        enrollment = self.store.enrollment_by_pair.get((user["_id"], lesson["courseId"]))
+        if not enrollment:
+            return reply(404, {"message": "Not enrolled"})
+        before = list(enrollment["completedLessons"])
+        if completed:
+            if lesson_id not in enrollment["completedLessons"]:
+                enrollment["completedLessons"].append(lesson_id)
+        else:
+            enrollment["completedLessons"] = [i for i in enrollment["completedLessons"] if i != lesson_id]
+        self.store.save_enrollment(enrollment, enrollment["completedLessons"] != before)
+        return reply(200, {"message": "Marked complete" if completed else "Marked incomplete",
+                           "completedLessons": enrollment["completedLessons"]})
+
+    @route("GET", "/api/lessons/content/:contentId")
+    def get_content(self, request, content_id):
+        lesson = self.store.lessons.get(self.store.content_to_lesson.get(self.store.check_id(content_id)))
+        if not lesson:
+            return reply(404, {"message": "Contenido no encontrado"})
+        content = next(c for c in lesson["contents"] if c["_id"] == content_id)
+        return reply(200, dict(content, lessonTitle=lesson["title"], lessonId=lesson["_id"],
+                               courseId=lesson["courseId"]))
+
+    # ------------------------------------------
+    # /api/quizzes
+    # ------------------------------------------
+
+    @route("GET", "/api/quizzes", error="Server error while fetching quizzes.")
+    def quizzes_for_lesson(self, request):
+        lesson_id = request.query.get("lessonId")
+        if not lesson_id:
+            return reply(400, {"message": "A lessonId query parameter is required."})
+        self.store.check_id(lesson_id)
+        return reply(200, [{"_id": q["_id"], "title": q["title"], "description": q.get("description")}
+                           for q in self.store.quizzes.values() if q.get("lessonId") == lesson_id])
+
+    @route("GET", "/api/quizzes/list", error="Server error while fetching quizzes.")
+    def list_quizzes(self, request):
+        return reply(200, [{"_id": q["_id"], "title": q["title"], "description": q.get("description")}
+                           for q in self.store.quizzes.values()])
+
+    @route("GET", "/api/quizzes/quiz-score", error="Server error while creating quiz.")
+    def quiz_score(self, request):
+        user = self.current_user(request)
+        if not user:
+            return self.unauthorized()
+        quiz = self.store.get("quizzes", request.query.get("quizId"))
+        if not quiz:
+            return reply(404, {"message": "Quiz not found"})
+        attempt = self.store.attempt(user["_id"], quiz)
+        status, score = "Not attempted", 0
+        if attempt:
+            status = "Started" if attempt["completed"] else "Completed"  # inverted in the backend too
+            score = round(attempt["currentScore"] / quiz["maxScore"] * 100, 2) if quiz["maxScore"] else None
+        return reply(200, {"status": status, "score": score})
+
+    @route("GET", "/api/quizzes/attempts", error="Server error fetching number of attempts.")
+    def attempt_count(self, request):
+        user = self.current_user(request)
+        if not user:
+            return self.unauthorized()
+        if user["role"] != "admin":
+            return reply(401, {"message": "User not allowed to perform this operation."})
+        quiz_id = request.query.get("quizId")
+        return reply(200, {"attemptCount": sum(1 for a in self.store.attempts.values() if a["quizId"] == quiz_id)})
+
+    @route("GET", "/api/quizzes/:quizId", error="Server error.")
+    def get_quiz(self, request, quiz_id):
+        user = self.current_user(request)
+        if not user:
+            return self.unauthorized()
+        quiz = self.store.get("quizzes", quiz_id)
+        if not quiz:
+            return reply(404, {"message": "Quiz not found"})
+        attempt = self.store.attempt(user["_id"], quiz)
+        questions = []
+        for q in quiz["questions"]:
+            item = {"_id": q["_id"], "title": q["title"], "type": q["type"], "value": q["value"]}
+            if q.get("options") is not None:
+                item["options"] = q["options"]
+            if q.get("code") is not None:
+                item["code"] = q["code"]
+            if user["role"] == "admin":
+                item["correctAnswer"] = q["correctAnswer"]
+            questions.append(item)
+        return reply(200, {"id": quiz["_id"], "title": quiz["title"], "description": quiz.get("description"),
+                           "currentQuestion": attempt["questionsAnswered"] if attempt else 0,
+                           "currentScore": attempt["currentScore"] if attempt else 0,
+                           "questions": questions})
+
+    @route("POST", "/api/quizzes", error="Server error while creating quiz.")
+    def create_quiz(self, request):
+        body = request.json
+        if not body.get("title") or body.get("questions") is None:
+            return reply(400, {"message": "Missing required fields: title and questions are required."})
+        lesson_id = body.get("lessonId")
+        quiz = self.store.add_quiz(body["title"], body.get("description"),
+                                   self.store.check_id(lesson_id) if lesson_id else None, body["questions"])
+        return reply(201, quiz)
+
+    @route("PATCH", "/api/quizzes/:quizId", error="Server error while updating quiz.")
+    def patch_quiz(self, request, quiz_id):
+        quiz = self.store.get("quizzes", quiz_id)
+        if not quiz:
+            return reply(404, {"message": "Quiz not found"})
+        body = request.json
+        if body.get("title"):
+            quiz["title"] = body["title"]
+        if body.get("description"):
+            quiz["description"] = body["description"]
+        if body.get("questions"):
+            self.store.set_questions(quiz, body["questions"])
+        if body.get("lessonId"):
+            quiz["lessonId"] = self.store.check_id(body["lessonId"])
+        quiz["updatedAt"] = now_iso()
+        return reply(200, quiz)
+
+    @route("PUT", "/api/quizzes/:quizId", error="Server error while updating quiz.")
+    def put_quiz(self, request, quiz_id):
+        body = request.json
+        if not body.get("title") or body.get("questions") is None:
+            return reply(400, {"message": "Missing required fields: title and questions are required."})
+        if body.get("deleteAttempts"):
+            self.store.delete_attempts(quiz_id)
+        quiz = self.store.get("quizzes", quiz_id)
+        if not quiz:
+            return reply(404, {"message": "Quiz not found"})
+        quiz["title"] = body["title"]
+        quiz["description"] = body.get("description")
+        self.store.set_questions(quiz, body["questions"])
+        if body.get("lessonId"):
+            quiz["lessonId"] = self.store.check_id(body["lessonId"])
+        quiz["updatedAt"] = now_iso()
+        return reply(200, quiz)
+
+    @staticmethod
+    def _question(quiz, index):
+        """quiz.questions[questionIndex], with JS indexing (numbers and numeric strings)."""
+        if isinstance(index, bool):
+            return None
+        if isinstance(index, float) and index.is_integer():
+            index = int(index)
+        if isinstance(index, str) and index.isdigit() and (index == "0" or not index.startswith("0")):
+            index = int(index)
+        if isinstance(index, int) and 0 <= index < len(quiz["questions"]):
+            return quiz["questions"][index]
+        return None
+
+    def _submit_answer(self, body, user_id):
+        if any(k in body and body[k] is None for k in ("quizId", "questionIndex")) or body.get("answer") is None:
+            return reply(400, {"message": "Missing required fields: quizId, questionIndex and answer are required."})
+        quiz = self.store.get("quizzes", body.get("quizId"))
+        if not quiz:
+            return reply(404, {"message": "Quiz not found"})
+        attempt = self.store.attempt(user_id, quiz)
+        answered = attempt["questionsAnswered"] if attempt else 0
+        index, answer = body.get("questionIndex"), body["answer"]
+        question = self._question(quiz, index)
+        if not question:
+            return reply(404, {"message": "Question not found"})
+        # Strict !== : "0" finds the question but is never the expected index
+        if isinstance(index, bool) or not isinstance(index, (int, float)) or index != answered:
+            return reply(400, {"message": "Question not allowed"})
+        correct = is_answer_correct(question, answer)  # may raise -> 500, nothing saved
+        self.store.save_attempt(user_id, quiz, [{"correct": correct, "score": question["value"] if correct else 0,
+                                                 "answer": answer}])
+        return reply(200, {"correct": correct, "answer": question["correctAnswer"]})
+
+    @route("POST", "/api/quizzes/submit-answer", error="Server error while submitting answer.")
+    def submit_answer(self, request):
+        user = self.current_user(request)
+        if not user:
+            return self.unauthorized()
+        return self._submit_answer(request.json, user["_id"])
+
+    @route("POST", "/api/quizzes/no-auth-submit-answer", error="Server error while creating quiz.")
+    def no_auth_submit_answer(self, request):
+        body = request.json
+        if "userId" in body and body["userId"] is None:
+            return reply(400, {"message": "Missing required fields: quizId, questionIndex and answer are required."})
+        return self._submit_answer(body, body.get("userId"))
+
+    @route("POST", "/api/quizzes/no-auth-submit-attempt", error="Server error while submitting attempt.")
+    def no_auth_submit_attempt(self, request):
+        body = request.json
+        quiz_id, user_id, answers = body.get("quizId"), body.get("userId"), body.get("answers")
+        start = body.get("startIndex")
+        start = 0 if start is None else start
+        if not quiz_id or not user_id or not isinstance(answers, list) or not answers:
+            return reply(400, {"message": "Missing required fields: quizId, userId and a non-empty answers "
+                                          "array are required."})
+        if any(a is None for a in answers):
+            return reply(400, {"message": "Answers cannot be null."})
+        quiz = self.store.get("quizzes", quiz_id)
+        if not quiz:
+            return reply(404, {"message": "Quiz not found"})
+        attempt = self.store.attempt(user_id, quiz)
+        if isinstance(start, bool) or start != (attempt["questionsAnswered"] if attempt else 0):
+            return reply(400, {"message": "Question not allowed"})
+        if start + len(answers) > len(quiz["questions"]):
+            return reply(404, {"message": "Question not found"})
+        stored, results = [], []
+        for offset, answer in enumerate(answers):
+            question = quiz["questions"][int(start) + offset]
+            correct = is_answer_correct(question, answer)
+            stored.append({"correct": correct, "score": question["value"] if correct else 0, "answer": answer})
+            results.append({"correct": correct, "answer": question["correctAnswer"]})
+        self.store.save_attempt(user_id, quiz, stored)
+        return reply(200, {"results": results})
+
+    # ------------------------------------------
+    # /api/enrollments
+    # ------------------------------------------
+
+    @route("GET", "/api/enrollments/status/:courseId", error="Error del servidor")
+    def enrollment_status(self, request, course_id):
+        user = self.current_user(request)
+        if not user:
+            return self.unauthorized()
+        self.store.check_id(course_id)
+        enrollment = self.store.enrollment_by_pair.get((user["_id"], course_id))
+        if not enrollment:
+            return reply(200, {"completedLessons": [], "studentProgress": 0})
+        return reply(200, {"completedLessons": enrollment["completedLessons"],
+                           "studentProgress": enrollment["studentProgress"]})
+
+    @route("GET", "/api/enrollments/all", error="Error del servidor")
+    def all_enrollments(self, request):
+        if not self.current_user(request):
+            return self.unauthorized()
+        store = self.store
+        rows = []
+        for enrollment in sorted(store.enrollments.values(), key=lambda e: e["createdAt"], reverse=True):
+            student = store.users.get(enrollment["student"])
+            course = store.courses.get(enrollment["course"])
+            rows.append(dict(enrollment,
+                             student={"_id": student["_id"], "name": student["name"], "email": student["email"]}
+                             if student else None,
+                             course={"_id": course["_id"], "title": course["title"], "category": course["category"]}
+                             if course else None))
+        return reply(200, rows)
+
+    @route("GET", "/api/enrollments/my-students")
+    def my_students(self, request):
+        user = self.current_user(request)
+        if not user:
+            return self.unauthorized()
+        store = self.store
+        course_ids = [c["_id"] for c in store.courses.values() if c["owner"] == user["_id"]]
+        if not course_ids:
+            return reply(200, [])
+        enrollments = [e for cid in course_ids for e in store.course_enrollments(cid)]
+        enrollments.sort(key=lambda e: e["_id"])  # natural (insertion) order of Enrollment.find
+        if not enrollments:
+            return reply(200, [])
+
+        quiz_course = {}
+        max_scores = {}
+        lesson_course = {l: cid for cid in course_ids for l in store.lessons_by_course.get(cid, [])}
+        for quiz in store.quizzes.values():
+            if quiz.get("lessonId") in lesson_course:
+                quiz_course[quiz["_id"]] = lesson_course[quiz["lessonId"]]
+                max_scores[quiz["_id"]] = quiz["maxScore"]
+        # enrollments.map(e => e.student._id): a deleted student populates as null and throws
+        if any(e["student"] not in store.users for e in enrollments):
+            raise JSTypeError("Cannot read properties of null (reading '_id')")
+        student_ids = {e["student"] for e in enrollments}
+        attempts = {}
+        for attempt in store.attempts.values():
+            if attempt["completed"] and attempt["userId"] in student_ids and attempt["quizId"] in quiz_course:
+                key = (attempt["userId"], quiz_course[attempt["quizId"]])
+                attempts.setdefault(key, []).append(attempt)
+
+        students = {}
+        for enrollment in enrollments:
+            student = store.users.get(enrollment["student"])
+            course = store.courses.get(enrollment["course"])
+            if not student or not course:
+                continue
+            entry = students.setdefault(student["_id"], {
+                "name": student["name"], "email": student["email"], "lessons": 0, "count": 0,
+                "courses": {}, "quizSum": 0, "quizCourses": 0})
+            entry["lessons"] += enrollment["studentProgress"] or 0
+            entry["count"] += 1
+            entry["courses"].setdefault(course["title"], None)
+            rows = attempts.get((student["_id"], course["_id"]))
+            if rows:
+                pcts = [a["currentScore"] / (max_scores.get(a["quizId"]) or 100) * 100 for a in rows]
+                entry["quizSum"] += sum(pcts) / len(pcts)
+                entry["quizCourses"] += 1
+
+        return reply(200, [{
+            "id": sid,
+            "name": e["name"],
+            "email": e["email"],
+            "lessonProgress": js_round(e["lessons"] / e["count"]) if e["count"] else 0,
+            "quizAverage": js_round(e["quizSum"] / e["quizCourses"]) if e["quizCourses"] else 0,
+            "courses": list(e["courses"])[:3],
+            "totalCourses": e["count"],
+        } for sid, e in students.items()])
+
+    # ------------------------------------------
+    # /api/user
+    # ------------------------------------------
+
+    @route("PUT", "/api/user/:userId/role", error="Invalid user ID format.")
+    def update_role(self, request, user_id):
+        role = request.json.get("role")
+        if not role:
+            return reply(400, {"message": "Role is required."})
+        if role not in ("student", "admin"):
+            return reply(400, {"message": "Invalid role. Must be either 'student' or 'admin'."})
+        user = self.store.get("users", user_id)
+        if not user:
+            return reply(404, {"message": "User not found."})
+        user["role"] = role
+        user["updatedAt"] = now_iso()
+        return reply(200, {"message": "User role updated successfully.",
+                           "user": self.public_user(user, ("name", "email", "role"))})
+    update_role.cast_400 = True
+
+    @route("GET", "/api/user/:userId", error="Invalid user ID format.")
+    def get_user(self, request, user_id):
+        user = self.store.get("users", user_id)
+        if not user:
+            return reply(404, {"message": "User not found."})
+        return reply(200, self.public_user(user))
+    get_user.cast_400 = True
+
+    @route("GET", "/api/user", error="Server error while fetching users.")
+    def list_users(self, request):
+        if "limit" not in request.query:
+            return reply(200, [self.public_user(u) for u in self.store.users.values()])
+        limit = request.query["limit"]
+        if not limit.isdigit() or not 1 <= int(limit) <= MAX_PAGE_SIZE:
+            return reply(400, {"message": f"limit must be an integer between 1 and {MAX_PAGE_SIZE}."})
+        after = request.query.get("after")
+        if after and not OBJECT_ID.match(after):
+            return reply(400, {"message": "Invalid cursor."})
+        # Ids are time-ordered hex of equal length, so string order is _id order
+        ids = sorted(self.store.users)
+        start = bisect.bisect_right(ids, after) if after else 0
+        return reply(200, [self.public_user(self.store.users[i]) for i in ids[start:start + int(limit)]])
+
+    # ------------------------------------------
+    # /api/upload, /uploads
+    # ------------------------------------------
+
+    @route("POST", "/api/upload")
+    def upload(self, request):
+        size = request.headers["x-body-size"]
+        if size > UPLOAD_LIMIT:
+            return reply(500, {"message": "File too large"})
+        content_type = request.headers.get("content-type", "")
+        boundary = content_type.partition("boundary=")[2].strip('"')
+        head_end = request.body.find(b"\r\n\r\n")
+        if not boundary or head_end < 0:
+            return reply(400, {"message": "No file uploaded"})
+        part_head = request.body[:head_end].decode("utf-8", "replace")
+        name = re.search(r'filename="([^"]*)"', part_head)
+        if not name or "application/pdf" not in part_head:
+            return reply(500, {"message": "Only PDFs are allowed"})
+        start = head_end + 4
+        file_size = size - start - len(f"\r\n--{boundary}--\r\n")
+        filename = f"{int(time.time() * 1000)}-{WHITESPACE.sub('-', name.group(1))}"
+        kept = request.body[start:start + file_size]
+        self.store.uploads[filename] = (file_size, kept)
+        return reply(200, {"url": f"{UPLOAD_URL}/{filename}"})
+
+    @route("GET", "/uploads/:filename")
+    def static_upload(self, request, filename):
+        entry = self.store.uploads.get(filename)
+        if not entry:
+            return Response(404, f"Cannot GET {request.path}".encode(), "text/html; charset=utf-8")
+        size, kept = entry
+        start, end, status, headers = 0, size - 1, 200, [("Accept-Ranges", "bytes")]
+        match = re.match(r"bytes=(\d*)-(\d*)$", request.headers.get("range", ""))
+        if match and (match.group(1) or match.group(2)):
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            else:
+                start = max(size - int(match.group(2)), 0)
+            if start > end or start >= size:
+                return Response(416, b"", headers=[("Content-Range", f"bytes */{size}")])
+            status = 206
+            headers.append(("Content-Range", f"bytes {start}-{end}/{size}"))
+        length = end - start + 1
+        content_type = "application/pdf" if filename.lower().endswith(".pdf") else "application/octet-stream"
+
+        def chunks():
+            position = start
+            while position <= end:
+                step = min(STREAM_CHUNK, end + 1 - position)
+                if position < len(kept):
+                    piece = kept[position:position + step]
+                    yield piece + bytes(step - len(piece))  # uploads past UPLOAD_KEEP were counted, not kept
+                else:
+                    yield bytes(step)
+                position += step
+
+        if length <= STREAM_CHUNK:
+            return Response(status, b"".join(chunks()), content_type, headers)
+        return Response(status, b"", content_type, headers, stream=(length, chunks()))
+
+    # ------------------------------------------
+    # Fixtures
+    # ------------------------------------------
+
+    def load_accounts(self, admin_file=None, student_file=None):
+        """Admins and students from the parametros/ credential files."""
+        for path, role, email_col, password_col in (
+                (admin_file or parametros_path("admin_credentials.dat"), "admin", "adminEmail", "adminPassword"),
+                (student_file or parametros_path("student_credentials.dat"), "student", "studentEmail",
+                 "studentPassword")):
+            if not os.path.exists(path):
+                continue
+            source = ParameterFile(path)
+            for row in source.rows():
+                email = row.get(email_col)
+                if email and email not in self.store.users_by_email:
+                    self.store.add_user(email.split("@")[0], email, row.get(password_col, ""), role)
+            source.close()
+
+    def add_account(self, email, password, role="student", name=None):
+        user = self.store.users_by_email.get(email)
+        if user is None:
+            user = self.store.add_user(name or email.split("@")[0], email, password, role)
+        user["role"], user["password"] = role, password
+        return user
+
+    def populate_demo(self, pdf_size=64 * 1024):
+        """
+        One course per admin with a pdf lesson, every student enrolled, so
+        scenarios 3A/3B have something to work on from the first iteration.
+        """
+        store = self.store
+        admins = [u for u in store.users.values() if u["role"] == "admin"]
+        students = [u for u in store.users.values() if u["role"] == "student"]
+        for n, admin in enumerate(admins, 1):
+            course = store.add_course(admin["_id"], f"Demo {n}", "Curso de demostración", "Secundaria")
+            filename = f"demo-{n}.pdf"
+            store.uploads[filename] = (pdf_size, b"%PDF-1.4\n")
+            store.add_lesson(course["_id"], f"Lección demo {n}", "", [
+                {"title": f"PDF demo {n}", "type": "pdf", "url": f"{UPLOAD_URL}/{filename}"}])
+            for student in students:
+                store.enroll(student["_id"], course["_id"])
+
+
+# ==========================================
+# SERVER
+# ==========================================
+
+async def serve(app, host="127.0.0.1", port=5000, reuse_port=False):
+    loop = asyncio.get_running_loop()
+    return await loop.create_server(lambda: HTTPProtocol(app), host, port, reuse_address=True,
+                                    reuse_port=reuse_port or None, backlog=4096)
+
+
+class StandInThread:
+    """Runs the stand-in on its own event loop in a daemon thread."""
+
+    def __init__(self, app, host="127.0.0.1", port=0):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.loop = None
+        self.server = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        self.loop = new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.server = self.loop.run_until_complete(serve(self.app, self.host, self.port))
+        self.port = self.server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self.loop.run_forever()
+        # Drop kept-alive connections too, so pooled clients don't wait on a stopped server
+        for protocol in list(self.app.connections):
+            protocol.transport.abort()
+        self.loop.run_until_complete(asyncio.sleep(0))
+        self.loop.close()
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        def shutdown():
+            self.server.close()
+            self.loop.stop()
+        self.loop.call_soon_threadsafe(shutdown)
+        self._thread.join(timeout=5)
+
+
+def new_event_loop():
+    return uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+
+
+@contextmanager
+def running_standin(port=0, demo=False, **kwargs):
+    """`with running_standin() as host:` -> base URL of a fresh stand-in."""
+    app = StandInApp(**kwargs)
+    app.load_accounts()
+    if demo:
+        app.populate_demo()
+    server = StandInThread(app, port=port).start()
+    try:
+        yield server.url
+    finally:
+        server.stop()
+
+
+def parse_latency(text):
+    """'5' or '2-10' (milliseconds) -> (low, high) seconds."""
+    low, _, high = text.partition("-")
+    return float(low) / 1000, float(high or low) / 1000
+
+
+def parse_account(text):
+    email, _, password = text.partition(":")
+    return email, password
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utils.loadtest.standin",
+                                     description="In-memory stand-in for the Node backend.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--latency", type=parse_latency, default=(0.0, 0.0), metavar="MS[-MS]",
+                        help="injected latency per request, fixed or uniform range (ms)")
+    parser.add_argument("--login-latency", type=float, default=0, metavar="MS",
+                        help="extra latency on login/register, e.g. 70 to mimic bcrypt")
+    parser.add_argument("--admin", action="append", type=parse_account, default=[], metavar="EMAIL:PASSWORD",
+                        help="extra admin account (repeatable)")
+    parser.add_argument("--student", action="append", type=parse_account, default=[], metavar="EMAIL:PASSWORD",
+                        help="extra student account (repeatable)")
+    parser.add_argument("--test-students", type=int, default=10, metavar="N",
+                        help="create test_{i}@test.com for i in 1..N (default: %(default)s)")
+    parser.add_argument("--student-password", default=DEFAULT_STUDENT_PASSWORD, metavar="PASSWORD",
+                        help="password of the test_{i}@test.com students (default: %(default)s, as createTestUsers "
+                             "and simulate_progress use; HOLY, asyncSeeder and manifestSeed use password123)")
+    parser.add_argument("--demo", action="store_true", help="give every admin a course with a pdf lesson")
+    parser.add_argument("--seed", type=int, help="seed for the latency jitter")
+    args = parser.parse_args(argv)
+
+    app = StandInApp(latency=args.latency, login_latency=args.login_latency / 1000, seed=args.seed)
+    app.load_accounts()
+    for i in range(1, args.test_students + 1):
+        app.add_account(f"test_{i}@test.com", args.student_password, name=f"Test User {i}")
+    for email, password in args.admin:
+        app.add_account(email, password, "admin")
+    for email, password in args.student:
+        app.add_account(email, password)
+    if args.demo:
+        app.populate_demo()
+
+    loop = new_event_loop()
+    asyncio.set_event_loop(loop)
+    server = loop.run_until_complete(serve(app, args.host, args.port))
+    print(f"🧪 Stand-in backend on http://{args.host}:{args.port} "
+          f"({len(app.store.users)} users{', demo courses' if args.demo else ''}{', uvloop' if uvloop else ''})")
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        print(f"\n🛑 Stopped after {app.requests:,} requests")
+    finally:
+        server.close()
+        loop.close()
+
+
+if __name__ == "__main__":
+    main()
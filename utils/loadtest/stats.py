@@ -0,0 +1,270 @@
+import csv
+import json
+import math
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+
+from .histogram import Histogram
+
+REPORT_PERCENTILES = (50, 90, 95, 99)
+REPORT_COLUMNS = ["transaction", "pass", "fail", "error_rate", "avg", "p50", "p90", "p95", "p99", "max", "tps"]
+
+
+def percentile(sorted_values, pct):
+    """
+    Nearest-rank percentile over an already sorted list.
+    Returns 0.0 for an empty list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(math.ceil(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class TransactionStats:
+    """
+    Latency histogram (passed samples) and pass/fail counters for one
+    transaction. With a timeline, every sample is also kept as an
+    (end time, elapsed) pair in `events`, elapsed negated for a failure.
+    """
+
+    def __init__(self, name, timeline=False):
+        self.name = name
+        self.histogram = Histogram()
+        self.failures = 0
+        self.events = array("d") if timeline else None
+
+    @property
+    def passed(self):
+        return self.histogram.total
+
+    def add(self, elapsed, ok=True):
+        if ok:
+            self.histogram.record(elapsed)
+        else:
+            self.failures += 1
+        if self.events is not None:
+            self.events.extend((time.time(), elapsed if ok else -elapsed))
+
+    def merge(self, other):
+        self.histogram.merge(other.histogram)
+        self.failures += other.failures
+        if other.events is not None:
+            if self.events is None:
+                self.events = array("d")
+            self.events.extend(other.events)
+        return self
+
+    def to_dict(self):
+        return {"histogram": self.histogram.to_dict(), "failures": self.failures}
+
+    @classmethod
+    def from_dict(cls, name, data):
+        stats = cls(name)
+        stats.histogram = Histogram.from_dict(data["histogram"])
+        stats.failures = data["failures"]
+        return stats
+
+    def summary(self, wall_time):
+        passed = self.passed
+        total = passed + self.failures
+        pcts = self.histogram.percentiles(REPORT_PERCENTILES)
+        return {
+            "transaction": self.name,
+            "pass": passed,
+            "fail": self.failures,
+            "error_rate": self.failures / total if total else 0.0,
+            "avg": self.histogram.mean,
+            "p50": pcts[50],
+            "p90": pcts[90],
+            "p95": pcts[95],
+            "p99": pcts[99],
+            "max": self.histogram.max / 1_000_000,
+            "tps": passed / wall_time if wall_time > 0 else 0.0,
+        }
+
+
+class StatsCollector:
+    """
+    Transaction registry shared by every VUser.
+
+    Each thread records into its own shard, so the hot path takes no lock;
+    shards are merged only when a report is asked for. Transactions are
+    reported in the order they were first seen. timeline=True also keeps
+    when each sample was recorded (TransactionStats.events), for lining
+    latencies up with server metrics (see sampler.py).
+
+    Threads also keep their own meter of bytes sent and received
+    (meter_response) and of whether they are busy as a VUser (working),
+    read back summed by gauges() for the live dashboard.
+    """
+
+    def __init__(self, timeline=False):
+        self.timeline = timeline
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._shards = []
+        self._meters = []
+        self._carried = {"sent": 0, "received": 0, "active": 0}  # gauges of merged snapshots
+        self._order = {}
+        self.started_at = None
+        self.finished_at = None
+
+    def start(self):
+        self.started_at = time.time()
+
+    def stop(self):
+        self.finished_at = time.time()
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def record(self, name, elapsed, ok=True):
+        shard = self._shard()
+        stats = shard.get(name)
+        if stats is None:
+            stats = shard[name] = TransactionStats(name, self.timeline)
+            with self._lock:
+                self._order.setdefault(name, len(self._order))
+        stats.add(elapsed, ok)
+
+    def _meter(self):
+        meter = getattr(self._local, "meter", None)
+        if meter is None:
+            meter = self._local.meter = [0, 0, 0]  # bytes sent, bytes received, working depth
+            with self._lock:
+                self._meters.append(meter)
+        return meter
+
+    def count_bytes(self, sent, received):
+        meter = self._meter()
+        meter[0] += sent
+        meter[1] += received
+
+    def meter_response(self, response, *args, **kwargs):
+        """
+        requests response hook counting the bytes of each exchange: bodies
+        plus headers, without TLS or chunk framing. A streamed body is
+        counted by its Content-Length, since reading it here would consume it.
+        """
+        request = response.request
+        body = request.body
+        sent = len(body) if isinstance(body, (bytes, str)) else 0
+        sent += sum(len(k) + len(v) + 4 for k, v in request.headers.items())
+        if kwargs.get("stream"):
+            received = int(response.headers.get("Content-Length") or 0)
+        else:
+            received = len(response.content or b"")
+        received += sum(len(k) + len(v) + 4 for k, v in response.headers.items())
+        self.count_bytes(sent, received)
+        return response
+
+    @contextmanager
+    def working(self):
+        """Count the calling thread as an active VUser for the duration of the block."""
+        meter = self._meter()
+        meter[2] += 1
+        try:
+            yield
+        finally:
+            meter[2] -= 1
+
+    def gauges(self):
+        """{"sent", "received"}: bytes so far; {"active"}: threads inside working() now."""
+        with self._lock:
+            meters = list(self._meters)
+        return {
+            "sent": self._carried["sent"] + sum(m[0] for m in meters),
+            "received": self._carried["received"] + sum(m[1] for m in meters),
+            "active": self._carried["active"] + sum(1 for m in meters if m[2] > 0),
+        }
+
+    def merged(self):
+        """{name: TransactionStats} summed over every thread's shard."""
+        with self._lock:
+            shards = list(self._shards)
+            order = dict(self._order)
+        merged = {}
+        for shard in shards:
+            for name, stats in list(shard.items()):
+                merged.setdefault(name, TransactionStats(name)).merge(stats)
+        return {name: merged[name] for name in sorted(merged, key=order.get)}
+
+    @property
+    def wall_time(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def report(self):
+        wall_time = self.wall_time
+        return [t.summary(wall_time) for t in self.merged().values()]
+
+    def snapshot(self):
+        """Cumulative, JSON-safe copy of everything recorded so far (see from_snapshots)."""
+        return {
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "transactions": [[name, stats.to_dict()] for name, stats in self.merged().items()],
+            "gauges": self.gauges(),
+        }
+
+    @classmethod
+    def from_snapshots(cls, snapshots):
+        """
+        One collector holding the sum of several snapshots, e.g. one per
+        worker process. The run spans the earliest start to the latest finish.
+        """
+        collector = cls()
+        for snapshot in snapshots:
+            shard = {}
+            for name, data in snapshot["transactions"]:
+                shard[name] = TransactionStats.from_dict(name, data)
+                collector._order.setdefault(name, len(collector._order))
+            collector._shards.append(shard)
+            for key, value in snapshot.get("gauges", {}).items():
+                collector._carried[key] += value
+        started = [s["started_at"] for s in snapshots if s.get("started_at") is not None]
+        finished = [s["finished_at"] for s in snapshots if s.get("finished_at") is not None]
+        collector.started_at = min(started) if started else None
+        collector.finished_at = max(finished) if finished else None
+        return collector
+
+
+def print_report(rows, wall_time):
+    """Print a LoadRunner-style transaction summary table (times in ms)."""
+    if not rows:
+        print("📭 No transactions recorded")
+        return
+
+    print(f"\n📊 Transaction Summary ({wall_time:.1f}s)")
+    print("=" * 119)
+    print(f"{'Transaction':<28} {'Pass':>7} {'Fail':>6} {'Err%':>6} {'Avg':>9} {'p50':>9} "
+          f"{'p90':>9} {'p95':>9} {'p99':>9} {'Max':>9} {'TPS':>8}")
+    print("-" * 119)
+    for row in rows:
+        print(f"{row['transaction']:<28} {row['pass']:>7} {row['fail']:>6} {row['error_rate'] * 100:>6.1f} "
+              f"{row['avg'] * 1000:>9.1f} {row['p50'] * 1000:>9.1f} "
+              f"{row['p90'] * 1000:>9.1f} {row['p95'] * 1000:>9.1f} "
+              f"{row['p99'] * 1000:>9.1f} {row['max'] * 1000:>9.1f} "
+              f"{row['tps']:>8.2f}")
+
+
+def write_json(path, rows, wall_time):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"wall_time": wall_time, "transactions": rows}, f, indent=2)
+
+
+def write_csv(path, rows):
+    """One row per transaction; times in seconds like the JSON export."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
@@ -0,0 +1,301 @@
+"""
+Concurrent PDF upload driver for POST /api/upload (scenario 3A, T03_UploadPDF).
+
+Files are streamed from disk as multipart bodies, never read into memory
+whole: with a Content-Length by default, or with chunked transfer
+encoding (--chunked). The synthetic tiers can be generated first:
+
+    python -m utils.loadtest.upload --generate pdfs/
+    python -m utils.loadtest.upload --file pdfs/medium.pdf --vusers 20 --iterations 5
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.httpClient import create_session
+
+from .engine import DEFAULT_HOST
+from .stats import StatsCollector, print_report, write_csv, write_json
+
+TIERS = {
+    "small": 500 * 1024,
+    "medium": 5 * 1024 * 1024,
+    "large": 50 * 1024 * 1024,
+}
+CHUNK_SIZE = 256 * 1024
+MB = 1024 * 1024
+
+
+# ==========================================
+# SYNTHETIC PDFS
+# ==========================================
+
+def generate_pdf(path, size, chunk_size=MB):
+    """
+    Write a valid one-page PDF of exactly `size` bytes (or the minimum
+    possible). The padding is an incompressible binary stream object, so
+    transport compression can't shrink it.
+    """
+    head = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>",
+    ]
+    offsets = []
+    with open(path, "wb") as f:
+        written = f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        for number, body in enumerate(head, 1):
+            offsets.append(written)
+            written += f.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+
+        count = len(head) + 1
+        # Everything after the padding has a fixed size once the numbers are known
+        tail_size = len(f"xref\n0 {count + 1}\n0000000000 65535 f \n") + 20 * count + \
+            len(f"trailer\n<< /Size {count + 1} /Root 1 0 R >>\nstartxref\n") + 10 + len("\n%%EOF\n")
+        opening = f"{count} 0 obj\n<< /Length {{}} >>\nstream\n"
+        closing = b"\nendstream\nendobj\n"
+        padding = max(size - written - tail_size - len(closing) - len(opening.format(0)), 0)
+        # /Length grows with its own digit count; shrink the padding to keep the total
+        while written + len(opening.format(padding)) + padding + len(closing) + tail_size > size and padding:
+            padding -= 1
+
+        offsets.append(written)
+        written += f.write(opening.format(padding).encode())
+        remaining = padding
+        while remaining:
+            block = os.urandom(min(chunk_size, remaining))
+            remaining -= f.write(block)
+        written += padding + f.write(closing)
+
+        xref = written
+        f.write(f"xref\n0 {count + 1}\n0000000000 65535 f \n".encode())
+        for offset in offsets:
+            f.write(f"{offset:010d} 00000 n \n".encode())
+        f.write(f"trailer\n<< /Size {count + 1} /Root 1 0 R >>\nstartxref\n{xref:010d}\n%%EOF\n".encode())
+    return path
+
+
+def generate_tiers(directory, tiers=TIERS):
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for tier, size in tiers.items():
+        path = os.path.join(directory, f"{tier}.pdf")
+        if not os.path.exists(path) or os.path.getsize(path) != size:
+            generate_pdf(path, size)
+        paths[tier] = path
+    return paths
+
+
+# ==========================================
+# STREAMING MULTIPART
+# ==========================================
+
+class MultipartFile:
+    """
+    One-field multipart/form-data body that reads the file lazily.
+
+    requests treats it as a stream: with __len__ it sends a Content-Length
+    and pulls the body through read(); iterate it instead (chunked=True in
+    upload_file) to send it with Transfer-Encoding: chunked.
+    """
+
+    def __init__(self, path, field="file", filename=None, content_type="application/pdf", chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.boundary = uuid.uuid4().hex
+        filename = filename or os.path.basename(path)
+        self._preamble = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode()
+        self._epilogue = f"\r\n--{self.boundary}--\r\n".encode()
+        self.file_size = os.path.getsize(path)
+        self._file = None
+        self._pending = b""
+        self._stage = 0  # 0 preamble, 1 file, 2 epilogue, 3 done
+        self.sent = 0
+
+    @property
+    def content_type(self):
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self):
+        return len(self._preamble) + self.file_size + len(self._epilogue)
+
+    def _next_part(self, size):
+        if self._stage == 0:
+            self._stage = 1
+            self._file = open(self.path, "rb")
+            return self._preamble
+        if self._stage == 1:
+            data = self._file.read(size)
+            if data:
+                return data
+            self._file.close()
+            self._stage = 2
+        if self._stage == 2:
+            self._stage = 3
+            return self._epilogue
+        return b""
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.chunk_size
+        data = self._pending
+        while len(data) < size and self._stage < 3:
+            data += self._next_part(size - len(data))
+        data, self._pending = data[:size], data[size:]
+        self.sent += len(data)
+        return data
+
+    def __iter__(self):
+        while True:
+            data = self.read(self.chunk_size)
+            if not data:
+                return
+            yield data
+
+    def close(self):
+        if self._file and not self._file.closed:
+            self._file.close()
+
+
+def upload_file(session, url, path, filename=None, chunked=False, timeout=300):
+    """Stream `path` to the upload endpoint; returns (response, bytes sent)."""
+    body = MultipartFile(path, filename=filename)
+    headers = {"Content-Type": body.content_type}
+    try:
+        res = session.post(url, data=iter(body) if chunked else body, headers=headers, timeout=timeout)
+    finally:
+        body.close()
+    return res, body.sent
+
+
+# ==========================================
+# DRIVER
+# ==========================================
+
+class UploadResult:
+    def __init__(self, vuser_id):
+        self.vuser_id = vuser_id
+        self.uploads = 0
+        self.failures = 0
+        self.bytes = 0
+        self.busy = 0.0
+        self.last_error = None
+
+    @property
+    def mb_per_s(self):
+        return self.bytes / MB / self.busy if self.busy else 0.0
+
+
+def run_vuser(vuser_id, host, paths, iterations, stats, chunked, timeout):
+    session = create_session(pool_maxsize=1, retries=0)
+    url = f"{host}/api/upload"
+    result = UploadResult(vuser_id)
+    for i in range(iterations):
+        path = paths[(vuser_id + i) % len(paths)]
+        name = f"{os.path.splitext(os.path.basename(path))[0]}-{vuser_id}-{i}.pdf"
+        transaction = f"T03_UploadPDF_{os.path.splitext(os.path.basename(path))[0]}"
+        started = time.perf_counter()
+        try:
+            res, sent = upload_file(session, url, path, filename=name, chunked=chunked, timeout=timeout)
+            ok = res.status_code == 200 and str(res.json().get("url", "")).endswith(".pdf")
+            if not ok:
+                result.last_error = f"{res.status_code}: {res.text[:200]}"
+        except Exception as e:
+            ok, sent = False, 0
+            result.last_error = f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - started
+        stats.record(transaction, elapsed, ok)
+        if ok:
+            result.uploads += 1
+            result.bytes += sent
+            result.busy += elapsed
+        else:
+            result.failures += 1
+    session.close()
+    return result
+
+
+def directory_bytes_since(directory, since):
+    """Bytes in files under `directory` modified after `since` (what the server wrote to disk)."""
+    total = 0
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.stat().st_mtime >= since:
+                total += entry.stat().st_size
+    return total
+
+
+def run(host, paths, vusers, iterations, chunked=False, timeout=300, uploads_dir=None):
+    stats = StatsCollector()
+    started_at = time.time()
+    stats.start()
+    with ThreadPoolExecutor(max_workers=vusers) as pool:
+        futures = [pool.submit(run_vuser, v, host, paths, iterations, stats, chunked, timeout)
+                   for v in range(vusers)]
+        results = [f.result() for f in futures]
+    stats.stop()
+    disk_bytes = directory_bytes_since(uploads_dir, started_at) if uploads_dir else None
+    return stats, results, disk_bytes
+
+
+def print_throughput(results, wall_time, disk_bytes=None):
+    print("\n📤 Upload throughput")
+    print(f"{'VUser':>6} {'Uploads':>8} {'Fail':>5} {'MB':>10} {'MB/s':>8}")
+    for r in results:
+        print(f"{r.vuser_id:>6} {r.uploads:>8} {r.failures:>5} {r.bytes / MB:>10.1f} {r.mb_per_s:>8.2f}")
+        if r.last_error:
+            print(f"       ↳ last error: {r.last_error}")
+    total = sum(r.bytes for r in results)
+    print(f"\n   Aggregate: {total / MB:.1f} MB in {wall_time:.1f}s = {total / MB / wall_time if wall_time else 0:.2f} MB/s")
+    if disk_bytes is not None:
+        print(f"   Disk:      {disk_bytes / MB:.1f} MB written = {disk_bytes / MB / wall_time if wall_time else 0:.2f} MB/s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utils.loadtest.upload",
+                                     description="Concurrent streaming PDF uploads to /api/upload.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="backend base URL (default: %(default)s)")
+    parser.add_argument("--generate", metavar="DIR", help="write small/medium/large synthetic PDFs into DIR")
+    parser.add_argument("--tier", action="append", choices=list(TIERS), help="tier(s) from --generate DIR to upload")
+    parser.add_argument("--file", action="append", help="PDF to upload (repeatable)")
+    parser.add_argument("--vusers", type=int, default=4, help="concurrent uploaders")
+    parser.add_argument("--iterations", type=int, default=1, help="uploads per VUser")
+    parser.add_argument("--chunked", action="store_true", help="send Transfer-Encoding: chunked instead of Content-Length")
+    parser.add_argument("--timeout", type=float, default=300, help="per-upload timeout in seconds")
+    parser.add_argument("--uploads-dir", metavar="DIR", help="the backend's uploads/ dir, to measure disk throughput")
+    parser.add_argument("--json", metavar="FILE", help="write the transaction summary as JSON")
+    parser.add_argument("--csv", metavar="FILE", help="write the transaction summary as CSV")
+    args = parser.parse_args(argv)
+
+    paths = list(args.file or [])
+    if args.generate:
+        print(f"🧾 Generating PDF tiers in {args.generate}/")
+        tiers = generate_tiers(args.generate)
+        paths += [tiers[t] for t in (args.tier or ([] if paths else list(TIERS)))]
+    if not paths:
+        parser.error("nothing to upload: give --file or --generate DIR")
+
+    print(f"🚀 {args.vusers} VUsers x {args.iterations} uploads to {args.host}/api/upload"
+          f"{' (chunked)' if args.chunked else ''}")
+    stats, results, disk_bytes = run(args.host, paths, args.vusers, args.iterations,
+                                     chunked=args.chunked, timeout=args.timeout, uploads_dir=args.uploads_dir)
+
+    rows = stats.report()
+    print_report(rows, stats.wall_time)
+    print_throughput(results, stats.wall_time, disk_bytes)
+    if args.json:
+        write_json(args.json, rows, stats.wall_time)
+    if args.csv:
+        write_csv(args.csv, rows)
+    return 0 if all(not r.failures for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
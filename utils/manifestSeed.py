@@ -0,0 +1,523 @@
+"""
+Idempotent seeding from a declarative manifest.
+
+HOLY.py creates every course, lesson and quiz again on each run. Here a
+JSON manifest describes what should exist, and a run only writes the
+difference: what is missing is created, what changed is updated, the rest
+costs nothing.
+
+    python -m utils.manifestSeed --init seed_manifest.json     # start from HOLY.py's datasets
+    python -m utils.manifestSeed seed_manifest.json --dry-run  # show the plan
+    python -m utils.manifestSeed seed_manifest.json
+
+What exists is read in bulk once: the owner's courses (/api/courses),
+every course's lessons (one request per course), every quiz
+(/api/quizzes/list) and every account (/api/user, paged). Courses and
+lessons are compared with the manifest field by field from those
+listings. Quiz questions and enrollments are not listed, so their content
+digests are kept in SEED_INDEX next to the id of every manifest key; that
+index is also what lets a renamed course or lesson be updated in place
+instead of duplicated. Without an index (first run, or another machine)
+objects are matched by title and updated once.
+
+Manifest layout (`key` defaults to the title and must stay stable):
+
+    {
+      "owner": {"email": "...", "password": "...", "name": "..."},
+      "students": [{"email": "...", "password": "...", "name": "..."}],
+      "courses": [{
+        "key": "robotica", "title": "...", "description": "...", "category": "Secundaria",
+        "students": ["test_1@test.com"],
+        "lessons": [{
+          "key": "l1", "title": "...", "description": "...",
+          "contents": [{"title": "...", "type": "video", "url": "..."}],
+          "quiz": {"title": "...", "description": "...", "questions": [...]}
+        }]
+      }]
+    }
+
+Nothing is ever deleted: objects dropped from the manifest are left alone
+(python -m utils.teardown removes tagged runs), and the API can only add
+students to a course, not remove them.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+if __package__ in (None, ""):
+    # Run as a file rather than with -m: put the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.allUsers import iter_user_pages
+from utils.httpClient import BASE_URL, auth_headers, create_session
+from utils.loadtest.instrument import instrument_session, report, transaction
+from utils.tokenPool import get_token_pool
+
+SEED_INDEX = ".seed_index.json"
+DEFAULT_WORKERS = 8
+CONTENT_FIELDS = ("title", "type", "url", "textContent", "quizId")
+KINDS = ("student", "course", "lesson", "quiz")
+OUTCOMES = ("created", "updated", "unchanged", "failed")
+
+
+class SeedError(Exception):
+    """A write the backend refused; the object and what depends on it are skipped."""
+
+
+def digest(value):
+    """Content hash of a JSON value, independent of key order."""
+    text = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def normalize_contents(contents):
+    """Lesson contents as the backend stores them, minus the subdocument _ids."""
+    return [{field: str(item[field]) if field == "quizId" else item[field]
+             for field in CONTENT_FIELDS if item.get(field) is not None}
+            for item in contents or []]
+
+
+def lesson_state(title, description, contents):
+    return digest({"title": title, "description": description or "", "contents": normalize_contents(contents)})
+
+
+def quiz_state(quiz):
+    return digest({"title": quiz["title"], "description": quiz.get("description", ""),
+                   "questions": quiz["questions"]})
+
+
+def course_state(title, description, category):
+    return digest({"title": title, "description": description or "", "category": category})
+
+
+# ==========================================
+# MANIFEST
+# ==========================================
+
+def load_manifest(path):
+    """Read a manifest and fill in the default keys; ValueError when it is malformed."""
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    owner = manifest.get("owner") or {}
+    if not owner.get("email") or not owner.get("password"):
+        raise ValueError("the manifest needs an owner with an email and a password")
+    seen = set()
+    for course in manifest.setdefault("courses", []):
+        if not course.get("title") or not course.get("category"):
+            raise ValueError(f"course {course.get('key') or course.get('title')!r} needs a title and a category")
+        course.setdefault("key", course["title"])
+        if course["key"] in seen:
+            raise ValueError(f"duplicate course key {course['key']!r}")
+        seen.add(course["key"])
+        lesson_keys = set()
+        for lesson in course.setdefault("lessons", []):
+            if not lesson.get("title"):
+                raise ValueError(f"a lesson of {course['key']!r} has no title")
+            lesson.setdefault("key", lesson["title"])
+            if lesson["key"] in lesson_keys:
+                raise ValueError(f"duplicate lesson key {lesson['key']!r} in {course['key']!r}")
+            lesson_keys.add(lesson["key"])
+            if any(item.get("type") == "quiz" for item in lesson.get("contents", [])):
+                raise ValueError(f"lesson {lesson['key']!r}: give its quiz under \"quiz\", not in contents")
+    manifest.setdefault("students", [])
+    return manifest
+
+
+def manifest_from_holy(seed=None):
+    """A manifest with what HOLY.py seeds, its random choices fixed by `seed`."""
+    from utils import HOLY  # the script's datasets; imported here to keep its session out of normal runs
+
+    rng = random.Random(seed)
+    students = [{"email": f"test_{i}@test.com", "password": "password123", "name": f"Test Student {i}"}
+                for i in range(1, 6)]
+    courses = []
+    for info in HOLY.COURSE_DATA:
+        lessons = []
+        for i in range(1, rng.randint(3, 5) + 1):
+            questions = [dict(q, value=rng.randint(1, 10)) for q in HOLY.QUESTION_BANK if rng.random() > 0.3]
+            lessons.append({
+                "key": f"leccion-{i}",
+                "title": f"Lección {i}: Conceptos Fundamentales",
+                "description": "Visualizar el video completo para asistencia.",
+                "contents": [{"title": f"Video del Tema {i}", "type": "video", "url": rng.choice(HOLY.YOUTUBE_LINKS)}],
+                "quiz": {"title": f"Quiz {i}: Evaluación Práctica",
+                         "description": "Demuestra lo aprendido en esta lección.",
+                         "questions": questions or [dict(HOLY.QUESTION_BANK[0], value=1)]},
+            })
+        enrolled = rng.sample(students, k=rng.randint(3, len(students)))
+        courses.append({"key": info["title"], "title": info["title"], "description": info["desc"],
+                        "category": info["cat"], "students": sorted(s["email"] for s in enrolled),
+                        "lessons": lessons})
+    return {"owner": {"email": "jaramillovictorarmando@gmail.com", "password": "Hola1234",
+                      "name": "Director Académico"},
+            "students": students, "courses": courses}
+
+
+# ==========================================
+# INDEX
+# ==========================================
+
+class SeedIndex:
+    """
+    {manifest key: {"id", "digest"}} per server, in SEED_INDEX. Keys are
+    "course/<key>", "lesson/<course key>/<key>" and "quiz/<course key>/<key>",
+    plus "enrollment/<course key>" for the enrolled students' digest.
+    """
+
+    def __init__(self, path=SEED_INDEX, server=BASE_URL):
+        self.path = path
+        self.server = server
+        self._lock = threading.Lock()
+        self._all = self._load()
+        self.entries = self._all.setdefault(server, {})
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            print(f"⚠️ Ignoring unreadable seed index {self.path}")
+            return {}
+
+    def get(self, key):
+        with self._lock:
+            return self.entries.get(key) or {}
+
+    def put(self, key, object_id, state=None):
+        with self._lock:
+            self.entries[key] = {"id": object_id, "digest": state}
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._all, f, indent=1)
+            os.replace(tmp, self.path)
+
+
+# ==========================================
+# SEEDER
+# ==========================================
+
+class Existing:
+    """What the backend already has, read in bulk before anything is written."""
+
+    def __init__(self):
+        self.users = {}     # email -> /api/user row
+        self.courses = {}   # id -> /api/courses row
+        self.lessons = {}   # course id -> {lesson id: lesson}
+        self.quizzes = {}   # id -> /api/quizzes/list row
+
+
+class ManifestSeeder:
+    """
+    Bring the backend in line with a manifest. Courses are independent, so
+    they are seeded on `workers` threads; within a course the lessons and
+    quizzes go in order. With dry_run nothing is written and `counts` is
+    the plan.
+    """
+
+    def __init__(self, manifest, index=None, workers=DEFAULT_WORKERS, dry_run=False, base_url=BASE_URL):
+        self.manifest = manifest
+        self.index = index or SeedIndex(server=base_url)
+        self.workers = workers
+        self.dry_run = dry_run
+        self.base_url = base_url
+        self.session = instrument_session(create_session(pool_maxsize=workers * 2))
+        self.existing = Existing()
+        self.token = None
+        self.counts = {kind: dict.fromkeys(OUTCOMES, 0) for kind in KINDS}
+        self.errors = []
+        self._lock = threading.Lock()
+
+    def _count(self, kind, outcome, count=1):
+        with self._lock:
+            self.counts[kind][outcome] += count
+
+    def _call(self, name, method, path, payload=None, statuses=(200, 201)):
+        with transaction(name):
+            res = self.session.request(method, f"{self.base_url}{path}", json=payload,
+                                       headers=auth_headers(self.token))
+        if res.status_code not in statuses:
+            raise SeedError(f"{method} {path} -> {res.status_code}: {res.text[:200]}")
+        return res.json()
+
+    # ------------------------------------------
+    # Reading what exists
+    # ------------------------------------------
+
+    def login(self):
+        owner = self.manifest["owner"]
+        with transaction("T01_LoginOwner"):
+            entry = get_token_pool().get(owner["email"], owner["password"], name=owner.get("name") or owner["email"])
+        if not entry:
+            raise SeedError(f"could not log in or register the owner {owner['email']}")
+        self.token = entry["token"]
+
+    def promote_owner(self):
+        """
+        /api/courses lists a student's enrollments, not the courses it owns,
+        so a student owner is made an admin first (as updateRole.py would).
+        """
+        owner = self.existing.users.get(self.manifest["owner"]["email"])
+        if not owner or owner.get("role") != "student":
+            return
+        if self.dry_run:
+            print(f"⚠️ {owner['email']} is a student and would be made an admin; "
+                  "until then its courses cannot be listed, so the plan recreates them")
+            return
+        self._call("T03_PromoteOwner", "PUT", f"/user/{owner['_id']}/role", {"role": "admin"})
+        print(f"👑 {owner['email']} is now an admin")
+
+    def fetch(self):
+        """Fill self.existing: one listing per collection, plus one per known course for its lessons."""
+        with transaction("T02_ListUsers"):
+            for page in iter_user_pages():
+                self.existing.users.update((user["email"], user) for user in page)
+        self.promote_owner()
+        courses = self._call("T04_ListCourses", "GET", "/courses")
+        self.existing.courses = {course["id"]: course for course in courses}
+        quizzes = self._call("T05_ListQuizzes", "GET", "/quizzes/list")
+        self.existing.quizzes = {quiz["_id"]: quiz for quiz in quizzes}
+
+        def lessons_of(course_id):
+            return course_id, self._call("T06_ListLessons", "GET", f"/lessons/{course_id}/lessons")
+
+        course_ids = {self.resolve_course(course) for course in self.manifest["courses"]} - {None}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for course_id, lessons in pool.map(lessons_of, course_ids):
+                self.existing.lessons[course_id] = {lesson["_id"]: lesson for lesson in lessons}
+
+    def resolve_course(self, course):
+        """Id of the existing course for a manifest course: by index, else by title; None if missing."""
+        known = self.index.get(f"course/{course['key']}").get("id")
+        if known in self.existing.courses:
+            return known
+        for course_id, row in self.existing.courses.items():
+            if row["name"] == course["title"]:
+                return course_id
+        return None
+
+    def resolve_lesson(self, course_key, course_id, lesson):
+        lessons = self.existing.lessons.get(course_id, {})
+        known = self.index.get(f"lesson/{course_key}/{lesson['key']}").get("id")
+        if known in lessons:
+            return lessons[known]
+        for row in lessons.values():
+            if row["title"] == lesson["title"]:
+                return row
+        return None
+
+    # ------------------------------------------
+    # Writing the difference
+    # ------------------------------------------
+
+    def seed_students(self):
+        """Register the manifest students that have no account yet; nobody is logged in."""
+        missing = [s for s in self.manifest["students"] if s["email"] not in self.existing.users]
+        self._count("student", "unchanged", len(self.manifest["students"]) - len(missing))
+        if self.dry_run:
+            self._count("student", "created", len(missing))
+            return
+
+        def register(student):
+            try:
+                self._call("T07_RegisterStudent", "POST", "/auth/register",
+                           {"name": student.get("name") or student["email"], "email": student["email"],
+                            "password": student["password"]})
+                self._count("student", "created")
+            except SeedError as e:
+                self._count("student", "failed")
+                self.errors.append(f"student {student['email']}: {e}")
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(register, missing))
+
+    def seed_course(self, course):
+        key = course["key"]
+        course_id = self.resolve_course(course)
+        wanted = course_state(course["title"], course.get("description"), course["category"])
+        students = sorted(course.get("students", []))
+        enrollment = digest(students)
+        row = self.existing.courses.get(course_id)
+
+        if course_id is None:
+            self._count("course", "created")
+            if not self.dry_run:
+                data = self._call("T08_CreateCourse", "POST", "/courses",
+                                  {"title": course["title"], "description": course.get("description", ""),
+                                   "category": course["category"], "accessList": students})
+                course_id = data["id"]
+        else:
+            payload = {}
+            if course_state(row["name"], row.get("description"), row.get("category")) != wanted:
+                payload.update(title=course["title"], description=course.get("description", ""),
+                               category=course["category"])
+            # Enrollments are not listed: trust the index unless the count shows students missing
+            if (self.index.get(f"enrollment/{key}").get("digest") != enrollment
+                    or row.get("studentsCount", 0) < len(students)):
+                payload["students"] = students
+            self._count("course", "updated" if payload else "unchanged")
+            if payload and not self.dry_run:
+                self._call("T09_UpdateCourse", "PUT", f"/courses/{course_id}", payload)
+        if not self.dry_run:
+            self.index.put(f"course/{key}", course_id, wanted)
+            self.index.put(f"enrollment/{key}", course_id, enrollment)
+
+        for lesson in course.get("lessons", []):
+            try:
+                self.seed_lesson(key, course_id, lesson)
+            except SeedError as e:
+                self._count("lesson", "failed")
+                self.errors.append(f"lesson {key}/{lesson['key']}: {e}")
+
+    def seed_lesson(self, course_key, course_id, lesson):
+        key = f"{course_key}/{lesson['key']}"
+        row = self.resolve_lesson(course_key, course_id, lesson) if course_id else None
+        contents = normalize_contents(lesson.get("contents"))
+        created = row is None
+        if created:
+            if self.dry_run:
+                row = {"_id": None, "title": lesson["title"], "description": lesson.get("description", ""),
+                       "contents": contents}
+            else:
+                row = self._call("T10_CreateLesson", "POST", "/lessons",
+                                 {"courseId": course_id, "title": lesson["title"],
+                                  "description": lesson.get("description", ""), "contents": contents})
+        lesson_id = row["_id"]
+
+        quiz_id = None
+        if lesson.get("quiz"):
+            quiz_id = self.seed_quiz(key, lesson_id, lesson["quiz"], row.get("contents"))
+            contents = contents + [{"title": lesson["quiz"]["title"], "type": "quiz", "quizId": quiz_id}]
+
+        wanted = lesson_state(lesson["title"], lesson.get("description"), contents)
+        changed = lesson_state(row["title"], row.get("description"), row.get("contents")) != wanted
+        if changed and not self.dry_run:
+            self._call("T11_UpdateLesson", "PUT", f"/lessons/{lesson_id}",
+                       {"title": lesson["title"], "description": lesson.get("description", ""),
+                        "contents": contents})
+        self._count("lesson", "created" if created else "updated" if changed else "unchanged")
+        if not self.dry_run:
+            self.index.put(f"lesson/{key}", lesson_id, wanted)
+
+    def seed_quiz(self, key, lesson_id, quiz, lesson_contents):
+        """Id of the lesson's quiz after creating or updating it (None in a dry run that would create it)."""
+        wanted = quiz_state(quiz)
+        entry = self.index.get(f"quiz/{key}")
+        quiz_id = entry.get("id")
+        if quiz_id not in self.existing.quizzes:
+            # No index entry: adopt the quiz the lesson already links to
+            linked = [str(item["quizId"]) for item in lesson_contents or [] if item.get("type") == "quiz"]
+            quiz_id = next((q for q in linked if q in self.existing.quizzes), None)
+            entry = {}
+        payload = {"title": quiz["title"], "description": quiz.get("description", ""),
+                   "questions": quiz["questions"], "lessonId": lesson_id}
+        try:
+            if quiz_id is None:
+                self._count("quiz", "created")
+                if self.dry_run:
+                    return None
+                quiz_id = self._call("T12_CreateQuiz", "POST", "/quizzes", payload)["_id"]
+            elif entry.get("digest") != wanted or self.existing.quizzes[quiz_id]["title"] != quiz["title"]:
+                self._count("quiz", "updated")
+                if not self.dry_run:
+                    self._call("T13_UpdateQuiz", "PUT", f"/quizzes/{quiz_id}", dict(payload, deleteAttempts=False))
+            else:
+                self._count("quiz", "unchanged")
+        except SeedError:
+            self._count("quiz", "failed")
+            raise
+        if not self.dry_run:
+            self.index.put(f"quiz/{key}", quiz_id, wanted)
+        return quiz_id
+
+    def run(self):
+        self.login()
+        self.fetch()
+        self.seed_students()
+
+        def seed(course):
+            try:
+                self.seed_course(course)
+            except SeedError as e:
+                self._count("course", "failed")
+                self.errors.append(f"course {course['key']}: {e}")
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(seed, self.manifest["courses"]))
+        if not self.dry_run:
+            self.index.save()
+        return self
+
+
+def print_counts(counts, dry_run=False):
+    print(f"\n{'Kind':<10} {'create' if dry_run else 'created':>9} {'update' if dry_run else 'updated':>9} "
+          f"{'unchanged':>10} {'failed':>7}")
+    print("-" * 49)
+    for kind, row in counts.items():
+        print(f"{kind:<10} {row['created']:>9} {row['updated']:>9} {row['unchanged']:>10} {row['failed']:>7}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create or update only what differs from a seed manifest.")
+    parser.add_argument("manifest", help="manifest JSON file")
+    parser.add_argument("--init", action="store_true",
+                        help="write a manifest with HOLY.py's datasets to MANIFEST and exit")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for --init (default: %(default)s)")
+    parser.add_argument("--dry-run", action="store_true", help="print what would be written, write nothing")
+    parser.add_argument("--index", default=SEED_INDEX, help="content-hash index file (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="courses seeded concurrently")
+    parser.add_argument("--json", metavar="FILE", help="write the transaction summary as JSON")
+    parser.add_argument("--csv", metavar="FILE", help="write the transaction summary as CSV")
+    args = parser.parse_args(argv)
+
+    if args.init:
+        if os.path.exists(args.manifest):
+            parser.error(f"{args.manifest} already exists")
+        manifest = manifest_from_holy(args.seed)
+        with open(args.manifest, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        lessons = sum(len(c["lessons"]) for c in manifest["courses"])
+        print(f"📝 {args.manifest}: {len(manifest['courses'])} courses, {lessons} lessons and quizzes, "
+              f"{len(manifest['students'])} students")
+        return 0
+
+    try:
+        manifest = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"❌ {args.manifest}: {e}")
+        return 2
+
+    seeder = ManifestSeeder(manifest, SeedIndex(args.index), workers=args.workers, dry_run=args.dry_run)
+    print(f"🌱 Seeding {args.manifest}{' (dry run)' if args.dry_run else ''}")
+    started = time.perf_counter()
+    try:
+        seeder.run()
+    except SeedError as e:
+        print(f"❌ {e}")
+        return 1
+    elapsed = time.perf_counter() - started
+
+    print_counts(seeder.counts, args.dry_run)
+    for error in seeder.errors:
+        print(f"❌ {error}")
+    writes = sum(row["created"] + row["updated"] for row in seeder.counts.values())
+    print(f"\n{'📋' if args.dry_run else '✅'} {writes} object(s) {'to write' if args.dry_run else 'written'} "
+          f"in {elapsed:.1f}s")
+    report(json_path=args.json, csv_path=args.csv)
+    return 1 if seeder.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,422 @@
+"""
+Offline quiz grading that reproduces routes/quizzes.js, in batch.
+
+The backend grades every question type (multiple-choice,
+fill-in-the-blank, multiple-answer, complete-the-code, true-false) with the
+same comparison:
+
+    typeof answer === typeof correctAnswer &&
+    answer.length === correctAnswer.length &&
+    JSON.stringify([...answer].sort()) === JSON.stringify([...correctAnswer].sort())
+
+(the `typeof answer === String` branch never runs). So strings match when
+they hold the same characters in any order, arrays match as multisets, an
+answer of another type is simply wrong, and numbers, booleans and plain
+objects of the same type as the key throw: the request fails with a 500
+and nothing is stored.
+
+Each answer is reduced once to an integer code of its canonical form
+(sorted characters / sorted elements), so grading millions of answers is
+a handful of NumPy comparisons over flat arrays:
+
+    key = AnswerKey(quizzes)
+    batch = AttemptBatch.from_attempts(attempts, key)
+    result = grade(key, batch)              # result.current_score, .score_pct, ...
+
+    python -m utils.quizGrading synthetic_data
+    python -m utils.quizGrading synthetic_data --fix    # rewrite `correct` flags before bulkLoad
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+if __package__ in (None, ""):
+    # Run as a file rather than with -m: put the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.syntheticData import DatasetWriter, read_docs
+
+# Answer kinds; STRING and ARRAY are the ones the comparison can match
+STRING, ARRAY, NUMBER, BOOLEAN, OBJECT, NULL = range(6)
+# typeof of each kind (arrays, objects and null are all "object")
+TYPEOF = np.array([0, 1, 2, 3, 1, 1], dtype=np.int8)
+
+# Per-answer outcomes
+CORRECT, WRONG, REJECTED, MISSING, NOT_FOUND, NOT_SENT = range(6)
+OUTCOMES = ("correct", "wrong", "rejected (500)", "missing (400)", "not found (404)", "not sent")
+MODES = ("sequential", "batch")
+
+
+# ==========================================
+# ENCODING
+# ==========================================
+
+def _sort_key(value):
+    """String form Array.prototype.sort() compares elements by."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, list):
+        return ",".join("" if v is None else _sort_key(v) for v in value)
+    if isinstance(value, dict):
+        return "[object Object]"
+    return str(value)
+
+
+class AnswerCodec:
+    """
+    Maps answers to (kind, code). Two STRING or two ARRAY answers get the
+    same code exactly when the backend comparison calls them equal; other
+    kinds get code -1. Canonical forms are computed once per distinct raw
+    answer.
+    """
+
+    def __init__(self):
+        self._codes = {}
+        self._raw = {}
+
+    def _code(self, canonical):
+        code = self._codes.get(canonical)
+        if code is None:
+            code = self._codes[canonical] = len(self._codes)
+        return code
+
+    def encode(self, value):
+        if value is None:
+            return NULL, -1
+        if isinstance(value, bool):
+            return BOOLEAN, -1
+        if isinstance(value, (int, float)):
+            return NUMBER, -1
+        if isinstance(value, dict):
+            return OBJECT, -1
+        if isinstance(value, str):
+            cached = self._raw.get(value)
+            if cached is None:
+                # [...s] spreads code points; equal multisets <=> equal sorted JSON
+                cached = self._raw[value] = self._code(("s", "".join(sorted(value))))
+            return STRING, cached
+        if isinstance(value, list):
+            # Stable sort on the string form, as in JS; ties keep their order
+            canonical = json.dumps(sorted(value, key=_sort_key), ensure_ascii=False, separators=(",", ":"))
+            return ARRAY, self._code(("a", canonical))
+        return OBJECT, -1
+
+    def __len__(self):
+        return len(self._codes)
+
+
+# ==========================================
+# ARRAYS
+# ==========================================
+
+class AnswerKey:
+    """Correct answers and values of a set of quizzes, flattened question-major."""
+
+    def __init__(self, quizzes, codec=None):
+        self.codec = codec or AnswerCodec()
+        self.quiz_ids = []
+        self.index = {}
+        starts, kinds, codes, values = [0], [], [], []
+        for quiz in quizzes:
+            quiz_id = str(quiz.get("_id") or quiz.get("id"))
+            self.index[quiz_id] = len(self.quiz_ids)
+            self.quiz_ids.append(quiz_id)
+            for question in quiz.get("questions") or []:
+                kind, code = self.codec.encode(question.get("correctAnswer"))
+                kinds.append(kind)
+                codes.append(code)
+                value = question.get("value", 1)
+                values.append(value if isinstance(value, (int, float)) and not isinstance(value, bool) else 0)
+            starts.append(len(kinds))
+
+        # One sentinel question and quiz at the end: quiz row -1 and questions
+        # past the end of a quiz index them instead of needing bounds checks
+        self.question_start = np.array(starts, dtype=np.int64)
+        self.sentinel = len(kinds)
+        self.kind = np.array(kinds + [NULL], dtype=np.int8)
+        self.code = np.array(codes + [-1], dtype=np.int64)
+        self.value = np.array(values + [0], dtype=np.float64)
+        self.question_count = np.append(np.diff(self.question_start), 0)
+        # maxScore: the sum of question values, as Quiz's pre("save") hook computes it
+        owner = np.repeat(np.arange(len(self.quiz_ids)), self.question_count[:-1])
+        self.max_score = np.append(np.bincount(owner, weights=self.value[:-1], minlength=len(self.quiz_ids)), np.nan)
+
+    def __len__(self):
+        return len(self.quiz_ids)
+
+
+class AttemptBatch:
+    """
+    Attempts as flat arrays: one row per answer, attempts delimited by
+    `answer_start`. Answers are taken to start at questionIndex 0.
+    """
+
+    def __init__(self, attempt_quiz, answer_start, kind, code, ids=None):
+        self.attempt_quiz = attempt_quiz
+        self.answer_start = answer_start
+        self.kind = kind
+        self.code = code
+        self.ids = ids
+
+    @classmethod
+    def from_attempts(cls, attempts, key):
+        """
+        `attempts` yields (quiz_id, answers) or (quiz_id, user_id, answers),
+        the tuples utils.attemptPipeline sends, or quizattempts documents
+        whose answers are {"answer": ...} subdocuments.
+        """
+        encode = key.codec.encode
+        quiz_rows, starts, kinds, codes, ids = [], [0], [], [], []
+        for attempt in attempts:
+            if isinstance(attempt, dict):
+                quiz_id = attempt.get("quizId")
+                answers = [a.get("answer") if isinstance(a, dict) else a for a in attempt.get("answers") or []]
+                ids.append(attempt.get("_id"))
+            else:
+                quiz_id, answers = attempt[0], attempt[-1]
+                ids.append(None)
+            quiz_rows.append(key.index.get(str(quiz_id), -1))
+            for answer in answers:
+                kind, code = encode(answer)
+                kinds.append(kind)
+                codes.append(code)
+            starts.append(len(kinds))
+        return cls(np.array(quiz_rows, dtype=np.int64), np.array(starts, dtype=np.int64),
+                   np.array(kinds, dtype=np.int8), np.array(codes, dtype=np.int64), ids)
+
+    @property
+    def answer_count(self):
+        return np.diff(self.answer_start)
+
+    def __len__(self):
+        return len(self.attempt_quiz)
+
+
+class GradeResult:
+    """Per-answer outcomes and per-attempt totals, all NumPy arrays."""
+
+    def __init__(self, outcome, score, accepted, answer_attempt, current_score, questions_answered,
+                 max_score, rejected):
+        self.outcome = outcome                        # per answer: CORRECT, WRONG, ...
+        self.score = score                            # per answer: value if stored and correct
+        self.accepted = accepted                      # per answer: stored by the backend
+        self.answer_attempt = answer_attempt          # per answer: attempt row
+        self.current_score = current_score            # per attempt
+        self.questions_answered = questions_answered  # per attempt
+        self.max_score = max_score                    # per attempt (NaN for unknown quizzes)
+        self.rejected = rejected                      # per attempt: the request that stopped it failed
+        # QuizAttempt's pre("save") hook: any stored answer marks the attempt completed
+        self.completed = questions_answered > 0
+
+    @property
+    def correct(self):
+        return self.outcome == CORRECT
+
+    @property
+    def score_pct(self):
+        """What GET /quiz-score returns: parseFloat((currentScore / maxScore * 100).toFixed(2)); NaN -> null."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct = np.round(self.current_score / self.max_score * 100, 2)
+        pct[~np.isfinite(pct)] = np.nan
+        return pct
+
+    def outcome_counts(self):
+        counts = np.bincount(self.outcome, minlength=len(OUTCOMES))
+        return {name: int(n) for name, n in zip(OUTCOMES, counts)}
+
+
+# ==========================================
+# GRADING
+# ==========================================
+
+def grade(key, batch, mode="sequential"):
+    """
+    Grade every answer of `batch` against `key`.
+
+    mode="sequential" follows /no-auth-submit-answer as attemptPipeline
+    drives it: answers go in questionIndex order, and after the first
+    failed request the attempt's questionIndex no longer lines up, so the
+    rest are refused (NOT_SENT: never stored, whether sent or not).
+    mode="batch" follows /no-auth-submit-attempt: one bad answer fails the
+    whole request and nothing is stored.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown grading mode '{mode}', expected one of {', '.join(MODES)}")
+
+    counts = batch.answer_count
+    attempts = len(batch)
+    answer_attempt = np.repeat(np.arange(attempts), counts)
+    position = np.arange(len(batch.kind)) - np.repeat(batch.answer_start[:-1], counts)
+
+    quiz = batch.attempt_quiz[answer_attempt]
+    found = position < key.question_count[quiz]
+    question = np.where(found, key.question_start[quiz] + position, key.sentinel)
+
+    a_kind, a_code = batch.kind, batch.code
+    k_kind, k_code = key.kind[question], key.code[question]
+
+    same_type = TYPEOF[a_kind] == TYPEOF[k_kind]
+    comparable = (a_kind == k_kind) & ((a_kind == STRING) | (a_kind == ARRAY))
+    # Same typeof but not spreadable on both sides: .length or [...x] throws
+    throws = same_type & ~comparable & (
+        (a_kind == NUMBER) | (a_kind == BOOLEAN) | (k_kind == NULL) | ((a_kind == OBJECT) & (k_kind == OBJECT)))
+
+    outcome = np.full(len(question), WRONG, dtype=np.int8)
+    outcome[comparable & (a_code == k_code)] = CORRECT
+    outcome[throws] = REJECTED
+    outcome[a_kind == NULL] = MISSING
+    outcome[~found] = NOT_FOUND
+
+    failed = outcome >= REJECTED
+    if mode == "sequential":
+        # Nothing after the first failure in an attempt is sent
+        seen = np.cumsum(failed) - np.repeat(np.cumsum(np.concatenate(([0], failed)))[batch.answer_start[:-1]], counts)
+        after = (seen - failed) > 0
+        outcome[after] = NOT_SENT
+        accepted = ~failed & ~after
+    else:
+        bad = np.zeros(attempts, dtype=bool)
+        np.logical_or.at(bad, answer_attempt[failed], True)
+        accepted = ~bad[answer_attempt]
+
+    score = np.where(accepted & (outcome == CORRECT), key.value[question], 0.0)
+    current_score = np.bincount(answer_attempt, weights=score, minlength=attempts)
+    questions_answered = np.bincount(answer_attempt, weights=accepted, minlength=attempts).astype(np.int64)
+    rejected = np.zeros(attempts, dtype=bool)
+    np.logical_or.at(rejected, answer_attempt[failed], True)
+    return GradeResult(outcome, score, accepted, answer_attempt, current_score, questions_answered,
+                       key.max_score[batch.attempt_quiz], rejected)
+
+
+def grade_attempts(quizzes, attempts, mode="sequential"):
+    """One-call form: quiz documents and attempts in, GradeResult out."""
+    key = AnswerKey(quizzes)
+    return grade(key, AttemptBatch.from_attempts(attempts, key), mode=mode)
+
+
+# ==========================================
+# DATASETS
+# ==========================================
+
+def load_dataset(data_dir):
+    """(AnswerKey, AttemptBatch, manifest) for a utils.syntheticData directory."""
+    with open(os.path.join(data_dir, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    files = manifest.get("files", {})
+    if "quizzes" not in files:
+        raise FileNotFoundError(f"{data_dir} has no quizzes")
+    key = AnswerKey(read_docs(os.path.join(data_dir, files["quizzes"])))
+    attempts = read_docs(os.path.join(data_dir, files["quizattempts"])) if "quizattempts" in files else ()
+    return key, AttemptBatch.from_attempts(attempts, key), manifest
+
+
+def stored_flags(data_dir, manifest):
+    """The `correct` flags the generator wrote, flattened like the batch."""
+    name = manifest.get("files", {}).get("quizattempts")
+    if not name:
+        return np.zeros(0, dtype=bool)
+    return np.fromiter((bool(a.get("correct")) for doc in read_docs(os.path.join(data_dir, name))
+                        for a in doc.get("answers") or []), dtype=bool)
+
+
+def rewrite_attempts(data_dir, manifest, result):
+    """
+    Rewrite quizattempts with the backend's verdicts: `correct` recomputed,
+    refused answers dropped and questionsAnswered/completed to match.
+    """
+    name = manifest["files"]["quizattempts"]
+    path = os.path.join(data_dir, name)
+    correct, accepted = result.correct, result.accepted
+    staging = tempfile.mkdtemp(dir=data_dir)
+    writer = DatasetWriter(staging, manifest.get("format", "ndjson"))
+    row = 0
+    try:
+        for i, doc in enumerate(read_docs(path)):
+            answers = []
+            for answer in doc.get("answers") or []:
+                if accepted[row]:
+                    answers.append(dict(answer, correct=bool(correct[row])))
+                row += 1
+            doc["answers"] = answers
+            doc["questionsAnswered"] = int(result.questions_answered[i])
+            doc["completed"] = bool(result.completed[i])
+            writer.write("quizattempts", doc)
+        writer.close({})
+        os.replace(writer.path("quizattempts"), path)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def print_summary(key, batch, result, flags=None):
+    print(f"\n🧮 Graded {len(batch.kind):,} answers in {len(batch):,} attempts over {len(key):,} quizzes")
+    total = max(len(batch.kind), 1)
+    for name, n in result.outcome_counts().items():
+        if n:
+            print(f"   {name:<26} {n:>12,}  {n / total:6.1%}")
+
+    pct = result.score_pct
+    scored = pct[~np.isnan(pct)]
+    if len(scored):
+        p50, p90 = np.percentile(scored, [50, 90])
+        print(f"   quiz-score: mean {scored.mean():.2f}%, p50 {p50:.2f}%, p90 {p90:.2f}% "
+              f"over {len(scored):,} attempts")
+    if (batch.attempt_quiz < 0).any():
+        print(f"   ⚠️  {int((batch.attempt_quiz < 0).sum()):,} attempts reference unknown quizzes")
+
+    if flags is not None and len(flags) == len(batch.kind):
+        differ = flags != result.correct
+        print(f"   stored `correct` flags that disagree with the backend: {int(differ.sum()):,}")
+        return int(differ.sum())
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grade a synthetic dataset's quiz attempts the way the backend would.")
+    parser.add_argument("data_dir", nargs="?", default="synthetic_data", help="dataset directory (default: %(default)s)")
+    parser.add_argument("--mode", choices=MODES, default="sequential",
+                        help="submit-answer one by one, or the whole attempt at once (default: %(default)s)")
+    parser.add_argument("--fix", action="store_true",
+                        help="rewrite quizattempts with the backend's verdicts before bulk loading")
+    parser.add_argument("--json", metavar="FILE", help="write per-attempt currentScore/score_pct as JSON lines")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    key, batch, manifest = load_dataset(args.data_dir)
+    loaded = time.perf_counter()
+    result = grade(key, batch, mode=args.mode)
+    graded = time.perf_counter()
+    print(f"📂 Encoded {len(batch.kind):,} answers ({len(key.codec):,} distinct) in {loaded - started:.1f}s, "
+          f"graded in {(graded - loaded) * 1000:.0f} ms")
+
+    mismatches = print_summary(key, batch, result, stored_flags(args.data_dir, manifest))
+
+    if args.json:
+        pct = result.score_pct
+        with open(args.json, "w", encoding="utf-8") as f:
+            for i, attempt_id in enumerate(batch.ids):
+                f.write(json.dumps({"_id": attempt_id, "currentScore": float(result.current_score[i]),
+                                    "questionsAnswered": int(result.questions_answered[i]),
+                                    "score": None if np.isnan(pct[i]) else float(pct[i])}) + "\n")
+        print(f"💾 Scores saved to: {args.json}")
+
+    if args.fix:
+        if mismatches or (~result.accepted).any():
+            rewrite_attempts(args.data_dir, manifest, result)
+            print(f"✍️  Rewrote {manifest['files']['quizattempts']} with the backend's verdicts")
+        else:
+            print("✅ Stored flags already match the backend; nothing to rewrite")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
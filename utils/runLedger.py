@@ -0,0 +1,205 @@
+"""
+Run ledger: which courses, lessons, quizzes and quiz attempts a run created.
+
+When LOADTEST_RUN_ID is set, every session from httpClient.create_session()
+(and asyncSeeder's aiohttp calls) reports its successful creates here,
+and they are appended to runs/<run id>.ndjson, one JSON line per object,
+after a line naming the server they were created on. Nothing is tagged in
+the database itself: the backend schemas are strict, so the ledger is the
+tag. `python -m utils.teardown <run id>` deletes what a ledger lists, on
+that server. Courses record their owner's email, never a token: the
+teardown logs the owner in again through the token pool.
+
+    LOADTEST_RUN_ID=seed-1 python -m utils.HOLY
+    python -m utils.teardown seed-1
+"""
+import base64
+import json
+import os
+import re
+import secrets
+import threading
+from datetime import datetime
+from urllib.parse import urlsplit
+
+RUN_ENV = "LOADTEST_RUN_ID"
+# One runs/ per checkout, wherever the scripts are started from (like the token cache)
+RUNS_DIR = os.environ.get("LOADTEST_RUNS_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "runs")
+# Teardown order: attempts reference quizzes, quizzes lessons, lessons courses
+KINDS = ("attempt", "quiz", "lesson", "course")
+# Ledger lines naming the server (scheme://host:port) the objects were created on
+HOST_KIND = "host"
+
+ATTEMPT_PATHS = re.compile(r"^/api/quizzes/(submit-answer|no-auth-submit-answer|no-auth-submit-attempt)$")
+TOKEN_COOKIE = re.compile(r"(?:^|;\s*)token=([^;]+)")
+
+
+def new_run_id():
+    """Sortable and unique enough: 20261018-090040-3fa2."""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(2)}"
+
+
+def token_claim(token, name):
+    """One claim of a backend JWT, read without verifying it."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return json.loads(base64.urlsafe_b64decode(payload)).get(name)
+    except (IndexError, ValueError, AttributeError):
+        return None
+
+
+def token_subject(token):
+    """User id (`sub`) of a backend JWT."""
+    return token_claim(token, "sub")
+
+
+def request_token(headers):
+    """The JWT a request authenticated with: the `token` cookie or a Bearer header."""
+    match = TOKEN_COOKIE.search(headers.get("Cookie", ""))
+    if match:
+        return match.group(1)
+    auth = headers.get("Authorization", "")
+    return auth[7:] if auth.startswith("Bearer ") else None
+
+
+class RunLedger:
+    """Append-only NDJSON file of created objects; safe across threads and processes."""
+
+    def __init__(self, run_id, directory=None):
+        self.run_id = run_id
+        self.path = os.path.join(directory or RUNS_DIR, f"{run_id}.ndjson")
+        self._lock = threading.Lock()
+        self._file = None
+        self._hosts = set()
+
+    def add(self, kind, object_id, **extra):
+        line = json.dumps(dict(extra, kind=kind, id=object_id), separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                # O_APPEND: whole-line writes from several processes never interleave
+                self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+            self._file.write(line)
+
+    def add_host(self, host):
+        """Name the server the following objects live on, once per server and process."""
+        if host and host not in self._hosts:
+            self._hosts.add(host)
+            self.add(HOST_KIND, host)
+
+    def observe(self, method, path, payload, status, data, token=None, host=None):
+        """
+        Record one API call if it created something the teardown should
+        remove; `host` is the server's scheme://host:port.
+        """
+        if method != "POST" or status not in (200, 201) or not isinstance(data, dict):
+            return
+        if path == "/api/courses":
+            if data.get("id"):
+                self.add_host(host)
+                self.add("course", data["id"], owner=token_claim(token, "email"))
+        elif path == "/api/lessons":
+            if data.get("_id"):
+                self.add_host(host)
+                self.add("lesson", data["_id"], course=data.get("courseId") or (payload or {}).get("courseId"))
+        elif path == "/api/quizzes":
+            if data.get("_id"):
+                self.add_host(host)
+                self.add("quiz", data["_id"])
+        elif ATTEMPT_PATHS.match(path) and isinstance(payload, dict) and payload.get("quizId"):
+            user_id = payload.get("userId") or token_subject(token)
+            self.add_host(host)
+            self.add("attempt", f"{payload['quizId']}:{user_id}", quiz=payload["quizId"], user=user_id)
+
+    def _hook(self, response, *args, **kwargs):
+        request = response.request
+        if request.method != "POST" or response.status_code not in (200, 201):
+            return
+        try:
+            payload = json.loads(request.body) if request.body else None
+        except (TypeError, ValueError):
+            payload = None  # multipart uploads and other non-JSON bodies create nothing we track
+        try:
+            data = response.json()
+        except ValueError:
+            return
+        url = urlsplit(request.url)
+        self.observe(request.method, url.path, payload, response.status_code, data,
+                     token=request_token(request.headers), host=f"{url.scheme}://{url.netloc}")
+
+    def attach(self, session):
+        """Record the creates made through a requests session; idempotent."""
+        hooks = session.hooks.setdefault("response", [])
+        if self._hook not in hooks:
+            hooks.append(self._hook)
+        return session
+
+    def _records(self):
+        """Every readable line; lines cut short by a crash are skipped."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+
+    def load(self):
+        """{kind: {id: record}} in KINDS order, later lines for the same id winning."""
+        records = {kind: {} for kind in KINDS}
+        for record in self._records():
+            if record.get("kind") in records:
+                records[record["kind"]][record["id"]] = record
+        return records
+
+    def hosts(self):
+        """Servers the run created objects on, in the order they were first used."""
+        return list(dict.fromkeys(r["id"] for r in self._records() if r.get("kind") == HOST_KIND))
+
+    def rewrite(self, records, hosts=()):
+        """
+        Replace the ledger with `records` (what is left after a teardown)
+        on `hosts`; removes it when no records are left.
+        """
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+            remaining = [r for kind in KINDS for r in records.get(kind, {}).values()]
+            if not remaining:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                return
+            with open(f"{self.path}.tmp", "w", encoding="utf-8") as f:
+                for record in [{"kind": HOST_KIND, "id": host} for host in hosts] + remaining:
+                    f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            os.replace(f"{self.path}.tmp", self.path)
+            self._hosts = set(hosts)
+
+
+def list_runs(directory=None):
+    try:
+        names = os.listdir(directory or RUNS_DIR)
+    except FileNotFoundError:
+        return []
+    return sorted(name[:-len(".ndjson")] for name in names if name.endswith(".ndjson"))
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def current_ledger():
+    """The ledger of the run named by LOADTEST_RUN_ID, or None when runs are not being tagged."""
+    global _ledger
+    run_id = os.environ.get(RUN_ENV)
+    if not run_id:
+        return None
+    with _ledger_lock:
+        if _ledger is None or _ledger.run_id != run_id:
+            _ledger = RunLedger(run_id)
+        return _ledger
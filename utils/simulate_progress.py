@@ -1,36 +1,45 @@
+import argparse
 import requests
+import os
 import random
 import sys
+import threading
 import time
+from contextlib import nullcontext
+
+if __package__ in (None, ""):
+    # Run as a file rather than with -m: put the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.httpClient import BASE_URL, auth_headers, create_session, get_session
+from utils.loadtest.dashboard import live
+from utils.loadtest.instrument import get_collector, instrument_session, report, transaction
+from utils.loadtest.scheduler import DEFAULT_MAX_IN_FLIGHT, ArrivalScheduler, parse_profile, print_schedule
+from utils.tokenPool import get_token_pool
+
+session = instrument_session(get_session())
 
 # Configuration
-BASE_URL = "http://localhost:5000/api"
 AUTH_LOGIN_URL = f"{BASE_URL}/auth/login"
 COURSES_URL = f"{BASE_URL}/courses" 
 LESSONS_BASE_URL = f"{BASE_URL}/lessons"
 
 def login_and_get_user(email, password):
-    """Logs in and returns the User ID and Token"""
-    try:
-        res = requests.post(AUTH_LOGIN_URL, json={"email": email, "password": password})
-        if res.status_code == 200:
-            data = res.json()
-            # Depending on your Auth response structure, adjust these keys
-            # Usually it returns { token: "...", user: { _id: "..." } }
-            return data.get("user", {}).get("id"), data.get("token")
-        else:
-            print(f"   ⚠️ Could not log in {email}")
-            return None, None
-    except Exception as e:
-        print(f"   ❌ Connection error: {e}")
-        return None, None
+    """Logs in (or reuses a cached token) and returns the User ID and Token"""
+    with transaction("T01_Login"):
+        entry = get_token_pool().get(email, password)
+    if entry:
+        return entry["userId"], entry["token"]
+    print(f"   ⚠️ Could not log in {email}")
+    return None, None
 
 def get_enrolled_courses(token):
     """Fetches courses the student is enrolled in"""
-    headers = {"Authorization": f"Bearer {token}"}
+    headers = auth_headers(token)
     try:
         # Assuming your /courses endpoint returns only enrolled courses for students
-        res = requests.get(COURSES_URL, headers=headers)
+        with transaction("T02_GetMyCourses"):
+            res = session.get(COURSES_URL, headers=headers)
         if res.status_code == 200:
             return res.json()
         return []
@@ -43,14 +52,15 @@ def get_lessons_for_course(course_id):
     # Assuming the file is mounted at /api/lessons
     url = f"{LESSONS_BASE_URL}/{course_id}/lessons"
     try:
-        res = requests.get(url)
+        with transaction("T03_GetCourseLessons"):
+            res = session.get(url)
         if res.status_code == 200:
             return res.json()
         return []
     except:
         return []
 
-def toggle_lesson_completion(lesson_id, user_id, is_completed):
+def toggle_lesson_completion(lesson_id, user_id, is_completed, token=None):
     """Calls the PUT /:id/toggle-completion endpoint"""
     url = f"{LESSONS_BASE_URL}/{lesson_id}/toggle-completion"
     
@@ -61,22 +71,68 @@ def toggle_lesson_completion(lesson_id, user_id, is_completed):
     }
     
     try:
-        # Note: Your toggle endpoint snippet didn't show 'requireAuth', 
-        # but usually headers are good practice. The body contains the auth logic here.
-        res = requests.put(url, json=payload)
+        # The route is behind requireAuth and takes the student from the token
+        with transaction("T04_ToggleCompletion"):
+            res = session.put(url, json=payload, headers=auth_headers(token))
         return res.status_code == 200
     except:
         return False
 
-def main():
-    print("==========================================")
-    print("   SIMULATING STUDENT PROGRESS")
-    print("==========================================\n")
+def collect_student_lessons(accounts):
+    """
+    Log the students in and list the lessons of their courses once, so the
+    open model only times toggle-completion. Returns [(user_id, token, lesson_ids)].
+    """
+    get_token_pool().login_many(accounts)
+    students = []
+    for email, password in accounts:
+        user_id, token = login_and_get_user(email, password)
+        if not user_id or not token:
+            continue
+        lesson_ids = []
+        for course in get_enrolled_courses(token):
+            course_id = course.get("id") or course.get("_id")
+            lesson_ids.extend(lesson["_id"] for lesson in get_lessons_for_course(course_id))
+        if lesson_ids:
+            students.append((user_id, token, lesson_ids))
+    return students
+
+def run_open_model(args, accounts):
+    """
+    Toggle a random lesson of a random student at every arrival of
+    --arrivals. Returns the ArrivalScheduler, or None when no student has lessons.
+    """
+    global session
+    profile = parse_profile(args.arrivals, args.duration)
+    # One pooled connection per toggle in flight, so waiting for a connection never counts as latency
+    session = instrument_session(create_session(pool_maxsize=args.max_in_flight))
+    students = collect_student_lessons(accounts)
+    if not students:
+        return None
+    print(f"🎯 {len(students)} students, {sum(len(s[2]) for s in students)} lessons; "
+          f"{profile.describe()}{' (Poisson)' if args.poisson else ''}")
+
+    rng = random.Random(args.seed)
+    picks = threading.Lock()
+
+    def toggle(_):
+        with picks:
+            user_id, token, lesson_ids = rng.choice(students)
+            lesson_id = rng.choice(lesson_ids)
+            completed = rng.choice([True, False, True])
+        if not toggle_lesson_completion(lesson_id, user_id, completed, token):
+            raise RuntimeError(f"toggle-completion failed for lesson {lesson_id}")
+
+    scheduler = ArrivalScheduler(profile, poisson=args.poisson, max_in_flight=args.max_in_flight, seed=args.seed)
+    return scheduler.run(toggle)
+
+def update_progress(accounts):
+    """Log each student in and randomly mark the lessons of their courses complete."""
+    # Log every test user in up front, concurrently (cached tokens are reused)
+    get_token_pool().login_many(accounts)
 
     # Iterate through your test users
-    for i in range(1, 11): 
-        email = f"test_{i}@test.com"
-        password = "testtest"
+    for email, password in accounts:
         
         print(f"👤 Processing: {email}")
         
@@ -113,7 +169,7 @@ def main():
                 should_complete = random.choice([True, False, True]) # 66% chance of completion
                 
                 if should_complete:
-                    success = toggle_lesson_completion(lesson['_id'], user_id, True)
+                    success = toggle_lesson_completion(lesson['_id'], user_id, True, token)
                     if success:
                         updates_count += 1
                         sys.stdout.write(".") # Visual progress bar
@@ -122,10 +178,53 @@ def main():
             print(f"\n      ↳ Marked {updates_count}/{len(lessons)} lessons as complete.")
             time.sleep(0.2) # Be nice to the server
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Randomly mark lessons complete for the test students.")
+    parser.add_argument("--json", metavar="FILE", help="write the transaction summary as JSON")
+    parser.add_argument("--csv", metavar="FILE", help="write the transaction summary as CSV")
+    parser.add_argument("--arrivals", metavar="PROFILE",
+                        help="open model: toggles started at constant:RATE, ramp:START:END or "
+                             "step:RATExSECONDS,... per second, whatever the response times")
+    parser.add_argument("--duration", type=float, default=60,
+                        help="seconds for constant and ramp profiles (default: %(default)s)")
+    parser.add_argument("--poisson", action="store_true", help="Poisson arrivals instead of evenly spaced")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT,
+                        help="toggles in flight before arrivals are dropped (default: %(default)s)")
+    parser.add_argument("--students", type=int, default=10, help="test_N@test.com accounts to use")
+    parser.add_argument("--seed", type=int, help="random seed for arrivals and picks")
+    parser.add_argument("--live", action="store_true",
+                        help="show a live dashboard instead of a line per student and lesson")
+    args = parser.parse_args(argv)
+    if args.arrivals:
+        try:
+            parse_profile(args.arrivals, args.duration)
+        except ValueError as e:
+            parser.error(str(e))
+    accounts = [(f"test_{i}@test.com", "testtest") for i in range(1, args.students + 1)]
+
+    print("==========================================")
+    print("   SIMULATING STUDENT PROGRESS")
+    print("==========================================\n")
+
+    if args.arrivals:
+        with live(get_collector(), title="Lesson toggles") if args.live else nullcontext():
+            scheduler = run_open_model(args, accounts)
+        if scheduler:
+            print_schedule(scheduler.summary())
+        else:
+            print("❌ No logged-in student has lessons to toggle")
+        report(json_path=args.json, csv_path=args.csv)
+        return
+
+    with live(get_collector(), title="Student progress") if args.live else nullcontext():
+        update_progress(accounts)
+
     print("\n==========================================")
     print("✅ PROGRESS UPDATED RANDOMLY")
     print("==========================================")
 
+    report(json_path=args.json, csv_path=args.csv)
+
 if __name__ == "__main__":
     try:
         main()
@@ -0,0 +1,470 @@
+"""
+Offline, columnar version of GET /api/enrollments/my-students.
+
+The endpoint joins Course, Enrollment, Lesson, Quiz and QuizAttempt in
+memory on every request, with linear `find`s inside loops. Here each
+collection is loaded once into flat NumPy columns, ids become row numbers
+through hash indexes, and the per-student metrics are group-bys:
+
+- lessonProgress: Math.round(mean studentProgress over the admin's enrollments)
+- quizAverage:    Math.round(mean over enrolled courses with completed
+                  attempts of that course's mean attempt percentage), where
+                  an attempt's percentage falls back to maxScore 100 when the
+                  quiz has none
+- courses:        the first 3 distinct course titles, in enrollment order
+
+Input is a utils.syntheticData directory (derived fields are recomputed
+the way utils.bulkLoad stores them) or a directory of mongoexport NDJSON
+files named after the collections.
+
+    python -m utils.studentMetrics synthetic_data --admin synth_admin_1@test.com
+    python -m utils.studentMetrics dump/ --admin admin1@email.com --compare --password password1
+    python -m utils.studentMetrics synthetic_data --materialize my_students.ndjson
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import requests
+
+if __package__ in (None, ""):
+    # Run as a file rather than with -m: put the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.httpClient import HOST, auth_headers, create_session
+from utils.syntheticData import COLLECTIONS, read_docs
+from utils.tokenPool import TokenPool
+
+ROUND_EPSILON = 1e-9
+
+
+def js_round(values):
+    """Math.round over an array: halves go up."""
+    return np.floor(np.asarray(values, dtype=np.float64) + 0.5).astype(np.int64)
+
+
+def plain_id(value):
+    """ObjectId as a hex string, from either a plain string or mongoexport's {"$oid": ...}."""
+    if isinstance(value, dict):
+        value = value.get("$oid", value)
+    return None if value is None else str(value)
+
+
+def plain_number(value, default=0):
+    """Number from a plain value or mongoexport's {"$numberInt": ...}-style wrappers."""
+    if isinstance(value, dict):
+        value = next(iter(value.values()), default)
+    if value is None or isinstance(value, bool):
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def collection_path(data_dir, collection):
+    """File holding `collection`: from manifest.json, else COLLECTION.ndjson/.json/.csv."""
+    manifest_path = os.path.join(data_dir, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            name = json.load(f).get("files", {}).get(collection)
+        return os.path.join(data_dir, name) if name else None
+    for ext in ("ndjson", "json", "csv"):
+        path = os.path.join(data_dir, f"{collection}.{ext}")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+class IdIndex:
+    """Hash index from id string to row number; unknown ids map to -1."""
+
+    def __init__(self):
+        self.rows = {}
+        self.ids = []
+
+    def add(self, doc_id):
+        row = self.rows[doc_id] = len(self.ids)
+        self.ids.append(doc_id)
+        return row
+
+    def lookup(self, doc_id):
+        return self.rows.get(doc_id, -1)
+
+    def lookup_many(self, ids):
+        rows = self.rows
+        return np.fromiter((rows.get(i, -1) for i in ids), dtype=np.int64, count=len(ids))
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class StudentMetrics:
+    """Columnar copy of the collections my-students reads."""
+
+    def __init__(self):
+        self.users = IdIndex()
+        self.user_name, self.user_email, self.user_role = [], [], []
+        self.courses = IdIndex()
+        self.quizzes = IdIndex()
+        self.load_seconds = 0.0
+
+    # ------------------------------------------
+    # LOADING
+    # ------------------------------------------
+
+    @classmethod
+    def from_dir(cls, data_dir):
+        metrics = cls()
+        started = time.perf_counter()
+        docs = {}
+        for collection in COLLECTIONS:
+            path = collection_path(data_dir, collection)
+            docs[collection] = read_docs(path) if path else iter(())
+        metrics.load(**docs)
+        metrics.load_seconds = time.perf_counter() - started
+        return metrics
+
+    def load(self, users=(), courses=(), lessons=(), quizzes=(), enrollments=(), quizattempts=()):
+        """Build the columns from iterables of documents, in collection order."""
+        for doc in users:
+            self.users.add(plain_id(doc["_id"]))
+            self.user_name.append(doc.get("name"))
+            self.user_email.append(doc.get("email"))
+            self.user_role.append(doc.get("role", "student"))
+
+        owners, titles = [], []
+        for doc in courses:
+            self.courses.add(plain_id(doc["_id"]))
+            owners.append(plain_id(doc.get("owner")))
+            titles.append(doc.get("title"))
+        self.course_owner = self.users.lookup_many(owners)
+        self.course_title = titles
+        # Titles as codes, so "distinct titles" is an integer group-by
+        title_codes = {}
+        self.course_title_code = np.fromiter((title_codes.setdefault(t, len(title_codes)) for t in titles),
+                                             dtype=np.int64, count=len(titles))
+        self.title_count = len(title_codes)
+
+        lesson_index, lesson_courses = IdIndex(), []
+        for doc in lessons:
+            lesson_index.add(plain_id(doc["_id"]))
+            lesson_courses.append(plain_id(doc.get("courseId")))
+        lesson_course = self.courses.lookup_many(lesson_courses)
+        known = lesson_course >= 0
+        lessons_per_course = np.bincount(lesson_course[known], minlength=len(self.courses))
+
+        quiz_lessons, max_scores, question_values = [], [], {}
+        for doc in quizzes:
+            quiz_id = plain_id(doc["_id"])
+            self.quizzes.add(quiz_id)
+            quiz_lessons.append(plain_id(doc.get("lessonId")))
+            values = question_values[quiz_id] = [plain_number(q.get("value", 1), 1) for q in doc.get("questions") or []]
+            # Quiz's pre("save") hook sums the values when maxScore wasn't exported
+            max_scores.append(plain_number(doc["maxScore"]) if "maxScore" in doc else sum(values))
+        quiz_lesson = lesson_index.lookup_many(quiz_lessons)
+        self.quiz_course = np.where(quiz_lesson >= 0, lesson_course[np.maximum(quiz_lesson, 0)], -1) \
+            if len(lesson_course) else np.full(len(quiz_lesson), -1, dtype=np.int64)
+        self.quiz_max_score = np.array(max_scores, dtype=np.float64)
+
+        students, enrolled_courses, progress = [], [], []
+        for doc in enrollments:
+            students.append(plain_id(doc.get("student")))
+            course_id = plain_id(doc.get("course"))
+            enrolled_courses.append(course_id)
+            if "studentProgress" in doc:
+                progress.append(plain_number(doc["studentProgress"]))
+            else:
+                # Enrollment's pre("save") hook
+                total = lessons_per_course[self.courses.lookup(course_id)] if course_id in self.courses.rows else 0
+                done = len(doc.get("completedLessons") or [])
+                progress.append(min(done / total * 100, 100) if total else 0)
+        self.enrollment_student = self.users.lookup_many(students)
+        self.enrollment_course = self.courses.lookup_many(enrolled_courses)
+        self.enrollment_progress = np.array(progress, dtype=np.float64)
+
+        attempt_users, attempt_quizzes, scores, completed = [], [], [], []
+        for doc in quizattempts:
+            attempt_users.append(plain_id(doc.get("userId")))
+            attempt_quizzes.append(plain_id(doc.get("quizId")))
+            answers = doc.get("answers") or []
+            if "currentScore" in doc:
+                scores.append(plain_number(doc["currentScore"]))
+            else:
+                # Generated attempts only carry `correct` flags; score them as bulkLoad does
+                values = question_values.get(attempt_quizzes[-1], [])
+                scores.append(sum(v for a, v in zip(answers, values) if a.get("correct")))
+            # QuizAttempt's pre("save") hook marks any answered attempt completed
+            completed.append(bool(doc.get("completed")) or bool(answers))
+        self.attempt_user = self.users.lookup_many(attempt_users)
+        self.attempt_quiz = self.quizzes.lookup_many(attempt_quizzes)
+        self.attempt_score = np.array(scores, dtype=np.float64)
+        self.attempt_completed = np.array(completed, dtype=bool)
+        self._pair_table = None
+        return self
+
+    # ------------------------------------------
+    # GROUP-BYS
+    # ------------------------------------------
+
+    def course_quiz_means(self):
+        """
+        Mean attempt percentage per (student, course), over completed
+        attempts. Returns (sorted pair keys, means); key = student * courses + course.
+        """
+        if self._pair_table is None:
+            course = np.where(self.attempt_quiz >= 0, self.quiz_course[np.maximum(self.attempt_quiz, 0)], -1) \
+                if len(self.quiz_course) else np.full(len(self.attempt_quiz), -1, dtype=np.int64)
+            keep = self.attempt_completed & (course >= 0) & (self.attempt_user >= 0)
+            max_score = self.quiz_max_score[self.attempt_quiz[keep]]
+            pct = self.attempt_score[keep] / np.where(max_score > 0, max_score, 100) * 100
+            keys = self.attempt_user[keep] * len(self.courses) + course[keep]
+            pairs, inverse = np.unique(keys, return_inverse=True)
+            means = np.bincount(inverse, weights=pct, minlength=len(pairs)) / np.bincount(inverse, minlength=len(pairs))
+            self._pair_table = (pairs, means)
+        return self._pair_table
+
+    def compute(self, owners=None):
+        """
+        my-students for every admin in `owners` (user rows; all course
+        owners when None). Returns {owner row: rows}; an owner maps to None
+        when the endpoint would answer 500 (an enrollment whose student no
+        longer exists makes `e.student._id` throw).
+        """
+        courses = len(self.courses)
+        users = len(self.users)
+        course = self.enrollment_course
+        valid = course >= 0
+        owner = np.where(valid, self.course_owner[np.maximum(course, 0)], -1) if courses else \
+            np.full(len(course), -1, dtype=np.int64)
+        selected = valid & (owner >= 0)
+        if owners is not None:
+            selected &= np.isin(owner, np.asarray(list(owners), dtype=np.int64))
+
+        rows = np.nonzero(selected)[0]
+        owner, course = owner[rows], course[rows]
+        student = self.enrollment_student[rows]
+        broken = set(np.unique(owner[student < 0]).tolist())
+        fine = student >= 0
+        rows, owner, course, student = rows[fine], owner[fine], course[fine], student[fine]
+
+        # Join each enrollment to its (student, course) quiz mean
+        pairs, means = self.course_quiz_means()
+        keys = student * courses + course
+        at = np.searchsorted(pairs, keys)
+        hit = at < len(pairs)
+        hit[hit] = pairs[at[hit]] == keys[hit]
+        course_mean = np.zeros(len(keys))
+        course_mean[hit] = means[at[hit]]
+
+        # Group by (owner, student), keeping first-seen order like the JS Map
+        groups, first, inverse = np.unique(owner * users + student, return_index=True, return_inverse=True)
+        lesson_sum = np.bincount(inverse, weights=self.enrollment_progress[rows], minlength=len(groups))
+        course_count = np.bincount(inverse, minlength=len(groups))
+        quiz_sum = np.bincount(inverse, weights=course_mean, minlength=len(groups))
+        quiz_courses = np.bincount(inverse, weights=hit, minlength=len(groups))
+        lesson_avg = lesson_sum / course_count
+        quiz_avg = np.divide(quiz_sum, quiz_courses, out=np.zeros(len(groups)), where=quiz_courses > 0)
+
+        titles = self._first_titles(inverse, course, len(groups))
+        group_owner = groups // users
+        group_student = groups % users
+
+        result = {o: None for o in broken}
+        for g in np.lexsort((first, group_owner)):
+            o = int(group_owner[g])
+            if o in broken:
+                continue
+            s = int(group_student[g])
+            result.setdefault(o, []).append({
+                "id": self.users.ids[s],
+                "name": self.user_name[s],
+                "email": self.user_email[s],
+                "lessonProgress": int(js_round(lesson_avg[g])),
+                "quizAverage": int(js_round(quiz_avg[g])),
+                "courses": titles[g],
+                "totalCourses": int(course_count[g]),
+                # Unrounded, for telling rounding-boundary cases apart in compare()
+                "_lesson": float(lesson_avg[g]),
+                "_quiz": float(quiz_avg[g]),
+            })
+        return result
+
+    def _first_titles(self, group, course, groups, limit=3):
+        """First `limit` distinct course titles per group, in enrollment order."""
+        code = self.course_title_code[course]
+        pairs, first = np.unique(group * max(self.title_count, 1) + code, return_index=True)
+        pair_group = pairs // max(self.title_count, 1)
+        order = np.lexsort((first, pair_group))
+        pair_group, first = pair_group[order], first[order]
+        starts = np.searchsorted(pair_group, pair_group, side="left")
+        keep = (np.arange(len(pair_group)) - starts) < limit
+        titles = [[] for _ in range(groups)]
+        for g, row in zip(pair_group[keep], first[keep]):
+            titles[g].append(self.course_title[course[row]])
+        return titles
+
+    def for_admin(self, admin):
+        """my-students for one admin, by id or email; None when the endpoint would 500."""
+        row = self.users.lookup(admin)
+        if row < 0 and admin in self.user_email:
+            row = self.user_email.index(admin)
+        if row < 0:
+            raise KeyError(f"No user with id or email {admin}")
+        result = self.compute([row])
+        return result.get(row, [])
+
+
+# ==========================================
+# COMPARISON WITH THE LIVE ENDPOINT
+# ==========================================
+
+FIELDS = ("name", "email", "lessonProgress", "quizAverage", "courses", "totalCourses")
+
+
+def fetch_live(host, email, password, timeout=600):
+    """Log in as `email` and GET /api/enrollments/my-students; returns (rows, seconds)."""
+    entry = TokenPool(base_url=f"{host}/api").get(email, password)
+    if not entry:
+        raise RuntimeError(f"Could not log in as {email}")
+    session = create_session(retries=0)
+    started = time.perf_counter()
+    res = session.get(f"{host}/api/enrollments/my-students", headers=auth_headers(entry["token"]), timeout=timeout)
+    elapsed = time.perf_counter() - started
+    res.raise_for_status()
+    return res.json(), elapsed
+
+
+def compare(expected, live):
+    """
+    Differences between offline rows and the endpoint's. Off-by-one
+    roundings of a value within ROUND_EPSILON of .5 are reported apart,
+    since JS and NumPy may sum the same floats in a different order.
+    """
+    report = {"missing": [], "extra": [], "fields": [], "rounding": [], "order": False}
+    by_id = {row["id"]: row for row in expected}
+    live_by_id = {row.get("id"): row for row in live}
+    report["extra"] = [i for i in live_by_id if i not in by_id]
+    for student_id, row in by_id.items():
+        other = live_by_id.get(student_id)
+        if other is None:
+            report["missing"].append(student_id)
+            continue
+        for field in FIELDS:
+            if row[field] == other.get(field):
+                continue
+            raw = row["_lesson"] if field == "lessonProgress" else row["_quiz"] if field == "quizAverage" else None
+            if raw is not None and abs(raw - math.floor(raw) - 0.5) < ROUND_EPSILON \
+                    and abs(row[field] - other.get(field, 0)) == 1:
+                report["rounding"].append((student_id, field, row[field], other.get(field)))
+            else:
+                report["fields"].append((student_id, field, row[field], other.get(field)))
+    common = [row.get("id") for row in live if row.get("id") in by_id]
+    report["order"] = common != [row["id"] for row in expected if row["id"] in live_by_id]
+    return report
+
+
+def print_compare(report, expected_count, live_count):
+    print(f"\n🔍 Offline {expected_count:,} students vs endpoint {live_count:,}")
+    problems = len(report["missing"]) + len(report["extra"]) + len(report["fields"])
+    if report["missing"]:
+        print(f"   ❌ {len(report['missing']):,} students missing from the endpoint, e.g. {report['missing'][:3]}")
+    if report["extra"]:
+        print(f"   ❌ {len(report['extra']):,} unexpected students in the endpoint, e.g. {report['extra'][:3]}")
+    for student_id, field, ours, theirs in report["fields"][:10]:
+        print(f"   ❌ {student_id} {field}: expected {ours!r}, endpoint {theirs!r}")
+    if len(report["fields"]) > 10:
+        print(f"   … {len(report['fields']) - 10:,} more field differences")
+    if report["rounding"]:
+        print(f"   ⚠️  {len(report['rounding']):,} off-by-one roundings at exactly .5 (float summation order)")
+    if report["order"]:
+        print("   ⚠️  Same students, different order")
+    if not problems:
+        print("   ✅ Endpoint matches the offline computation")
+    return problems
+
+
+# ==========================================
+# CLI
+# ==========================================
+
+def print_rows(rows, limit):
+    print(f"{'Name':<28} {'Email':<32} {'Lessons':>8} {'Quizzes':>8} {'Courses':>8}")
+    print("-" * 90)
+    for row in rows[:limit]:
+        print(f"{str(row['name'])[:27]:<28} {str(row['email'])[:31]:<32} {row['lessonProgress']:>7}% "
+              f"{row['quizAverage']:>7}% {row['totalCourses']:>8}")
+    if len(rows) > limit:
+        print(f"… {len(rows) - limit:,} more")
+
+
+def public(row):
+    return {k: v for k, v in row.items() if not k.startswith("_")}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute /api/enrollments/my-students offline from exported collections.")
+    parser.add_argument("data_dir", nargs="?", default="synthetic_data", help="dataset or mongoexport directory")
+    parser.add_argument("--admin", help="admin email or id to compute for")
+    parser.add_argument("--materialize", metavar="FILE",
+                        help="write every admin's rows as NDJSON ({admin, ...row})")
+    parser.add_argument("--compare", action="store_true", help="compare --admin's rows with the live endpoint")
+    parser.add_argument("--password", help="--admin's password, for --compare")
+    parser.add_argument("--host", default=HOST, help="backend base URL for --compare (default: %(default)s)")
+    parser.add_argument("--show", type=int, default=20, help="rows to print (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if not args.admin and not args.materialize:
+        parser.error("give --admin and/or --materialize")
+    if args.compare and not (args.admin and args.password):
+        parser.error("--compare needs --admin EMAIL and --password")
+
+    metrics = StudentMetrics.from_dir(args.data_dir)
+    print(f"📂 Loaded {len(metrics.users):,} users, {len(metrics.courses):,} courses, "
+          f"{len(metrics.enrollment_course):,} enrollments, {len(metrics.attempt_quiz):,} attempts "
+          f"in {metrics.load_seconds:.1f}s")
+
+    status = 0
+    if args.admin:
+        started = time.perf_counter()
+        try:
+            rows = metrics.for_admin(args.admin)
+        except KeyError as e:
+            print(f"❌ {e.args[0]}")
+            return 1
+        print(f"🧮 my-students for {args.admin} in {(time.perf_counter() - started) * 1000:.0f} ms")
+        if rows is None:
+            print("   ⚠️  The endpoint would answer 500: an enrollment points at a deleted student")
+            rows = []
+        else:
+            print_rows(rows, args.show)
+
+        if args.compare:
+            try:
+                live, elapsed = fetch_live(args.host, args.admin, args.password)
+            except (requests.exceptions.RequestException, RuntimeError) as e:
+                print(f"❌ Live endpoint failed: {e}")
+                return 1
+            print(f"🌐 Endpoint answered {len(live):,} rows in {elapsed:.2f}s")
+            status = 1 if print_compare(compare(rows, live), len(rows), len(live)) else 0
+
+    if args.materialize:
+        started = time.perf_counter()
+        everything = metrics.compute()
+        with open(args.materialize, "w", encoding="utf-8") as f:
+            for owner, rows in everything.items():
+                for row in rows or []:
+                    f.write(json.dumps(dict(admin=metrics.users.ids[owner], **public(row)), ensure_ascii=False))
+                    f.write("\n")
+        total = sum(len(r or []) for r in everything.values())
+        print(f"💾 {total:,} rows for {len(everything):,} admins in {time.perf_counter() - started:.1f}s "
+              f"saved to: {args.materialize}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
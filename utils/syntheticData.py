@@ -0,0 +1,418 @@
+import argparse
+import bisect
+import csv
+import json
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+if __package__ in (None, ""):
+    # Run as a file rather than with -m: put the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.HOLY import COURSE_DATA, QUESTION_BANK, YOUTUBE_LINKS
+
+# Collections in the order they have to be loaded (later ones reference earlier ones)
+COLLECTIONS = ["users", "courses", "lessons", "quizzes", "enrollments", "quizattempts"]
+FORMATS = ("ndjson", "csv")
+
+# Columns of each collection when written as CSV; nested values are JSON-encoded
+CSV_COLUMNS = {
+    "users": ["_id", "name", "email", "password", "role", "createdAt"],
+    "courses": ["_id", "title", "description", "owner", "category", "createdAt"],
+    "lessons": ["_id", "courseId", "title", "description", "contents", "createdAt"],
+    "quizzes": ["_id", "title", "description", "lessonId", "questions", "createdAt"],
+    "enrollments": ["_id", "student", "course", "completedLessons", "createdAt"],
+    "quizattempts": ["_id", "quizId", "userId", "lessonId", "completed", "questionsAnswered", "answers"],
+}
+
+# CSV cells holding JSON (lists, subdocuments, booleans)
+JSON_COLUMNS = {"contents", "questions", "completedLessons", "answers", "completed"}
+INT_COLUMNS = {"questionsAnswered"}
+
+FIRST_NAMES = ["Ana", "Luis", "María", "José", "Sofía", "Diego", "Valeria", "Carlos", "Fernanda", "Jorge",
+               "Camila", "Miguel", "Daniela", "Juan", "Regina", "Emiliano", "Ximena", "Santiago", "Renata", "Pablo"]
+LAST_NAMES = ["García", "Hernández", "López", "Martínez", "González", "Pérez", "Rodríguez", "Sánchez",
+              "Ramírez", "Cruz", "Flores", "Gómez", "Morales", "Vázquez", "Jiménez", "Reyes", "Díaz", "Torres"]
+
+DEFAULT_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+DEFAULT_PASSWORD = "testtest"
+PROGRESS_EVERY = 100_000
+
+
+class ObjectIds:
+    """
+    Deterministic 24-hex ids shaped like Mongo ObjectIds:
+    4-byte creation time, 5 seed-derived bytes, 3-byte counter.
+    """
+
+    def __init__(self, rng):
+        self.machine = rng.getrandbits(40)
+        self.counter = rng.getrandbits(24)
+
+    def new(self, created):
+        self.counter = (self.counter + 1) & 0xFFFFFF
+        if self.counter == 0:
+            # Counter wrapped: move to a fresh "machine" so ids never repeat
+            self.machine = (self.machine + 1) & 0xFFFFFFFFFF
+        return f"{int(created.timestamp()):08x}{self.machine:010x}{self.counter:06x}"
+
+
+class ZipfSampler:
+    """Picks course indexes with P(rank k) proportional to 1 / k**s."""
+
+    def __init__(self, n, s, rng):
+        order = list(range(n))
+        rng.shuffle(order)  # popularity rank is independent of creation order
+        self.order = order
+        self.cumulative = []
+        total = 0.0
+        for rank in range(1, n + 1):
+            total += 1.0 / rank ** s
+            self.cumulative.append(total)
+        self.total = total
+
+    def sample(self, rng, k):
+        """k distinct indexes (k is capped at n)."""
+        k = min(k, len(self.order))
+        picked = set()
+        while len(picked) < k:
+            rank = bisect.bisect_left(self.cumulative, rng.random() * self.total)
+            picked.add(self.order[min(rank, len(self.order) - 1)])
+        return sorted(picked)
+
+
+class DatasetWriter:
+    """One NDJSON or CSV file per collection inside `out_dir`."""
+
+    def __init__(self, out_dir, fmt="ndjson"):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format '{fmt}', expected one of {', '.join(FORMATS)}")
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.counts = {name: 0 for name in COLLECTIONS}
+        self._files = {}
+        self._writers = {}
+
+    def path(self, collection):
+        return os.path.join(self.out_dir, f"{collection}.{self.fmt}")
+
+    def _open(self, collection):
+        f = self._files[collection] = open(self.path(collection), "w", encoding="utf-8", newline="")
+        if self.fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS[collection], extrasaction="ignore")
+            writer.writeheader()
+            self._writers[collection] = writer
+        return f
+
+    def write(self, collection, doc):
+        f = self._files.get(collection) or self._open(collection)
+        if self.fmt == "ndjson":
+            f.write(json.dumps(doc, ensure_ascii=False, separators=(",", ":")))
+            f.write("\n")
+        else:
+            self._writers[collection].writerow({
+                key: json.dumps(value, ensure_ascii=False) if isinstance(value, (list, dict, bool)) else value
+                for key, value in doc.items()
+            })
+        self.counts[collection] += 1
+
+    def close(self, manifest):
+        for f in self._files.values():
+            f.close()
+        manifest = dict(manifest, format=self.fmt, counts=self.counts,
+                        files={name: os.path.basename(self.path(name)) for name in COLLECTIONS if self.counts[name]})
+        with open(os.path.join(self.out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        return manifest
+
+
+def read_docs(path):
+    """Yield documents from an NDJSON or CSV file written by DatasetWriter."""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            for row in csv.DictReader(f):
+                doc = {}
+                for key, value in row.items():
+                    if key in JSON_COLUMNS:
+                        value = json.loads(value) if value else None
+                    elif key in INT_COLUMNS:
+                        value = int(value)
+                    doc[key] = value
+                yield doc
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class SyntheticDataset:
+    """
+    Generates users, courses, lessons, quizzes, enrollments and quiz attempts.
+
+    - course popularity is Zipfian, so a few courses hold most enrollments
+    - every student has a `skill` (chance of answering correctly) and an
+      `engagement` (how far into a course they get)
+    - lessons are completed in order, so completion drops off along a course
+      and the first unfinished quiz lesson may hold a half-done attempt
+
+    Only courses, lessons and quizzes are kept in memory; students are
+    generated and written one at a time, so the student count only costs time.
+    Derived fields (maxScore, studentProgress, course progress, scores) are
+    left to the loader, exactly as the mongoose hooks would compute them.
+    """
+
+    def __init__(self, seed=None, students=1000, courses=50, admins=5, lessons=(3, 8), quiz_rate=0.4,
+                 zipf_s=1.1, enrollments_mean=3.0, attempt_rate=0.9, password=DEFAULT_PASSWORD,
+                 email_prefix="synth", epoch=DEFAULT_EPOCH, span_days=180):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.ids = ObjectIds(self.rng)
+        self.students = students
+        self.courses = courses
+        self.admins = admins
+        self.lessons = lessons
+        self.quiz_rate = quiz_rate
+        self.zipf_s = zipf_s
+        self.enrollments_mean = enrollments_mean
+        self.attempt_rate = attempt_rate
+        self.password = password
+        self.email_prefix = email_prefix
+        self.epoch = epoch
+        self.span = timedelta(days=span_days)
+        # course index -> [(lesson_id, quiz or None)], in lesson order
+        self._course_lessons = []
+        self._course_ids = []
+
+    # ------------------------------------------
+    # HELPERS
+    # ------------------------------------------
+
+    def _time(self, position, total):
+        """Spread student sign-ups evenly across the span, after the catalog exists."""
+        return self.epoch + timedelta(days=2) + self.span * (position / max(1, total))
+
+    @staticmethod
+    def _iso(moment):
+        return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}Z"
+
+    def _name(self):
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    # ------------------------------------------
+    # CATALOG (admins, courses, lessons, quizzes)
+    # ------------------------------------------
+
+    def _write_admins(self, out):
+        admin_ids = []
+        for i in range(1, self.admins + 1):
+            created = self.epoch + timedelta(minutes=i)
+            admin_id = self.ids.new(created)
+            admin_ids.append(admin_id)
+            out.write("users", {
+                "_id": admin_id,
+                "name": f"Admin {i}",
+                "email": f"{self.email_prefix}_admin_{i}@test.com",
+                "password": self.password,
+                "role": "admin",
+                "createdAt": self._iso(created),
+            })
+        return admin_ids
+
+    def _build_quiz(self, number):
+        questions = [dict(q) for q in QUESTION_BANK if self.rng.random() > 0.3] or [dict(QUESTION_BANK[0])]
+        for q in questions:
+            q["value"] = self.rng.randint(1, 10)
+        # Not stored: how hard each question is for the skill model
+        difficulty = [self.rng.uniform(0.2, 0.8) for _ in questions]
+        return {"title": f"Quiz {number}: Evaluación Práctica",
+                "description": "Demuestra lo aprendido en esta lección.",
+                "questions": questions}, difficulty
+
+    def _write_catalog(self, out, admin_ids):
+        for c in range(self.courses):
+            info = COURSE_DATA[c % len(COURSE_DATA)]
+            created = self.epoch + timedelta(days=1, minutes=10 * c)
+            course_id = self.ids.new(created)
+            out.write("courses", {
+                "_id": course_id,
+                "title": info["title"] if c < len(COURSE_DATA) else f"{info['title']} ({c // len(COURSE_DATA) + 1})",
+                "description": info["desc"],
+                "owner": admin_ids[c % len(admin_ids)],
+                "category": info["cat"],
+                "createdAt": self._iso(created),
+            })
+
+            lessons = []
+            for n in range(1, self.rng.randint(*self.lessons) + 1):
+                lesson_created = created + timedelta(minutes=n)
+                lesson_id = self.ids.new(lesson_created)
+                contents = [{"title": f"Video del Tema {n}", "type": "video", "url": self.rng.choice(YOUTUBE_LINKS)}]
+                quiz = None
+                if self.rng.random() < self.quiz_rate:
+                    body, difficulty = self._build_quiz(n)
+                    quiz = dict(body, _id=self.ids.new(lesson_created), lessonId=lesson_id,
+                                createdAt=self._iso(lesson_created))
+                    out.write("quizzes", quiz)
+                    quiz = (quiz, difficulty)
+                    contents.append({"title": body["title"], "type": "quiz", "quizId": quiz[0]["_id"]})
+                out.write("lessons", {
+                    "_id": lesson_id,
+                    "courseId": course_id,
+                    "title": f"Lección {n}: Conceptos Fundamentales",
+                    "description": "Visualizar el video completo para asistencia.",
+                    "contents": contents,
+                    "createdAt": self._iso(lesson_created),
+                })
+                lessons.append((lesson_id, quiz))
+
+            self._course_ids.append(course_id)
+            self._course_lessons.append(lessons)
+
+    # ------------------------------------------
+    # STUDENTS (users, enrollments, attempts)
+    # ------------------------------------------
+
+    def _answer(self, question, correct):
+        right = question["correctAnswer"]
+        if correct:
+            return right
+        kind = question["type"]
+        if kind == "true-false":
+            return "False" if str(right) == "True" else "True"
+        if kind == "multiple-answer":
+            # Drop one correct option and pick one wrong one
+            return list(right[:-1]) + [o for o in question.get("options") or [] if o not in right][:1]
+        wrong = [o for o in question.get("options") or [] if o != right]
+        return self.rng.choice(wrong) if wrong else "Wrong Answer Value"
+
+    def _attempt(self, out, created, user_id, lesson_id, quiz, skill, answered=None):
+        doc, difficulty = quiz
+        questions = doc["questions"]
+        count = len(questions) if answered is None else answered
+        answers = []
+        for question, hardness in zip(questions[:count], difficulty):
+            # Logistic item response: skill above difficulty -> likely correct
+            correct = self.rng.random() < 1 / (1 + math.exp(-8 * (skill - hardness)))
+            answers.append({"correct": correct, "answer": self._answer(question, correct)})
+        out.write("quizattempts", {
+            "_id": self.ids.new(created),
+            "quizId": doc["_id"],
+            "userId": user_id,
+            "lessonId": lesson_id,
+            "completed": count == len(questions),
+            "questionsAnswered": count,
+            "answers": answers,
+        })
+
+    def _write_student(self, out, i, sampler):
+        created = self._time(i, self.students)
+        user_id = self.ids.new(created)
+        out.write("users", {
+            "_id": user_id,
+            "name": self._name(),
+            "email": f"{self.email_prefix}_{i}@test.com",
+            "password": self.password,
+            "role": "student",
+            "createdAt": self._iso(created),
+        })
+
+        skill = self.rng.betavariate(5, 2)
+        engagement = self.rng.betavariate(1.2, 1.5)
+        k = 1 + int(self.rng.expovariate(1 / max(self.enrollments_mean - 1, 1e-9))) if self.enrollments_mean > 1 else 1
+
+        for c in sampler.sample(self.rng, k):
+            lessons = self._course_lessons[c]
+            # Completion curve: engaged students get further, but everyone drops off
+            fraction = self.rng.betavariate(0.3 + 4 * engagement, 0.3 + 4 * (1 - engagement))
+            done = round(fraction * len(lessons))
+            out.write("enrollments", {
+                "_id": self.ids.new(created),
+                "student": user_id,
+                "course": self._course_ids[c],
+                "completedLessons": [lesson_id for lesson_id, _ in lessons[:done]],
+                "createdAt": self._iso(created),
+            })
+
+            for lesson_id, quiz in lessons[:done]:
+                if quiz and self.rng.random() < self.attempt_rate:
+                    self._attempt(out, created, user_id, lesson_id, quiz, skill)
+            if done < len(lessons):
+                lesson_id, quiz = lessons[done]
+                if quiz and self.rng.random() < engagement:
+                    self._attempt(out, created, user_id, lesson_id, quiz, skill,
+                                  answered=self.rng.randint(0, len(quiz[0]["questions"]) - 1))
+
+    def generate(self, out):
+        started = time.perf_counter()
+        admin_ids = self._write_admins(out)
+        self._write_catalog(out, admin_ids)
+        sampler = ZipfSampler(self.courses, self.zipf_s, self.rng)
+
+        for i in range(1, self.students + 1):
+            self._write_student(out, i, sampler)
+            if i % PROGRESS_EVERY == 0:
+                print(f"   ↳ {i:,} / {self.students:,} students ({time.perf_counter() - started:.1f}s)")
+
+        return out.close({
+            "seed": self.seed,
+            "students": self.students,
+            "courses": self.courses,
+            "admins": self.admins,
+            "lessons": list(self.lessons),
+            "quizRate": self.quiz_rate,
+            "zipfS": self.zipf_s,
+            "enrollmentsMean": self.enrollments_mean,
+            "attemptRate": self.attempt_rate,
+            "emailPrefix": self.email_prefix,
+            "password": self.password,
+        })
+
+
+def parse_range(text):
+    low, _, high = text.partition("-")
+    return int(low), int(high or low)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream a seeded synthetic dataset to NDJSON/CSV for bulk loading.")
+    parser.add_argument("--out", default="synthetic_data", help="output directory (default: %(default)s)")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    parser.add_argument("--seed", type=int, default=42, help="random seed; same seed, same dataset")
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--courses", type=int, default=50)
+    parser.add_argument("--admins", type=int, default=5, help="course owners")
+    parser.add_argument("--lessons", type=parse_range, default=(3, 8), metavar="MIN-MAX", help="lessons per course")
+    parser.add_argument("--quiz-rate", type=float, default=0.4, help="share of lessons that carry a quiz")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of course popularity")
+    parser.add_argument("--enrollments", type=float, default=3.0, help="mean courses per student")
+    parser.add_argument("--attempt-rate", type=float, default=0.9, help="chance a completed quiz lesson has an attempt")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="plain-text password of every account")
+    parser.add_argument("--email-prefix", default="synth", help="accounts are PREFIX_{i}@test.com")
+    args = parser.parse_args(argv)
+
+    if args.courses < 1 or args.admins < 1:
+        parser.error("--courses and --admins must be at least 1")
+
+    dataset = SyntheticDataset(
+        seed=args.seed, students=args.students, courses=args.courses, admins=args.admins,
+        lessons=args.lessons, quiz_rate=args.quiz_rate, zipf_s=args.zipf, enrollments_mean=args.enrollments,
+        attempt_rate=args.attempt_rate, password=args.password, email_prefix=args.email_prefix,
+    )
+
+    print(f"🧬 Generating {args.students:,} students over {args.courses:,} courses (seed {args.seed}) into {args.out}/")
+    started = time.perf_counter()
+    manifest = dataset.generate(DatasetWriter(args.out, args.format))
+    elapsed = time.perf_counter() - started
+
+    print(f"\n✅ Done in {elapsed:.1f}s")
+    for name in COLLECTIONS:
+        print(f"   {name:<13} {manifest['counts'][name]:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,494 @@
+"""
+Delete what a tagged run created, so the next run starts from the same data.
+
+Runs are tagged by setting LOADTEST_RUN_ID (the load test does it with
+--run-id); every create then lands in runs/<run id>.ndjson (utils/runLedger.py).
+This tool removes those objects in dependency order, each phase concurrent,
+on the server the ledger names (--host to point it elsewhere):
+
+    attempts -> quizzes -> lessons -> courses (with their enrollments)
+
+Through the API (default):
+  * attempts: kept unless --wipe-quiz-attempts. The only route is
+    PUT /api/quizzes/:id with deleteAttempts, which clears every attempt on
+    the quiz, other users' too, and rewrites its questions from a GET; the
+    attempts of other users removed that way are counted and reported.
+  * quizzes: kept, the API has no way to delete one (use --mongo-uri).
+  * lessons: DELETE /api/lessons/:id, except those of run courses...
+  * courses: ...which DELETE /api/courses/:id removes along with their
+    enrollments. Only the owner may delete a course: the ledger records
+    the owner's email and the token comes from the token pool, logging in
+    with the parametros/ admin accounts, --admin or --owner when needed.
+With --mongo-uri every phase is a few delete_many batches instead, and
+only the run's own attempts are deleted.
+
+    python -m utils.teardown --list
+    python -m utils.teardown 20261018-090040-3fa2 --host http://staging:5000
+    python -m utils.teardown 20261018-090040-3fa2 --attempts-only
+    python -m utils.teardown --all --mongo-uri mongodb://localhost:27017/test
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+if __package__ in (None, ""):
+    # Run as a file rather than with -m: put the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.httpClient import HOST, auth_headers, create_session
+from utils.loadtest.params import ParameterFile, parametros_path
+from utils.runLedger import KINDS, RunLedger, list_runs
+from utils.tokenPool import TokenPool, get_token_pool
+
+DEFAULT_WORKERS = 16
+DEFAULT_MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017/test")
+MONGO_BATCH = 1000
+# Same account utils/HOLY.py seeds with; rewrites quizzes for their attempts and owns HOLY's courses
+ADMIN_EMAIL = "jaramillovictorarmando@gmail.com"
+ADMIN_PASSWORD = "Hola1234"
+PROGRESS_INTERVAL = 0.2
+LABELS = {"attempt": "attempts", "quiz": "quizzes", "lesson": "lessons", "course": "courses"}
+
+
+class Phase:
+    """Progress and outcome counts for one kind of object."""
+
+    def __init__(self, kind, total):
+        self.kind = kind
+        self.total = total
+        self.deleted = 0
+        self.missing = 0
+        self.failed = 0
+        self.kept = 0
+        self.errors = {}
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+        self._printed = 0.0
+
+    def count(self, outcome, amount=1, error=None):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + amount)
+            if error:
+                self.errors[error] = self.errors.get(error, 0) + amount
+            now = time.perf_counter()
+            if now - self._printed >= PROGRESS_INTERVAL:
+                self._printed = now
+                self.progress()
+
+    @property
+    def done(self):
+        return self.deleted + self.missing + self.failed + self.kept
+
+    def progress(self):
+        elapsed = time.perf_counter() - self.started
+        print(f"\r   {self.kind:<8} {self.done:>7,}/{self.total:,}  "
+              f"{self.done / max(elapsed, 1e-9):,.0f}/s\033[K", end="", flush=True)
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started
+        rate = self.deleted / max(self.elapsed, 1e-9)
+        print(f"\r\033[K   {self.kind:<8} 🗑️ {self.deleted:,} deleted  ∅ {self.missing:,} already gone  "
+              f"❌ {self.failed:,} failed" + (f"  📌 {self.kept:,} kept" if self.kept else "")
+              + f"  ({self.elapsed:.2f}s, {rate:,.0f}/s)")
+        for error, amount in sorted(self.errors.items(), key=lambda e: -e[1])[:5]:
+            print(f"      ↳ {amount:,}× {error}")
+        return self
+
+
+def merge_ledgers(ledgers):
+    """{kind: {id: record}} over several runs."""
+    records = {kind: {} for kind in KINDS}
+    for ledger in ledgers:
+        for kind, items in ledger.load().items():
+            records[kind].update(items)
+    return records
+
+
+def known_accounts():
+    """{email: password} of the parametros/ admin accounts the load test creates courses with."""
+    try:
+        admins = ParameterFile(parametros_path("admin_credentials.dat"))
+    except OSError:
+        return {}
+    try:
+        return {row["adminEmail"]: row["adminPassword"] for row in admins.rows()}
+    finally:
+        admins.close()
+
+
+def run_concurrently(work, function, workers):
+    """Call function(item) for every item on a pool of `workers` threads."""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for future in as_completed([pool.submit(function, item) for item in work]):
+            future.result()
+
+
+# ==========================================
+# API
+# ==========================================
+
+class ApiTeardown:
+    """
+    Delete through the backend's routes. `remaining` holds, per kind, the
+    ids still present afterwards (failures and what the API cannot delete).
+    """
+
+    def __init__(self, records, workers=DEFAULT_WORKERS, admin=(ADMIN_EMAIL, ADMIN_PASSWORD), owners=(),
+                 wipe_quiz_attempts=False, host=HOST):
+        self.records = records
+        self.workers = workers
+        self.api_url = f"{host.rstrip('/')}/api"
+        self.admin = admin
+        self.wipe_quiz_attempts = wipe_quiz_attempts
+        self.session = create_session(pool_maxsize=workers)
+        self.remaining = {kind: dict(items) for kind, items in records.items()}
+        self.passwords = dict(known_accounts(), **{admin[0]: admin[1]}, **dict(owners))
+        self.other_attempts = 0
+        self._tokens = {}
+        self._token_lock = threading.Lock()
+        self._pool = None
+        self._count_lock = threading.Lock()
+
+    def admin_token(self):
+        return self.token_for(self.admin[0]) or ""
+
+    def token_for(self, email):
+        """A token for `email`: cached in the token pool, else a login with a known password."""
+        with self._token_lock:
+            if email not in self._tokens:
+                pool = self.token_pool()
+                entry = pool.lookup(email)
+                if entry is None and email in self.passwords:
+                    entry = pool.get(email, self.passwords[email])
+                self._tokens[email] = entry["token"] if entry else None
+            return self._tokens[email]
+
+    def token_pool(self):
+        """The shared token pool for the default server, one of its own for any other."""
+        if self._pool is None:
+            if self.api_url == f"{HOST}/api":
+                self._pool = get_token_pool()
+            else:
+                self._pool = TokenPool(base_url=self.api_url)
+                self._pool.watch(self.session)
+        return self._pool
+
+    def _request(self, method, path, token=None, **kwargs):
+        try:
+            return self.session.request(method, f"{self.api_url}{path}", headers=auth_headers(token), **kwargs), None
+        except requests.exceptions.RequestException as e:
+            return None, type(e).__name__
+
+    def attempts(self):
+        by_quiz = {}
+        for attempt_id, record in self.records["attempt"].items():
+            by_quiz.setdefault(record["quiz"], []).append(attempt_id)
+        phase = Phase("attempts", len(self.records["attempt"]))
+        if not self.wipe_quiz_attempts:
+            if phase.total:
+                phase.count("kept", phase.total,
+                            "the API only clears all of a quiz's attempts; pass --wipe-quiz-attempts or use --mongo-uri")
+            return phase.finish()
+
+        def clear(quiz_id):
+            ids = by_quiz[quiz_id]
+            outcome, error = self._clear_attempts(quiz_id, len(ids))
+            phase.count(outcome, len(ids), error)
+            if outcome != "failed":
+                for attempt_id in ids:
+                    self.remaining["attempt"].pop(attempt_id, None)
+
+        run_concurrently(by_quiz, clear, self.workers)
+        phase.finish()
+        if self.other_attempts:
+            print(f"      ↳ ⚠️ {self.other_attempts:,} attempts not made by the run were removed with them")
+        return phase
+
+    def _clear_attempts(self, quiz_id, run_attempts):
+        """
+        PUT the quiz back unchanged with deleteAttempts. The PUT replaces
+        the questions, so they are read as an admin (with correctAnswer)
+        first; the backend deletes the attempts before it looks the quiz up,
+        so a quiz that is already gone still has its attempts cleared.
+        The quiz's attempt count, read first, tells how many of the
+        removed attempts were not the run's.
+        """
+        token = self.admin_token()
+        if not token:
+            return "failed", "admin login failed"
+        response, error = self._request("GET", "/quizzes/attempts", token, params={"quizId": quiz_id})
+        if response is None:
+            return "failed", error
+        if response.status_code != 200:
+            hint = " (is the admin account an admin?)" if response.status_code == 401 else ""
+            return "failed", f"GET attempt count HTTP {response.status_code}{hint}"
+        others = max(0, response.json().get("attemptCount", 0) - run_attempts)
+        response, error = self._request("GET", f"/quizzes/{quiz_id}", token)
+        if response is None:
+            return "failed", error
+        if response.status_code == 404:
+            body = {"title": "-", "questions": [], "deleteAttempts": True}
+        elif response.status_code != 200:
+            return "failed", f"GET quiz HTTP {response.status_code}"
+        else:
+            quiz = response.json()
+            if any("correctAnswer" not in q for q in quiz["questions"]):
+                return "failed", "quiz read without correct answers (is the admin account an admin?)"
+            body = {"title": quiz["title"], "description": quiz.get("description"),
+                    "questions": quiz["questions"], "deleteAttempts": True}
+        response, error = self._request("PUT", f"/quizzes/{quiz_id}", token, json=body)
+        if response is None:
+            return "failed", error
+        if response.status_code in (200, 404):
+            with self._count_lock:
+                self.other_attempts += others
+            return "deleted", None
+        return "failed", f"PUT quiz HTTP {response.status_code}"
+
+    def quizzes(self):
+        phase = Phase("quizzes", len(self.records["quiz"]))
+        if phase.total:
+            phase.count("kept", phase.total, "no delete route for quizzes; use --mongo-uri")
+        return phase.finish()
+
+    def lessons(self):
+        courses = self.records["course"]
+        # Lessons of run courses go with the course (one DELETE cascades to all of them)
+        orphans = [i for i, r in self.records["lesson"].items() if r.get("course") not in courses]
+        phase = Phase("lessons", len(orphans))
+
+        def delete(lesson_id):
+            response, error = self._request("DELETE", f"/lessons/{lesson_id}")
+            self._settle(phase, "lesson", lesson_id, response, error)
+
+        run_concurrently(orphans, delete, self.workers)
+        return phase.finish()
+
+    def courses(self):
+        phase = Phase("courses", len(self.records["course"]))
+        lessons_by_course = {}
+        for lesson_id, record in self.records["lesson"].items():
+            lessons_by_course.setdefault(record.get("course"), []).append(lesson_id)
+        cascaded = []
+
+        def delete(course_id):
+            record = self.records["course"][course_id]
+            # Ledgers written before owners were recorded by email carry the creating token
+            token = (record.get("owner") and self.token_for(record["owner"])) or record.get("token") \
+                or self.admin_token()
+            response, error = self._request("DELETE", f"/courses/{course_id}", token)
+            if self._settle(phase, "course", course_id, response, error):
+                lessons = lessons_by_course.get(course_id, ())
+                cascaded.extend(lessons)
+                for lesson_id in lessons:
+                    self.remaining["lesson"].pop(lesson_id, None)
+
+        run_concurrently(self.records["course"], delete, self.workers)
+        phase.finish()
+        print(f"      ↳ {len(cascaded):,} ledger lessons and the courses' enrollments went with them")
+        return phase
+
+    def _settle(self, phase, kind, object_id, response, error):
+        """Count one DELETE; True when the object is gone."""
+        if response is None:
+            phase.count("failed", error=error)
+            return False
+        if response.status_code == 404:
+            phase.count("missing")
+        elif response.ok:
+            phase.count("deleted")
+        else:
+            phase.count("failed", error=f"HTTP {response.status_code}")
+            return False
+        self.remaining[kind].pop(object_id, None)
+        return True
+
+
+# ==========================================
+# MONGO
+# ==========================================
+
+class MongoTeardown:
+    """Delete straight from the backend's collections, MONGO_BATCH ids per delete_many."""
+
+    def __init__(self, records, db, workers=DEFAULT_WORKERS):
+        from bson import ObjectId
+        self.records = records
+        self.db = db
+        self.workers = workers
+        self.object_id = ObjectId
+        self.remaining = {kind: dict(items) for kind, items in records.items()}
+
+    def _oids(self, ids):
+        return [self.object_id(i) for i in ids if self.object_id.is_valid(i)]
+
+    def _delete(self, phase, kind, collection, queries):
+        """
+        Run (ids, filter) batches concurrently: `ids` are the ledger
+        entries the batch covers. The deleted count is spread over them in
+        order, the rest counted as already gone.
+        """
+        def run(batch):
+            ids, query = batch
+            try:
+                deleted = self.db[collection].delete_many(query).deleted_count
+            except Exception as e:  # pymongo errors: keep the batch in the ledger for a retry
+                phase.count("failed", len(ids), type(e).__name__)
+                return
+            if ids:
+                phase.count("deleted", min(deleted, len(ids)))
+                phase.count("missing", max(len(ids) - deleted, 0))
+            for object_id in ids:
+                self.remaining[kind].pop(object_id, None)
+
+        run_concurrently(queries, run, self.workers)
+        return phase.finish()
+
+    @staticmethod
+    def _batches(ids):
+        ids = list(ids)
+        return [ids[i:i + MONGO_BATCH] for i in range(0, len(ids), MONGO_BATCH)]
+
+    def attempts(self):
+        attempts = self.records["attempt"]
+        queries = []
+        for batch in self._batches(attempts):
+            pairs = [{"quizId": self.object_id(r["quiz"]), "userId": self.object_id(r["user"])}
+                     for r in (attempts[i] for i in batch)
+                     if self.object_id.is_valid(r.get("quiz") or "") and self.object_id.is_valid(r.get("user") or "")]
+            queries.append((batch, {"$or": pairs} if pairs else {"_id": None}))
+        # Other users' attempts on the run's quizzes would be orphaned by the quiz phase
+        for batch in self._batches(self.records["quiz"]):
+            queries.append(([], {"quizId": {"$in": self._oids(batch)}}))
+        return self._delete(Phase("attempts", len(attempts)), "attempt", "quizattempts", queries)
+
+    def quizzes(self):
+        queries = [(batch, {"_id": {"$in": self._oids(batch)}}) for batch in self._batches(self.records["quiz"])]
+        return self._delete(Phase("quizzes", len(self.records["quiz"])), "quiz", "quizzes", queries)
+
+    def lessons(self):
+        queries = [(batch, {"_id": {"$in": self._oids(batch)}}) for batch in self._batches(self.records["lesson"])]
+        # Lessons the run's courses got some other way (the frontend, another tool)
+        queries += [([], {"courseId": {"$in": self._oids(batch)}}) for batch in self._batches(self.records["course"])]
+        return self._delete(Phase("lessons", len(self.records["lesson"])), "lesson", "lessons", queries)
+
+    def courses(self):
+        batches = self._batches(self.records["course"])
+        phase = Phase("courses", len(self.records["course"]))
+        enrollments = [self.db["enrollments"].delete_many({"course": {"$in": self._oids(batch)}}) for batch in batches]
+        removed = sum(result.deleted_count for result in enrollments)
+        self._delete(phase, "course", "courses", [(batch, {"_id": {"$in": self._oids(batch)}}) for batch in batches])
+        print(f"      ↳ {removed:,} enrollments removed with them")
+        return phase
+
+
+# ==========================================
+# CLI
+# ==========================================
+
+def print_runs(run_ids):
+    if not run_ids:
+        print("No tagged runs in runs/.")
+        return
+    print(f"{'Run':<24} " + " ".join(f"{LABELS[kind]:>9}" for kind in KINDS) + "  Host")
+    for run_id in run_ids:
+        ledger = RunLedger(run_id)
+        records = ledger.load()
+        print(f"{run_id:<24} " + " ".join(f"{len(records[kind]):>9,}" for kind in KINDS)
+              + f"  {', '.join(ledger.hosts()) or '?'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Delete the objects tagged runs created, in dependency order.")
+    parser.add_argument("runs", nargs="*", help="run ids (see --list)")
+    parser.add_argument("--all", action="store_true", help="every run in runs/")
+    parser.add_argument("--list", action="store_true", help="list tagged runs and what they created")
+    parser.add_argument("--attempts-only", action="store_true",
+                        help="only clear quiz attempts, keep the seeded courses, lessons and quizzes")
+    parser.add_argument("--host", help="backend base URL to delete through (default: the one the ledger "
+                                        f"recorded, else {HOST})")
+    parser.add_argument("--mongo-uri", nargs="?", const=DEFAULT_MONGO_URI,
+                        help=f"delete straight from MongoDB (default URI: $MONGO_URI or {DEFAULT_MONGO_URI})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="concurrent requests/batches")
+    parser.add_argument("--admin", metavar="EMAIL:PASSWORD", default=f"{ADMIN_EMAIL}:{ADMIN_PASSWORD}",
+                        help="admin account for clearing attempts through the API (default: the HOLY.py admin)")
+    parser.add_argument("--owner", action="append", default=[], metavar="EMAIL:PASSWORD",
+                        help="password of a course owner the token pool has no token for (repeatable)")
+    parser.add_argument("--wipe-quiz-attempts", action="store_true",
+                        help="through the API, clear the attempts of the run's quizzes; this removes every "
+                             "attempt on those quizzes, other users' included")
+    parser.add_argument("--dry-run", action="store_true", help="show what would be deleted")
+    parser.add_argument("--keep-ledger", action="store_true", help="do not remove deleted objects from the ledgers")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print_runs(list_runs())
+        return 0
+    run_ids = list_runs() if args.all else args.runs
+    if not run_ids:
+        parser.error("give run ids or --all")
+    ledgers = [RunLedger(run_id) for run_id in run_ids]
+    missing = [ledger.run_id for ledger in ledgers if not os.path.exists(ledger.path)]
+    if missing:
+        print(f"❌ No ledger for: {', '.join(missing)} (see --list)")
+        return 1
+
+    records = merge_ledgers(ledgers)
+    hosts = {ledger.run_id: ledger.hosts() for ledger in ledgers}
+    recorded = list(dict.fromkeys(host for found in hosts.values() for host in found))
+    host = args.host or (recorded[0] if recorded else HOST)
+    if not args.host and not args.mongo_uri and len(recorded) > 1:
+        print(f"❌ These runs were made against {', '.join(recorded)}; tear them down one server at a time, "
+              f"or pass --host")
+        return 1
+    kinds = ("attempt",) if args.attempts_only else KINDS
+    summary = ", ".join(f"{len(records[kind]):,} {LABELS[kind]}" for kind in kinds)
+    print(f"🧹 Tearing down {', '.join(run_ids)}: {summary}"
+          f" via {'MongoDB' if args.mongo_uri else f'the API at {host}'}")
+    if args.dry_run:
+        return 0
+
+    client = None
+    if args.mongo_uri:
+        from pymongo import MongoClient  # only the bulk path needs the driver
+        client = MongoClient(args.mongo_uri)
+        teardown = MongoTeardown(records, client.get_default_database("test"), args.workers)
+    else:
+        email, _, password = args.admin.partition(":")
+        owners = [owner.partition(":")[::2] for owner in args.owner]
+        teardown = ApiTeardown(records, args.workers, admin=(email, password), owners=owners,
+                               wipe_quiz_attempts=args.wipe_quiz_attempts, host=host)
+
+    started = time.perf_counter()
+    phases = []
+    try:
+        for kind in kinds:
+            phases.append({"attempt": teardown.attempts, "quiz": teardown.quizzes,
+                           "lesson": teardown.lessons, "course": teardown.courses}[kind]())
+    except KeyboardInterrupt:
+        print("\n🛑 Interrupted; the ledgers keep whatever was not deleted yet.")
+    finally:
+        if client:
+            client.close()
+        if not args.keep_ledger:
+            for ledger in ledgers:
+                own = ledger.load()
+                ledger.rewrite({kind: {i: r for i, r in own[kind].items() if i in teardown.remaining[kind]}
+                                for kind in KINDS}, hosts[ledger.run_id])
+
+    elapsed = time.perf_counter() - started
+    deleted = sum(phase.deleted for phase in phases)
+    failed = sum(phase.failed for phase in phases)
+    print(f"\n{'✅' if not failed else '⚠️'} {deleted:,} objects deleted in {elapsed:.2f}s "
+          f"({deleted / max(elapsed, 1e-9):,.0f}/s)" + (f", {failed:,} failed (still in the ledger)" if failed else ""))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
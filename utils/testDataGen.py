@@ -1,10 +1,19 @@
 import requests
+import os
 import random
 import sys
 import time
 
+if __package__ in (None, ""):
+    # Run as a file rather than with -m: put the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.httpClient import BASE_URL, auth_headers, get_session
+from utils.tokenPool import get_token_pool
+
+session = get_session()
+
 # Configuration
-BASE_URL = "http://localhost:5000/api"
 AUTH_LOGIN_URL = f"{BASE_URL}/auth/login"
 AUTH_REGISTER_URL = f"{BASE_URL}/auth/register" # Kept just for the admin
 COURSE_URL = f"{BASE_URL}/courses"
@@ -41,23 +50,13 @@ def get_admin_token():
     password = "Hola1234"
     name = "Director Académico"
 
-    # 1. Try Login first
+    # Cached token if still valid, otherwise login (or register + login)
     print(f"🔑 Logging in as Admin ({email})...")
-    res = requests.post(AUTH_LOGIN_URL, json={"email": email, "password": password})
-    
-    if res.status_code == 200:
-        return res.json().get("token")
-    
-    # 2. If login fails, try to Register
-    print("   ↳ Account not found. Creating Admin account...")
-    requests.post(AUTH_REGISTER_URL, json={"name": name, "email": email, "password": password})
-    
-    # 3. Login again
-    res = requests.post(AUTH_LOGIN_URL, json={"email": email, "password": password})
-    if res.status_code == 200:
-        return res.json().get("token")
+    entry = get_token_pool().get(email, password, name=name)
+    if entry:
+        return entry["token"]
     
-    print(f"❌ Critical: Could not authenticate Admin. {res.text}")
+    print("❌ Critical: Could not authenticate Admin.")
     return None
 
 def get_existing_student_emails(amount=10):
@@ -77,7 +76,7 @@ def create_course_with_enrollments(token, course_info, student_emails):
     subset_size = random.randint(min(3, len(student_emails)), len(student_emails))
     enrollees = random.sample(student_emails, k=subset_size)
     
-    headers = {"Authorization": f"Bearer {token}"}
+    headers = auth_headers(token)
     payload = {
         "title": course_info["title"],
         "description": course_info["desc"],
@@ -86,7 +85,7 @@ def create_course_with_enrollments(token, course_info, student_emails):
     }
     
     try:
-        res = requests.post(COURSE_URL, json=payload, headers=headers)
+        res = session.post(COURSE_URL, json=payload, headers=headers)
         
         if res.status_code == 201:
             data = res.json()
@@ -102,7 +101,7 @@ def create_course_with_enrollments(token, course_info, student_emails):
 
 def add_lessons_to_course(token, course_id):
     """Adds 3-5 video lessons to a specific course"""
-    headers = {"Authorization": f"Bearer {token}"}
+    headers = auth_headers(token)
     num_lessons = random.randint(3, 5)
     
     for i in range(1, num_lessons + 1):
@@ -119,7 +118,7 @@ def add_lessons_to_course(token, course_id):
             "contents": content_payload
         }
         
-        requests.post(LESSON_URL, json=payload, headers=headers)
+        session.post(LESSON_URL, json=payload, headers=headers)
 
 def main():
     print("==========================================")
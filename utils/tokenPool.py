@@ -0,0 +1,304 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from utils.httpClient import BASE_URL, get_session
+
+session = get_session()
+
+# One cache per checkout, wherever the scripts are started from: <repo>/.token_cache.json,
+# or the file named by LOADTEST_TOKEN_CACHE. Entries are kept per server URL.
+CACHE_ENV = "LOADTEST_TOKEN_CACHE"
+CACHE_FILE = os.environ.get(CACHE_ENV) or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".token_cache.json")
+# What requireAuth answers when a valid token's user no longer exists (e.g. after a database reset)
+USER_NOT_FOUND = "Usuario no encontrado"
+# Tokens closer than this to their expiry are refreshed instead of reused.
+REFRESH_MARGIN = 300
+# Used when a token carries no readable `exp` (backend signs with 7d).
+DEFAULT_TTL = 7 * 24 * 60 * 60
+DEFAULT_WORKERS = 16
+
+
+def token_expiry(token, default_ttl=DEFAULT_TTL):
+    """Read the `exp` claim from a JWT without verifying it."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (IndexError, KeyError, ValueError, TypeError):
+        return time.time() + default_ttl
+
+
+def extract_token(response):
+    """The backend sends the JWT as the `token` cookie; some responses also put it in the body."""
+    token = response.cookies.get("token")
+    if token:
+        return token
+    try:
+        return response.json().get("token")
+    except ValueError:
+        return None
+
+
+def extract_user_id(data):
+    user = data.get("user") or {}
+    return user.get("id") or user.get("_id") or data.get("id") or data.get("_id")
+
+
+def is_auth_failure(status, data=None):
+    """True for a 401, or requireAuth's 404 for a token whose user is gone."""
+    return status == 401 or (status == 404 and isinstance(data, dict) and data.get("error") == USER_NOT_FOUND)
+
+
+def sent_token(request):
+    """The token a prepared request carried, as a Bearer header or the `token` cookie."""
+    auth = request.headers.get("Authorization", "")
+    if auth.startswith("Bearer "):
+        return auth[7:]
+    for part in request.headers.get("Cookie", "").split(";"):
+        name, _, value = part.strip().partition("=")
+        if name == "token":
+            return value
+    return None
+
+
+def password_fingerprint(email, password, server=""):
+    """Ties a cached token to the server and password it was issued for."""
+    return hashlib.sha256(f"{server}:{email}:{password}".encode()).hexdigest()[:16]
+
+
+class TokenPool:
+    """
+    Logs accounts in concurrently and keeps their tokens and user ids in an
+    on-disk cache. Valid tokens are reused across runs; only missing or
+    (nearly) expired ones trigger a new bcrypt-bound /api/auth/login.
+
+    The cache says nothing about whether the server still knows the
+    accounts, so the first cache hit of a run checks one cached token with
+    GET /api/auth/me. If the server rejects it (its database was reset or
+    rebuilt), every cached entry for that server is dropped and accounts
+    log in or register again. Entries the server answers 401/404 for later
+    in the run are dropped too (see watch()).
+    """
+
+    def __init__(self, cache_file=CACHE_FILE, workers=DEFAULT_WORKERS, refresh_margin=REFRESH_MARGIN,
+                 base_url=BASE_URL):
+        self.login_url = f"{base_url}/auth/login"
+        self.register_url = f"{base_url}/auth/register"
+        self.me_url = f"{base_url}/auth/me"
+        self.server = base_url
+        self.cache_file = cache_file
+        self.workers = workers
+        self.refresh_margin = refresh_margin
+        self._lock = threading.Lock()
+        self._verify_lock = threading.Lock()
+        self._entries = self._load().get(self.server, {})
+        self.verified = False
+        self.logins = 0
+        self.hits = 0
+
+    # ------------------------------------------
+    # CACHE
+    # ------------------------------------------
+
+    def _load(self):
+        """{server: {email: entry}} from the cache file."""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, encoding="utf-8") as f:
+                return json.load(f).get("servers", {})
+        except (OSError, ValueError, AttributeError):
+            print(f"⚠️ Ignoring unreadable token cache {self.cache_file}")
+            return {}
+
+    def save(self):
+        """Write this server's live entries, keeping the other servers' ones from the file."""
+        if not self.cache_file:
+            return
+        with self._lock:
+            now = time.time()
+            servers = self._load()
+            servers[self.server] = {email: e for email, e in self._entries.items() if e["expiresAt"] > now}
+            tmp = f"{self.cache_file}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"servers": servers}, f)
+            os.replace(tmp, self.cache_file)
+
+    def verify(self):
+        """
+        Once per pool: check one cached token against the server and drop
+        every cached entry for it if the account is gone. Returns False
+        when the cache was dropped.
+        """
+        with self._verify_lock:
+            if self.verified:
+                return True
+            self.verified = True
+            with self._lock:
+                now = time.time() + self.refresh_margin
+                sample = next((e for e in self._entries.values() if e["expiresAt"] > now), None)
+            if sample is None:
+                return True
+            try:
+                res = session.get(self.me_url, cookies={"token": sample["token"]})
+                data = res.json() if res.status_code == 200 else None
+            except (requests.RequestException, ValueError):
+                return True  # cannot tell; logins will fail anyway if the server is down
+            if data is not None and (data.get("id") or data.get("_id")) == sample.get("userId"):
+                return True
+            print(f"⚠️ Cached tokens for {self.server} are no longer valid (database reset?); logging in again")
+            with self._lock:
+                self._entries.clear()
+        self.save()
+        return False
+
+    def cached(self, email, password):
+        """Return the cached entry if it is still valid for this password."""
+        with self._lock:
+            entry = self._entries.get(email)
+        if not entry:
+            return None
+        if entry.get("fingerprint") != password_fingerprint(email, password, self.login_url):
+            return None
+        if entry["expiresAt"] - self.refresh_margin <= time.time():
+            return None
+        if not self.verified and not self.verify():
+            return None
+        return entry
+
+    def lookup(self, email):
+        """Any live cached entry for `email`, whatever password it was issued for."""
+        with self._lock:
+            entry = self._entries.get(email)
+        if not entry or entry["expiresAt"] - self.refresh_margin <= time.time():
+            return None
+        if not self.verified and not self.verify():
+            return None
+        return entry
+
+    def invalidate(self, email):
+        with self._lock:
+            self._entries.pop(email, None)
+
+    def invalidate_token(self, token):
+        """Drop the entry holding `token`; True if there was one."""
+        with self._lock:
+            email = next((email for email, e in self._entries.items() if e["token"] == token), None)
+            if email is None:
+                return False
+            del self._entries[email]
+        self.save()
+        return True
+
+    def check_response(self, response, *args, **kwargs):
+        """requests response hook: drop the cached entry a 401/404 auth failure was sent with."""
+        if response.status_code not in (401, 404) or response.request is None:
+            return
+        token = sent_token(response.request)
+        if not token:
+            return
+        try:
+            data = response.json() if response.status_code == 404 else None
+        except ValueError:
+            data = None
+        if is_auth_failure(response.status_code, data):
+            self.invalidate_token(token)
+
+    def watch(self, http_session):
+        """Have `http_session` drop cached tokens the server rejects."""
+        hooks = http_session.hooks.setdefault("response", [])
+        if self.check_response not in hooks:
+            hooks.append(self.check_response)
+        return http_session
+
+    # ------------------------------------------
+    # LOGIN
+    # ------------------------------------------
+
+    def _store(self, email, password, response):
+        token = extract_token(response)
+        if not token:
+            return None
+        entry = {
+            "email": email,
+            "token": token,
+            "userId": extract_user_id(response.json()),
+            "expiresAt": token_expiry(token),
+            "fingerprint": password_fingerprint(email, password, self.login_url),
+        }
+        with self._lock:
+            self._entries[email] = entry
+            self.logins += 1
+        return entry
+
+    def _login(self, email, password, name=None):
+        """Log in; when `name` is given and login fails, register the account instead."""
+        try:
+            res = session.post(self.login_url, json={"email": email, "password": password})
+            if res.status_code == 200:
+                return self._store(email, password, res)
+            if name is None:
+                return None
+            res = session.post(self.register_url, json={"name": name, "email": email, "password": password})
+            if res.status_code in [200, 201]:
+                return self._store(email, password, res)
+        except Exception as e:
+            print(f"   ❌ Auth error for {email}: {e}")
+        return None
+
+    def get(self, email, password, name=None):
+        """Token entry for one account ({'token', 'userId', 'expiresAt', ...}) or None."""
+        entry = self.cached(email, password)
+        if entry:
+            with self._lock:
+                self.hits += 1
+            return entry
+        entry = self._login(email, password, name)
+        self.save()
+        return entry
+
+    def login_many(self, accounts):
+        """
+        `accounts` is a list of (email, password) or (email, password, name)
+        tuples; a name enables register-on-failure. Returns {email: entry or None}.
+        """
+        results = {}
+        pending = []
+        for account in accounts:
+            email, password = account[0], account[1]
+            entry = self.cached(email, password)
+            if entry:
+                results[email] = entry
+            else:
+                pending.append(account)
+
+        with self._lock:
+            self.hits += len(results)
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for account, entry in zip(pending, pool.map(lambda a: self._login(*a), pending)):
+                    results[account[0]] = entry
+            self.save()
+
+        return results
+
+
+_pool = None
+
+
+def get_token_pool():
+    """Process-wide TokenPool backed by CACHE_FILE, watching the shared session."""
+    global _pool
+    if _pool is None:
+        _pool = TokenPool()
+        _pool.watch(session)
+    return _pool
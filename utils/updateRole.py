@@ -1,6 +1,30 @@
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 
-API_URL = "http://localhost:5000/api/user"
+if __package__ in (None, ""):
+    # Run as a file rather than with -m: put the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.allUsers import PAGE_SIZE, iter_user_pages
+from utils.httpClient import BASE_URL, create_session, get_session
+from utils.loadtest.stats import StatsCollector, print_report
+
+session = get_session()
+
+API_URL = f"{BASE_URL}/user"
+
+# Bulk mode (--bulk): (user id or email, role) rows applied concurrently
+ROLES = ("student", "admin")  # what PUT /:userId/role accepts
+DEFAULT_WORKERS = 16
+OBJECT_ID = re.compile(r"^[0-9a-fA-F]{24}$")
+FAILURE_FIELDS = ["user", "role", "error"]
 
 def update_user_role(user_id, new_role):
     """
@@ -23,7 +47,7 @@ def update_user_role(user_id, new_role):
     print(f"🔄 Updating user {user_id} to role: {new_role}")
     
     try:
-        response = requests.put(f"{API_URL}/{user_id}/role", json=payload)
+        response = session.put(f"{API_URL}/{user_id}/role", json=payload)
         response.raise_for_status()
         
         result = response.json()
@@ -54,7 +78,7 @@ def get_user_details(user_id):
     Get specific user details before and after update
     """
     try:
-        response = requests.get(f"{API_URL}/{user_id}")
+        response = session.get(f"{API_URL}/{user_id}")
         response.raise_for_status()
         
         user = response.json()
@@ -74,7 +98,7 @@ def get_user_details(user_id):
     
     return None
 
-if __name__ == "__main__":
+def single_update():
     # SPECIFIC USER ID - Replace with the actual user ID you want to update
     TARGET_USER_ID = "691a7fb4cf1b0ee3f7731207"  # ⚠️ Change this to your specific user ID
     
@@ -103,4 +127,233 @@ if __name__ == "__main__":
         else:
             print("\n❌ Failed to update user role")
     else:
-        print(f"\n❌ Cannot proceed. User with ID {TARGET_USER_ID} not found or inaccessible.")
\ No newline at end of file
+        print(f"\n❌ Cannot proceed. User with ID {TARGET_USER_ID} not found or inaccessible.")
+
+# ==========================================
+# BULK MODE
+# ==========================================
+
+def read_role_changes(source):
+    """
+    Read (user, role, line) rows from a CSV file, or stdin for "-".
+    `user` is an ObjectId or an email. A header row naming the columns
+    (user/id/email and role) is optional; blank lines and lines starting
+    with # are ignored.
+    """
+    f = sys.stdin if source == "-" else open(source, encoding="utf-8", newline="")
+    try:
+        rows = []
+        user_col, role_col = 0, 1
+        for line, row in enumerate(csv.reader(f), 1):
+            row = [cell.strip() for cell in row]
+            if not any(row) or row[0].startswith("#"):
+                continue
+            lowered = [cell.lower() for cell in row]
+            if not rows and "role" in lowered:
+                role_col = lowered.index("role")
+                user_col = next((lowered.index(name) for name in ("user", "id", "_id", "email") if name in lowered),
+                                1 if role_col == 0 else 0)
+                continue
+            if len(row) <= max(user_col, role_col):
+                rows.append((row[0], None, line))
+                continue
+            rows.append((row[user_col], row[role_col].lower(), line))
+        return rows
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+class UserIndex:
+    """
+    Every user fetched once through the paged listing, looked up by id or
+    email (case-insensitive). Built once per run, so resolving hundreds of
+    emails costs a handful of page requests instead of one GET each.
+    """
+
+    def __init__(self, users=()):
+        self.by_id = {}
+        self.by_email = {}
+        for user in users:
+            self.add(user)
+
+    def add(self, user):
+        self.by_id[user["_id"]] = user
+        if user.get("email"):
+            self.by_email[user["email"].lower()] = user
+
+    @classmethod
+    def fetch(cls, page_size=PAGE_SIZE):
+        index = cls()
+        for page in iter_user_pages(page_size):
+            for user in page:
+                index.add(user)
+        return index
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def lookup(self, key):
+        if OBJECT_ID.match(key):
+            return self.by_id.get(key)
+        return self.by_email.get(key.lower())
+
+def plan_role_changes(rows, index):
+    """
+    Resolve rows against the index. Returns (changes, skipped, failures):
+    changes are (user, role) still to send, skipped are users already in
+    the wanted role, failures are (user key, role, error) rows that were
+    never sent. A user listed with different roles is ambiguous, so none
+    of that user's rows are applied and every one of them is a failure;
+    repeating the same change is not.
+    """
+    wanted = {}
+    failures = []
+    for key, role, line in rows:
+        if role not in ROLES:
+            failures.append((key, role or "", f"line {line}: role must be one of {', '.join(ROLES)}"))
+            continue
+        user = index.lookup(key)
+        if user is None:
+            failures.append((key, role, f"line {line}: user not found"))
+            continue
+        wanted.setdefault(user["_id"], (user, []))[1].append((key, role, line))
+
+    changes, skipped = [], []
+    for user, requested in wanted.values():
+        roles = {role for _, role, _ in requested}
+        if len(roles) > 1:
+            lines = ", ".join(str(line) for _, _, line in requested)
+            for key, role, line in requested:
+                failures.append((key, role, f"line {line}: conflicting roles {'/'.join(sorted(roles))} "
+                                            f"for this user (lines {lines}); nothing applied"))
+            continue
+        role = requested[0][1]
+        (skipped if user.get("role") == role else changes).append((user, role))
+    return changes, skipped, failures
+
+def apply_role_changes(changes, workers=DEFAULT_WORKERS, stats=None):
+    """
+    PUT every (user, role) change with up to `workers` requests in flight,
+    one pooled connection per worker. Latencies go to `stats` as
+    "PUT_UserRole". Returns (applied, failures) like plan_role_changes.
+    """
+    stats = stats or StatsCollector()
+    bulk_session = create_session(pool_maxsize=workers)
+
+    def send(change):
+        user, role = change
+        started = time.perf_counter()
+        try:
+            response = bulk_session.put(f"{API_URL}/{user['_id']}/role", json={"role": role})
+        except requests.exceptions.RequestException as e:
+            stats.record("PUT_UserRole", time.perf_counter() - started, ok=False)
+            return change, str(e)
+        ok = response.status_code == 200
+        stats.record("PUT_UserRole", time.perf_counter() - started, ok=ok)
+        if ok:
+            return change, None
+        try:
+            message = response.json().get("message", response.reason)
+        except ValueError:
+            message = response.reason
+        return change, f"HTTP {response.status_code}: {message}"
+
+    applied, failures = [], []
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for (user, role), error in pool.map(send, changes):
+                if error:
+                    failures.append((user.get("email") or user["_id"], role, error))
+                else:
+                    user["role"] = role
+                    applied.append((user, role))
+    finally:
+        bulk_session.close()
+    return applied, failures
+
+def write_failures(filename, failures):
+    """Failed rows as CSV with the same user,role columns --bulk reads, so they can be retried."""
+    with open(filename, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(FAILURE_FIELDS)
+        writer.writerows(failures)
+
+def bulk_update(source, workers=DEFAULT_WORKERS, page_size=PAGE_SIZE, dry_run=False, failures_file=None):
+    """Read, resolve and apply role changes from `source`; prints a summary and returns the failure count."""
+    rows = read_role_changes(source)
+    print(f"📄 {len(rows)} role change(s) read from {'stdin' if source == '-' else source}")
+
+    started = time.perf_counter()
+    index = UserIndex.fetch(page_size)
+    print(f"🗂️  Indexed {len(index):,} users in {time.perf_counter() - started:.2f}s")
+
+    changes, skipped, failures = plan_role_changes(rows, index)
+    print(f"🔄 {len(changes)} to change, {len(skipped)} already in that role, {len(failures)} rejected")
+
+    applied = []
+    stats = StatsCollector()
+    if changes and not dry_run:
+        stats.start()
+        applied, put_failures = apply_role_changes(changes, workers=workers, stats=stats)
+        stats.stop()
+        failures += put_failures
+        print_report(stats.report(), stats.wall_time)
+
+    print("\n📈 Bulk Role Update Summary:")
+    print(f"   Applied: {len(applied)}" + (f" (dry run, {len(changes)} would change)" if dry_run else ""))
+    print(f"   Skipped (no-op): {len(skipped)}")
+    print(f"   Failed: {len(failures)}")
+    for role in ROLES:
+        moved = sum(1 for _, r in applied if r == role)
+        if moved:
+            print(f"   → {role}: {moved}")
+
+    if failures:
+        print("\n❌ Failures:")
+        for key, role, error in failures[:20]:
+            print(f"   {key} → {role or '?'}: {error}")
+        if len(failures) > 20:
+            print(f"   ... and {len(failures) - 20} more")
+        if failures_file:
+            write_failures(failures_file, failures)
+            print(f"💾 Failed rows saved to: {failures_file} (retry with --bulk {failures_file})")
+    return len(failures)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Change one user's role (edit TARGET_USER_ID), or many with --bulk.")
+    parser.add_argument("--bulk", metavar="CSV",
+                        help="user,role rows (user is an id or email); '-' reads stdin")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="concurrent PUT requests (default: %(default)s)")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE,
+                        help="users per request while building the index (default: %(default)s)")
+    parser.add_argument("--dry-run", action="store_true", help="resolve and report, send nothing")
+    parser.add_argument("--failures", metavar="CSV", help="write failed rows to CSV for a retry")
+    args = parser.parse_args(argv)
+
+    if not args.bulk:
+        single_update()
+        return 0
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.page_size < 1:
+        parser.error("--page-size must be at least 1")
+
+    print("=== Bulk User Role Update ===")
+    try:
+        failed = bulk_update(args.bulk, workers=args.workers, page_size=args.page_size,
+                             dry_run=args.dry_run, failures_file=args.failures)
+    except FileNotFoundError as e:
+        print(f"❌ Error: {e}")
+        return 1
+    except requests.exceptions.ConnectionError:
+        print("❌ Error: Cannot connect to server. Make sure the server is running on http://localhost:5000")
+        return 1
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Error while indexing users: {e}")
+        return 1
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())